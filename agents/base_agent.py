@@ -1,11 +1,25 @@
+import asyncio
+import copy
 from abc import ABC, abstractmethod
+from collections.abc import Callable
+
+import numpy as np
+
 from simulation.data_models import (
     AuctionState, Bid, AuctionResult,
-    MultiItemAuctionState, ItemBid, MultiItemAuctionResult
+    MultiItemAuctionState, ItemBid, MultiItemAuctionResult, AscendingAuctionState
 )
+from simulation.instrumentation import Instrumentation, NULL_INSTRUMENTATION
 
 
 class BaseAgent(ABC):
+    # Where the agent reports timings and counters; environments given an
+    # Instrumentation hand it to agents still using this default
+    instrumentation: Instrumentation = NULL_INSTRUMENTATION
+    # Rounds between the updates of a budget pacing strategy; None if bids do
+    # not depend on the remaining budget. See bid_block.
+    pacing_interval: int | None = None
+
     def __init__(self, agent_id: int):
         self.agent_id = agent_id
 
@@ -14,6 +28,37 @@ class BaseAgent(ABC):
         """Return a bid for a single-item auction."""
         pass
 
+    async def get_bid_async(self, auction_state: AuctionState, history: list[AuctionResult]) -> Bid:
+        """
+        Async variant of get_bid used by the concurrent environment loop.
+
+        Runs get_bid in a worker thread by default; agents with a native async
+        client should override it.
+        """
+        return await asyncio.to_thread(self.get_bid, auction_state, history)
+
+    @property
+    def supports_async_cancellation(self) -> bool:
+        """
+        Whether cancelling get_bid_async stops the bid. The default runs
+        get_bid in a worker thread, which keeps running when cancelled.
+        """
+        return _defining_class(type(self), "get_bid_async") is not BaseAgent
+
+    def prepare_batch_request(self, auction_state: AuctionState, history: list[AuctionResult]) -> dict | None:
+        """
+        Return Messages API parameters to submit in a message batch, or None to
+        bid directly through get_bid. Agents returning parameters must also
+        implement bid_from_batch_response.
+        """
+        return None
+
+    def bid_from_batch_response(self, response) -> Bid:
+        """Turn the response to a request from prepare_batch_request into a bid."""
+        raise NotImplementedError(
+            f"{self.__class__.__name__} does not support message batches"
+        )
+
     def get_item_bids(
         self,
         auction_state: MultiItemAuctionState,
@@ -22,4 +67,175 @@ class BaseAgent(ABC):
         """Return bids for a multi-item auction. Override in subclasses."""
         raise NotImplementedError(
             f"{self.__class__.__name__} does not support multi-item auctions"
-        )
\ No newline at end of file
+        )
+
+    def get_ascending_bids(
+        self,
+        auction_state: AscendingAuctionState,
+        history: list[MultiItemAuctionResult]
+    ) -> list[ItemBid]:
+        """
+        Return new bids for one sub-round of an ascending auction (see
+        simulation.ascending_auction). Each bid is a limit the auction bids
+        up to on the agent's behalf; raise it in a later sub-round to stay in.
+
+        By default the agent enters the bids get_item_bids would make in a
+        sealed-bid round as its limits in the first sub-round, and nothing after.
+        """
+        if auction_state.sub_round > 1:
+            return []
+        return self.get_item_bids(
+            MultiItemAuctionState(
+                agent_id=auction_state.agent_id,
+                round_number=auction_state.round_number,
+                items=auction_state.items,
+                private_values=auction_state.private_values,
+                valuation_model=auction_state.valuation_model
+            ),
+            history
+        )
+
+    def get_state(self) -> dict:
+        """
+        Internal state (RNG states, running statistics) needed to resume a
+        checkpointed simulation. Must be picklable. Stateless agents return {}.
+        """
+        return {}
+
+    def set_state(self, state: dict) -> None:
+        """Restore state returned by get_state."""
+        pass
+
+    def fork(self, stream: int) -> "BaseAgent":
+        """
+        An independent copy of this agent, e.g. to bid in another process on
+        a shard of the markets (see simulation.multi_market). Agents that draw
+        random numbers must give each `stream` its own RNG stream, so copies
+        do not repeat each other's draws.
+        """
+        # The copy reports nowhere: an Instrumentation holds a lock and belongs to this process
+        return copy.deepcopy(self, memo={id(self.instrumentation): NULL_INSTRUMENTATION})
+
+    def bid_batch(self, private_values: np.ndarray) -> np.ndarray:
+        """
+        Bid for many rounds at once. Only strategies that ignore the history
+        (and the round number) can implement this.
+
+        The environments use it instead of get_bid / get_item_bids whenever
+        every agent supports it, so it must return exactly the bids those
+        methods would have returned round by round, consuming any RNG the same way.
+
+        Args:
+            private_values: Array of shape (rounds, items) with one column per
+                item, in auction item order (a single column for single-item
+                auctions).
+
+        Returns:
+            Array of bid amounts with the same shape.
+        """
+        raise NotImplementedError(
+            f"{self.__class__.__name__} does not support batch bidding"
+        )
+
+    def bid_block(self, private_values: np.ndarray, remaining_budget: float) -> np.ndarray:
+        """
+        Bid for the next rounds of a single-item auction with budgets, given
+        the budget left before the first of them (inf without a budget).
+
+        Budgeted environments play agents in bulk through this method,
+        in blocks that never cross a multiple of any agent's pacing_interval.
+        Like bid_batch, it must return exactly the bids get_bid would have
+        returned round by round. By default it is bid_batch, for strategies
+        that ignore the budget.
+
+        Args:
+            private_values: Array of shape (rounds, 1).
+
+        Returns:
+            Array of bid amounts with the same shape.
+        """
+        return self.bid_batch(private_values)
+
+    @classmethod
+    def bid_blocks(
+        cls, agents: list["BaseAgent"], private_values: np.ndarray, remaining_budgets: np.ndarray
+    ) -> np.ndarray:
+        """
+        bid_block for several agents at once, which environments call once per
+        group of bid_block_groups. Strategies with state that vectorizes well
+        override it to bid for all their agents in one call; by default each
+        agent bids through its own bid_block.
+
+        Args:
+            agents: Agents of this class (of any class for BaseAgent.bid_blocks).
+            private_values: Array of shape (rounds, len(agents)).
+            remaining_budgets: Array of shape (len(agents),).
+
+        Returns:
+            Array of bid amounts with the same shape as private_values.
+        """
+        # One contiguous row per agent, rather than a strided column
+        agent_values = np.ascontiguousarray(np.asarray(private_values, dtype=np.float64).T)[:, :, None]
+        bids = np.empty(agent_values.shape[1::-1])
+        for column, (agent, remaining) in enumerate(zip(agents, np.asarray(remaining_budgets).tolist())):
+            bids[:, column] = agent.bid_block(agent_values[column], remaining)[:, 0]
+        return bids
+
+    @property
+    def supports_bid_block(self) -> bool:
+        """Whether bid_block can stand in for get_bid (see supports_bid_batch)."""
+        cls = type(self)
+        block_owner = _defining_class(cls, "bid_block")
+        if block_owner is BaseAgent:
+            return self.supports_bid_batch
+        return all(
+            issubclass(block_owner, _defining_class(cls, name))
+            for name in ("get_bid", "get_item_bids")
+        )
+
+    @property
+    def supports_bid_batch(self) -> bool:
+        """
+        Whether bid_batch can stand in for this agent's per-round methods.
+
+        A subclass that overrides get_bid or get_item_bids without also
+        overriding bid_batch falls back to per-round bidding, since the
+        inherited bid_batch no longer describes its strategy.
+        """
+        cls = type(self)
+        batch_owner = _defining_class(cls, "bid_batch")
+        if batch_owner is BaseAgent:
+            return False
+        return all(
+            issubclass(batch_owner, _defining_class(cls, name))
+            for name in ("get_bid", "get_item_bids")
+        )
+
+
+def bid_block_groups(agents: list[BaseAgent]) -> list[tuple[Callable, list[BaseAgent], np.ndarray]]:
+    """
+    Split `agents` into the groups that bid through one bid_blocks call:
+    the agents of each class with its own bid_blocks together, and the
+    others in a single group bidding through BaseAgent.bid_blocks.
+
+    Returns:
+        (bid_blocks, the group's agents, their positions in `agents`) for
+        each group. Pass the same agent lists on every call, so that the
+        groups' state can be kept together between calls.
+    """
+    groups: dict[type, list[int]] = {}
+    for position, agent in enumerate(agents):
+        cls = type(agent)
+        blocks_owner = _defining_class(cls, "bid_blocks")
+        # An inherited bid_blocks no longer describes an overridden bid_block
+        if blocks_owner is BaseAgent or not issubclass(blocks_owner, _defining_class(cls, "bid_block")):
+            cls = BaseAgent
+        groups.setdefault(cls, []).append(position)
+    return [
+        (cls.bid_blocks, [agents[position] for position in positions], np.array(positions))
+        for cls, positions in groups.items()
+    ]
+
+
+def _defining_class(cls: type, name: str) -> type:
+    return next(klass for klass in cls.__mro__ if name in vars(klass))
\ No newline at end of file
@@ -0,0 +1,122 @@
+"""
+Reading bids out of Messages API responses.
+
+Responses are read block by block, from either the SDK's typed message or
+the plain dict form kept in the response cache: a `submit_bid` tool call
+(see BID_TOOL) wins, otherwise the first "BID: <amount>" line of a text
+block. Nothing is stringified or concatenated along the way.
+
+`BidPolicy` decides what happens around the parse: how often a malformed
+answer is retried, how bids are clamped and what is bid when the retries
+run out.
+"""
+import math
+import re
+from dataclasses import dataclass
+
+BID_TOOL_NAME = "submit_bid"
+BID_TOOL = {
+    "name": BID_TOOL_NAME,
+    "description": "Submit your sealed bid for this auction round.",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "reasoning": {"type": "string", "description": "Brief reasoning for the bid."},
+            "bid_amount": {"type": "number", "minimum": 0, "description": "The amount you bid."},
+        },
+        "required": ["bid_amount"],
+    },
+}
+
+# "BID: 42.5", "**Bid** - $1,200", ...
+BID_PATTERN = re.compile(r"\bBID\s*\**\s*[:\-=]\s*\**\s*\$?\s*(\d[\d,]*(?:\.\d+)?|\.\d+)", re.IGNORECASE)
+
+
+class BidParseError(ValueError):
+    """Raised when a response contains no usable bid."""
+
+
+def _field(block, name: str):
+    """A content block field, from an SDK block or its dict form."""
+    if isinstance(block, dict):
+        return block.get(name)
+    return getattr(block, name, None)
+
+
+def content_blocks(response) -> list:
+    """The content blocks of an SDK message or its dict form ([] if there are none)."""
+    content = _field(response, "content")
+    return content if isinstance(content, list) else []
+
+
+def extract_bid(response) -> float:
+    """
+    The bid in a response: the `bid_amount` of a submit_bid tool call, or
+    else the amount of the first "BID: <amount>" in a text block.
+
+    Raises:
+        BidParseError: If there is no bid, or it is not a finite number.
+    """
+    blocks = content_blocks(response)
+    for block in blocks:
+        if _field(block, "type") == "tool_use" and _field(block, "name") == BID_TOOL_NAME:
+            tool_input = _field(block, "input")
+            amount = tool_input.get("bid_amount") if isinstance(tool_input, dict) else None
+            if isinstance(amount, bool) or not isinstance(amount, (int, float, str)):
+                raise BidParseError(f"The {BID_TOOL_NAME} call has no numeric bid_amount.")
+            try:
+                amount = float(amount)
+            except ValueError:
+                raise BidParseError(f"The {BID_TOOL_NAME} bid_amount {amount!r} is not a number.") from None
+            if not math.isfinite(amount):
+                raise BidParseError(f"The {BID_TOOL_NAME} bid_amount {amount} is not finite.")
+            return amount
+
+    for block in blocks:
+        if _field(block, "type") == "text":
+            match = BID_PATTERN.search(_field(block, "text") or "")
+            if match:
+                return float(match.group(1).replace(",", ""))
+    raise BidParseError("Could not parse bid amount from LLM response.")
+
+
+@dataclass
+class BidPolicy:
+    """
+    Args:
+        max_retries: Follow-up requests per bid after a response without a
+            usable bid. Each one shows the model its answer and the problem.
+        retry_budget: Retries allowed over the agent's lifetime (None: no
+            limit), so a model that keeps failing cannot multiply the cost of a run.
+        max_bid_ratio: If given, bids above this multiple of the private
+            value are clamped to it. Negative bids are always clamped to 0.
+        fallback_fraction: When no usable bid is left after the retries, bid
+            this fraction of the private value. The default 0.0 abstains;
+            None raises BidParseError instead.
+    """
+    max_retries: int = 1
+    retry_budget: int | None = None
+    max_bid_ratio: float | None = None
+    fallback_fraction: float | None = 0.0
+
+    def __post_init__(self):
+        if self.max_retries < 0:
+            raise ValueError(f"max_retries must be non-negative, got {self.max_retries}")
+        if self.fallback_fraction is not None and self.fallback_fraction < 0:
+            raise ValueError(f"fallback_fraction must be non-negative, got {self.fallback_fraction}")
+
+    def clamp(self, amount: float, private_value: float | None) -> float:
+        amount = max(amount, 0.0)
+        if self.max_bid_ratio is not None and private_value is not None:
+            amount = min(amount, self.max_bid_ratio * private_value)
+        return amount
+
+    def may_retry(self, attempt: int, retries_used: int) -> bool:
+        """Whether a bid that has had `attempt` retries may have another."""
+        within_budget = self.retry_budget is None or retries_used < self.retry_budget
+        return attempt < self.max_retries and within_budget
+
+    def fallback(self, private_value: float | None, error: BidParseError) -> float:
+        if self.fallback_fraction is None or private_value is None:
+            raise error
+        return self.fallback_fraction * private_value
@@ -0,0 +1,340 @@
+"""
+Shared API clients and rate limiting for LLM agents.
+
+Every LLMAgent gets its own lightweight `anthropic.Anthropic` object, but all
+of them send through one HTTP connection pool per base URL, owned by a
+process-wide `ClientManager`. Async clients are shared per event loop, as
+their connections cannot outlive it.
+
+Requests go through a `RateLimiter` shared by every agent using the same
+API key and base URL:
+
+- Token buckets for requests and tokens per minute keep the request rate
+  under the quota instead of running into it.
+- A 429 (rate limited) or 529 (overloaded) response pauses every agent for
+  the server's retry-after (or an exponential backoff) and halves the rate,
+  which then creeps back up with each successful request.
+- Connection errors and other 5xx responses are retried with the same
+  backoff, but do not slow the rate down.
+
+The SDK's own retries are turned off, since they would retry each agent's
+429s independently.
+"""
+import asyncio
+import os
+import random
+import threading
+import time
+import weakref
+from collections.abc import Callable
+
+import anthropic
+from dotenv import load_dotenv
+
+THROTTLE_STATUSES = (429, 529)
+
+
+class TokenBucket:
+    """
+    Refills at `rate_per_minute * scale` per minute, up to `burst_seconds`
+    worth of refill (and at least one full acquire). Acquires larger than the
+    capacity are allowed from a full bucket, leaving it in debt.
+    """
+
+    def __init__(self, rate_per_minute: float, burst_seconds: float, clock: Callable[[], float]):
+        self.rate_per_minute = rate_per_minute
+        self.burst_seconds = burst_seconds
+        self._clock = clock
+        self.level = self.capacity
+        self._updated = clock()
+
+    @property
+    def capacity(self) -> float:
+        return max(self.rate_per_minute * self.burst_seconds / 60.0, 1.0)
+
+    def _refill(self, scale: float) -> None:
+        now = self._clock()
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate_per_minute * scale / 60.0)
+        self._updated = now
+
+    def wait_time(self, amount: float, scale: float) -> float:
+        """Seconds until `amount` can be taken (0.0 if it can be now)."""
+        self._refill(scale)
+        needed = min(amount, self.capacity)
+        if self.level >= needed:
+            return 0.0
+        return (needed - self.level) * 60.0 / (self.rate_per_minute * scale)
+
+    def take(self, amount: float) -> None:
+        self.level -= amount
+
+
+class RateLimiter:
+    """
+    Paces API calls to stay within request and token quotas, and backs off
+    when the server throttles anyway. Thread-safe; usable from sync and async code.
+
+    Args:
+        requests_per_minute: Request quota (None: unlimited).
+        tokens_per_minute: Input plus output token quota (None: unlimited).
+            Input tokens are estimated from the prompt when the request is
+            sent and corrected, with the output tokens, from the response's usage.
+        max_attempts: Attempts per call before a throttling or transient
+            error is raised.
+        burst_seconds: Largest burst allowed, in seconds of quota.
+        min_scale: Lowest fraction of the quotas throttling can cut the rate to.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float | None = None,
+        tokens_per_minute: float | None = None,
+        max_attempts: int = 6,
+        burst_seconds: float = 1.0,
+        min_scale: float = 0.05,
+        initial_backoff: float = 1.0,
+        max_backoff: float = 60.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.max_attempts = max_attempts
+        self.min_scale = min_scale
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._requests = TokenBucket(requests_per_minute, burst_seconds, clock) if requests_per_minute else None
+        self._tokens = TokenBucket(tokens_per_minute, burst_seconds, clock) if tokens_per_minute else None
+        self.scale = 1.0  # fraction of the quotas currently used
+        self._paused_until = 0.0
+        self._consecutive_throttles = 0
+        self.throttled = 0  # throttling responses seen
+        self.waited_seconds = 0.0  # total time calls spent waiting for the limiter
+
+    # Pacing
+
+    def _reserve(self, tokens: float) -> float:
+        """Take one request and `tokens` tokens if available; otherwise the seconds to wait."""
+        with self._lock:
+            wait = max(self._paused_until - self._clock(), 0.0)
+            for bucket, amount in ((self._requests, 1), (self._tokens, tokens)):
+                if bucket is not None:
+                    wait = max(wait, bucket.wait_time(amount, self.scale))
+            if wait > 0:
+                return wait
+            for bucket, amount in ((self._requests, 1), (self._tokens, tokens)):
+                if bucket is not None:
+                    bucket.take(amount)
+            return 0.0
+
+    def acquire(self, tokens: float = 0) -> None:
+        while (wait := self._reserve(tokens)) > 0:
+            self.waited_seconds += wait
+            time.sleep(wait)
+
+    async def acquire_async(self, tokens: float = 0) -> None:
+        while (wait := self._reserve(tokens)) > 0:
+            self.waited_seconds += wait
+            await asyncio.sleep(wait)
+
+    # Feedback
+
+    def record_success(self, estimated_tokens: float, used_tokens: float | None) -> None:
+        """Settle a call's token estimate against its usage and let the rate recover a little."""
+        with self._lock:
+            if self._tokens is not None and used_tokens is not None:
+                self._tokens.take(used_tokens - estimated_tokens)
+            self._consecutive_throttles = 0
+            self.scale = min(1.0, self.scale + 0.05)
+
+    def record_throttle(self, retry_after: float | None) -> None:
+        """Pause every caller and halve the rate after a 429/529."""
+        with self._lock:
+            self.throttled += 1
+            self._consecutive_throttles += 1
+            self.scale = max(self.min_scale, self.scale / 2)
+            pause = retry_after if retry_after is not None else self._backoff(self._consecutive_throttles)
+            self._paused_until = max(self._paused_until, self._clock() + pause)
+
+    def _backoff(self, attempt: int) -> float:
+        """Exponential backoff with full jitter."""
+        return random.uniform(0, min(self.max_backoff, self.initial_backoff * 2 ** (attempt - 1)))
+
+    # Calls
+
+    def call(self, create: Callable, params: dict):
+        """`create(**params)` once the limiter allows it, retrying throttling and transient errors."""
+        estimate = estimate_input_tokens(params)
+        for attempt in range(1, self.max_attempts + 1):
+            self.acquire(estimate)
+            try:
+                response = create(**params)
+            except anthropic.APIError as error:
+                delay = self._handle_error(error, attempt)
+                if delay:
+                    time.sleep(delay)
+                continue
+            self.record_success(estimate, usage_tokens(response))
+            return response
+
+    async def call_async(self, create: Callable, params: dict):
+        estimate = estimate_input_tokens(params)
+        for attempt in range(1, self.max_attempts + 1):
+            await self.acquire_async(estimate)
+            try:
+                response = await create(**params)
+            except anthropic.APIError as error:
+                delay = self._handle_error(error, attempt)
+                if delay:
+                    await asyncio.sleep(delay)
+                continue
+            self.record_success(estimate, usage_tokens(response))
+            return response
+
+    def _handle_error(self, error: anthropic.APIError, attempt: int) -> float:
+        """
+        Re-raise `error` unless it is worth retrying. Returns the delay before
+        the next attempt (throttling delays are applied through the pause instead).
+        """
+        status = getattr(error, "status_code", None)
+        if attempt >= self.max_attempts:
+            raise error
+        if status in THROTTLE_STATUSES:
+            self.record_throttle(_retry_after(error))
+            return 0.0
+        if isinstance(error, anthropic.APIConnectionError) or (status is not None and status >= 500):
+            return self._backoff(attempt)
+        raise error
+
+
+def estimate_input_tokens(params: dict) -> int:
+    """Rough input token count of a request: about four characters per token."""
+    characters = len(params.get("system") or "")
+    for message in params.get("messages", ()):
+        content = message.get("content")
+        if isinstance(content, str):
+            characters += len(content)
+        else:
+            for block in content or ():
+                characters += len(str(block.get("text") or block.get("content") or block.get("input") or ""))
+    return characters // 4 + 1
+
+
+def usage_tokens(response) -> int | None:
+    """Input plus output tokens reported by an SDK message, or None."""
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return None
+    return (getattr(usage, "input_tokens", 0) or 0) + (getattr(usage, "output_tokens", 0) or 0)
+
+
+def _retry_after(error: anthropic.APIError) -> float | None:
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    headers = response.headers
+    try:
+        if headers.get("retry-after-ms") is not None:
+            return float(headers["retry-after-ms"]) / 1000.0
+        if headers.get("retry-after") is not None:
+            return float(headers["retry-after"])
+    except ValueError:
+        pass
+    return None
+
+
+class ClientManager:
+    """
+    Owns the HTTP connection pools and rate limiters shared by LLM agents.
+
+    Args:
+        requests_per_minute: Request quota per API key and base URL.
+        tokens_per_minute: Token quota per API key and base URL.
+        max_attempts: See RateLimiter.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float | None = None,
+        tokens_per_minute: float | None = None,
+        max_attempts: int = 6
+    ):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._http_clients: dict[str | None, object] = {}
+        self._async_clients: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self._limiters: dict[tuple[str, str | None], RateLimiter] = {}
+        self._dotenv_loaded = False
+
+    def api_key(self) -> str:
+        """ANTHROPIC_API_KEY, from the environment or a .env file (read once, on first use)."""
+        with self._lock:
+            if not self._dotenv_loaded:
+                load_dotenv()
+                self._dotenv_loaded = True
+        api_key = os.getenv("ANTHROPIC_API_KEY")
+        if not api_key:
+            raise ValueError("ANTHROPIC_API_KEY not found in environment variables.")
+        return api_key
+
+    def client(self, api_key: str, base_url: str | None = None) -> anthropic.Anthropic:
+        """A new client object sending through the shared connection pool for `base_url`."""
+        with self._lock:
+            http_client = self._http_clients.get(base_url)
+            if http_client is None:
+                http_client = self._http_clients[base_url] = anthropic.DefaultHttpxClient()
+        return anthropic.Anthropic(api_key=api_key, base_url=base_url, http_client=http_client, max_retries=0)
+
+    def async_client(self, api_key: str, base_url: str | None = None) -> anthropic.AsyncAnthropic:
+        """The async client shared by every agent on the running event loop."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            clients = self._async_clients.setdefault(loop, {})
+            client = clients.get((api_key, base_url))
+            if client is None:
+                client = clients[(api_key, base_url)] = anthropic.AsyncAnthropic(
+                    api_key=api_key, base_url=base_url, max_retries=0
+                )
+        return client
+
+    def rate_limiter(self, api_key: str, base_url: str | None = None) -> RateLimiter:
+        with self._lock:
+            limiter = self._limiters.get((api_key, base_url))
+            if limiter is None:
+                limiter = self._limiters[(api_key, base_url)] = RateLimiter(
+                    self.requests_per_minute, self.tokens_per_minute, max_attempts=self.max_attempts
+                )
+        return limiter
+
+    def close(self) -> None:
+        """Close the shared sync connection pools (async ones close with their event loop)."""
+        with self._lock:
+            for http_client in self._http_clients.values():
+                http_client.close()
+            self._http_clients.clear()
+
+
+_shared_manager: ClientManager | None = None
+_shared_lock = threading.Lock()
+
+
+def shared_client_manager() -> ClientManager:
+    """The process-wide ClientManager used by agents not given one."""
+    global _shared_manager
+    with _shared_lock:
+        if _shared_manager is None:
+            _shared_manager = ClientManager()
+        return _shared_manager
+
+
+def configure_clients(
+    requests_per_minute: float | None = None,
+    tokens_per_minute: float | None = None,
+    max_attempts: int = 6
+) -> ClientManager:
+    """Replace the process-wide ClientManager, e.g. to set quotas. Affects agents created afterwards."""
+    global _shared_manager
+    with _shared_lock:
+        _shared_manager = ClientManager(requests_per_minute, tokens_per_minute, max_attempts)
+        return _shared_manager
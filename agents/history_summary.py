@@ -0,0 +1,98 @@
+from collections import deque
+from collections.abc import Sequence
+from dataclasses import dataclass
+
+from simulation.data_models import AuctionResult
+
+
+@dataclass
+class RoundOutcome:
+    round_number: int
+    winning_bid: float
+    own_bid: float | None  # None if the agent did not bid that round
+    won: bool
+
+
+class HistorySummary:
+    """
+    Running statistics over one agent's view of the auction history.
+
+    Each settled round is folded in exactly once, so keeping the summary up to
+    date costs O(agents) per round no matter how long the history grows. Only
+    the last `window` rounds are kept in full.
+    """
+
+    def __init__(self, agent_id: int, window: int = 5):
+        self.agent_id = agent_id
+        self.window = window
+        self.reset()
+
+    def reset(self) -> None:
+        self.last_round = 0
+        self.rounds_seen = 0
+        self.wins = 0
+        self.allocated_rounds = 0
+        self.winning_bid_total = 0.0
+        self.shading_total = 0.0
+        self.shading_count = 0
+        self.recent: deque[RoundOutcome] = deque(maxlen=self.window)
+
+    @property
+    def win_rate(self) -> float:
+        return self.wins / self.rounds_seen if self.rounds_seen else 0.0
+
+    @property
+    def average_winning_bid(self) -> float:
+        return self.winning_bid_total / self.allocated_rounds if self.allocated_rounds else 0.0
+
+    @property
+    def average_shading(self) -> float | None:
+        """Average of own bid / own private value, or None if never observed."""
+        return self.shading_total / self.shading_count if self.shading_count else None
+
+    def update(self, result: AuctionResult) -> None:
+        """Fold one settled round into the summary."""
+        own_bid = next((bid.bid_amount for bid in result.all_bids if bid.agent_id == self.agent_id), None)
+        won = result.winning_agent_id == self.agent_id
+
+        self.last_round = result.round_number
+        self.rounds_seen += 1
+        if won:
+            self.wins += 1
+        if result.winning_agent_id != -1:
+            self.allocated_rounds += 1
+            self.winning_bid_total += result.winning_bid
+        private_value = result.private_values.get(self.agent_id, 0.0)
+        if own_bid is not None and private_value > 0:
+            self.shading_total += own_bid / private_value
+            self.shading_count += 1
+        self.recent.append(RoundOutcome(
+            round_number=result.round_number,
+            winning_bid=result.winning_bid,
+            own_bid=own_bid,
+            won=won
+        ))
+
+    def sync(self, history: Sequence[AuctionResult]) -> None:
+        """
+        Fold in every result in `history` not seen yet.
+
+        Only the tail of `history` is read, so this works with full lists,
+        result stores and bounded windows alike. A history whose latest round
+        is older than what has been seen is treated as a new simulation.
+        """
+        if not history:
+            if self.rounds_seen:
+                self.reset()
+            return
+        if history[-1].round_number < self.last_round:
+            self.reset()
+
+        new_results = []
+        for index in range(len(history) - 1, -1, -1):
+            result = history[index]
+            if result.round_number <= self.last_round:
+                break
+            new_results.append(result)
+        for result in reversed(new_results):
+            self.update(result)
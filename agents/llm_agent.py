@@ -1,75 +1,259 @@
 from simulation.data_models import Bid, AuctionState, AuctionResult
 from agents.base_agent import BaseAgent
-import anthropic
-from dotenv import load_dotenv
-import os
-import re
+from agents.client_pool import ClientManager, shared_client_manager
+from agents.bid_parsing import BID_TOOL, BID_TOOL_NAME, BidParseError, BidPolicy, extract_bid
+from agents.history_summary import HistorySummary
+from agents.response_cache import ResponseCache
+from simulation.instrumentation import (
+    LLM_CACHE_HITS_TOTAL, LLM_CALLS_TOTAL, LLM_INPUT_TOKENS_TOTAL,
+    LLM_FALLBACK_BIDS_TOTAL, LLM_OUTPUT_TOKENS_TOTAL, LLM_PARSE_FAILURES_TOTAL, LLM_PHASE_SECONDS,
+    LLM_RETRIES_TOTAL
+)
+import copy
+import logging
+
+logger = logging.getLogger(__name__)
+
+SYSTEM_PROMPT = "You are a strategic bidder in a first-price sealed-bid auction.\nIf you win, you pay your bid amount. Your goal is to maximise your profit over multiple rounds.\n"
 
-load_dotenv()
 
 class LLMAgent(BaseAgent):
-    def __init__(self, agent_id: int, model: str = "claude-sonnet-4-5-20250929"):
+    def __init__(
+        self,
+        agent_id: int,
+        model: str = "claude-sonnet-4-5-20250929",
+        base_url: str | None = None,
+        history_window: int = 5,
+        cache: ResponseCache | None = None,
+        bid_policy: BidPolicy | None = None,
+        use_bid_tool: bool = False,
+        client_manager: ClientManager | None = None
+    ):
         super().__init__(agent_id)
-        api_key=os.getenv("ANTHROPIC_API_KEY")
-        if not api_key:
-            raise ValueError("ANTHROPIC_API_KEY not found in environment variables.")
-        self.client = anthropic.Anthropic(api_key=api_key)
+        # Connection pools and the rate limiter are shared with every agent using the same manager
+        self.client_manager = client_manager if client_manager is not None else shared_client_manager()
+        self._api_key = self.client_manager.api_key()
+        self.base_url = base_url
+        self.client = self.client_manager.client(self._api_key, base_url)
+        self.rate_limiter = self.client_manager.rate_limiter(self._api_key, base_url)
         self.model = model
+        self.history_summary = HistorySummary(agent_id, window=history_window)
+        self.cache = cache
+        self.bid_policy = bid_policy if bid_policy is not None else BidPolicy()
+        # Ask for bids through the submit_bid tool instead of a "BID:" line
+        self.use_bid_tool = use_bid_tool
+        self.retries_used = 0
+        # (params, private value) of the request handed out by prepare_batch_request
+        self._pending_batch: tuple[dict, float] | None = None
     
+    @property
+    def async_client(self):
+        """The async client shared on the running event loop."""
+        return self.client_manager.async_client(self._api_key, self.base_url)
+
     def _format_prompt(self, auction_state: AuctionState, history: list[AuctionResult]) -> str:
+        summary = self.history_summary
+        summary.sync(history)
         prompt = f"For this auction round, your private value for the item is: {auction_state.private_value}\n"
-        if auction_state.round_number > 1:
-            prompt += f"Here is the history of previous auctions:\n"
-            for result in history:
-                prompt += f"In round {result.round_number}, the winning bid was {result.winning_bid}.\n"
-                if result.winning_agent_id == self.agent_id:
-                    prompt += f"You bid {result.winning_bid}. Your bid won.\n"
+        if summary.rounds_seen:
+            prompt += f"Summary of the {summary.rounds_seen} previous auctions:\n"
+            prompt += f"You won {summary.wins} of them (win rate {summary.win_rate:.0%}).\n"
+            prompt += f"The average winning bid was {summary.average_winning_bid:.2f}.\n"
+            if summary.average_shading is not None:
+                prompt += f"On average you bid {summary.average_shading:.0%} of your private value.\n"
+            prompt += f"Here are the last {len(summary.recent)} auctions:\n"
+            for outcome in summary.recent:
+                prompt += f"In round {outcome.round_number}, the winning bid was {outcome.winning_bid}.\n"
+                if outcome.own_bid is None:
+                    prompt += "You did not bid.\n"
+                elif outcome.won:
+                    prompt += f"You bid {outcome.own_bid}. Your bid won.\n"
                 else:
-                    prompt += f"You bid {next(bid.bid_amount for bid in result.all_bids if bid.agent_id == self.agent_id)}. Your bid lost.\n"
-                    prompt += f"The winning bid was {result.winning_bid}.\n"
+                    prompt += f"You bid {outcome.own_bid}. Your bid lost.\n"
         else:
             prompt += "This is the first auction round, so there is no history.\n"
         prompt += "\nBased on this information, what is your bid amount?\n"
-        prompt += "IMPORTANT: Start your response with the bid in the format: BID: <amount>\n"
-        prompt += "Then explain your reasoning.\n"
-        print(f"Formatted prompt: {prompt}")
+        if self.use_bid_tool:
+            prompt += f"Submit your bid with the {BID_TOOL_NAME} tool, including your reasoning.\n"
+        else:
+            prompt += "IMPORTANT: Start your response with the bid in the format: BID: <amount>\n"
+            prompt += "Then explain your reasoning.\n"
+        logger.debug("Formatted prompt: %s", prompt)
         return prompt
     
-    def _parse_bid_from_response(self, response: dict) -> float:
-        text = ""
-        if isinstance(response, dict):
-            content = response.get("content")
-            if isinstance(content, list):
-                parts = []
-                for item in content:
-                    if isinstance(item, dict) and item.get("type") == "text":
-                        parts.append(item.get("text", ""))
-                text = "".join(parts).strip()
-        # fallback to string conversion
-        if not text:
-            text = str(response)
-
-        match = re.search(r'BID\s*[:\-]\s*([0-9]+(?:\.[0-9]+)?)', text, re.IGNORECASE)
-        if match:
-            return float(match.group(1))
-        
-        raise ValueError("Could not parse bid amount from LLM response.")
-
-        
+    def _parse_bid_from_response(self, response) -> float:
+        return extract_bid(response)
 
-    
-    def get_bid(self, auction_state: AuctionState, history: list[AuctionResult]) -> Bid:
-        prompt = self._format_prompt(auction_state, history)
-
-        response = self.client.messages.create(
-            model= self.model,
-            max_tokens=1024,
-            system="You are a strategic bidder in a first-price sealed-bid auction.\nIf you win, you pay your bid amount. Your goal is to maximise your profit over multiple rounds.\n",
-            messages=[
+    def _request_params(self, prompt: str) -> dict:
+        params = {
+            "model": self.model,
+            "max_tokens": 1024,
+            "system": SYSTEM_PROMPT,
+            "messages": [
                 {"role": "user", "content": prompt}
             ]
-        )
-        print(f"LLM Response: {response}")
-        bid_amount = self._parse_bid_from_response(response)
-        return Bid(agent_id=self.agent_id, bid_amount=bid_amount)
-        
+        }
+        if self.use_bid_tool:
+            params["tools"] = [BID_TOOL]
+            params["tool_choice"] = {"type": "tool", "name": BID_TOOL_NAME}
+        return params
+
+    def _retry_params(self, params: dict, response, error: BidParseError) -> dict:
+        """The conversation so far, plus the failed answer and a request to bid again."""
+        # Unset optional fields (e.g. "citations": None) are dropped before sending the blocks back
+        content = [
+            {name: value for name, value in block.items() if value is not None}
+            for block in _response_to_dict(response).get("content") or []
+        ]
+        tool_calls = [block["id"] for block in content if block.get("type") == "tool_use" and block.get("id")]
+        if tool_calls:
+            follow_up = [
+                {"type": "tool_result", "tool_use_id": tool_use_id, "is_error": True,
+                 "content": f"{error} Call {BID_TOOL_NAME} again with a valid bid_amount."}
+                for tool_use_id in tool_calls
+            ]
+        elif self.use_bid_tool:
+            follow_up = f"{error} Submit your bid with the {BID_TOOL_NAME} tool."
+        else:
+            follow_up = f"{error} Reply with your bid in the format: BID: <amount>"
+        messages = list(params["messages"])
+        if content:
+            messages.append({"role": "assistant", "content": content})
+        messages.append({"role": "user", "content": follow_up})
+        return {**params, "messages": messages}
+
+    def _create_message(self, params: dict):
+        response = self.cached_response(params)
+        if response is None:
+            with self.instrumentation.timer(LLM_PHASE_SECONDS, agent_id=self.agent_id, phase="api"):
+                response = self.rate_limiter.call(self.client.messages.create, params)
+            response = self.store_response(params, response)
+        return response
+
+    async def _create_message_async(self, params: dict):
+        response = self.cached_response(params)
+        if response is None:
+            with self.instrumentation.timer(LLM_PHASE_SECONDS, agent_id=self.agent_id, phase="api"):
+                response = await self.rate_limiter.call_async(self.async_client.messages.create, params)
+            response = self.store_response(params, response)
+        return response
+
+    def _prompt_params(self, auction_state: AuctionState, history: list[AuctionResult]) -> dict:
+        with self.instrumentation.timer(LLM_PHASE_SECONDS, agent_id=self.agent_id, phase="prompt"):
+            return self._request_params(self._format_prompt(auction_state, history))
+
+    def get_bid(self, auction_state: AuctionState, history: list[AuctionResult]) -> Bid:
+        params = self._prompt_params(auction_state, history)
+        response = self._create_message(params)
+        return self._resolve_bid(params, response, auction_state.private_value)
+
+    async def get_bid_async(self, auction_state: AuctionState, history: list[AuctionResult]) -> Bid:
+        params = self._prompt_params(auction_state, history)
+        response = await self._create_message_async(params)
+        attempt = 0
+        while True:
+            outcome = self._bid_or_retry(params, response, auction_state.private_value, attempt)
+            if isinstance(outcome, Bid):
+                return outcome
+            params, attempt = outcome, attempt + 1
+            response = await self._create_message_async(params)
+
+    def _resolve_bid(self, params: dict | None, response, private_value: float | None) -> Bid:
+        """Turn a response into a bid, sending follow-up requests while the policy allows."""
+        attempt = 0
+        while True:
+            outcome = self._bid_or_retry(params, response, private_value, attempt)
+            if isinstance(outcome, Bid):
+                return outcome
+            params, attempt = outcome, attempt + 1
+            response = self._create_message(params)
+
+    def _bid_or_retry(self, params: dict | None, response, private_value: float | None, attempt: int) -> Bid | dict:
+        """
+        The bid in `response`, clamped by the bid policy, or the params of a
+        follow-up request if it has none and a retry is allowed. When none
+        is, the policy's fallback bid is returned (or BidParseError raised).
+        """
+        logger.debug("LLM response: %s", response)
+        try:
+            amount = self._parse_bid(response)
+        except BidParseError as error:
+            if params is not None and self.bid_policy.may_retry(attempt, self.retries_used):
+                self.retries_used += 1
+                self.instrumentation.increment(LLM_RETRIES_TOTAL, agent_id=self.agent_id)
+                return self._retry_params(params, response, error)
+            amount = self.bid_policy.fallback(private_value, error)
+            self.instrumentation.increment(LLM_FALLBACK_BIDS_TOTAL, agent_id=self.agent_id)
+            return Bid(agent_id=self.agent_id, bid_amount=amount)
+        return Bid(agent_id=self.agent_id, bid_amount=self.bid_policy.clamp(amount, private_value))
+
+    def _parse_bid(self, response) -> float:
+        with self.instrumentation.timer(LLM_PHASE_SECONDS, agent_id=self.agent_id, phase="parse"):
+            try:
+                return self._parse_bid_from_response(response)
+            except BidParseError:
+                self.instrumentation.increment(LLM_PARSE_FAILURES_TOTAL, agent_id=self.agent_id)
+                raise
+
+    def prepare_batch_request(self, auction_state: AuctionState, history: list[AuctionResult]) -> dict:
+        params = self._prompt_params(auction_state, history)
+        self._pending_batch = (params, auction_state.private_value)
+        return params
+
+    def cached_response(self, params: dict) -> dict | None:
+        """Return the cached response for these request params, if any."""
+        if self.cache is None:
+            return None
+        response = self.cache.get(ResponseCache.key(params))
+        if response is not None:
+            self.instrumentation.increment(LLM_CACHE_HITS_TOTAL, agent_id=self.agent_id)
+        return response
+
+    def store_response(self, params: dict, response):
+        """
+        Record a fresh response's token usage, cache it and return it in the
+        form a cache hit would have.
+        """
+        if self.instrumentation.enabled:
+            input_tokens, output_tokens = _token_usage(response)
+            self.instrumentation.increment(LLM_CALLS_TOTAL, agent_id=self.agent_id)
+            self.instrumentation.increment(LLM_INPUT_TOKENS_TOTAL, input_tokens, agent_id=self.agent_id)
+            self.instrumentation.increment(LLM_OUTPUT_TOKENS_TOTAL, output_tokens, agent_id=self.agent_id)
+        if self.cache is None:
+            return response
+        response = _response_to_dict(response)
+        self.cache.put(ResponseCache.key(params), response)
+        return response
+
+    def bid_from_batch_response(self, response) -> Bid:
+        """
+        The bid in the response to the last prepare_batch_request. Retries
+        are sent directly rather than through another batch.
+        """
+        params, private_value = self._pending_batch or (None, None)
+        self._pending_batch = None
+        return self._resolve_bid(params, response, private_value)
+
+    def get_state(self) -> dict:
+        # The summary covers rounds that may have left a bounded history window
+        return {"history_summary": copy.deepcopy(self.history_summary), "retries_used": self.retries_used}
+
+    def set_state(self, state: dict) -> None:
+        self.history_summary = copy.deepcopy(state["history_summary"])
+        self.retries_used = state.get("retries_used", 0)
+
+
+def _response_to_dict(response) -> dict:
+    """Convert an SDK message to the plain dict form stored in the cache."""
+    if isinstance(response, dict):
+        return response
+    return response.model_dump(mode="json")
+
+
+def _token_usage(response) -> tuple[int, int]:
+    """(input tokens, output tokens) of an SDK message or its dict form."""
+    if isinstance(response, dict):
+        usage = response.get("usage") or {}
+        return usage.get("input_tokens", 0) or 0, usage.get("output_tokens", 0) or 0
+    usage = getattr(response, "usage", None)
+    return getattr(usage, "input_tokens", 0) or 0, getattr(usage, "output_tokens", 0) or 0
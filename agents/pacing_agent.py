@@ -0,0 +1,287 @@
+"""
+Budget pacing strategies.
+
+A paced agent spreads its budget over a run of known length. It bids
+through a control in [min_control, 1], updated every `pacing_interval`
+rounds from the budget the environment reports as remaining
+(`AuctionState.remaining_budget`): the control is multiplied by
+exp(learning_rate * (target - spent) / target), where `spent` is what the
+agent paid over the last interval and `target` an even share, for one
+interval, of the budget it had left at the start of it. Overspending lowers
+the control, underspending raises it. Agents without a budget keep a
+control of 1.
+
+Between two updates the bids depend only on the values (and the agent's
+random stream), so whole intervals are bid at once through bid_block, and
+all the agents of one strategy at once through bid_blocks. To make the
+latter a single NumPy call per block, an agent's parameters and state live
+in a `_PacingGroup`, one array entry per agent: each agent starts in a group
+of its own, and bid_blocks moves the agents it is given into a shared one.
+For the same reason ThrottlingAgent draws from a counter-based stream (a
+hash of its key and the round) rather than from a per-agent RNG object: the
+draws of many agents over many rounds are then one vectorized computation,
+and do not depend on how the rounds are split into blocks.
+"""
+import math
+from abc import abstractmethod
+
+import numpy as np
+
+import agents.base_agent as base_agent
+
+# SplitMix64 constants (see _uniforms)
+_GOLDEN_GAMMA = np.uint64(0x9E3779B97F4A7C15)
+_MIX_1 = np.uint64(0xBF58476D1CE4E5B9)
+_MIX_2 = np.uint64(0x94D049BB133111EB)
+
+
+class _PacingGroup:
+    """
+    Parameters and state of pacing agents as arrays, one entry per agent.
+    `members` is the agent list the group was built for by bid_blocks (None
+    once one of them has been moved to another group).
+    """
+    __slots__ = (
+        "num_rounds", "pacing_interval", "learning_rate", "shading_factor", "min_control",
+        "control", "rounds_played", "interval_budget", "key", "members"
+    )
+
+    def __init__(self, size: int):
+        self.num_rounds = np.zeros(size, dtype=np.int64)
+        self.pacing_interval = np.ones(size, dtype=np.int64)
+        self.learning_rate = np.zeros(size)
+        self.shading_factor = np.zeros(size)
+        self.min_control = np.zeros(size)
+        self.control = np.ones(size)
+        self.rounds_played = np.zeros(size, dtype=np.int64)
+        self.interval_budget = np.full(size, np.nan)  # NaN: no budget seen at the last update
+        self.key = np.zeros(size, dtype=np.uint64)  # random stream of ThrottlingAgent
+        self.members = None
+
+    def copy_entry(self, slot: int, target: "_PacingGroup", target_slot: int) -> None:
+        for name in _PacingGroup.__slots__[:-1]:
+            getattr(target, name)[target_slot] = getattr(self, name)[slot]
+
+    @staticmethod
+    def of(agents: list["PacingAgent"]) -> "_PacingGroup":
+        """The group holding exactly `agents`, in order, made on the first call for this list."""
+        group = agents[0]._group
+        if group.members is agents:
+            return group
+        group = _PacingGroup(len(agents))
+        group.members = agents
+        for slot, agent in enumerate(agents):
+            agent._group.copy_entry(agent._slot, group, slot)
+            agent._group.members = None
+            agent._group, agent._slot = group, slot
+        return group
+
+
+def _group_field(name: str, doc: str) -> property:
+    def get(self):
+        return getattr(self._group, name)[self._slot].item()
+
+    def set(self, value):
+        getattr(self._group, name)[self._slot] = value
+
+    return property(get, set, doc=doc)
+
+
+class PacingAgent(base_agent.BaseAgent):
+    """
+    Base class of the pacing strategies; subclasses turn the control into bids.
+
+    Args:
+        num_rounds: Length of the run the budget has to last.
+        pacing_interval: Rounds between control updates.
+        learning_rate: Step size of the multiplicative update.
+        shading_factor: Fraction of the private value bid at full control.
+        min_control: Lowest control the updates can reach.
+    """
+
+    num_rounds = _group_field("num_rounds", "Length of the run the budget has to last.")
+    pacing_interval = _group_field("pacing_interval", "Rounds between control updates.")
+    learning_rate = _group_field("learning_rate", "Step size of the multiplicative update.")
+    shading_factor = _group_field("shading_factor", "Fraction of the private value bid at full control.")
+    min_control = _group_field("min_control", "Lowest control the updates can reach.")
+    control = _group_field("control", "Current control, in [min_control, 1].")
+    rounds_played = _group_field("rounds_played", "Rounds bid for so far.")
+
+    def __init__(
+        self,
+        agent_id: int,
+        num_rounds: int,
+        pacing_interval: int = 100,
+        learning_rate: float = 0.5,
+        shading_factor: float = 0.8,
+        min_control: float = 0.01
+    ):
+        super().__init__(agent_id)
+        if pacing_interval < 1:
+            raise ValueError(f"pacing_interval must be at least 1, got {pacing_interval}")
+        if not 0.0 <= shading_factor <= 1.0:
+            raise ValueError(f"shading_factor must be in [0, 1], got {shading_factor}")
+        if not 0.0 < min_control <= 1.0:
+            raise ValueError(f"min_control must be in (0, 1], got {min_control}")
+        self._group, self._slot = _PacingGroup(1), 0
+        self.num_rounds = num_rounds
+        self.pacing_interval = pacing_interval
+        self.learning_rate = learning_rate
+        self.shading_factor = shading_factor
+        self.min_control = min_control
+
+    @property
+    def interval_budget(self) -> float | None:
+        """Budget left at the start of the current interval."""
+        budget = self._group.interval_budget[self._slot].item()
+        return None if math.isnan(budget) else budget
+
+    @interval_budget.setter
+    def interval_budget(self, budget: float | None) -> None:
+        self._group.interval_budget[self._slot] = np.nan if budget is None else budget
+
+    @classmethod
+    @abstractmethod
+    def _bids(cls, group: _PacingGroup, slots: np.ndarray, private_values: np.ndarray) -> np.ndarray:
+        """
+        Bids at the current controls of the agents in `slots` of `group`,
+        for private values of shape (rounds, len(slots)).
+        """
+        pass
+
+    @classmethod
+    def _play(
+        cls, group: _PacingGroup, slots: np.ndarray, private_values: np.ndarray, remaining_budgets: np.ndarray
+    ) -> np.ndarray:
+        """Update the controls that are due, then bid for the next rounds."""
+        num_rounds = len(private_values)
+        rounds_played, interval = group.rounds_played[slots], group.pacing_interval[slots]
+        if num_rounds and ((rounds_played + num_rounds - 1) // interval > rounds_played // interval).any():
+            raise ValueError(
+                f"A block of {num_rounds} rounds crosses a pacing update "
+                f"(every {interval.min()} rounds or more)"
+            )
+        _update_controls(group, slots, remaining_budgets)
+        bids = cls._bids(group, slots, private_values)
+        group.rounds_played[slots] += num_rounds
+        return bids
+
+    def get_bid(self, auction_state, history):
+        remaining = auction_state.remaining_budget
+        bids = self._play(
+            self._group, np.array([self._slot]), np.array([[auction_state.private_value]]),
+            np.array([np.nan if remaining is None else remaining])
+        )
+        return base_agent.Bid(agent_id=self.agent_id, bid_amount=float(bids[0, 0]))
+
+    def bid_block(self, private_values: np.ndarray, remaining_budget: float) -> np.ndarray:
+        """Same bids and draws as calling get_bid once per round."""
+        return self._play(
+            self._group, np.array([self._slot]), np.asarray(private_values, dtype=np.float64),
+            np.array([remaining_budget], dtype=np.float64)
+        )
+
+    @classmethod
+    def bid_blocks(cls, agents, private_values, remaining_budgets):
+        """One vectorized update and bid for all of `agents` (see the module docstring)."""
+        group = _PacingGroup.of(agents)
+        return cls._play(
+            group, np.arange(len(agents)), np.asarray(private_values, dtype=np.float64),
+            np.asarray(remaining_budgets, dtype=np.float64)
+        )
+
+    def get_state(self) -> dict:
+        return {
+            "control": self.control,
+            "rounds_played": self.rounds_played,
+            "interval_budget": self.interval_budget,
+        }
+
+    def set_state(self, state: dict) -> None:
+        self.control = state["control"]
+        self.rounds_played = state["rounds_played"]
+        self.interval_budget = state["interval_budget"]
+
+    def __getstate__(self) -> dict:
+        # A copy or pickle of the agent takes its own entry of the group, not the whole group
+        state = self.__dict__.copy()
+        state["_group"], state["_slot"] = _PacingGroup(1), 0
+        self._group.copy_entry(self._slot, state["_group"], 0)
+        return state
+
+
+def _update_controls(group: _PacingGroup, slots: np.ndarray, remaining_budgets: np.ndarray) -> None:
+    """The control update of the agents in `slots` that are at the start of an interval."""
+    due = group.rounds_played[slots] % group.pacing_interval[slots] == 0
+    if not due.any():
+        return
+    slots, remaining = slots[due], remaining_budgets[due]
+    finite = np.isfinite(remaining)
+    interval_budget = group.interval_budget[slots]
+    # NaN (no budget at the last update) compares False
+    updated = finite & (interval_budget > 0)
+    if updated.any():
+        u = slots[updated]
+        interval = group.pacing_interval[u]
+        spent = interval_budget[updated] - remaining[updated]
+        # Rounds the budget had to last at the start of the interval that just ended
+        rounds_left = np.maximum(group.num_rounds[u] - group.rounds_played[u] + interval, interval)
+        target = interval_budget[updated] * interval / rounds_left
+        control = group.control[u] * np.exp(group.learning_rate[u] * (target - spent) / target)
+        group.control[u] = np.minimum(np.maximum(control, group.min_control[u]), 1.0)
+    group.interval_budget[slots] = np.where(finite, remaining, np.nan)
+
+
+class MultiplicativePacingAgent(PacingAgent):
+    """Bids shading_factor * control * value: the control scales every bid down."""
+
+    @classmethod
+    def _bids(cls, group, slots, private_values):
+        return (group.shading_factor[slots] * group.control[slots]) * private_values
+
+
+class ThrottlingAgent(PacingAgent):
+    """
+    Bids shading_factor * value in a random fraction `control` of the rounds
+    and abstains (bids 0.0) in the others.
+    """
+
+    def __init__(self, agent_id: int, num_rounds: int, random_seed: int = None, **pacing):
+        super().__init__(agent_id, num_rounds, **pacing)
+        self.key = np.random.SeedSequence(random_seed).generate_state(1, np.uint64)[0]
+
+    key = _group_field("key", "Key of the agent's random stream.")
+
+    @classmethod
+    def _bids(cls, group, slots, private_values):
+        draws = _uniforms(group.key[slots], group.rounds_played[slots], len(private_values))
+        return np.where(draws < group.control[slots], group.shading_factor[slots] * private_values, 0.0)
+
+    def get_state(self) -> dict:
+        return {**super().get_state(), "key": self.key}
+
+    def set_state(self, state: dict) -> None:
+        super().set_state(state)
+        self.key = state["key"]
+
+    def fork(self, stream: int) -> "ThrottlingAgent":
+        """A copy with its random stream keyed from this agent's key and `stream`."""
+        clone = super().fork(stream)
+        clone.key = np.random.SeedSequence([stream, self.key]).generate_state(1, np.uint64)[0]
+        return clone
+
+
+def _uniforms(keys: np.ndarray, first_rounds: np.ndarray, num_rounds: int) -> np.ndarray:
+    """
+    Uniform draws in [0, 1) of shape (num_rounds, len(keys)): column k holds
+    the draws of stream keys[k] for rounds first_rounds[k] onwards, each the
+    SplitMix64 hash of the key and the round.
+    """
+    rounds = first_rounds.astype(np.uint64) + np.arange(1, num_rounds + 1, dtype=np.uint64)[:, None]
+    z = keys + rounds * _GOLDEN_GAMMA
+    z ^= z >> np.uint64(30)
+    z *= _MIX_1
+    z ^= z >> np.uint64(27)
+    z *= _MIX_2
+    z ^= z >> np.uint64(31)
+    return (z >> np.uint64(11)) * 2.0 ** -53
@@ -1,5 +1,8 @@
 import agents.base_agent as base_agent
 from simulation.data_models import ItemBid, MultiItemAuctionState, MultiItemAuctionResult
+from simulation.value_distributions import numpy_generator
+from simulation.checkpoint import pack_rng_state, unpack_rng_state
+import numpy as np
 import random
 
 
@@ -29,4 +32,23 @@ class RandomAgent(base_agent.BaseAgent):
                 item_id=item.item_id,
                 bid_amount=bid_amount
             ))
-        return bids
\ No newline at end of file
+        return bids
+
+    def get_state(self) -> dict:
+        return {"rng": pack_rng_state(self.rng.getstate())}
+
+    def set_state(self, state: dict) -> None:
+        self.rng.setstate(unpack_rng_state(state["rng"]))
+
+    def fork(self, stream: int) -> "RandomAgent":
+        """A copy with its RNG seeded from this agent's RNG state and `stream`."""
+        clone = super().fork(stream)
+        clone.rng = random.Random(hash((stream, self.rng.getstate())))
+        return clone
+
+    ## bid for many rounds at once
+    def bid_batch(self, private_values: np.ndarray) -> np.ndarray:
+        """Same draws as calling get_bid / get_item_bids once per round."""
+        private_values = np.asarray(private_values, dtype=np.float64)
+        with numpy_generator(self.rng) as generator:
+            return private_values * generator.random(private_values.shape)
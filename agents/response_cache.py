@@ -0,0 +1,96 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+
+class CacheMissError(KeyError):
+    """Raised in replay mode when a request has no recorded response."""
+
+
+class ResponseCache:
+    """
+    Content-addressed on-disk cache of LLM responses.
+
+    Entries are keyed by a hash of the full request parameters (model, system
+    prompt, messages, ...) and stored as one JSON file each. The cache is kept
+    under `max_bytes` by evicting the least recently used entries. In replay
+    mode nothing is ever requested from the API: a miss raises CacheMissError.
+
+    One cache can be shared by agents bidding in different threads (e.g. the
+    concurrent matchups of a Tournament): the bookkeeping is done under a
+    lock and every thread writes through its own temporary file.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 512 * 1024 * 1024, replay: bool = False):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.replay = replay
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        # key -> file size, least recently used first
+        self._entries: OrderedDict[str, int] = OrderedDict()
+        self.total_bytes = 0
+        files = [entry for entry in os.scandir(directory) if entry.name.endswith(".json")]
+        for entry in sorted(files, key=lambda e: e.stat().st_mtime_ns):
+            size = entry.stat().st_size
+            self._entries[entry.name[:-len(".json")]] = size
+            self.total_bytes += size
+
+    @staticmethod
+    def key(request_params: dict) -> str:
+        encoded = json.dumps(request_params, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> dict | None:
+        """Return the cached response for `key`, or None (CacheMissError in replay mode)."""
+        with self._lock:
+            cached = key in self._entries
+        if cached:
+            try:
+                with open(self._path(key), encoding="utf-8") as f:
+                    response = json.load(f)
+                os.utime(self._path(key))
+            except FileNotFoundError:
+                # Evicted by another thread, or another process sharing the directory
+                with self._lock:
+                    self.total_bytes -= self._entries.pop(key, 0)
+            else:
+                with self._lock:
+                    if key in self._entries:
+                        self._entries.move_to_end(key)
+                return response
+        if self.replay:
+            raise CacheMissError(key)
+        return None
+
+    def put(self, key: str, response: dict) -> None:
+        path = self._path(key)
+        payload = json.dumps(response).encode("utf-8")
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self.total_bytes += len(payload) - self._entries.pop(key, 0)
+            self._entries[key] = len(payload)
+            self._evict()
+
+    def _evict(self) -> None:
+        """Drop least recently used entries until the cache fits; call with the lock held."""
+        while self.total_bytes > self.max_bytes and len(self._entries) > 1:
+            key, size = self._entries.popitem(last=False)
+            self.total_bytes -= size
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,59 @@
+import numpy as np
+
+import agents.base_agent as base_agent
+from simulation.data_models import ItemBid, MultiItemAuctionState, MultiItemAuctionResult
+
+
+class ShadingAgent(base_agent.BaseAgent):
+    """Bids a fixed fraction of its private value on every item."""
+
+    def __init__(self, agent_id: int, shading_factor: float = 0.8):
+        super().__init__(agent_id)
+        if not 0.0 <= shading_factor <= 1.0:
+            raise ValueError(f"shading_factor must be in [0, 1], got {shading_factor}")
+        self.shading_factor = shading_factor
+
+    def shade(self, private_values):
+        """Bid for a private value (a float or an array of them)."""
+        return self.shading_factor * private_values
+
+    def get_bid(self, auction_state, history):
+        bid_amount = float(self.shade(auction_state.private_value))
+        return base_agent.Bid(agent_id=self.agent_id, bid_amount=bid_amount)
+
+    def get_item_bids(
+        self,
+        auction_state: MultiItemAuctionState,
+        history: list[MultiItemAuctionResult]
+    ) -> list[ItemBid]:
+        return [
+            ItemBid(
+                agent_id=self.agent_id,
+                item_id=item.item_id,
+                bid_amount=float(self.shade(auction_state.private_values.get(item.item_id, 0)))
+            )
+            for item in auction_state.items
+        ]
+
+    def bid_batch(self, private_values: np.ndarray) -> np.ndarray:
+        return self.shade(np.asarray(private_values, dtype=np.float64))
+
+
+class BayesNashAgent(ShadingAgent):
+    """
+    Symmetric Bayes-Nash equilibrium bid of a first-price auction with
+    independent private values uniform on [low, high]:
+    b(v) = low + (n - 1) / n * (v - low), for n bidders.
+
+    Each item of a multi-item auction is treated as its own auction.
+    """
+
+    def __init__(self, agent_id: int, num_bidders: int, low: float = 0.0):
+        if num_bidders < 1:
+            raise ValueError(f"num_bidders must be at least 1, got {num_bidders}")
+        super().__init__(agent_id, shading_factor=(num_bidders - 1) / num_bidders)
+        self.num_bidders = num_bidders
+        self.low = low
+
+    def shade(self, private_values):
+        return self.low + self.shading_factor * (private_values - self.low)
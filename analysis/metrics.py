@@ -0,0 +1,428 @@
+"""
+Allocative efficiency and bid shading of finished runs.
+
+A run's results are first converted to dense arrays (`RoundData`: values,
+bids and wins of shape (rounds, agents, items)), and every metric is then
+computed for all rounds at once:
+
+- Optimal welfare: the best assignment of each round's items to agents under
+  the valuation model. Additive valuations take the best agent per item;
+  other models are compiled to bundle value tables and combined agent by
+  agent with a subset-convolution (max over every split of a bundle between
+  the agents so far and the next one), O(agents * 3^items) per round.
+- Realized welfare: every agent's value for the bundle it actually won, and
+  the efficiency ratio realized / optimal.
+- Shading: each bid against the risk-neutral Bayes-Nash bid of a symmetric
+  first-price auction with independent private values. For uniform values
+  that is low + (n - 1) / n * (v - low); otherwise it is computed from the
+  empirical distribution of the run's values for that item.
+
+`AuctionAnalyzer` caches analyses by run ID, in memory and optionally as
+.npz files, so repeated requests (e.g. from a dashboard) skip the work.
+"""
+import hashlib
+import os
+from dataclasses import dataclass, fields
+from functools import lru_cache
+
+import numpy as np
+
+from simulation.data_models import AuctionResult, MultiItemAuctionResult
+from simulation.results_store import AuctionResultStore
+from simulation.valuation_models import AdditiveValuation, ValuationModel
+from simulation.value_distributions import UniformValues, ValueDistribution
+
+# Largest number of float64 intermediates per chunk of rounds (32 MB)
+CHUNK_ELEMENTS = 1 << 22
+# Candidate (mask, submask) sums per block of rounds in the welfare search (2 MB)
+DP_BLOCK_ELEMENTS = 1 << 18
+# Points of the empirical value distribution used for Bayes-Nash bids
+EMPIRICAL_GRID_POINTS = 4096
+
+
+@dataclass
+class RoundData:
+    """Dense per-round arrays of one run; agents and items in sorted id order."""
+    agent_ids: np.ndarray  # (agents,)
+    item_ids: np.ndarray  # (items,)
+    values: np.ndarray  # (rounds, agents, items) private values
+    bids: np.ndarray  # (rounds, agents, items) bid amounts, 0.0 where no bid was made
+    won: np.ndarray  # (rounds, agents, items) bool
+    prices: np.ndarray  # (rounds, items) price paid, 0.0 if unallocated
+
+
+def round_data(results) -> RoundData:
+    """
+    Convert a run's results to dense arrays.
+
+    Args:
+        results: An AuctionResultStore, or a sequence of AuctionResult or of
+            MultiItemAuctionResult. Every round must involve the same agents.
+    """
+    if isinstance(results, AuctionResultStore):
+        data = _store_round_data(results)
+        if data is not None:
+            return data
+    results = list(results)
+    if not results:
+        raise ValueError("Cannot analyze a run without results")
+    if isinstance(results[0], MultiItemAuctionResult):
+        return _multi_item_round_data(results)
+    return _single_item_round_data(results)
+
+
+def _store_round_data(store: AuctionResultStore) -> RoundData | None:
+    """Reshape the store's columns directly; None if rounds differ in bidders."""
+    num_rounds = len(store)
+    if num_rounds == 0 or len(store.agent_id) % num_rounds:
+        return None
+    agent_ids = store.agent_id.reshape(num_rounds, -1)
+    if not (agent_ids == agent_ids[0]).all():
+        return None
+    order = np.argsort(agent_ids[0], kind="stable")
+    columns = [column.reshape(num_rounds, -1)[:, order, None]
+               for column in (store.private_value, store.bid_amount, store.won)]
+    prices = np.where(store.winning_agent_ids >= 0, store.winning_bids, 0.0)
+    return RoundData(
+        agent_ids=agent_ids[0][order],
+        item_ids=np.zeros(1, dtype=np.int64),
+        values=columns[0].astype(np.float64),
+        bids=columns[1].astype(np.float64),
+        won=columns[2].astype(np.bool_),
+        prices=prices[:, None].astype(np.float64)
+    )
+
+
+def _single_item_round_data(results: list[AuctionResult]) -> RoundData:
+    agent_ids = np.array(sorted(results[0].private_values or {bid.agent_id for bid in results[0].all_bids}))
+    column = {int(agent_id): k for k, agent_id in enumerate(agent_ids)}
+    shape = (len(results), len(agent_ids), 1)
+    values, bids, won = np.zeros(shape), np.zeros(shape), np.zeros(shape, dtype=np.bool_)
+    prices = np.zeros((len(results), 1))
+    for r, result in enumerate(results):
+        for agent_id, value in result.private_values.items():
+            values[r, column[agent_id], 0] = value
+        for bid in result.all_bids:
+            bids[r, column[bid.agent_id], 0] = bid.bid_amount
+        if result.winning_agent_id >= 0:
+            won[r, column[result.winning_agent_id], 0] = True
+            prices[r, 0] = result.winning_bid
+    return RoundData(agent_ids, np.zeros(1, dtype=np.int64), values, bids, won, prices)
+
+
+def _multi_item_round_data(results: list[MultiItemAuctionResult]) -> RoundData:
+    first = results[0]
+    agent_ids = np.array(sorted(first.private_values or {bid.agent_id for bid in first.all_bids}))
+    item_ids = np.array(sorted(first.allocations))
+    agent_column = {int(agent_id): k for k, agent_id in enumerate(agent_ids)}
+    item_column = {int(item_id): k for k, item_id in enumerate(item_ids)}
+    shape = (len(results), len(agent_ids), len(item_ids))
+    values, bids, won = np.zeros(shape), np.zeros(shape), np.zeros(shape, dtype=np.bool_)
+    prices = np.zeros(shape[::2])
+    for r, result in enumerate(results):
+        for agent_id, agent_values in result.private_values.items():
+            values[r, agent_column[agent_id]] = [agent_values.get(int(item_id), 0.0) for item_id in item_ids]
+        for bid in result.all_bids:
+            bids[r, agent_column[bid.agent_id], item_column[bid.item_id]] = bid.bid_amount
+        for item_id, agent_id in result.allocations.items():
+            if agent_id >= 0:
+                won[r, agent_column[agent_id], item_column[item_id]] = True
+                prices[r, item_column[item_id]] = result.prices.get(item_id, 0.0)
+    return RoundData(agent_ids, item_ids, values, bids, won, prices)
+
+
+# Welfare
+
+@lru_cache(maxsize=8)
+def _submask_pairs(num_items: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Every (mask, submask) pair over `num_items` bits, grouped by mask.
+
+    Returns:
+        The rest (mask minus submask) and submask of each pair, and the index
+        where each mask's group starts (for np.maximum.reduceat).
+    """
+    rests, subs, starts = [], [], []
+    for mask in range(1 << num_items):
+        starts.append(len(subs))
+        sub = mask
+        while True:
+            rests.append(mask ^ sub)
+            subs.append(sub)
+            if sub == 0:
+                break
+            sub = (sub - 1) & mask
+    return np.array(rests), np.array(subs), np.array(starts)
+
+
+def _chunk_rounds(elements_per_round: int) -> int:
+    return max(1, CHUNK_ELEMENTS // max(elements_per_round, 1))
+
+
+def welfare(data: RoundData, valuation_model: ValuationModel | None = None) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Optimal and realized welfare of every round.
+
+    Args:
+        data: The run's round arrays.
+        valuation_model: How agents value bundles (additive by default).
+            Valuations are assumed monotone, so leaving items unassigned never helps.
+
+    Returns:
+        (optimal, realized), each of shape (rounds,).
+    """
+    optimal, won_values = _welfare(data, valuation_model)
+    return optimal, won_values.sum(axis=1)
+
+
+def _welfare(data: RoundData, valuation_model: ValuationModel | None) -> tuple[np.ndarray, np.ndarray]:
+    """Optimal welfare (rounds,) and each agent's value for its won bundle (rounds, agents)."""
+    num_rounds, num_agents, num_items = data.values.shape
+    if valuation_model is None or isinstance(valuation_model, AdditiveValuation) or num_items == 1:
+        optimal = np.maximum(data.values.max(axis=1), 0.0).sum(axis=-1)
+        return optimal, np.where(data.won, data.values, 0.0).sum(axis=-1)
+
+    item_ids = [int(item_id) for item_id in data.item_ids]
+    won_masks = (data.won * (1 << np.arange(num_items))).sum(axis=-1)  # (rounds, agents)
+    rests, subs, starts = _submask_pairs(num_items)
+    chunk = _chunk_rounds(num_agents << num_items)
+
+    optimal = np.empty(num_rounds)
+    won_values = np.empty((num_rounds, num_agents))
+    for begin in range(0, num_rounds, chunk):
+        end = min(begin + chunk, num_rounds)
+        tables = valuation_model.compile(item_ids, data.values[begin:end]).table  # (chunk, agents, 2^items)
+        won_values[begin:end] = np.take_along_axis(tables, won_masks[begin:end, :, None], axis=-1)[..., 0]
+
+        optimal[begin:end] = _optimal_welfare(tables, rests, subs, starts)
+    return optimal, won_values
+
+
+def _optimal_welfare(tables: np.ndarray, rests: np.ndarray, subs: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    """Optimal welfare per round from bundle value tables of shape (rounds, agents, 2^items)."""
+    # Mask-major, so gathering by mask moves whole rows of rounds
+    tables = np.ascontiguousarray(tables.transpose(1, 2, 0))  # (agents, 2^items, rounds)
+    num_rounds = tables.shape[-1]
+    optimal = np.empty(num_rounds)
+    # Small enough blocks of rounds for the candidates to stay in cache
+    block = max(1, DP_BLOCK_ELEMENTS // len(subs))
+    for begin in range(0, num_rounds, block):
+        end = min(begin + block, num_rounds)
+        # best[mask]: best welfare from giving exactly the items of mask to the agents so far
+        best = tables[0, :, begin:end]
+        for agent_table in tables[1:, :, begin:end]:
+            best = np.maximum.reduceat(best[rests] + agent_table[subs], starts, axis=0)
+        optimal[begin:end] = best.max(axis=0)
+    return optimal
+
+
+# Bid shading
+
+def bayes_nash_bids(
+    values: np.ndarray,
+    num_bidders: int,
+    value_distribution: ValueDistribution | None = None
+) -> np.ndarray:
+    """
+    Risk-neutral symmetric Bayes-Nash first-price bids,
+    b(v) = v - integral from low to v of F(x)^(n-1) dx / F(v)^(n-1).
+
+    Args:
+        values: Private values of shape (rounds, agents, items).
+        num_bidders: Bidders per auction (n).
+        value_distribution: The values' distribution F. Closed form for
+            UniformValues; otherwise (or if None) F is the empirical
+            distribution of `values`, separately for each item.
+    """
+    if isinstance(value_distribution, UniformValues):
+        low = value_distribution.low
+        return low + (num_bidders - 1) / num_bidders * (values - low)
+
+    bids = np.empty_like(values, dtype=np.float64)
+    for item in range(values.shape[-1]):
+        grid, grid_bids = _empirical_bid_function(values[..., item].ravel(), num_bidders)
+        bids[..., item] = np.interp(values[..., item], grid, grid_bids)
+    return bids
+
+
+def _empirical_bid_function(sample: np.ndarray, num_bidders: int) -> tuple[np.ndarray, np.ndarray]:
+    """The Bayes-Nash bid at up to EMPIRICAL_GRID_POINTS order statistics of `sample`."""
+    ordered = np.sort(sample)
+    positions = np.unique(np.linspace(0, len(ordered) - 1, min(len(ordered), EMPIRICAL_GRID_POINTS)).astype(np.int64))
+    grid = ordered[positions]
+    cdf_power = ((positions + 1) / len(ordered)) ** (num_bidders - 1)
+    # Left Riemann sum of F^(n-1) between consecutive grid points
+    integral = np.concatenate(([0.0], np.cumsum(cdf_power[:-1] * np.diff(grid))))
+    return grid, grid - integral / cdf_power
+
+
+@dataclass
+class RunAnalysis:
+    """Per-round efficiency and per-bid shading of one run."""
+    agent_ids: np.ndarray  # (agents,)
+    item_ids: np.ndarray  # (items,)
+    optimal_welfare: np.ndarray  # (rounds,)
+    realized_welfare: np.ndarray  # (rounds,)
+    values: np.ndarray  # (rounds, agents, items)
+    bids: np.ndarray  # (rounds, agents, items)
+    bayes_nash_bids: np.ndarray  # (rounds, agents, items)
+    won: np.ndarray  # (rounds, agents, items)
+    utility: np.ndarray  # (rounds, agents) value of the bundle won minus the prices paid
+
+    @property
+    def efficiency(self) -> np.ndarray:
+        """Realized / optimal welfare per round (1.0 where the optimum is 0)."""
+        return np.divide(
+            self.realized_welfare, self.optimal_welfare,
+            out=np.ones_like(self.optimal_welfare), where=self.optimal_welfare > 0
+        )
+
+    @property
+    def mean_efficiency(self) -> float:
+        """Total realized over total optimal welfare."""
+        total = self.optimal_welfare.sum()
+        return float(self.realized_welfare.sum() / total) if total > 0 else 1.0
+
+    @property
+    def shading(self) -> np.ndarray:
+        """1 - bid / value per bid (0.0 where the value is 0)."""
+        return 1.0 - np.divide(self.bids, self.values, out=np.ones_like(self.bids), where=self.values > 0)
+
+    @property
+    def bayes_nash_shading(self) -> np.ndarray:
+        return 1.0 - np.divide(
+            self.bayes_nash_bids, self.values, out=np.ones_like(self.bids), where=self.values > 0
+        )
+
+    @property
+    def excess_bids(self) -> np.ndarray:
+        """Bid minus Bayes-Nash bid: positive means shading less than the equilibrium."""
+        return self.bids - self.bayes_nash_bids
+
+    def agent_summary(self) -> dict[int, dict[str, float]]:
+        """Per agent: win rate (items won per round), mean utility per round, and mean shading."""
+        shading = self.shading.mean(axis=(0, 2))
+        bayes_nash_shading = self.bayes_nash_shading.mean(axis=(0, 2))
+        excess = self.excess_bids.mean(axis=(0, 2))
+        win_rate = self.won.sum(axis=(0, 2)) / max(len(self.optimal_welfare), 1)
+        utility = self.utility.mean(axis=0)
+        return {
+            int(agent_id): {
+                "win_rate": float(win_rate[k]),
+                "mean_utility": float(utility[k]),
+                "shading": float(shading[k]),
+                "bayes_nash_shading": float(bayes_nash_shading[k]),
+                "excess_bid": float(excess[k]),
+            }
+            for k, agent_id in enumerate(self.agent_ids)
+        }
+
+    def save(self, path: str) -> None:
+        np.savez(path, **{f.name: getattr(self, f.name) for f in fields(self)})
+
+    @classmethod
+    def load(cls, path: str) -> "RunAnalysis":
+        with np.load(path) as arrays:
+            return cls(**{f.name: arrays[f.name] for f in fields(cls)})
+
+
+def analyze(
+    results,
+    valuation_model: ValuationModel | None = None,
+    value_distribution: ValueDistribution | None = None
+) -> RunAnalysis:
+    """
+    Efficiency and shading of a run (see the module docstring).
+
+    Args:
+        results: The run's results, in any form `round_data` accepts.
+        valuation_model: The environment's valuation model (additive by default).
+        value_distribution: The environment's value distribution, for the
+            Bayes-Nash bids (empirical if None).
+    """
+    data = results if isinstance(results, RoundData) else round_data(results)
+    optimal, won_values = _welfare(data, valuation_model)
+    # Each item's price is paid by its winner
+    paid = (data.won * data.prices[:, None, :]).sum(axis=-1)
+    return RunAnalysis(
+        agent_ids=data.agent_ids,
+        item_ids=data.item_ids,
+        optimal_welfare=optimal,
+        realized_welfare=won_values.sum(axis=1),
+        values=data.values,
+        bids=data.bids,
+        bayes_nash_bids=bayes_nash_bids(data.values, len(data.agent_ids), value_distribution),
+        won=data.won,
+        utility=won_values - paid
+    )
+
+
+def _fingerprint(*configuration) -> str:
+    """Stable digest of analysis settings, from their classes and attributes."""
+    parts = []
+    for obj in configuration:
+        if obj is None:
+            parts.append("None")
+        else:
+            attributes = sorted((name, repr(value)) for name, value in vars(obj).items())
+            parts.append(f"{type(obj).__module__}.{type(obj).__qualname__}{attributes}")
+    return hashlib.sha256("|".join(parts).encode()).hexdigest()
+
+
+class AuctionAnalyzer:
+    """
+    Analyses runs under fixed settings, caching each by run ID.
+
+    Args:
+        valuation_model: The environment's valuation model (additive by default).
+        value_distribution: The environment's value distribution (empirical if None).
+        cache_dir: If given, analyses are also saved there as .npz files and
+            reused by later analyzers with the same settings.
+    """
+
+    def __init__(
+        self,
+        valuation_model: ValuationModel | None = None,
+        value_distribution: ValueDistribution | None = None,
+        cache_dir: str | None = None
+    ):
+        self.valuation_model = valuation_model
+        self.value_distribution = value_distribution
+        self.cache_dir = cache_dir
+        self._fingerprint = _fingerprint(valuation_model, value_distribution)
+        self._memory: dict[str, RunAnalysis] = {}
+        if cache_dir is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, run_id: str) -> str:
+        digest = hashlib.sha256(f"{run_id}\0{self._fingerprint}".encode()).hexdigest()[:32]
+        return os.path.join(self.cache_dir, f"analysis-{digest}.npz")
+
+    def analyze(self, run_id: str, results) -> RunAnalysis:
+        """
+        The analysis of run `run_id`, computed from `results` only if it is not
+        cached yet. `results` may be a zero-argument callable returning them, so
+        a cache hit does not even load the run.
+        """
+        analysis = self.cached(run_id)
+        if analysis is None:
+            analysis = analyze(
+                results() if callable(results) else results, self.valuation_model, self.value_distribution
+            )
+            self._memory[run_id] = analysis
+            if self.cache_dir is not None:
+                analysis.save(self._path(run_id))
+        return analysis
+
+    def cached(self, run_id: str) -> RunAnalysis | None:
+        """The cached analysis of `run_id`, or None."""
+        analysis = self._memory.get(run_id)
+        if analysis is None and self.cache_dir is not None and os.path.exists(self._path(run_id)):
+            analysis = self._memory[run_id] = RunAnalysis.load(self._path(run_id))
+        return analysis
+
+    def invalidate(self, run_id: str) -> None:
+        """Drop `run_id` from the cache, e.g. after the run was extended."""
+        self._memory.pop(run_id, None)
+        if self.cache_dir is not None and os.path.exists(self._path(run_id)):
+            os.remove(self._path(run_id))
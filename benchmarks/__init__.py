@@ -0,0 +1 @@
+"""Benchmark suite for the simulation hot paths. Run with `python -m benchmarks`."""
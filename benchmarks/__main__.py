@@ -0,0 +1,59 @@
+"""
+Run the benchmark suite.
+
+    python -m benchmarks --quick --output results.json
+    python -m benchmarks --output new.json --baseline old.json --threshold 0.1
+
+Exits with status 1 if any case regressed against the baseline.
+"""
+import argparse
+import sys
+
+from benchmarks.cases import all_cases
+from benchmarks.harness import compare, load_results, run_case, save_results
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the auction simulation hot paths.")
+    parser.add_argument("--quick", action="store_true", help="Use a smaller grid of problem sizes.")
+    parser.add_argument("--filter", default="", help="Only run cases whose key contains this text.")
+    parser.add_argument("--output", help="Write results to this JSON file.")
+    parser.add_argument("--baseline", help="Compare against results saved by an earlier run.")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="Relative throughput drop that counts as a regression (default 0.1).")
+    parser.add_argument("--memory-threshold", type=float, default=0.25,
+                        help="Relative peak memory growth that counts as a regression (default 0.25).")
+    parser.add_argument("--repeats", type=int, default=5, help="Timed repeats per case (best is kept).")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Minimum seconds per timed repeat.")
+    args = parser.parse_args(argv)
+
+    cases = [case for case in all_cases(quick=args.quick) if args.filter in case.key]
+    results = []
+    for case in cases:
+        result = run_case(case, repeats=args.repeats, min_time=args.min_time)
+        results.append(result)
+        print(
+            f"{result.key:<70} {result.throughput:>14,.0f} {result.unit}/s"
+            f" {result.peak_memory_bytes / 1024:>10,.0f} KiB peak"
+        )
+
+    if args.output:
+        save_results(args.output, results)
+        print(f"\nResults saved to {args.output}")
+
+    if args.baseline:
+        regressions = compare(load_results(args.baseline), results, args.threshold, args.memory_threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) against {args.baseline}:")
+            for regression in regressions:
+                print(
+                    f"  {regression.key} {regression.metric}: {regression.baseline:,.0f} -> "
+                    f"{regression.current:,.0f} ({regression.change:+.1%})"
+                )
+            return 1
+        print(f"\nNo regressions against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
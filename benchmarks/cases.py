@@ -0,0 +1,305 @@
+"""Benchmark cases for the simulation hot paths, over a grid of problem sizes."""
+import os
+import random
+from unittest.mock import patch
+
+from agents.pacing_agent import MultiplicativePacingAgent, ThrottlingAgent
+from agents.random_agent import RandomAgent
+from analysis.metrics import analyze, round_data
+from benchmarks.harness import BenchmarkCase
+from simulation.auction_environment import AuctionEnvironment, MultiItemAuctionEnvironment
+from simulation.ascending_auction import AscendingAuction
+from simulation.auction_logic import run_auction, run_multi_item_auction, ItemBidIndex
+from simulation.data_models import AuctionResult, AuctionState, Bid, Item, ItemBid
+from simulation.multi_market import MultiMarketEnvironment
+from simulation.valuation_models import AdditiveValuation, SubstitutesValuation, SynergyValuation
+
+
+class PerRoundRandomAgent(RandomAgent):
+    """RandomAgent kept on the per-round path, so _play_round calls get_bid for every agent."""
+
+    def get_bid(self, auction_state, history):
+        return super().get_bid(auction_state, history)
+
+    def get_item_bids(self, auction_state, history):
+        return super().get_item_bids(auction_state, history)
+
+
+def canned_response(bid: float = 42.5) -> dict:
+    return {
+        "id": "msg_benchmark",
+        "type": "message",
+        "role": "assistant",
+        "model": "benchmark",
+        "content": [{"type": "text", "text": f"BID: {bid}\nShading below my value keeps some profit."}],
+        "stop_reason": "end_turn",
+        "usage": {"input_tokens": 200, "output_tokens": 20},
+    }
+
+
+# Auction logic
+
+def prepare_run_auction(agents: int, rounds: int):
+    rng = random.Random(0)
+    bids_by_round = [[Bid(agent_id, rng.uniform(0, 100)) for agent_id in range(agents)] for _ in range(rounds)]
+
+    def run():
+        tie_rng = random.Random(0)
+        for round_number, bids in enumerate(bids_by_round, start=1):
+            run_auction(bids, auction_id=1, rng=tie_rng, round_number=round_number)
+    return run
+
+
+def prepare_run_multi_item_auction(agents: int, items: int, rounds: int):
+    rng = random.Random(0)
+    item_list = [Item(item_id=i) for i in range(items)]
+    bids_by_round = [
+        [ItemBid(agent_id, item_id, rng.uniform(0, 100)) for agent_id in range(agents) for item_id in range(items)]
+        for _ in range(rounds)
+    ]
+
+    bid_index = ItemBidIndex(item_list)
+
+    def run():
+        tie_rng = random.Random(0)
+        for round_number, bids in enumerate(bids_by_round, start=1):
+            run_multi_item_auction(
+                bids, item_list, auction_id=1, rng=tie_rng, round_number=round_number, bid_index=bid_index
+            )
+    return run
+
+
+def prepare_ascending_auction(agents: int, items: int, bids: int, pricing: str):
+    rng = random.Random(0)
+    item_list = [Item(item_id=i) for i in range(items)]
+    # Limits drifting upwards, as agents raise them over the sub-rounds
+    bid_events = [
+        ItemBid(rng.randrange(agents), rng.randrange(items), rng.uniform(0, 100) + 100 * k / bids)
+        for k in range(bids)
+    ]
+
+    def run():
+        auction = AscendingAuction(item_list, increment=0.5, pricing=pricing)
+        auction.submit_many(bid_events)
+        auction.settle(random.Random(0))
+    return run
+
+
+# Valuation models
+
+def valuation_model(model: str, items: int):
+    if model == "additive":
+        return AdditiveValuation()
+    if model == "synergy":
+        return SynergyValuation({frozenset({i, j}): 5.0 for i in range(items) for j in range(i + 1, items)})
+    if model == "substitutes":
+        return SubstitutesValuation([frozenset(range(k, min(k + 3, items))) for k in range(0, items, 3)])
+    raise ValueError(f"Unknown valuation model {model!r}")
+
+
+def prepare_get_bundle_value(model: str, items: int):
+    valuation = valuation_model(model, items)
+    base_values = {i: float(10 + i) for i in range(items)}
+    bundles = [frozenset(i for i in range(items) if mask >> i & 1) for mask in range(1 << items)]
+
+    def run():
+        for bundle in bundles:
+            valuation.get_bundle_value(bundle, base_values)
+    return run
+
+
+# Environment rounds
+
+def prepare_setup_and_play_round(agents: int, items: int, rounds: int):
+    if items == 1:
+        env = AuctionEnvironment(1, 0, [PerRoundRandomAgent(i, random_seed=i) for i in range(agents)])
+    else:
+        item_list = [Item(item_id=i) for i in range(items)]
+        env = MultiItemAuctionEnvironment(
+            1, item_list, [PerRoundRandomAgent(i, random_seed=i) for i in range(agents)], random_seed=0
+        )
+
+    def run():
+        env.value_sampler.reserve(rounds)
+        for round_number in range(1, rounds + 1):
+            states = env._setup_round(round_number)
+            env._play_round(round_number, states, [])
+    return run
+
+
+def prepare_run_simulation(agents: int, items: int, rounds: int, bulk: bool):
+    agent_class = RandomAgent if bulk else PerRoundRandomAgent
+
+    def run():
+        agent_list = [agent_class(i, random_seed=i) for i in range(agents)]
+        if items == 1:
+            env = AuctionEnvironment(1, 0, agent_list)
+        else:
+            env = MultiItemAuctionEnvironment(1, [Item(item_id=i) for i in range(items)], agent_list, random_seed=0)
+        env.run_simulation(rounds)
+    return run
+
+
+def prepare_multi_market(agents: int, markets: int, ticks: int, budgets: bool):
+    market_list = [Item(item_id=i) for i in range(markets)]
+
+    def run():
+        env = MultiMarketEnvironment(
+            1, market_list, [RandomAgent(i, random_seed=i) for i in range(agents)], random_seed=0,
+            budgets={i: 10.0 * markets * ticks for i in range(agents)} if budgets else None
+        )
+        env.run_simulation(ticks)
+    return run
+
+
+def prepare_pacing(agents: int, rounds: int, pacing_interval: int):
+    def run():
+        agent_list = [
+            MultiplicativePacingAgent(i, rounds, pacing_interval=pacing_interval) if i % 2
+            else ThrottlingAgent(i, rounds, pacing_interval=pacing_interval, random_seed=i)
+            for i in range(agents)
+        ]
+        # Budgets worth about half of what the agents would spend unpaced
+        budgets = {i: 20.0 * rounds / agents for i in range(agents)}
+        AuctionEnvironment(1, 0, agent_list, budgets=budgets).run_pacing_simulation(rounds)
+    return run
+
+
+# Run analysis
+
+def prepare_analyze(model: str, agents: int, items: int, rounds: int):
+    valuation = valuation_model(model, items)
+    item_list = [Item(item_id=i) for i in range(items)]
+    env = MultiItemAuctionEnvironment(
+        1, item_list, [RandomAgent(i, random_seed=i) for i in range(agents)], random_seed=0, valuation_model=valuation
+    )
+    data = round_data(env.run_simulation(rounds))
+
+    def run():
+        analyze(data, valuation)
+    return run
+
+
+# LLM agent prompt handling (no network: only prompt building and parsing)
+
+def make_llm_agent():
+    with patch.dict(os.environ, {"ANTHROPIC_API_KEY": os.environ.get("ANTHROPIC_API_KEY", "benchmark-key")}):
+        from agents.llm_agent import LLMAgent
+        return LLMAgent(agent_id=0)
+
+
+def prepare_format_prompt(history: int, prompts: int):
+    agent = make_llm_agent()
+    rng = random.Random(0)
+    past = [
+        AuctionResult(
+            auction_id=1,
+            winning_agent_id=round_number % 3,
+            round_number=round_number,
+            winning_bid=rng.uniform(0, 100),
+            all_bids=[Bid(agent_id, rng.uniform(0, 100)) for agent_id in range(3)],
+            private_values={agent_id: rng.uniform(0, 100) for agent_id in range(3)}
+        )
+        for round_number in range(1, history + 1)
+    ]
+    states = [
+        AuctionState(agent_id=0, private_value=rng.uniform(0, 100), round_number=history + 1)
+        for _ in range(prompts)
+    ]
+
+    def run():
+        for state in states:
+            agent._format_prompt(state, past)
+    return run
+
+
+def prepare_parse_bid(responses: int):
+    agent = make_llm_agent()
+    canned = [canned_response(bid=float(i)) for i in range(responses)]
+
+    def run():
+        for response in canned:
+            agent._parse_bid_from_response(response)
+    return run
+
+
+def all_cases(quick: bool = False) -> list[BenchmarkCase]:
+    """Every benchmark case; `quick` uses a smaller size grid."""
+    agent_counts = [3, 10] if quick else [3, 10, 100]
+    item_counts = [3] if quick else [3, 10]
+    rounds = 200 if quick else 1000
+    cases = []
+
+    for agents in agent_counts:
+        cases.append(BenchmarkCase(
+            "run_auction", prepare_run_auction, {"agents": agents, "rounds": rounds}, units=rounds
+        ))
+        for items in item_counts:
+            cases.append(BenchmarkCase(
+                "run_multi_item_auction", prepare_run_multi_item_auction,
+                {"agents": agents, "items": items, "rounds": rounds // 5}, units=rounds // 5
+            ))
+
+    for model in ("additive", "synergy", "substitutes"):
+        for items in ([6] if quick else [6, 10]):
+            cases.append(BenchmarkCase(
+                "get_bundle_value", prepare_get_bundle_value, {"model": model, "items": items},
+                units=1 << items, unit="bundles"
+            ))
+
+    for agents in agent_counts:
+        for items in [1] + item_counts:
+            cases.append(BenchmarkCase(
+                "setup_and_play_round", prepare_setup_and_play_round,
+                {"agents": agents, "items": items, "rounds": rounds // 5}, units=rounds // 5
+            ))
+
+    for model in ("additive", "synergy", "substitutes"):
+        for agents in agent_counts[:2]:
+            cases.append(BenchmarkCase(
+                "analyze", prepare_analyze, {"model": model, "agents": agents, "items": 6, "rounds": rounds},
+                units=rounds
+            ))
+
+    for history in ([0, 100] if quick else [0, 100, 10_000]):
+        cases.append(BenchmarkCase(
+            "llm_format_prompt", prepare_format_prompt, {"history": history, "prompts": 50},
+            units=50, unit="prompts"
+        ))
+    cases.append(BenchmarkCase(
+        "llm_parse_bid", prepare_parse_bid, {"responses": 100}, units=100, unit="responses"
+    ))
+
+    simulation_rounds = [rounds] if quick else [rounds, 10 * rounds]
+    for agents in agent_counts:
+        for items in [1] + item_counts:
+            for num_rounds in simulation_rounds:
+                for bulk in (False, True):
+                    cases.append(BenchmarkCase(
+                        "run_simulation", prepare_run_simulation,
+                        {"agents": agents, "items": items, "rounds": num_rounds, "bulk": bulk},
+                        units=num_rounds
+                    ))
+
+    for markets in ([1000] if quick else [1000, 10_000]):
+        for budgets in (False, True):
+            cases.append(BenchmarkCase(
+                "multi_market", prepare_multi_market,
+                {"agents": 20, "markets": markets, "ticks": 20, "budgets": budgets},
+                units=20 * markets, unit="auctions"
+            ))
+
+    for agents in ([100] if quick else [100, 1000]):
+        cases.append(BenchmarkCase(
+            "pacing", prepare_pacing, {"agents": agents, "rounds": 10 * rounds, "pacing_interval": 100},
+            units=10 * rounds * agents, unit="bids"
+        ))
+
+    for agents in agent_counts:
+        for pricing in ("english", "clock"):
+            cases.append(BenchmarkCase(
+                "ascending_auction", prepare_ascending_auction,
+                {"agents": agents, "items": 10, "bids": 10 * rounds, "pricing": pricing},
+                units=10 * rounds, unit="bids"
+            ))
+    return cases
@@ -0,0 +1,170 @@
+"""
+Timing, memory measurement and result comparison for the benchmark suite.
+
+A benchmark case is a `prepare` function that does its setup and returns a
+zero-argument callable processing `units` units of work (rounds, bundles,
+prompts, ...) per call. Throughput is the best of several timed repeats;
+peak memory comes from one separate call under tracemalloc, so tracing does
+not skew the timings.
+"""
+import contextlib
+import io
+import json
+import platform
+import subprocess
+import time
+import tracemalloc
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, field
+
+RESULTS_VERSION = 1
+MAX_CALLS = 1 << 20  # per timed repeat
+
+
+@dataclass
+class BenchmarkCase:
+    name: str
+    prepare: Callable[..., Callable[[], object]]
+    params: dict = field(default_factory=dict)
+    units: int = 1  # units of work done by one call of the prepared callable
+    unit: str = "rounds"
+
+    @property
+    def key(self) -> str:
+        """Identifies the case across result files, e.g. 'run_auction[agents=10,rounds=1000]'."""
+        params = ",".join(f"{name}={value}" for name, value in sorted(self.params.items()))
+        return f"{self.name}[{params}]"
+
+
+@dataclass
+class BenchmarkResult:
+    key: str
+    name: str
+    params: dict
+    unit: str
+    units_per_call: int
+    seconds_per_call: float  # best repeat
+    throughput: float  # units per second
+    peak_memory_bytes: int
+    calls: int  # calls per timed repeat
+
+
+@dataclass
+class Regression:
+    key: str
+    metric: str  # "throughput" or "peak_memory_bytes"
+    baseline: float
+    current: float
+
+    @property
+    def change(self) -> float:
+        """Relative change from the baseline, e.g. -0.25 for 25% lower."""
+        return self.current / self.baseline - 1.0 if self.baseline else 0.0
+
+
+def run_case(case: BenchmarkCase, repeats: int = 5, min_time: float = 0.2) -> BenchmarkResult:
+    """
+    Time a case. Each repeat calls the prepared callable enough times to
+    take at least `min_time` seconds, and the fastest repeat is reported.
+    Anything the case prints is discarded.
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        run = case.prepare(**case.params)
+        run()  # warm up caches and lazy imports
+
+        calls = 1
+        elapsed = _time_calls(run, calls)
+        while elapsed < min_time and calls < MAX_CALLS:
+            per_call = elapsed / calls
+            estimate = int(min_time / per_call) + 1 if per_call > 0 else MAX_CALLS
+            calls = min(MAX_CALLS, max(2 * calls, estimate))
+            elapsed = _time_calls(run, calls)
+        best = min([elapsed] + [_time_calls(run, calls) for _ in range(repeats - 1)])
+
+        tracemalloc.start()
+        try:
+            run()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    seconds_per_call = best / calls
+    return BenchmarkResult(
+        key=case.key,
+        name=case.name,
+        params=dict(case.params),
+        unit=case.unit,
+        units_per_call=case.units,
+        seconds_per_call=seconds_per_call,
+        throughput=case.units / seconds_per_call if seconds_per_call > 0 else float("inf"),
+        peak_memory_bytes=peak,
+        calls=calls
+    )
+
+
+def _time_calls(run: Callable[[], object], calls: int) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        run()
+    return time.perf_counter() - start
+
+
+def compare(
+    baseline: list[BenchmarkResult],
+    current: list[BenchmarkResult],
+    threshold: float = 0.1,
+    memory_threshold: float = 0.25
+) -> list[Regression]:
+    """
+    Cases present in both runs whose throughput dropped by more than
+    `threshold`, or whose peak memory grew by more than `memory_threshold`
+    (both relative to the baseline).
+    """
+    baseline_by_key = {result.key: result for result in baseline}
+    regressions = []
+    for result in current:
+        before = baseline_by_key.get(result.key)
+        if before is None:
+            continue
+        if result.throughput < before.throughput * (1.0 - threshold):
+            regressions.append(Regression(result.key, "throughput", before.throughput, result.throughput))
+        if result.peak_memory_bytes > before.peak_memory_bytes * (1.0 + memory_threshold):
+            regressions.append(Regression(
+                result.key, "peak_memory_bytes", before.peak_memory_bytes, result.peak_memory_bytes
+            ))
+    return regressions
+
+
+def save_results(path: str, results: list[BenchmarkResult]) -> None:
+    document = {
+        "version": RESULTS_VERSION,
+        "metadata": environment_metadata(),
+        "results": [asdict(result) for result in results],
+    }
+    with open(path, "w") as f:
+        json.dump(document, f, indent=2)
+
+
+def load_results(path: str) -> list[BenchmarkResult]:
+    with open(path) as f:
+        document = json.load(f)
+    if document.get("version") != RESULTS_VERSION:
+        raise ValueError(f"Unsupported benchmark results version {document.get('version')} in {path}")
+    return [BenchmarkResult(**result) for result in document["results"]]
+
+
+def environment_metadata() -> dict:
+    import numpy as np
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+    }
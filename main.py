@@ -1,40 +1,83 @@
+import argparse
 import agents.llm_agent as llm_agent
 import agents.random_agent as random_agent
-import pandas as pd
+from agents.client_pool import configure_clients
+from agents.response_cache import ResponseCache
+from agents.shading_agent import BayesNashAgent, ShadingAgent
 from simulation import auction_environment
+from simulation.streaming import CSVSink, RollingMetrics, stream_results
+from simulation.instrumentation import Instrumentation
+from simulation.tournament import Strategy, Tournament, round_robin
 
 
 def main():
-    llm_agents = [llm_agent.LLMAgent(agent_id=i) for i in range(3)]
+    parser = argparse.ArgumentParser(description="Run the first-price auction simulation.")
+    parser.add_argument("--cache-dir", help="Directory for cached LLM responses (disabled if omitted).")
+    parser.add_argument("--replay", action="store_true", help="Only use cached LLM responses; fail on a cache miss.")
+    parser.add_argument("--metrics", help="Write phase timings and counters to this file (Prometheus text if it ends in .prom, JSON otherwise).")
+    parser.add_argument("--tournament", type=int, metavar="SIZE", help="Instead, play a round-robin tournament of SIZE-bidder mixes and print the leaderboard.")
+    parser.add_argument("--llm-models", nargs="*", default=[], help="Model names to enter as LLM strategies in the tournament.")
+    parser.add_argument("--requests-per-minute", type=float, help="API request quota shared by all LLM agents.")
+    parser.add_argument("--tokens-per-minute", type=float, help="API token quota shared by all LLM agents.")
+    args = parser.parse_args()
+    if args.replay and not args.cache_dir:
+        parser.error("--replay requires --cache-dir")
+    if args.requests_per_minute or args.tokens_per_minute:
+        configure_clients(requests_per_minute=args.requests_per_minute, tokens_per_minute=args.tokens_per_minute)
+
+    cache = ResponseCache(args.cache_dir, replay=args.replay) if args.cache_dir else None
+    if args.tournament:
+        run_tournament(args.tournament, args.llm_models, cache)
+        return
+
+    llm_agents = [llm_agent.LLMAgent(agent_id=i, cache=cache) for i in range(3)]
     random_agents = [random_agent.RandomAgent(agent_id=i+3, random_seed=42+i) for i in range(3)]
     all_agents = llm_agents + random_agents
-    env = auction_environment.AuctionEnvironment(auction_id=1, random_seed=100, agents=all_agents)
+    instrumentation = Instrumentation() if args.metrics else None
+    env = auction_environment.AuctionEnvironment(
+        auction_id=1, random_seed=100, agents=all_agents, instrumentation=instrumentation
+    )
     num_rounds = 25
-    results = env.run_simulation(num_rounds=num_rounds)
-    rows = []
-    for round_number, result in enumerate(results, start=1):
-        for bid in result.all_bids:
-            agent_type = "LLM" if bid.agent_id < 3 else "Random"
-            private_value = result.private_values.get(bid.agent_id, 0.0)   
-            won = bid.agent_id == result.winning_agent_id
-            utility = bid.bid_amount - private_value if won else 0.0
-            rows.append({
-                "round": round_number,
-                "agent_id": bid.agent_id,
-                "agent_type": agent_type,
-                "bid_amount": bid.bid_amount,
-                "private_value": private_value,
-                "won": won,
-                "utility": utility
-            })
-    df = pd.DataFrame(rows)
-    df.to_csv("auction_results.csv", index=False)
+    agent_types = {agent.agent_id: "LLM" if agent in llm_agents else "Random" for agent in all_agents}
+    metrics = RollingMetrics(window=num_rounds)
+    with CSVSink("auction_results.csv", agent_types=agent_types) as csv_sink:
+        stream_results(env.iter_simulation(num_rounds=num_rounds), [csv_sink, metrics])
     print("Auction simulation completed. Results saved to auction_results.csv")
+    if instrumentation is not None:
+        if args.metrics.endswith(".prom"):
+            instrumentation.write_prometheus(args.metrics)
+        else:
+            instrumentation.write_json(args.metrics)
+        print(f"Metrics saved to {args.metrics}")
 
     print("\nSummary Statistics:")
-    print(df.groupby('agent_id')['utility'].sum())
-    print(df.groupby('agent_type')['utility'].sum())
-            
-        
+    utility_by_type = {}
+    for agent_id, utility in sorted(metrics.total_utility.items()):
+        print(f"agent {agent_id}: {utility:.2f}")
+        utility_by_type[agent_types[agent_id]] = utility_by_type.get(agent_types[agent_id], 0.0) + utility
+    for agent_type, utility in sorted(utility_by_type.items()):
+        print(f"{agent_type}: {utility:.2f}")
+
+
+def run_tournament(size: int, llm_models: list[str], cache: ResponseCache | None):
+    strategies = [
+        Strategy("random", random_agent.RandomAgent, seeded=True),
+        Strategy("bayes-nash", BayesNashAgent, population_param="num_bidders"),
+    ] + [
+        Strategy(f"shade-{factor}", ShadingAgent, {"shading_factor": factor}) for factor in (0.5, 0.7, 0.9)
+    ] + [
+        Strategy(f"llm-{model}", llm_agent.LLMAgent, {"model": model, "cache": cache}, api_bound=True)
+        for model in llm_models
+    ]
+    tournament = Tournament(strategies, num_rounds=25 if llm_models else 1000)
+    leaderboard = tournament.run(round_robin([s.name for s in strategies], size, seeds=range(3), with_repeats=True))
+    print(f"{'rank':>4} {'strategy':<40} {'matchups':>8} {'utility/round':>16} {'win rate':>9}")
+    for row in leaderboard.rows():
+        print(
+            f"{row['rank']:>4} {row['strategy']:<40} {row['matchups']:>8} "
+            f"{row['mean_utility']:>8.3f} ± {row['standard_error']:<5.3f} {row['win_rate']:>8.1%}"
+        )
+
+
 if __name__ == "__main__":
     main()
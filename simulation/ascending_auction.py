@@ -0,0 +1,189 @@
+"""
+Ascending auctions over a set of items, settled one bid at a time.
+
+Every bid is a proxy: the auction bids for the agent up to `bid_amount` (its
+limit) and the price an item stands at follows from its two highest limits.
+Under "english" pricing the leader pays the second-highest limit plus the
+increment, capped at its own limit (the earlier bid wins a tie, at that
+limit). Under "clock" pricing the price climbs in ticks of the increment from
+the reserve price, each bidder dropping out at the first tick above its
+limit; the winner pays the first tick at which it is the only bidder left,
+and if the last bidders all drop out at the same tick, one of them, drawn
+at settlement, wins at the tick before.
+
+Each item keeps a heap of its limits. Raising a limit pushes a new entry and
+leaves the old one to be discarded when it reaches the top, so a bid costs
+O(log n) and the auction reaches its clearing state in time proportional to
+the number of bids, however many sub-rounds it takes.
+
+A simultaneous ascending auction (SAA) runs all items at once in sub-rounds:
+agents see the standing bids and asking prices, submit new limits, and the
+auction ends after a sub-round in which no bid was accepted. Activity and
+withdrawal rules are not modelled.
+"""
+import heapq
+import math
+import random
+
+from simulation.data_models import Item, ItemBid
+
+PRICING_RULES = ("english", "clock")
+
+
+class AscendingAuction:
+    """
+    Standing high bids for a set of items, updated incrementally as bids arrive.
+
+    A bid is accepted if it is at least the item's asking price (the reserve
+    price before the first bid, one increment above the current price after)
+    and, for an agent raising its own limit, at least one increment above it.
+
+    Args:
+        items: The auctioned items.
+        increment: Minimum raise of the price (and of an agent's own limit).
+        reserve_price: Lowest price an item can sell at.
+        pricing: "english" or "clock" (see the module docstring).
+    """
+    __slots__ = (
+        "item_ids", "positions", "increment", "reserve_price", "pricing",
+        "bids", "num_accepted", "_heaps", "_limits", "_prices", "_tied",
+        "_standing", "_asking", "_seq", "_settled"
+    )
+
+    def __init__(self, items: list[Item], increment: float = 1.0, reserve_price: float = 0.0, pricing: str = "english"):
+        if pricing not in PRICING_RULES:
+            raise ValueError(f"Unknown pricing rule {pricing!r}, expected one of {PRICING_RULES}")
+        if not increment > 0:
+            raise ValueError(f"increment must be positive, got {increment}")
+        if reserve_price < 0:
+            raise ValueError(f"reserve_price must be non-negative, got {reserve_price}")
+        self.item_ids = [item.item_id for item in items]
+        self.positions: dict[int, int] = {}
+        for item_id in self.item_ids:
+            self.positions.setdefault(item_id, len(self.positions))
+        self.increment = increment
+        self.reserve_price = reserve_price
+        self.pricing = pricing
+        self.bids: list[ItemBid] = []  # every bid submitted, in processing order
+        self.num_accepted = 0
+        num_positions = len(self.positions)
+        # Per item: max-heap of (-limit, seq, agent_id), and agent_id -> (limit, seq) of its live limit
+        self._heaps: list[list[tuple[float, int, int]]] = [[] for _ in range(num_positions)]
+        self._limits: list[dict[int, tuple[float, int]]] = [{} for _ in range(num_positions)]
+        self._prices = [0.0] * num_positions
+        self._tied = [False] * num_positions  # clock pricing: the last bidders drop out together
+        self._standing: dict[int, ItemBid] = {}
+        self._asking = {item_id: reserve_price for item_id in self.positions}
+        self._seq = 0
+        self._settled = False
+
+    def submit(self, bid: ItemBid) -> bool:
+        """Process one bid in O(log n); returns whether it was accepted."""
+        if self._settled:
+            raise ValueError("The auction has already been settled")
+        self.bids.append(bid)
+        k = self.positions.get(bid.item_id)
+        if k is None:
+            return False
+        limit = bid.bid_amount
+        limits = self._limits[k]
+        current = limits.get(bid.agent_id)
+        if not limit > 0 or limit < self._asking[bid.item_id]:
+            return False
+        if current is not None and limit < current[0] + self.increment:
+            return False
+
+        self._seq += 1
+        limits[bid.agent_id] = (limit, self._seq)
+        heapq.heappush(self._heaps[k], (-limit, self._seq, bid.agent_id))
+        self.num_accepted += 1
+        self._update(bid.item_id, k)
+        return True
+
+    def submit_many(self, bids: list[ItemBid]) -> int:
+        """Process bids in order; returns how many were accepted."""
+        return sum(self.submit(bid) for bid in bids)
+
+    def standing_bids(self) -> dict[int, ItemBid]:
+        """item_id -> the leader and the price it currently stands at, for items with bids."""
+        return dict(self._standing)
+
+    def asking_prices(self) -> dict[int, float]:
+        """item_id -> the lowest bid a new bidder could make."""
+        return dict(self._asking)
+
+    def settle(self, rng: random.Random) -> tuple[dict[int, int], dict[int, float]]:
+        """
+        Final allocations and prices; `rng` only picks among bidders dropping
+        out of a clock together (`rng.choice` in bid order, item by item).
+        Ends the auction.
+        """
+        self._settled = True
+        allocations: dict[int, int] = {}
+        prices: dict[int, float] = {}
+        for item_id in self.item_ids:
+            k = self.positions[item_id]
+            standing = self._standing.get(item_id)
+            if standing is None:
+                allocations[item_id] = -1
+                prices[item_id] = 0.0
+                continue
+            winner = standing.agent_id
+            if self._tied[k]:
+                winner = rng.choice(self._live_at_least(k, self._prices[k]))
+            allocations[item_id] = winner
+            prices[item_id] = self._prices[k]
+        return allocations, prices
+
+    def _update(self, item_id: int, k: int) -> None:
+        """Recompute the price, leader and asking price of item `k` from its two highest limits."""
+        first, second = self._top_two(k)
+        first_limit, leader = -first[0], first[2]
+        tied = False
+        if second is None:
+            price = self.reserve_price
+        elif self.pricing == "english":
+            price = min(first_limit, -second[0] + self.increment)
+        else:
+            price = self._clock_tick_above(-second[0])
+            if first_limit < price:
+                price -= self.increment
+                tied = True
+        self._prices[k] = price
+        self._tied[k] = tied
+        self._standing[item_id] = ItemBid(agent_id=leader, item_id=item_id, bid_amount=price)
+        self._asking[item_id] = price + self.increment
+
+    def _clock_tick_above(self, limit: float) -> float:
+        """First clock price above `limit`: reserve_price + ticks * increment."""
+        reserve_price, increment = self.reserve_price, self.increment
+        ticks = max(math.floor((limit - reserve_price) / increment) + 1, 1)
+        # Guard against rounding in the division
+        while ticks > 1 and reserve_price + (ticks - 1) * increment > limit:
+            ticks -= 1
+        while reserve_price + ticks * increment <= limit:
+            ticks += 1
+        return reserve_price + ticks * increment
+
+    def _discard_stale(self, k: int) -> None:
+        """Pop superseded limits off the top of item `k`'s heap."""
+        heap, limits = self._heaps[k], self._limits[k]
+        while heap:
+            _, seq, agent_id = heap[0]
+            if limits[agent_id][1] == seq:
+                return
+            heapq.heappop(heap)
+
+    def _top_two(self, k: int) -> tuple[tuple, tuple | None]:
+        heap = self._heaps[k]
+        self._discard_stale(k)
+        first = heapq.heappop(heap)
+        self._discard_stale(k)
+        second = heap[0] if heap else None
+        heapq.heappush(heap, first)
+        return first, second
+
+    def _live_at_least(self, k: int, price: float) -> list[int]:
+        """Agents whose live limit on item `k` is at least `price`, in bid order."""
+        live = [(seq, agent_id) for agent_id, (limit, seq) in self._limits[k].items() if limit >= price]
+        return [agent_id for _, agent_id in sorted(live)]
@@ -1,57 +1,400 @@
-from simulation.auction_logic import run_auction, run_multi_item_auction
+from simulation.auction_logic import (
+    run_auction, run_auction_batch, run_budgeted_rounds, run_multi_item_auction, limit_bids,
+    ItemBidIndex, BUDGET_POLICIES
+)
+from simulation.ascending_auction import AscendingAuction, PRICING_RULES
 from simulation.data_models import (
-    Bid, AuctionResult, AgentProfile, AuctionState,
-    Item, ItemBid, MultiItemAuctionState, MultiItemAuctionResult
+    Bid, AuctionResult, AgentProfile, AuctionState, BatchAuctionResult, BidBatch,
+    Item, ItemBid, MultiItemAuctionState, MultiItemAuctionResult, AscendingAuctionState, PacingRun
 )
 from simulation.valuation_models import ValuationModel, AdditiveValuation
-from agents.base_agent import BaseAgent
+from simulation.results_store import AuctionResultStore
+from simulation.batch_runner import run_batched_simulations
+from simulation.value_distributions import ValueDistribution, UniformValues, ValueSampler, ItemValues
+from simulation.streaming import HistoryWindow
+from simulation.checkpoint import Checkpointer, CheckpointError, pack_rng_state, unpack_rng_state
+from simulation.instrumentation import Instrumentation, NULL_INSTRUMENTATION, PHASE_SECONDS, ROUNDS_TOTAL, BIDS_TOTAL
+from agents.base_agent import BaseAgent, bid_block_groups
+from collections.abc import Iterator
+import asyncio
+import math
 import random
+import numpy as np
+
+# Rounds settled per bulk step when streaming results of batch-bidding agents
+STREAM_CHUNK_ROUNDS = 1024
+
+# How MultiItemAuctionEnvironment auctions its items each round: sealed-bid
+# first-price, or a simultaneous ascending auction priced by one of the rules
+# of simulation.ascending_auction
+AUCTION_FORMATS = ("sealed",) + PRICING_RULES
+
+
 class AuctionEnvironment:
-    def __init__(self, auction_id: int, random_seed: int = None, agents: list[BaseAgent] = None):
+    def __init__(
+        self,
+        auction_id: int,
+        random_seed: int = None,
+        agents: list[BaseAgent] = None,
+        value_distribution: ValueDistribution = None,
+        instrumentation: Instrumentation | None = None,
+        budgets: dict[int, float] | None = None,
+        budget_policy: str = "clip"
+    ):
+        """
+        Args:
+            budgets: agent_id -> what the agent can spend over the whole run
+                (agents left out have no budget; None: no budgets at all).
+            budget_policy: What happens at settlement to a bid above its
+                agent's remaining budget: "clip" lowers it to the budget
+                left, "reject" replaces it with 0.0.
+        """
+        if budget_policy not in BUDGET_POLICIES:
+            raise ValueError(f"Unknown budget policy {budget_policy!r}, expected one of {BUDGET_POLICIES}")
         self.auction_id = auction_id
         self.auction_rng = random.Random(random_seed) #tie-breaking RNG
         self.value_rng = random.Random(random_seed)   #private value RNG
         self.agents: list[BaseAgent] = agents if agents is not None else []
-        
-        
-        
+        self.value_distribution = value_distribution if value_distribution else UniformValues(0, 100)
+        self.value_sampler = ValueSampler(self.value_distribution, self.value_rng)
+        self.instrumentation = _attach_instrumentation(instrumentation, self.agents)
+        self.budget_policy = budget_policy
+        self.budgets = None
+        if budgets is not None:
+            self.budgets = np.array([budgets.get(agent.agent_id, np.inf) for agent in self.agents], dtype=np.float64)
+        self.spent = np.zeros(len(self.agents))
+        self._agent_columns = {agent.agent_id: column for column, agent in enumerate(self.agents)}
+
+    @property
+    def remaining_budgets(self) -> dict[int, float]:
+        """agent_id -> budget left (inf for agents without a budget)."""
+        budgets = self.budgets if self.budgets is not None else np.full(len(self.agents), np.inf)
+        return {agent.agent_id: left for agent, left in zip(self.agents, (budgets - self.spent).tolist())}
 
     def conduct_auction(self, current_round_bids: list[Bid], round_auction_state: list[AuctionState], round_number: int) -> AuctionResult:
-        result = run_auction(current_round_bids, self.auction_id, self.auction_rng, round_number=round_number)
         private_values = {state.agent_id: state.private_value for state in round_auction_state}
-        result.private_values = private_values
+        if self.budgets is None:
+            return run_auction(
+                current_round_bids, self.auction_id, self.auction_rng,
+                round_number=round_number, private_values=private_values
+            )
+
+        columns = [self._agent_columns[bid.agent_id] for bid in current_round_bids]
+        amounts = np.array([bid.bid_amount for bid in current_round_bids], dtype=np.float64)
+        limited = limit_bids(amounts, (self.budgets - self.spent)[columns], self.budget_policy)
+        current_round_bids = [
+            bid if amount == bid.bid_amount else Bid(agent_id=bid.agent_id, bid_amount=amount)
+            for bid, amount in zip(current_round_bids, limited.tolist())
+        ]
+        result = run_auction(
+            current_round_bids, self.auction_id, self.auction_rng,
+            round_number=round_number, private_values=private_values
+        )
+        if result.winning_agent_id != -1:
+            self.spent[self._agent_columns[result.winning_agent_id]] += result.winning_bid
         return result
-    
+
     def _setup_round(self, round_number: int):
-        round_auction_state = []
-        for agent in self.agents:
-            private_value = self.value_rng.uniform(0, 100)  
-            state = AuctionState(
+        values = self.value_sampler.next_round(len(self.agents), 1)[:, 0].tolist()
+        remaining = [None] * len(self.agents)
+        if self.budgets is not None:
+            remaining = (self.budgets - self.spent).tolist()
+        round_auction_state = [
+            AuctionState(
                 agent_id=agent.agent_id,
                 private_value=private_value,
-                round_number=round_number
+                round_number=round_number,
+                remaining_budget=remaining_budget
             )
-            round_auction_state.append(state)
+            for agent, private_value, remaining_budget in zip(self.agents, values, remaining)
+        ]
         return round_auction_state
 
-    def _play_round(self, round_number: int, round_auction_state: list[AuctionState], simulation_results: list[AuctionResult]) -> list[Bid]:
-        bids = []
-        for agent in self.agents:
-            state = next((s for s in round_auction_state if s.agent_id == agent.agent_id and s.round_number == round_number), None)
-            bid = agent.get_bid(state, simulation_results)
-            bids.append(bid)
-        return bids
+    def _play_round(self, round_number: int, round_auction_state: list[AuctionState], simulation_results: AuctionResultStore) -> list[Bid]:
+        # _setup_round builds the states in agent order, so state k belongs to agent k
+        return [
+            agent.get_bid(state, simulation_results)
+            for agent, state in zip(self.agents, round_auction_state)
+        ]
     
 
-    def run_simulation(self, num_rounds: int):
-        simulation_results = []
+    def run_simulation(self, num_rounds: int, checkpoint: Checkpointer | None = None) -> AuctionResultStore:
+        """
+        Run the simulation and return every round's result.
+
+        Args:
+            num_rounds: Total number of rounds to play.
+            checkpoint: If given, the run is recorded there and resumed from
+                its last snapshot if it has one.
+        """
+        simulation_results = AuctionResultStore(self.auction_id, capacity=num_rounds)
+        if checkpoint is None and self._bids_in_bulk():
+            self._run_bulk(num_rounds, simulation_results)
+            return simulation_results
+        for _ in self._play(num_rounds, simulation_results, checkpoint):
+            pass
+        return simulation_results
+
+    def iter_simulation(
+        self,
+        num_rounds: int,
+        history_window: int | None = 100,
+        checkpoint: Checkpointer | None = None
+    ) -> Iterator[AuctionResult]:
+        """
+        Play the simulation, yielding each round's result as soon as it is settled.
+
+        Only the last `history_window` results are kept, and that window is
+        the history agents see (None keeps everything). Batch-bidding agents
+        are still played in bulk, STREAM_CHUNK_ROUNDS rounds at a time. The
+        results are the same as those of run_simulation. When resuming from
+        `checkpoint`, only the rounds after its snapshot are yielded.
+        """
+        return self._play(num_rounds, HistoryWindow(history_window), checkpoint)
+
+    def _bids_in_bulk(self) -> bool:
+        return bool(self.agents) and all(agent.supports_bid_block for agent in self.agents)
+
+    def _play(self, num_rounds: int, history, checkpoint: Checkpointer | None) -> Iterator[AuctionResult]:
+        """Play the remaining rounds, appending each result to `history` (and the checkpoint) before yielding it."""
+        first_round = 1 if checkpoint is None else checkpoint.restore(self, history) + 1
+
+        if self._bids_in_bulk():
+            for chunk_start in range(first_round, num_rounds + 1, STREAM_CHUNK_ROUNDS):
+                chunk_rounds = min(STREAM_CHUNK_ROUNDS, num_rounds - chunk_start + 1)
+                chunk = AuctionResultStore(self.auction_id, capacity=chunk_rounds)
+                self._run_bulk(chunk_rounds, chunk, first_round=chunk_start)
+                with self.instrumentation.timer(PHASE_SECONDS, phase="recording"):
+                    for result in chunk:
+                        history.append(result)
+                        if checkpoint is not None:
+                            checkpoint.append(result)
+                    if checkpoint is not None:
+                        checkpoint.save(self, chunk_start + chunk_rounds - 1)
+                yield from chunk
+            return
+
+        instrumentation = self.instrumentation
+        self.value_sampler.reserve(num_rounds - first_round + 1)
+        for round_number in range(first_round, num_rounds + 1):
+            with instrumentation.timer(PHASE_SECONDS, phase="setup"):
+                round_auction_state = self._setup_round(round_number)
+            with instrumentation.timer(PHASE_SECONDS, phase="bidding"):
+                current_round_bids = self._play_round(round_number, round_auction_state, history)
+            with instrumentation.timer(PHASE_SECONDS, phase="settlement"):
+                result = self.conduct_auction(current_round_bids, round_auction_state, round_number=round_number)
+            with instrumentation.timer(PHASE_SECONDS, phase="recording"):
+                history.append(result)
+                if checkpoint is not None:
+                    checkpoint.append(result)
+                    if checkpoint.due(round_number) or round_number == num_rounds:
+                        checkpoint.save(self, round_number)
+            instrumentation.increment(ROUNDS_TOTAL)
+            instrumentation.increment(BIDS_TOTAL, len(current_round_bids))
+            yield result
+
+    def get_state(self) -> dict:
+        """RNG and agent state needed to resume the simulation (see simulation.checkpoint)."""
+        return {
+            "auction_rng": pack_rng_state(self.auction_rng.getstate()),
+            "value_sampler": self.value_sampler.get_state(),
+            "agents": [agent.get_state() for agent in self.agents],
+            "spent": self.spent.tolist(),
+        }
+
+    def set_state(self, state: dict) -> None:
+        if len(state["agents"]) != len(self.agents):
+            raise CheckpointError(
+                f"Checkpoint has {len(state['agents'])} agents, environment has {len(self.agents)}"
+            )
+        self.auction_rng.setstate(unpack_rng_state(state["auction_rng"]))
+        self.value_sampler.set_state(state["value_sampler"])
+        for agent, agent_state in zip(self.agents, state["agents"]):
+            agent.set_state(agent_state)
+        self.spent = np.array(state.get("spent", np.zeros(len(self.agents))), dtype=np.float64)
+
+    def _run_bulk(self, num_rounds: int, simulation_results: AuctionResultStore, first_round: int = 1) -> None:
+        """
+        Play every round at once through the agents' bid_batch (bid_block with
+        budgets or pacing agents, a block at a time). Gives the same results
+        as the per-round loop: the value, agent and tie-breaking RNGs are
+        consumed in the same order.
+        """
+        agent_ids = [agent.agent_id for agent in self.agents]
+        for block_start, values, bid_matrix, outcome in self._play_blocks(num_rounds, first_round):
+            with self.instrumentation.timer(PHASE_SECONDS, phase="recording"):
+                simulation_results.append_rounds(
+                    round_numbers=np.arange(block_start, block_start + len(values)),
+                    agent_ids=agent_ids,
+                    bid_matrix=bid_matrix,
+                    value_matrix=values,
+                    winner_indices=outcome.winner_indices,
+                    winning_bids=outcome.winning_bids
+                )
+
+    def run_pacing_simulation(self, num_rounds: int) -> PacingRun:
+        """
+        Play `num_rounds` rounds in bulk, keeping only each agent's spend,
+        wins and utility, and the budgets left after each block, instead of
+        every bid. Made for long runs with many budgeted agents, which would
+        not fit in an AuctionResultStore; the outcome is that of run_simulation.
+
+        Raises:
+            ValueError: If an agent does not support bid_block.
+        """
+        if not self._bids_in_bulk():
+            raise ValueError("run_pacing_simulation needs every agent to support bid_block")
+        num_agents = len(self.agents)
+        wins = np.zeros(num_agents, dtype=np.int64)
+        won_value = np.zeros(num_agents)
+        spent_before = self.spent.copy()
+        round_ends, remaining = [], []
+        budgets = self.budgets if self.budgets is not None else np.full(num_agents, np.inf)
+        for block_start, values, _, outcome in self._play_blocks(num_rounds, 1):
+            sold = np.flatnonzero(outcome.winner_indices >= 0)
+            winners = outcome.winner_indices[sold]
+            wins += np.bincount(winners, minlength=num_agents)
+            won_value += np.bincount(winners, weights=values[sold, winners], minlength=num_agents)
+            round_ends.append(block_start + len(values) - 1)
+            remaining.append(budgets - self.spent)
+        spend = self.spent - spent_before
+        return PacingRun(
+            agent_ids=np.array([agent.agent_id for agent in self.agents], dtype=np.int64),
+            budgets=budgets.copy(),
+            spend=spend,
+            wins=wins,
+            utility=won_value - spend,
+            round_ends=np.array(round_ends, dtype=np.int64),
+            remaining=np.array(remaining).reshape(len(round_ends), num_agents)
+        )
+
+    def _play_blocks(
+        self, num_rounds: int, first_round: int
+    ) -> Iterator[tuple[int, np.ndarray, np.ndarray, BatchAuctionResult]]:
+        """
+        Play rounds first_round .. first_round + num_rounds - 1 in bulk, yielding
+        (first round, values, bids as settled, settlement) for each block.
+
+        Without budgets or pacing agents everything is one block. With
+        pacing agents, blocks end at the multiples of their pacing intervals
+        (counting from round 1), so that agents see the remaining budget
+        wherever their strategy updates; budgets alone are settled
+        STREAM_CHUNK_ROUNDS rounds at a time. Spend is charged after each block.
+        """
+        instrumentation = self.instrumentation
+        num_agents = len(self.agents)
+        intervals = [agent.pacing_interval for agent in self.agents if agent.pacing_interval]
+        budgeted = self.budgets is not None
+        period = math.gcd(*intervals) if intervals else None
+        # Agents bid through bid_blocks, one call per group, when bids depend on the budget left
+        groups = bid_block_groups(self.agents) if budgeted or intervals else None
+        self.value_sampler.reserve(num_rounds)
+
+        block_start, last_round = first_round, first_round + num_rounds - 1
+        while block_start <= last_round:
+            if period is not None:
+                block_end = min((block_start - 1) // period * period + period, last_round)
+            else:
+                block_end = min(block_start + (STREAM_CHUNK_ROUNDS if budgeted else num_rounds) - 1, last_round)
+            block_length = block_end - block_start + 1
+            with instrumentation.timer(PHASE_SECONDS, phase="setup"):
+                values = self.value_sampler.next_rounds(block_length, num_agents, 1)[:, :, 0]
+            with instrumentation.timer(PHASE_SECONDS, phase="bidding"):
+                if groups:
+                    remaining = self.budgets - self.spent if budgeted else np.full(num_agents, np.inf)
+                    bid_matrix = np.empty((block_length, num_agents))
+                    for bid_blocks, members, columns in groups:
+                        bid_matrix[:, columns] = bid_blocks(members, values[:, columns], remaining[columns])
+                else:
+                    # One contiguous row per agent, rather than a strided column
+                    agent_values = np.ascontiguousarray(values.T)[:, :, None]
+                    bid_matrix = np.stack(
+                        [agent.bid_batch(agent_values[column])[:, 0] for column, agent in enumerate(self.agents)],
+                        axis=1
+                    )
+            with instrumentation.timer(PHASE_SECONDS, phase="settlement"):
+                if budgeted:
+                    outcome, bid_matrix, self.spent = run_budgeted_rounds(
+                        bid_matrix, self.budgets, self.auction_rng, self.budget_policy, spent=self.spent
+                    )
+                else:
+                    outcome = run_auction_batch(bid_matrix, self.auction_rng)
+            instrumentation.increment(ROUNDS_TOTAL, block_length)
+            instrumentation.increment(BIDS_TOTAL, bid_matrix.size)
+            yield block_start, values, bid_matrix, outcome
+            block_start = block_end + 1
+
+    async def _play_round_async(
+        self,
+        round_number: int,
+        round_auction_state: list[AuctionState],
+        simulation_results: AuctionResultStore,
+        semaphore: asyncio.Semaphore,
+        bid_timeout: float | None
+    ) -> list[Bid]:
+        """
+        Collect every agent's bid concurrently. An agent that times out
+        abstains with a zero bid, but the round only ends once its call has:
+        a native get_bid_async is cancelled, while a get_bid running in a
+        worker thread cannot be interrupted and is left to finish (its bid is
+        dropped), so it never changes the agent's state during a later round.
+        """
+        async def collect(agent: BaseAgent, state: AuctionState) -> Bid:
+            async with semaphore:
+                bidding = asyncio.ensure_future(agent.get_bid_async(state, simulation_results))
+                done, _ = await asyncio.wait({bidding}, timeout=bid_timeout)
+                if bidding in done:
+                    return bidding.result()
+                if agent.supports_async_cancellation:
+                    bidding.cancel()
+                await asyncio.gather(bidding, return_exceptions=True)
+                return Bid(agent_id=agent.agent_id, bid_amount=0.0)
+
+        return list(await asyncio.gather(
+            *(collect(agent, state) for agent, state in zip(self.agents, round_auction_state))
+        ))
+
+    async def run_simulation_async(
+        self,
+        num_rounds: int,
+        max_concurrency: int | None = None,
+        bid_timeout: float | None = None
+    ) -> AuctionResultStore:
+        """
+        Run the simulation, gathering each round's bids concurrently.
+
+        Args:
+            num_rounds: Number of rounds to play.
+            max_concurrency: Maximum number of bid requests in flight at once
+                (defaults to one per agent).
+            bid_timeout: Seconds each agent has to bid before it abstains for
+                the round (defaults to no timeout). Agents bidding through
+                the default get_bid_async still hold up the round until their
+                get_bid returns.
+        """
+        semaphore = asyncio.Semaphore(max_concurrency or max(len(self.agents), 1))
+        simulation_results = AuctionResultStore(self.auction_id, capacity=num_rounds)
+        self.value_sampler.reserve(num_rounds)
+        instrumentation = self.instrumentation
         for round_number in range(1, num_rounds + 1):
-            round_auction_state = self._setup_round(round_number)
-            current_round_bids = self._play_round(round_number, round_auction_state, simulation_results)
-            result = self.conduct_auction(current_round_bids, round_auction_state, round_number=round_number)
-            simulation_results.append(result)
+            with instrumentation.timer(PHASE_SECONDS, phase="setup"):
+                round_auction_state = self._setup_round(round_number)
+            with instrumentation.timer(PHASE_SECONDS, phase="bidding"):
+                current_round_bids = await self._play_round_async(
+                    round_number, round_auction_state, simulation_results, semaphore, bid_timeout
+                )
+            with instrumentation.timer(PHASE_SECONDS, phase="settlement"):
+                result = self.conduct_auction(current_round_bids, round_auction_state, round_number=round_number)
+            with instrumentation.timer(PHASE_SECONDS, phase="recording"):
+                simulation_results.append(result)
+            instrumentation.increment(ROUNDS_TOTAL)
+            instrumentation.increment(BIDS_TOTAL, len(current_round_bids))
         return simulation_results
 
+    def run_simulation_batched(self, num_rounds: int, client=None, poll_interval: float = 30.0) -> AuctionResultStore:
+        """Run the simulation with each round's LLM requests submitted as one message batch."""
+        return run_batched_simulations([self], num_rounds, client=client, poll_interval=poll_interval)[0]
+
 
 class MultiItemAuctionEnvironment:
     """Environment for multi-item auctions where agents bid on multiple items independently."""
@@ -62,28 +405,59 @@ class MultiItemAuctionEnvironment:
         items: list[Item],
         agents: list[BaseAgent],
         random_seed: int = None,
-        valuation_model: ValuationModel = None
+        valuation_model: ValuationModel = None,
+        value_distribution: ValueDistribution = None,
+        instrumentation: Instrumentation | None = None,
+        auction_format: str = "sealed",
+        increment: float = 1.0,
+        reserve_price: float = 0.0,
+        max_sub_rounds: int = 1000
     ):
+        """
+        Args:
+            auction_format: "sealed" for independent first-price sealed-bid
+                auctions, or "english" / "clock" for a simultaneous ascending
+                auction over all the items with that pricing rule, played in
+                sub-rounds through the agents' get_ascending_bids.
+            increment: Minimum raise in the ascending formats.
+            reserve_price: Lowest price in the ascending formats.
+            max_sub_rounds: Ascending auctions still running after this many
+                sub-rounds are settled at their standing bids.
+        """
+        if auction_format not in AUCTION_FORMATS:
+            raise ValueError(f"Unknown auction format {auction_format!r}, expected one of {AUCTION_FORMATS}")
+        if max_sub_rounds < 1:
+            raise ValueError(f"max_sub_rounds must be at least 1, got {max_sub_rounds}")
         self.auction_id = auction_id
         self.items = items
         self.agents = agents
         self.auction_rng = random.Random(random_seed)
         self.value_rng = random.Random(random_seed)
         self.valuation_model = valuation_model if valuation_model else AdditiveValuation()
+        self.value_distribution = value_distribution if value_distribution else UniformValues(0, 100)
+        self.value_sampler = ValueSampler(self.value_distribution, self.value_rng)
+        self.item_index = {item.item_id: k for k, item in enumerate(items)}
+        self.bid_index = ItemBidIndex(items)
+        self.instrumentation = _attach_instrumentation(instrumentation, self.agents)
+        self.auction_format = auction_format
+        self.increment = increment
+        self.reserve_price = reserve_price
+        self.max_sub_rounds = max_sub_rounds
+        if auction_format != "sealed":
+            # Fail on a bad increment or reserve price now rather than in the first round
+            AscendingAuction(items, increment, reserve_price, auction_format)
 
     def _setup_round(self, round_number: int) -> list[MultiItemAuctionState]:
-        """Generate private values for each agent for each item."""
+        """Generate private values for each agent for each item, as states in agent order."""
+        values = self.value_sampler.next_round(len(self.agents), len(self.items))
+        item_index = self.item_index
         round_states = []
-        for agent in self.agents:
-            private_values = {
-                item.item_id: self.value_rng.uniform(0, 100)
-                for item in self.items
-            }
+        for agent, agent_values in zip(self.agents, values):
             state = MultiItemAuctionState(
                 agent_id=agent.agent_id,
                 round_number=round_number,
                 items=self.items,
-                private_values=private_values,
+                private_values=ItemValues(item_index, agent_values),
                 valuation_model=self.valuation_model
             )
             round_states.append(state)
@@ -94,47 +468,229 @@ class MultiItemAuctionEnvironment:
         round_number: int,
         round_states: list[MultiItemAuctionState],
         history: list[MultiItemAuctionResult]
-    ) -> list[ItemBid]:
-        """Collect bids from all agents for all items."""
+    ) -> list[ItemBid] | AscendingAuction:
+        """
+        Collect bids from all agents for all items (round_states[k] is agent
+        k's state), or play the round's ascending auction in those formats.
+        """
+        if self.auction_format != "sealed":
+            return self._play_ascending(round_states, history)
         all_bids = []
-        for agent in self.agents:
-            state = next(
-                (s for s in round_states if s.agent_id == agent.agent_id),
-                None
-            )
-            if state is None:
-                continue
-            agent_bids = agent.get_item_bids(state, history)
-            all_bids.extend(agent_bids)
+        for agent, state in zip(self.agents, round_states):
+            all_bids.extend(agent.get_item_bids(state, history))
         return all_bids
 
+    def _play_ascending(
+        self,
+        round_states: list[MultiItemAuctionState],
+        history: list[MultiItemAuctionResult]
+    ) -> AscendingAuction:
+        """
+        Play a simultaneous ascending auction until a sub-round brings no
+        accepted bid (or max_sub_rounds is reached). Each sub-round's bids are
+        processed in an order shuffled by the auction RNG, as they arrive
+        together.
+        """
+        auction = AscendingAuction(self.items, self.increment, self.reserve_price, self.auction_format)
+        for sub_round in range(1, self.max_sub_rounds + 1):
+            # One snapshot per sub-round, shared by all agents' states
+            standing_bids, asking_prices = auction.standing_bids(), auction.asking_prices()
+            sub_round_bids = []
+            for agent, state in zip(self.agents, round_states):
+                sub_round_bids.extend(agent.get_ascending_bids(
+                    AscendingAuctionState(
+                        agent_id=state.agent_id,
+                        round_number=state.round_number,
+                        sub_round=sub_round,
+                        items=state.items,
+                        private_values=state.private_values,
+                        standing_bids=standing_bids,
+                        asking_prices=asking_prices,
+                        valuation_model=state.valuation_model
+                    ),
+                    history
+                ))
+            if len(sub_round_bids) > 1:
+                self.auction_rng.shuffle(sub_round_bids)
+            if not auction.submit_many(sub_round_bids):
+                break
+        return auction
+
     def _conduct_auction(
         self,
-        bids: list[ItemBid],
+        bids: list[ItemBid] | AscendingAuction,
         round_states: list[MultiItemAuctionState],
         round_number: int
     ) -> MultiItemAuctionResult:
-        """Run the multi-item auction and return results."""
-        result = run_multi_item_auction(
+        """Run the multi-item auction (or settle the ascending one played by _play_round) and return results."""
+        if isinstance(bids, AscendingAuction):
+            allocations, prices = bids.settle(self.auction_rng)
+            return MultiItemAuctionResult(
+                auction_id=self.auction_id,
+                round_number=round_number,
+                allocations=allocations,
+                prices=prices,
+                all_bids=bids.bids,
+                private_values={state.agent_id: state.private_values for state in round_states}
+            )
+        return run_multi_item_auction(
             bids=bids,
             items=self.items,
             auction_id=self.auction_id,
             rng=self.auction_rng,
-            round_number=round_number
+            round_number=round_number,
+            bid_index=self.bid_index,
+            # Attach private values for analytics
+            private_values={state.agent_id: state.private_values for state in round_states}
         )
-        # Attach private values for analytics
-        result.private_values = {
-            state.agent_id: state.private_values
-            for state in round_states
+
+    def run_simulation(
+        self,
+        num_rounds: int,
+        checkpoint: Checkpointer | None = None
+    ) -> list[MultiItemAuctionResult]:
+        """Run the full simulation for the specified number of rounds, resuming from `checkpoint` if given."""
+        results = []
+        for _ in self._play(num_rounds, results, checkpoint):
+            pass
+        return results
+
+    def iter_simulation(
+        self,
+        num_rounds: int,
+        history_window: int | None = 100,
+        checkpoint: Checkpointer | None = None
+    ) -> Iterator[MultiItemAuctionResult]:
+        """
+        Play the simulation, yielding each round's result as soon as it is settled.
+
+        Only the last `history_window` results are kept, and that window is
+        the history agents see (None keeps everything). Batch-bidding agents
+        are still played in bulk, STREAM_CHUNK_ROUNDS rounds at a time. When
+        resuming from `checkpoint`, only the rounds after its snapshot are yielded.
+        """
+        return self._play(num_rounds, HistoryWindow(history_window), checkpoint)
+
+    def _play(
+        self,
+        num_rounds: int,
+        history,
+        checkpoint: Checkpointer | None
+    ) -> Iterator[MultiItemAuctionResult]:
+        """Play the remaining rounds, appending each result to `history` (and the checkpoint) before yielding it."""
+        first_round = 1 if checkpoint is None else checkpoint.restore(self, history) + 1
+
+        bulk = self.auction_format == "sealed" and self.agents
+        if bulk and all(agent.supports_bid_batch for agent in self.agents):
+            for chunk_start in range(first_round, num_rounds + 1, STREAM_CHUNK_ROUNDS):
+                chunk_rounds = min(STREAM_CHUNK_ROUNDS, num_rounds - chunk_start + 1)
+                chunk = self._run_bulk(chunk_rounds, first_round=chunk_start)
+                with self.instrumentation.timer(PHASE_SECONDS, phase="recording"):
+                    for result in chunk:
+                        history.append(result)
+                        if checkpoint is not None:
+                            checkpoint.append(result)
+                    if checkpoint is not None:
+                        checkpoint.save(self, chunk_start + chunk_rounds - 1)
+                yield from chunk
+            return
+
+        instrumentation = self.instrumentation
+        self.value_sampler.reserve(num_rounds - first_round + 1)
+        for round_number in range(first_round, num_rounds + 1):
+            with instrumentation.timer(PHASE_SECONDS, phase="setup"):
+                round_states = self._setup_round(round_number)
+            with instrumentation.timer(PHASE_SECONDS, phase="bidding"):
+                bids = self._play_round(round_number, round_states, history)
+            with instrumentation.timer(PHASE_SECONDS, phase="settlement"):
+                result = self._conduct_auction(bids, round_states, round_number)
+            with instrumentation.timer(PHASE_SECONDS, phase="recording"):
+                history.append(result)
+                if checkpoint is not None:
+                    checkpoint.append(result)
+                    if checkpoint.due(round_number) or round_number == num_rounds:
+                        checkpoint.save(self, round_number)
+            instrumentation.increment(ROUNDS_TOTAL)
+            instrumentation.increment(BIDS_TOTAL, len(result.all_bids))
+            yield result
+
+    def get_state(self) -> dict:
+        """RNG and agent state needed to resume the simulation (see simulation.checkpoint)."""
+        return {
+            "auction_rng": pack_rng_state(self.auction_rng.getstate()),
+            "value_sampler": self.value_sampler.get_state(),
+            "agents": [agent.get_state() for agent in self.agents],
         }
-        return result
 
-    def run_simulation(self, num_rounds: int) -> list[MultiItemAuctionResult]:
-        """Run the full simulation for the specified number of rounds."""
+    def set_state(self, state: dict) -> None:
+        if len(state["agents"]) != len(self.agents):
+            raise CheckpointError(
+                f"Checkpoint has {len(state['agents'])} agents, environment has {len(self.agents)}"
+            )
+        self.auction_rng.setstate(unpack_rng_state(state["auction_rng"]))
+        self.value_sampler.set_state(state["value_sampler"])
+        for agent, agent_state in zip(self.agents, state["agents"]):
+            agent.set_state(agent_state)
+
+    def _run_bulk(self, num_rounds: int, first_round: int = 1) -> list[MultiItemAuctionResult]:
+        """
+        Play every round at once through the agents' bid_batch. Gives the same
+        results as the per-round loop: each (round, item) pair is settled like
+        one item of run_multi_item_auction, in the same order.
+        """
+        instrumentation = self.instrumentation
+        num_agents, num_items = len(self.agents), len(self.items)
+        with instrumentation.timer(PHASE_SECONDS, phase="setup"):
+            values = self.value_sampler.next_rounds(num_rounds, num_agents, num_items)
+        with instrumentation.timer(PHASE_SECONDS, phase="bidding"):
+            bids = np.stack([agent.bid_batch(values[:, column]) for column, agent in enumerate(self.agents)], axis=1)
+        with instrumentation.timer(PHASE_SECONDS, phase="settlement"):
+            outcome = run_auction_batch(
+                bids.transpose(0, 2, 1).reshape(num_rounds * num_items, num_agents),
+                self.auction_rng
+            )
+        instrumentation.increment(ROUNDS_TOTAL, num_rounds)
+        instrumentation.increment(BIDS_TOTAL, bids.size)
+
+        with instrumentation.timer(PHASE_SECONDS, phase="recording"):
+            return self._bulk_results(values, bids, outcome, first_round)
+
+    def _bulk_results(self, values, bids, outcome, first_round: int) -> list[MultiItemAuctionResult]:
+        num_rounds, num_items = len(bids), len(self.items)
+        winners = outcome.winner_indices.reshape(num_rounds, num_items).tolist()
+        prices = outcome.winning_bids.reshape(num_rounds, num_items).tolist()
+
+        agent_ids = [agent.agent_id for agent in self.agents]
+        item_ids = [item.item_id for item in self.items]
+        # Bid columns in the per-round order (agent-major); only the amounts differ between rounds
+        bid_agent_ids = np.repeat(np.array(agent_ids, dtype=np.int64), num_items)
+        bid_item_ids = np.tile(np.array(item_ids, dtype=np.int64), len(agent_ids))
+        bid_amounts = bids.reshape(num_rounds, -1)
         results = []
-        for round_number in range(1, num_rounds + 1):
-            round_states = self._setup_round(round_number)
-            bids = self._play_round(round_number, round_states, results)
-            result = self._conduct_auction(bids, round_states, round_number)
-            results.append(result)
-        return results
\ No newline at end of file
+        for round_index in range(num_rounds):
+            round_winners = winners[round_index]
+            results.append(MultiItemAuctionResult(
+                auction_id=self.auction_id,
+                round_number=first_round + round_index,
+                allocations={
+                    item_id: agent_ids[winner] if winner >= 0 else -1
+                    for item_id, winner in zip(item_ids, round_winners)
+                },
+                prices=dict(zip(item_ids, prices[round_index])),
+                all_bids=BidBatch(bid_agent_ids, bid_amounts[round_index], bid_item_ids),
+                private_values={
+                    agent_id: ItemValues(self.item_index, agent_values)
+                    for agent_id, agent_values in zip(agent_ids, values[round_index])
+                }
+            ))
+        return results
+
+
+def _attach_instrumentation(instrumentation: Instrumentation | None, agents: list[BaseAgent]) -> Instrumentation:
+    """Share an environment's instrumentation with agents that have none of their own."""
+    if instrumentation is None:
+        return NULL_INSTRUMENTATION
+    for agent in agents:
+        if agent.instrumentation is NULL_INSTRUMENTATION:
+            agent.instrumentation = instrumentation
+    return instrumentation
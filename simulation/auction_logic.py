@@ -1,10 +1,32 @@
 # stateless functions
 
-from simulation.data_models import Bid, AuctionResult, ItemBid, MultiItemAuctionResult, Item
+from simulation.data_models import (
+    Bid, AuctionResult, BatchAuctionResult, ItemBid, MultiItemAuctionResult, Item,
+    BundleBid, CombinatorialAuctionResult
+)
+from simulation.winner_determination import WinnerDeterminationSolver, BranchAndBoundWinnerDetermination
+from simulation.payment_rules import PaymentRule, FirstPricePayment
+from simulation.value_distributions import numpy_generator
+import numpy as np
 import random
-from collections import defaultdict
 
-def run_auction(bids: list[Bid], auction_id: int, rng: random.Random | None = None, round_number: int = 0) -> AuctionResult:
+# Relative amount by which a budget may be exceeded through floating-point rounding
+BUDGET_TOLERANCE = 1e-9
+
+
+def run_auction(
+    bids: list[Bid],
+    auction_id: int,
+    rng: random.Random | None = None,
+    round_number: int = 0,
+    private_values: dict[int, float] | None = None
+) -> AuctionResult:
+    """
+    Settle one first-price sealed-bid round, breaking ties with `rng`.
+    `private_values` (agent_id -> value) is recorded on the result for analytics.
+    """
+    if private_values is None:
+        private_values = {}
 
     if rng is None:
         rng = random.Random()
@@ -16,7 +38,8 @@ def run_auction(bids: list[Bid], auction_id: int, rng: random.Random | None = No
             winning_agent_id=-1,
             winning_bid=0.0,
             all_bids=[],
-            round_number=round_number
+            round_number=round_number,
+            private_values=private_values
         )
     
     filtered_bids = [bid for bid in bids if bid.bid_amount > 0]
@@ -27,7 +50,8 @@ def run_auction(bids: list[Bid], auction_id: int, rng: random.Random | None = No
             winning_agent_id=-1,
             winning_bid=0.0,
             all_bids=bids,
-            round_number=round_number
+            round_number=round_number,
+            private_values=private_values
         )
     
     
@@ -43,52 +67,466 @@ def run_auction(bids: list[Bid], auction_id: int, rng: random.Random | None = No
         winning_agent_id=winning_bid.agent_id,
         winning_bid=winning_bid.bid_amount,
         all_bids=bids,
-        round_number=round_number
+        round_number=round_number,
+        private_values=private_values
     )
 
 
+
+def run_auction_batch(
+    bid_matrix: np.ndarray,
+    rng: random.Random | np.random.Generator | None = None
+) -> BatchAuctionResult:
+    """
+    Settle many independent first-price sealed-bid rounds at once.
+
+    Row r of `bid_matrix` holds every agent's bid for round r, with one column
+    per agent. Each row is settled exactly like `run_auction`: non-positive bids
+    are ignored, the highest bid wins and ties are broken uniformly at random.
+
+    When `rng` is a `random.Random`, it is consumed round by round in the same
+    way `run_auction` consumes it, so a given seed picks the same tied winners
+    as calling `run_auction` once per round. A `numpy.random.Generator` breaks
+    all ties in a single vectorized draw instead (seeded, but a different stream).
+
+    Args:
+        bid_matrix: Array of shape (rounds, agents).
+        rng: Tie-breaking RNG.
+
+    Returns:
+        Winner column index, winning bid and tie count for every round.
+    """
+    if rng is None:
+        rng = random.Random()
+
+    bids = np.asarray(bid_matrix, dtype=np.float64)
+    if bids.ndim != 2:
+        raise ValueError(f"bid_matrix must be 2-dimensional, got shape {bids.shape}")
+    num_rounds, num_agents = bids.shape
+
+    if num_rounds == 0 or num_agents == 0:
+        return BatchAuctionResult(
+            np.full(num_rounds, -1, dtype=np.int64), np.zeros(num_rounds), np.zeros(num_rounds, dtype=np.int64)
+        )
+    return _pick_winners(*_rank_rows(bids), rng)
+
+
+def _rank_rows(bids: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """The bids that can win (others set to -inf), each row's highest bid and the number of bids tied at it."""
+    # NaN and non-positive bids never win, mirroring the filter in run_auction
+    masked = np.where(bids > 0, bids, -np.inf)
+    highest = masked.max(axis=1)
+    # In rows without a positive bid every column "ties" at -inf; they count no ties
+    num_tied = np.where(highest > -np.inf, (masked == highest[:, None]).sum(axis=1), 0)
+    return masked, highest, num_tied
+
+
+def _pick_winners(
+    masked: np.ndarray,
+    highest: np.ndarray,
+    num_tied: np.ndarray,
+    rng: random.Random | np.random.Generator
+) -> BatchAuctionResult:
+    """Settle rows ranked by _rank_rows, drawing one tie-break per sold row, in row order."""
+    winner_indices = np.full(len(masked), -1, dtype=np.int64)
+    winning_bids = np.zeros(len(masked), dtype=np.float64)
+    settled = np.flatnonzero(num_tied)
+
+    # Position of the winner among the tied bids of its round, in column order
+    if isinstance(rng, np.random.Generator):
+        picks = rng.integers(0, num_tied[settled])
+    else:
+        # randrange(n) draws exactly like choice() on an n-element list
+        picks = _randbelow_many(rng, num_tied[settled])
+
+    # A lone highest bidder is the first column holding the highest bid; only real ties need ranking
+    winners = np.argmax(masked, axis=1)[settled]
+    contested = np.flatnonzero(num_tied[settled] > 1)
+    if len(contested):
+        rows = settled[contested]
+        contested_tied = masked[rows] == highest[rows, None]
+        tie_rank = np.cumsum(contested_tied, axis=1)
+        winners[contested] = np.argmax(contested_tied & (tie_rank == (picks[contested] + 1)[:, None]), axis=1)
+    winner_indices[settled] = winners
+    winning_bids[settled] = highest[settled]
+    return BatchAuctionResult(winner_indices, winning_bids, num_tied)
+
+
+# Fewest tie-break draws _randbelow_many takes through NumPy
+MIN_BULK_DRAWS = 1024
+
+
+def _randbelow_many(rng: random.Random, limits: np.ndarray) -> np.ndarray:
+    """
+    `rng.randrange(n)` for each n of `limits` in turn: the same numbers, and
+    `rng` left in the same state.
+
+    randrange(n) draws getrandbits(k), k being the bit length of n, until a
+    draw is below n, and getrandbits(k) is the top k bits of one 32-bit
+    Mersenne Twister output. The outputs are drawn in bulk through
+    numpy_generator and handed out one run of equal limits at a time, as
+    within a run every output below the limit is the next row's number.
+    Moving the state to NumPy and back costs as much as about a thousand
+    randrange calls, so shorter runs of rows are drawn directly.
+    """
+    limits = np.asarray(limits, dtype=np.int64)
+    picks = np.zeros(len(limits), dtype=np.int64)
+    if len(limits) == 0:
+        return picks
+    if len(limits) < MIN_BULK_DRAWS or limits.max() >= 1 << 32:
+        return np.array([rng.randrange(n) for n in limits.tolist()], dtype=np.int64)
+
+    shifts = (32 - np.frexp(limits.astype(np.float64))[1]).astype(np.uint64)
+    run_starts = np.r_[0, np.flatnonzero(np.diff(limits)) + 1]
+    run_stops = np.r_[run_starts[1:], len(limits)]
+    with numpy_generator(rng) as generator:
+        bit_generator = generator.bit_generator
+        start_state = bit_generator.state
+        words = bit_generator.random_raw(2 * len(limits) + 64)
+        used = 0
+        for start, stop in zip(run_starts.tolist(), run_stops.tolist()):
+            limit, shift, needed = limits[start], shifts[start], stop - start
+            window = 2 * needed + 64
+            while True:
+                if used + window > len(words):
+                    words = np.concatenate([words, bit_generator.random_raw(used + window - len(words))])
+                draws = words[used:used + window] >> shift
+                accepted = np.flatnonzero(draws < limit)
+                if len(accepted) >= needed:
+                    break
+                window *= 2
+            picks[start:stop] = draws[accepted[:needed]]
+            used += int(accepted[needed - 1]) + 1
+        # Leave the generator right after the outputs that were used
+        bit_generator.state = start_state
+        bit_generator.random_raw(used)
+    return picks
+
+
+BUDGET_POLICIES = ("clip", "reject")
+# Fewest rows run_budgeted_rounds settles at once after a budget cut
+MIN_SETTLE_WINDOW = 64
+
+
+def limit_bids(bids: np.ndarray, remaining: np.ndarray, policy: str = "clip") -> np.ndarray:
+    """
+    Bids (agents along the last axis) limited to each agent's remaining
+    budget: "clip" lowers a bid above it to the budget left, "reject"
+    replaces it with 0.0 (an abstention).
+    """
+    if policy == "clip":
+        return np.minimum(bids, remaining)
+    if policy == "reject":
+        return np.where(bids > remaining, 0.0, bids)
+    raise ValueError(f"Unknown budget policy {policy!r}, expected one of {BUDGET_POLICIES}")
+
+
+def _running_spend(winners: np.ndarray, prices: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Every win grouped by agent, in row order: (rows, agents, spent), with
+    `spent` the agent's total over its wins up to and including that row.
+    """
+    rows = np.flatnonzero(winners >= 0)
+    order = np.argsort(winners[rows], kind="stable")
+    rows, agents = rows[order], winners[rows][order]
+    spent = np.cumsum(prices[rows])
+    first = np.flatnonzero(np.r_[True, agents[1:] != agents[:-1]])
+    group_start = np.repeat(first, np.diff(np.r_[first, len(agents)]))
+    spent -= spent[group_start] - prices[rows][group_start]
+    return rows, agents, spent
+
+
+def run_budgeted_auction_batch(
+    bid_matrix: np.ndarray,
+    budgets: np.ndarray,
+    rng: random.Random | np.random.Generator | None = None,
+    policy: str = "clip"
+) -> tuple[BatchAuctionResult, np.ndarray]:
+    """
+    Settle many simultaneous first-price auctions whose bidders share budgets.
+
+    Bids are first limited to their agent's budget (see limit_bids) and every
+    row is settled like `run_auction_batch` (consuming `rng` the same way).
+    An agent whose wins then cost more than its budget keeps them in row
+    order while they fit; its bids on the other rows it won are limited
+    again, to what it has left after the wins it keeps, and those rows are
+    settled again. This repeats until no budget is exceeded.
+
+    Args:
+        bid_matrix: Array of shape (auctions, agents).
+        budgets: Array of shape (agents,): what each agent can spend in total.
+        rng: Tie-breaking RNG.
+        policy: "clip" or "reject" (see limit_bids).
+
+    Returns:
+        The settlement, and the bids as settled.
+    """
+    if rng is None:
+        rng = random.Random()
+    budgets = np.asarray(budgets, dtype=np.float64)
+    bids = limit_bids(np.asarray(bid_matrix, dtype=np.float64), budgets, policy)
+    outcome = run_auction_batch(bids, rng)
+    winners, prices, num_tied = outcome.winner_indices, outcome.winning_bids, outcome.num_tied
+
+    while True:
+        rows, agents, spent = _running_spend(winners, prices)
+        over = spent > budgets[agents] * (1 + BUDGET_TOLERANCE)
+        if not over.any():
+            return BatchAuctionResult(winners, prices, num_tied), bids
+
+        left = budgets - np.bincount(agents[~over], weights=prices[rows][~over], minlength=len(budgets))
+        # A withdrawn win cost more than what is left, so "clip" lowers it to that and "reject" zeroes it
+        bids[rows[over], agents[over]] = left[agents[over]] if policy == "clip" else 0.0
+        resettled = np.unique(rows[over])
+        bids[resettled] = limit_bids(bids[resettled], left, policy)
+        outcome = run_auction_batch(bids[resettled], rng)
+        winners[resettled] = outcome.winner_indices
+        prices[resettled] = outcome.winning_bids
+        num_tied[resettled] = outcome.num_tied
+
+
+def run_budgeted_rounds(
+    bid_matrix: np.ndarray,
+    budgets: np.ndarray,
+    rng: random.Random | np.random.Generator | None = None,
+    policy: str = "clip",
+    spent: np.ndarray | None = None
+) -> tuple[BatchAuctionResult, np.ndarray, np.ndarray]:
+    """
+    Settle consecutive first-price rounds of one market whose bidders have budgets.
+
+    The result is that of settling the rows one at a time with `run_auction`,
+    each bid limited (see limit_bids) to `budgets - spent` after the rows
+    before it, and with `rng` consumed the same way. Prices are added to
+    `spent` in row order, so the amounts are the same to the last bit as
+    those of a round-by-round loop. Rows are settled in bulk and only the
+    rows from the first one where the limit could change the outcome (a
+    winning or tied highest bid at or above its agent's remaining budget)
+    are settled again, with the budgets left at that point. After such a
+    cut, rows are settled in windows sized from the distance to the cut.
+
+    Args:
+        bid_matrix: Array of shape (rounds, agents).
+        budgets: Array of shape (agents,): what each agent can spend in total.
+        rng: Tie-breaking RNG.
+        policy: "clip" or "reject" (see limit_bids).
+        spent: Array of shape (agents,): what each agent has spent before
+            the first row (default: nothing).
+
+    Returns:
+        The settlement, the bids as settled, and what each agent has spent
+        after the last row.
+    """
+    if rng is None:
+        rng = random.Random()
+    bids = np.array(bid_matrix, dtype=np.float64)
+    num_rounds, num_agents = bids.shape
+    budgets = np.asarray(budgets, dtype=np.float64)
+    initial_spent = np.zeros(num_agents) if spent is None else np.asarray(spent, dtype=np.float64)
+    spent = initial_spent.copy()
+    # Rows whose running spend comes this close to the budget are settled one by one
+    margin = np.where(np.isfinite(budgets), BUDGET_TOLERANCE * np.abs(budgets), 0.0)
+    winner_indices = np.full(num_rounds, -1, dtype=np.int64)
+    winning_bids = np.zeros(num_rounds)
+    num_tied = np.zeros(num_rounds, dtype=np.int64)
+
+    start, window = 0, num_rounds
+    while start < num_rounds:
+        remaining = budgets - spent
+        pending = bids[start:start + window]
+        pending[:] = limit_bids(pending, remaining, policy)
+        rng_state = rng.getstate() if isinstance(rng, random.Random) else rng.bit_generator.state
+        ranked = _rank_rows(pending)
+        outcome = _pick_winners(*ranked, rng)
+        cut = _first_overspent_round(pending, outcome, remaining - margin)
+        # Rows settled past a cut are wasted, so the window follows the distance between cuts
+        window = 2 * window if cut is None else max(2 * cut, MIN_SETTLE_WINDOW)
+        if cut is not None:
+            # Row 0 is limited to what is left already; always make progress
+            cut = max(cut, 1)
+            # Draw the tie-breaks of the rows before `cut` again, so the RNG is left as if they had been played alone
+            if isinstance(rng, random.Random):
+                rng.setstate(rng_state)
+            else:
+                rng.bit_generator.state = rng_state
+            outcome = _pick_winners(*(ranking[:cut] for ranking in ranked), rng)
+        stop = start + len(outcome.winner_indices)
+        winner_indices[start:stop] = outcome.winner_indices
+        winning_bids[start:stop] = outcome.winning_bids
+        num_tied[start:stop] = outcome.num_tied
+        sold = outcome.winner_indices >= 0
+        # ufunc.at adds one price at a time, in row order
+        np.add.at(spent, outcome.winner_indices[sold], outcome.winning_bids[sold])
+        start = stop
+
+    # Losing bids did not change the outcome, but are recorded as limited by their own row's budget
+    # too; that only matters to buyers with a bid above what they have left after the last row
+    sold = winner_indices >= 0
+    buyers = np.unique(winner_indices[sold])
+    buyers = buyers[bids[:, buyers].max(axis=0) > budgets[buyers] - spent[buyers]]
+    if len(buyers):
+        bought = np.flatnonzero(np.isin(winner_indices, buyers))
+        paid = np.zeros((num_rounds, len(buyers)))
+        paid[bought, np.searchsorted(buyers, winner_indices[bought])] = winning_bids[bought]
+        paid_before = np.cumsum(np.vstack([initial_spent[buyers], paid[:-1]]), axis=0)
+        bids[:, buyers] = limit_bids(bids[:, buyers], budgets[buyers] - paid_before, policy)
+    return BatchAuctionResult(winner_indices, winning_bids, num_tied), bids, spent
+
+
+def _first_overspent_round(bids: np.ndarray, outcome: BatchAuctionResult, limits: np.ndarray) -> int | None:
+    """
+    The first row whose winner, or any bidder tied at its highest bid, has
+    then spent more than its limit, counting that row (None if there is
+    none). Lowering any other bid cannot change a row's outcome.
+    """
+    rows, agents, spent = _running_spend(outcome.winner_indices, outcome.winning_bids)
+    over = spent > limits[agents]
+    cut = int(rows[over].min()) if over.any() else None
+
+    # Losing tied bidders, in the rare rows with ties, are checked one by one
+    contested = np.flatnonzero(outcome.num_tied > 1)
+    if cut is not None:
+        contested = contested[contested < cut]
+    if len(contested):
+        keys = agents * len(bids) + rows  # sorted, as wins are grouped by agent in row order
+        for row in contested.tolist():
+            tied = np.flatnonzero((bids[row] == outcome.winning_bids[row]) & (bids[row] > 0))
+            before = np.searchsorted(keys, tied * len(bids) + row) - 1
+            spent_before = np.where(
+                (before >= 0) & (agents[np.maximum(before, 0)] == tied), spent[np.maximum(before, 0)], 0.0
+            )
+            if (outcome.winning_bids[row] + spent_before > limits[tied]).any():
+                return row
+    return cut
+
+
+class ItemBidIndex:
+    """
+    Per-item scratch space for settling multi-item rounds, allocated once
+    and reused every round: the highest bid so far and the bids tied at it
+    for each item, found in a single pass over the bids.
+
+    Args:
+        items: The auctioned items, in settlement order.
+    """
+    __slots__ = ("item_ids", "positions", "best", "leaders", "_zeros")
+
+    def __init__(self, items: list[Item]):
+        self.item_ids = [item.item_id for item in items]
+        self.positions: dict[int, int] = {}
+        for item_id in self.item_ids:
+            self.positions.setdefault(item_id, len(self.positions))
+        self._zeros = [0.0] * len(self.positions)
+        self.best = list(self._zeros)
+        self.leaders: list[list[ItemBid]] = [[] for _ in self._zeros]
+
+    def settle(self, bids: list[ItemBid], rng: random.Random) -> tuple[dict[int, int], dict[int, float]]:
+        """
+        Allocations and prices for one round. Ties are broken with
+        `rng.choice` over the tied bids in bid order, item by item, so the
+        RNG is consumed exactly as by a per-item filter-max-choice.
+        """
+        positions, best, leaders = self.positions, self.best, self.leaders
+        best[:] = self._zeros
+        for tied in leaders:
+            tied.clear()
+
+        for bid in bids:
+            k = positions.get(bid.item_id)
+            if k is None:
+                continue
+            amount = bid.bid_amount
+            if amount > best[k]:
+                best[k] = amount
+                leaders[k].clear()
+                leaders[k].append(bid)
+            elif amount == best[k] and leaders[k]:
+                leaders[k].append(bid)
+
+        allocations: dict[int, int] = {}
+        prices: dict[int, float] = {}
+        for item_id in self.item_ids:
+            tied = leaders[positions[item_id]]
+            if not tied:
+                allocations[item_id] = -1
+                prices[item_id] = 0.0
+                continue
+            winner = rng.choice(tied)
+            allocations[item_id] = winner.agent_id
+            prices[item_id] = winner.bid_amount
+        return allocations, prices
+
+
 def run_multi_item_auction(
     bids: list[ItemBid],
     items: list[Item],
     auction_id: int,
     rng: random.Random | None = None,
-    round_number: int = 0
+    round_number: int = 0,
+    bid_index: ItemBidIndex | None = None,
+    private_values: dict[int, dict[int, float]] | None = None
 ) -> MultiItemAuctionResult:
     """
     Run independent first-price sealed-bid auctions for each item.
     Each item is allocated to the highest bidder for that item.
+
+    Args:
+        private_values: agent_id -> {item_id: value}, recorded on the result
+            for analytics.
+        bid_index: Scratch space built for `items`, to reuse across rounds
+            instead of regrouping the bids from scratch each time.
     """
     if rng is None:
         rng = random.Random()
+    if bid_index is None:
+        bid_index = ItemBidIndex(items)
+
+    allocations, prices = bid_index.settle(bids, rng)
 
-    # Group bids by item
-    bids_by_item: dict[int, list[ItemBid]] = defaultdict(list)
-    for bid in bids:
-        bids_by_item[bid.item_id].append(bid)
+    return MultiItemAuctionResult(
+        auction_id=auction_id,
+        round_number=round_number,
+        allocations=allocations,
+        prices=prices,
+        all_bids=bids,
+        private_values=private_values if private_values is not None else {}
+    )
 
-    allocations: dict[int, int] = {}
-    prices: dict[int, float] = {}
 
-    for item in items:
-        item_bids = bids_by_item.get(item.item_id, [])
-        filtered_bids = [b for b in item_bids if b.bid_amount > 0]
+def run_combinatorial_auction(
+    bids: list[BundleBid],
+    items: list[Item],
+    auction_id: int,
+    round_number: int = 0,
+    solver: WinnerDeterminationSolver | None = None,
+    payment_rule: PaymentRule | None = None
+) -> CombinatorialAuctionResult:
+    """
+    Run a sealed-bid combinatorial auction with XOR bundle bids.
 
-        if not filtered_bids:
-            allocations[item.item_id] = -1
-            prices[item.item_id] = 0.0
-            continue
+    The solver picks the welfare-maximizing set of compatible bids (each item
+    sold at most once, each agent winning at most one bundle) and the payment
+    rule decides what winners pay (their bid by default).
+    """
+    if solver is None:
+        solver = BranchAndBoundWinnerDetermination()
+    if payment_rule is None:
+        payment_rule = FirstPricePayment()
 
-        highest_bid = max(b.bid_amount for b in filtered_bids)
-        tied_bids = [b for b in filtered_bids if b.bid_amount == highest_bid]
-        winner = rng.choice(tied_bids)
+    solution, payments = payment_rule.settle(bids, items, solver)
 
-        allocations[item.item_id] = winner.agent_id
-        prices[item.item_id] = winner.bid_amount
+    allocations = {item.item_id: -1 for item in items}
+    for bid in solution.accepted_bids:
+        for item_id in bid.bundle:
+            allocations[item_id] = bid.agent_id
 
-    return MultiItemAuctionResult(
+    return CombinatorialAuctionResult(
         auction_id=auction_id,
         round_number=round_number,
         allocations=allocations,
-        prices=prices,
-        all_bids=bids
-    )
\ No newline at end of file
+        payments=payments,
+        accepted_bids=solution.accepted_bids,
+        all_bids=bids,
+        welfare=solution.value,
+        optimal=solution.optimal
+    )
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import time
+from typing import TYPE_CHECKING
+
+from simulation.data_models import Bid
+from simulation.instrumentation import BIDS_TOTAL, PHASE_SECONDS, ROUNDS_TOTAL
+from simulation.results_store import AuctionResultStore
+
+if TYPE_CHECKING:
+    from simulation.auction_environment import AuctionEnvironment
+
+
+class BatchRequestError(RuntimeError):
+    """Raised when a request in a message batch did not succeed."""
+
+
+def run_batched_simulations(
+    environments: list[AuctionEnvironment],
+    num_rounds: int,
+    client=None,
+    poll_interval: float = 30.0
+) -> list[AuctionResultStore]:
+    """
+    Run several environments in lockstep, submitting LLM decisions as message batches.
+
+    Every round, each environment's values are drawn and every agent that
+    returns parameters from `prepare_batch_request` has its request added to a
+    single Message Batch covering all environments. Other agents bid directly.
+    Once the batch has ended, each environment settles its round and the next
+    round starts. Results are identical to running each environment on its own
+    with the same responses. Every environment's instrumentation gets the
+    whole shared bidding step (including the batch wait) as its bidding time.
+
+    Args:
+        environments: Independent environments to advance together.
+        num_rounds: Number of rounds to play in each environment.
+        client: `anthropic.Anthropic` client used for the batches. Defaults to
+            the `client` of the first batching agent.
+        poll_interval: Seconds to wait between batch status checks.
+
+    Returns:
+        One result store per environment, in the same order.
+    """
+    all_results = [AuctionResultStore(env.auction_id, capacity=num_rounds) for env in environments]
+    for env in environments:
+        env.value_sampler.reserve(num_rounds)
+
+    for round_number in range(1, num_rounds + 1):
+        round_states = []
+        for env in environments:
+            with env.instrumentation.timer(PHASE_SECONDS, phase="setup"):
+                round_states.append(env._setup_round(round_number))
+        bidding_started = time.perf_counter()
+        round_bids: list[list[Bid | None]] = []
+        pending: dict[str, tuple[int, int, dict]] = {}  # custom_id -> (env index, agent index, params)
+
+        for env_index, (env, states, results) in enumerate(zip(environments, round_states, all_results)):
+            bids: list[Bid | None] = []
+            for agent_index, (agent, state) in enumerate(zip(env.agents, states)):
+                params = agent.prepare_batch_request(state, results)
+                if params is None:
+                    bids.append(agent.get_bid(state, results))
+                    continue
+                cached_response = getattr(agent, "cached_response", None)
+                response = cached_response(params) if cached_response else None
+                if response is not None:
+                    bids.append(agent.bid_from_batch_response(response))
+                    continue
+                bids.append(None)
+                pending[f"env{env_index}-agent{agent_index}"] = (env_index, agent_index, params)
+            round_bids.append(bids)
+
+        if pending:
+            if client is None:
+                env_index, agent_index, _ = next(iter(pending.values()))
+                client = environments[env_index].agents[agent_index].client
+            responses = _run_batch(client, pending, poll_interval)
+            for custom_id, (env_index, agent_index, params) in pending.items():
+                agent = environments[env_index].agents[agent_index]
+                store_response = getattr(agent, "store_response", None)
+                response = responses[custom_id]
+                if store_response:
+                    response = store_response(params, response)
+                round_bids[env_index][agent_index] = agent.bid_from_batch_response(response)
+
+        bidding_seconds = time.perf_counter() - bidding_started
+
+        for env, states, bids, results in zip(environments, round_states, round_bids, all_results):
+            env.instrumentation.observe(PHASE_SECONDS, bidding_seconds, phase="bidding")
+            with env.instrumentation.timer(PHASE_SECONDS, phase="settlement"):
+                result = env.conduct_auction(bids, states, round_number=round_number)
+            with env.instrumentation.timer(PHASE_SECONDS, phase="recording"):
+                results.append(result)
+            env.instrumentation.increment(ROUNDS_TOTAL)
+            env.instrumentation.increment(BIDS_TOTAL, len(bids))
+
+    return all_results
+
+
+def _run_batch(client, pending: dict[str, tuple[int, int, dict]], poll_interval: float) -> dict:
+    """Submit one batch, wait for it to end and return custom_id -> message."""
+    batch = client.messages.batches.create(requests=[
+        {"custom_id": custom_id, "params": params}
+        for custom_id, (_, _, params) in pending.items()
+    ])
+    while batch.processing_status != "ended":
+        time.sleep(poll_interval)
+        batch = client.messages.batches.retrieve(batch.id)
+
+    responses = {}
+    for entry in client.messages.batches.results(batch.id):
+        if entry.result.type != "succeeded":
+            raise BatchRequestError(f"Batch {batch.id} request {entry.custom_id} {entry.result.type}")
+        responses[entry.custom_id] = entry.result.message
+    missing = pending.keys() - responses.keys()
+    if missing:
+        raise BatchRequestError(f"Batch {batch.id} returned no result for {sorted(missing)}")
+    return responses
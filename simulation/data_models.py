@@ -1,7 +1,18 @@
+"""
+Records passed between agents, auction logic and environments.
+
+Bids, states and results are slotted, frozen dataclasses: no per-instance
+__dict__, and nothing downstream can change a settled round. Large numbers
+of bids are better kept as a `BidBatch`, which stores them as columns and
+only builds `Bid`/`ItemBid` objects when they are looked at.
+"""
 from __future__ import annotations
+from collections.abc import Iterator, Sequence
 from dataclasses import dataclass, field
 from typing import TYPE_CHECKING
 
+import numpy as np
+
 if TYPE_CHECKING:
     from simulation.valuation_models import ValuationModel
 
@@ -11,27 +22,51 @@ class AgentProfile:
     agent_id: int
 
 
-@dataclass 
+@dataclass(slots=True, frozen=True)
 class Bid:
     agent_id: int
     bid_amount: float
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class AuctionState:
     agent_id: int
     private_value: float
     round_number: int
+    remaining_budget: float | None = None  # None when the environment has no budgets
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class AuctionResult:
     auction_id: int
     winning_agent_id: int
     round_number: int
     winning_bid: float
-    all_bids: list[Bid]
+    all_bids: Sequence[Bid]  # a list or a BidBatch
     private_values: dict[int, float] = field(default_factory=dict)  # Optional, defaults to empty dict
 
 
+@dataclass
+class BatchAuctionResult:
+    """Outcome of many independent first-price rounds settled in one call."""
+    winner_indices: np.ndarray  # (rounds,) column index of the winner, -1 if no positive bid
+    winning_bids: np.ndarray  # (rounds,) price paid, 0.0 if unallocated
+    num_tied: np.ndarray  # (rounds,) number of bidders tied at the highest bid
+
+
+@dataclass
+class PacingRun:
+    """
+    Per-agent totals of a budgeted run, kept instead of per-bid records so
+    that long runs with many agents fit in memory.
+    """
+    agent_ids: np.ndarray  # (agents,)
+    budgets: np.ndarray  # (agents,) inf for agents without a budget
+    spend: np.ndarray  # (agents,) total paid
+    wins: np.ndarray  # (agents,) rounds won
+    utility: np.ndarray  # (agents,) value of the rounds won minus spend
+    round_ends: np.ndarray  # (blocks,) last round of each block the run was played in
+    remaining: np.ndarray  # (blocks, agents) budget left after each block
+
+
 # Multi-item auction data models
 
 @dataclass
@@ -44,14 +79,14 @@ class Item:
             self.name = f"Item_{self.item_id}"
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ItemBid:
     agent_id: int
     item_id: int
     bid_amount: float
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class MultiItemAuctionState:
     agent_id: int
     round_number: int
@@ -60,11 +95,120 @@ class MultiItemAuctionState:
     valuation_model: ValuationModel | None = None  # for computing bundle values
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
+class AscendingAuctionState:
+    agent_id: int
+    round_number: int
+    sub_round: int  # 1 for the first sub-round of the round's auction
+    items: list[Item]
+    private_values: dict[int, float]  # item_id -> base value
+    standing_bids: dict[int, ItemBid]  # item_id -> leader and current price, items with bids only
+    asking_prices: dict[int, float]  # item_id -> lowest acceptable new bid
+    valuation_model: ValuationModel | None = None  # for computing bundle values
+
+
+@dataclass(slots=True, frozen=True)
 class MultiItemAuctionResult:
     auction_id: int
     round_number: int
     allocations: dict[int, int]  # item_id -> winning_agent_id (-1 if unallocated)
     prices: dict[int, float]  # item_id -> price paid
-    all_bids: list[ItemBid]
-    private_values: dict[int, dict[int, float]] = field(default_factory=dict)  # agent_id -> {item_id: value}
\ No newline at end of file
+    all_bids: Sequence[ItemBid]  # a list or a BidBatch
+    private_values: dict[int, dict[int, float]] = field(default_factory=dict)  # agent_id -> {item_id: value}
+
+
+class BidBatch(Sequence):
+    """
+    Read-only sequence of bids stored as parallel arrays.
+
+    Holds 8 bytes per column per bid instead of a Python object per bid.
+    Indexing and iterating build `Bid`s, or `ItemBid`s when `item_ids` is
+    given, so a batch can stand in for a list of bids; slicing gives a
+    batch over views of the same arrays. Compares equal to any sequence
+    holding the same bids.
+
+    Args:
+        agent_ids: (n,) agent ID of each bid.
+        bid_amounts: (n,) amount of each bid.
+        item_ids: (n,) item ID of each bid, or None for single-item bids.
+    """
+
+    __slots__ = ("agent_ids", "bid_amounts", "item_ids")
+
+    def __init__(self, agent_ids: np.ndarray, bid_amounts: np.ndarray, item_ids: np.ndarray | None = None):
+        self.agent_ids = np.asarray(agent_ids, dtype=np.int64)
+        self.bid_amounts = np.asarray(bid_amounts, dtype=np.float64)
+        self.item_ids = None if item_ids is None else np.asarray(item_ids, dtype=np.int64)
+        if self.agent_ids.shape != self.bid_amounts.shape or (
+            self.item_ids is not None and self.item_ids.shape != self.agent_ids.shape
+        ):
+            raise ValueError("BidBatch columns must have the same shape")
+
+    @classmethod
+    def from_bids(cls, bids: Sequence[Bid] | Sequence[ItemBid]) -> BidBatch:
+        """Pack a list of Bids or ItemBids (all of one kind) into columns."""
+        if isinstance(bids, BidBatch):
+            return bids
+        count = len(bids)
+        agent_ids = np.fromiter((bid.agent_id for bid in bids), dtype=np.int64, count=count)
+        bid_amounts = np.fromiter((bid.bid_amount for bid in bids), dtype=np.float64, count=count)
+        item_ids = None
+        if count and isinstance(bids[0], ItemBid):
+            item_ids = np.fromiter((bid.item_id for bid in bids), dtype=np.int64, count=count)
+        return cls(agent_ids, bid_amounts, item_ids)
+
+    def __len__(self) -> int:
+        return len(self.agent_ids)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            item_ids = None if self.item_ids is None else self.item_ids[index]
+            return BidBatch(self.agent_ids[index], self.bid_amounts[index], item_ids)
+        if self.item_ids is None:
+            return Bid(agent_id=int(self.agent_ids[index]), bid_amount=float(self.bid_amounts[index]))
+        return ItemBid(
+            agent_id=int(self.agent_ids[index]),
+            item_id=int(self.item_ids[index]),
+            bid_amount=float(self.bid_amounts[index])
+        )
+
+    def __iter__(self) -> Iterator[Bid] | Iterator[ItemBid]:
+        agent_ids, bid_amounts = self.agent_ids.tolist(), self.bid_amounts.tolist()
+        if self.item_ids is None:
+            for agent_id, amount in zip(agent_ids, bid_amounts):
+                yield Bid(agent_id=agent_id, bid_amount=amount)
+        else:
+            for agent_id, item_id, amount in zip(agent_ids, self.item_ids.tolist(), bid_amounts):
+                yield ItemBid(agent_id=agent_id, item_id=item_id, bid_amount=amount)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Sequence) or isinstance(other, (str, bytes)):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"BidBatch({list(self)!r})"
+
+
+# Combinatorial auction data models
+
+@dataclass
+class BundleBid:
+    agent_id: int
+    bundle: frozenset[int]  # item_ids
+    amount: float
+
+
+@dataclass
+class CombinatorialAuctionResult:
+    auction_id: int
+    round_number: int
+    allocations: dict[int, int]  # item_id -> winning_agent_id (-1 if unallocated)
+    payments: dict[int, float]  # agent_id -> amount paid, winners only
+    accepted_bids: list[BundleBid]
+    all_bids: list[BundleBid]
+    welfare: float  # total amount of the accepted bids
+    optimal: bool  # False if the solver ran out of time before proving optimality
+    private_values: dict[int, dict[int, float]] = field(default_factory=dict)  # agent_id -> {item_id: value}
@@ -0,0 +1,272 @@
+"""
+Timings and counters for simulation runs.
+
+Environments and agents report to an `Instrumentation` object:
+
+- `timer(name, **labels)` times a block and records its duration in seconds
+  (the environment loop's phases, LLM prompt building, API calls, parsing).
+- `observe(name, value, **labels)` records any other sample.
+- `increment(name, amount, **labels)` bumps a counter (rounds, bids, tokens,
+  parse failures).
+
+Samples are summarised as count, sum, min, max and quantiles over the most
+recent `reservoir_size` samples. Everything can be exported as JSON
+(`snapshot`, `write_json`) or as Prometheus text (`to_prometheus`,
+`write_prometheus`, `serve`).
+
+When nothing is being measured, `NULL_INSTRUMENTATION` stands in: every
+method is a no-op, so the instrumented code paths cost only a method call.
+"""
+import json
+import math
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+QUANTILES = (0.5, 0.9, 0.99)
+
+# Metric names used by the environments and LLMAgent
+PHASE_SECONDS = "auction_phase_seconds"  # labels: phase = setup | bidding | settlement | recording
+ROUNDS_TOTAL = "auction_rounds_total"
+BIDS_TOTAL = "auction_bids_total"
+LLM_PHASE_SECONDS = "llm_phase_seconds"  # labels: agent_id, phase = prompt | api | parse
+LLM_CALLS_TOTAL = "llm_calls_total"
+LLM_CACHE_HITS_TOTAL = "llm_cache_hits_total"
+LLM_INPUT_TOKENS_TOTAL = "llm_input_tokens_total"
+LLM_OUTPUT_TOKENS_TOTAL = "llm_output_tokens_total"
+LLM_PARSE_FAILURES_TOTAL = "llm_parse_failures_total"
+LLM_RETRIES_TOTAL = "llm_retries_total"
+LLM_FALLBACK_BIDS_TOTAL = "llm_fallback_bids_total"
+
+
+def _key(name: str, labels: dict) -> tuple:
+    return name, tuple(sorted((label, str(value)) for label, value in labels.items()))
+
+
+class _Summary:
+    __slots__ = ("count", "total", "minimum", "maximum", "recent")
+
+    def __init__(self, reservoir_size: int):
+        self.count = 0
+        self.total = 0.0
+        self.minimum = math.inf
+        self.maximum = -math.inf
+        self.recent: deque[float] = deque(maxlen=reservoir_size)
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self.minimum = min(self.minimum, value)
+        self.maximum = max(self.maximum, value)
+        self.recent.append(value)
+
+    def quantiles(self) -> dict[float, float]:
+        ordered = sorted(self.recent)
+        if not ordered:
+            return {}
+        return {q: ordered[min(int(q * len(ordered)), len(ordered) - 1)] for q in QUANTILES}
+
+
+class _Timer:
+    __slots__ = ("_instrumentation", "_key", "_start")
+
+    def __init__(self, instrumentation: "Instrumentation", key: tuple):
+        self._instrumentation = instrumentation
+        self._key = key
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._instrumentation._observe(self._key, time.perf_counter() - self._start)
+
+
+class Instrumentation:
+    """
+    Thread-safe collector of timings and counters.
+
+    Args:
+        reservoir_size: Number of most recent samples per summary kept for
+            the quantiles.
+    """
+
+    enabled = True
+
+    def __init__(self, reservoir_size: int = 1024):
+        self.reservoir_size = reservoir_size
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._summaries: dict[tuple, _Summary] = {}
+            self._counters: dict[tuple, float] = {}
+            self._started = time.perf_counter()
+
+    def timer(self, name: str, **labels) -> _Timer:
+        """Context manager recording the duration of its block, in seconds."""
+        return _Timer(self, _key(name, labels))
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        self._observe(_key(name, labels), value)
+
+    def increment(self, name: str, amount: float = 1, **labels) -> None:
+        key = _key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def _observe(self, key: tuple, value: float) -> None:
+        with self._lock:
+            summary = self._summaries.get(key)
+            if summary is None:
+                summary = self._summaries[key] = _Summary(self.reservoir_size)
+            summary.add(value)
+
+    # Export
+
+    def snapshot(self) -> dict:
+        """
+        All metrics as plain data. Counters also get a per-second rate over
+        the time since creation or the last reset (e.g. bids per second).
+        """
+        with self._lock:
+            elapsed = time.perf_counter() - self._started
+            counters = [
+                {"name": name, "labels": dict(labels), "value": value,
+                 "per_second": value / elapsed if elapsed > 0 else 0.0}
+                for (name, labels), value in sorted(self._counters.items())
+            ]
+            summaries = [
+                {"name": name, "labels": dict(labels), "count": summary.count, "sum": summary.total,
+                 "mean": summary.total / summary.count, "min": summary.minimum, "max": summary.maximum,
+                 "quantiles": {str(q): value for q, value in summary.quantiles().items()}}
+                for (name, labels), summary in sorted(self._summaries.items())
+            ]
+        return {"elapsed_seconds": elapsed, "counters": counters, "summaries": summaries}
+
+    def to_prometheus(self) -> str:
+        """Prometheus text exposition format: counters as counters, samples as summaries."""
+        snapshot = self.snapshot()
+        lines = []
+        declared = set()
+        for counter in snapshot["counters"]:
+            if counter["name"] not in declared:
+                declared.add(counter["name"])
+                lines.append(f"# TYPE {counter['name']} counter")
+            lines.append(f"{counter['name']}{_labels(counter['labels'])} {_number(counter['value'])}")
+        for summary in snapshot["summaries"]:
+            name = summary["name"]
+            if name not in declared:
+                declared.add(name)
+                lines.append(f"# TYPE {name} summary")
+            for q, value in summary["quantiles"].items():
+                lines.append(f"{name}{_labels({**summary['labels'], 'quantile': q})} {_number(value)}")
+            lines.append(f"{name}_sum{_labels(summary['labels'])} {_number(summary['sum'])}")
+            lines.append(f"{name}_count{_labels(summary['labels'])} {summary['count']}")
+        return "\n".join(lines) + "\n"
+
+    def write_json(self, path: str) -> None:
+        with open(path, "w") as f:
+            json.dump(self.snapshot(), f, indent=2)
+
+    def write_prometheus(self, path: str) -> None:
+        """Write the Prometheus text, e.g. for node_exporter's textfile collector."""
+        with open(path, "w") as f:
+            f.write(self.to_prometheus())
+
+    def serve(self, port: int = 0, host: str = "127.0.0.1") -> "MetricsServer":
+        """Serve GET /metrics in Prometheus text format from a background thread."""
+        return MetricsServer(self, host, port)
+
+
+class NullInstrumentation(Instrumentation):
+    """Records nothing; used when instrumentation is disabled."""
+
+    enabled = False
+
+    def __init__(self):
+        super().__init__(reservoir_size=0)
+
+    def timer(self, name: str, **labels) -> "_NullTimer":
+        return _NULL_TIMER
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        pass
+
+    def increment(self, name: str, amount: float = 1, **labels) -> None:
+        pass
+
+    def __reduce__(self):
+        # Unpickles as the module's NULL_INSTRUMENTATION (and needs no lock pickled)
+        return "NULL_INSTRUMENTATION"
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+_NULL_TIMER = _NullTimer()
+NULL_INSTRUMENTATION = NullInstrumentation()
+
+
+class MetricsServer:
+    """Background HTTP server exposing an Instrumentation at /metrics."""
+
+    def __init__(self, instrumentation: Instrumentation, host: str, port: int):
+        metrics = instrumentation
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                payload = metrics.to_prometheus().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/metrics"
+
+    def shutdown(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+
+
+def _labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    return str(value) if isinstance(value, int) else repr(float(value))
@@ -0,0 +1,400 @@
+"""
+Many simultaneous first-price markets sharing one pool of bidders.
+
+Each tick, every market (an `Item`, e.g. an ad slot) runs one sealed-bid
+first-price auction among the agents taking part in it, settled like one item
+of `run_multi_item_auction`. All of a tick's markets are settled together by
+`run_auction_batch`. Ties are broken by a NumPy Generator in one vectorized
+draw, as a per-market `random.Random` draw would dominate the cost of a tick
+with thousands of markets; apart from which tied bidder wins, a tick's result
+is what `run_multi_item_auction` gives for the same bids.
+
+Budgets are shared by all of an agent's markets and last the whole run.
+Settlement goes through `run_budgeted_auction_batch`: bids above what their
+agent has left are clipped or rejected (`budget_policy`), and an agent winning more than it can pay for in
+a tick keeps its wins in market order while they fit, its other markets
+going to the next bidders.
+
+Markets can be sharded across worker processes (`num_shards`). Each shard
+owns a contiguous slice of the markets, its own value and tie-breaking RNGs
+and forks of the agents (see `BaseAgent.fork`), and plays `sync_ticks` ticks
+between synchronizations with the environment. Budgets stay shared: at each
+synchronization every shard gets a slice of each agent's remaining budget,
+in proportion to the agent's markets in it, so no budget is overspent.
+Sharded runs are reproducible but draw different values than unsharded ones.
+"""
+import random
+from collections.abc import Iterator, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from dataclasses import dataclass
+
+import numpy as np
+
+from agents.base_agent import BaseAgent
+from simulation.auction_environment import _attach_instrumentation
+from simulation.auction_logic import run_auction_batch, run_budgeted_auction_batch, BUDGET_POLICIES
+from simulation.data_models import BidBatch, Item, MultiItemAuctionResult, MultiItemAuctionState
+from simulation.instrumentation import Instrumentation, NULL_INSTRUMENTATION, PHASE_SECONDS, ROUNDS_TOTAL, BIDS_TOTAL
+from simulation.streaming import HistoryWindow
+from simulation.valuation_models import AdditiveValuation
+from simulation.value_distributions import ValueDistribution, UniformValues, ValueSampler, ItemValues
+
+# Upper bound on (ticks x agents x markets) values and bids held per shard at once
+CHUNK_ELEMENTS = 1 << 22
+
+
+@dataclass
+class ShardTicks:
+    """What a shard played over consecutive ticks. Arrays are (ticks, agents, markets) unless noted."""
+    values: np.ndarray
+    bids: np.ndarray  # as settled: 0.0 outside the agent's markets, limited to its budget
+    winners: np.ndarray  # (ticks, markets) winning agent's index, -1 if unsold
+    prices: np.ndarray  # (ticks, markets)
+    spend: np.ndarray  # (agents,) total paid by each agent
+
+
+class MarketShard:
+    """
+    Values, bids and settlement for a slice of the markets. Lives in the
+    environment's process, or in a worker process of its own.
+
+    Args:
+        agents: The bidders (forks of them in a worker).
+        markets: This shard's markets.
+        participation: (agents, markets) whether each agent bids in each market.
+        value_distribution: Distribution of the agents' values for a market.
+        value_rng: Draws the values.
+        auction_rng: Breaks ties.
+        budget_policy: See run_budgeted_auction_batch.
+    """
+
+    def __init__(
+        self,
+        agents: list[BaseAgent],
+        markets: list[Item],
+        participation: np.ndarray,
+        value_distribution: ValueDistribution,
+        value_rng: random.Random,
+        auction_rng: np.random.Generator,
+        instrumentation: Instrumentation = NULL_INSTRUMENTATION,
+        budget_policy: str = "clip"
+    ):
+        self.agents = agents
+        self.markets = markets
+        self.market_index = {market.item_id: k for k, market in enumerate(markets)}
+        self.participation = participation
+        self.value_distribution = value_distribution
+        self.auction_rng = auction_rng
+        self.value_rng = value_rng
+        self.value_sampler = self._sampler()
+        self.instrumentation = instrumentation
+        self.budget_policy = budget_policy
+        # Per-round agents are only shown the markets they take part in
+        self.agent_markets = [
+            [market for market, taking_part in zip(markets, row) if taking_part]
+            for row in participation.tolist()
+        ]
+        self.valuation_model = AdditiveValuation()
+
+    def _sampler(self) -> ValueSampler:
+        block_rounds = max(CHUNK_ELEMENTS // max(self.participation.size, 1), 1)
+        return ValueSampler(self.value_distribution, self.value_rng, block_rounds=block_rounds)
+
+    def __getstate__(self) -> dict:
+        # The sampler's buffered values are redrawn on arrival rather than pickled
+        state = self.__dict__.copy()
+        state["value_sampler"] = self.value_sampler.get_state()
+        state["instrumentation"] = NULL_INSTRUMENTATION
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        sampler_state = state.pop("value_sampler")
+        self.__dict__.update(state)
+        self.value_sampler = self._sampler()
+        self.value_sampler.set_state(sampler_state)
+
+    def play(
+        self,
+        num_ticks: int,
+        first_tick: int,
+        allowance: np.ndarray | None = None,
+        history: Sequence[MultiItemAuctionResult] = ()
+    ) -> ShardTicks:
+        """
+        Play `num_ticks` ticks (one, unless every agent supports bid_batch).
+
+        Args:
+            first_tick: Round number of the first tick.
+            allowance: (agents,) what each agent may spend over these ticks
+                (None: no budgets).
+            history: Results shown to per-round agents.
+        """
+        instrumentation = self.instrumentation
+        num_agents, num_markets = self.participation.shape
+        with instrumentation.timer(PHASE_SECONDS, phase="setup"):
+            self.value_sampler.reserve(num_ticks)
+            values = self.value_sampler.next_rounds(num_ticks, num_agents, num_markets)
+        with instrumentation.timer(PHASE_SECONDS, phase="bidding"):
+            bids = np.where(self.participation, self._bids(values, first_tick, history), 0.0)
+
+        with instrumentation.timer(PHASE_SECONDS, phase="settlement"):
+            if allowance is None:
+                outcome = run_auction_batch(
+                    bids.transpose(0, 2, 1).reshape(num_ticks * num_markets, num_agents), self.auction_rng
+                )
+                winners = outcome.winner_indices.reshape(num_ticks, num_markets)
+                prices = outcome.winning_bids.reshape(num_ticks, num_markets)
+            else:
+                winners = np.empty((num_ticks, num_markets), dtype=np.int64)
+                prices = np.empty((num_ticks, num_markets))
+                left = np.array(allowance, dtype=np.float64)
+                for tick in range(num_ticks):
+                    outcome, settled = run_budgeted_auction_batch(
+                        bids[tick].T, left, self.auction_rng, self.budget_policy
+                    )
+                    bids[tick] = settled.T
+                    winners[tick], prices[tick] = outcome.winner_indices, outcome.winning_bids
+                    sold = outcome.winner_indices >= 0
+                    left -= np.bincount(outcome.winner_indices[sold], weights=outcome.winning_bids[sold],
+                                        minlength=num_agents)
+            sold = winners >= 0
+            spend = np.bincount(winners[sold], weights=prices[sold], minlength=num_agents)
+        return ShardTicks(values, bids, winners, prices, spend)
+
+    def _bids(self, values: np.ndarray, first_tick: int, history) -> np.ndarray:
+        if all(agent.supports_bid_batch for agent in self.agents):
+            return np.stack([agent.bid_batch(values[:, column]) for column, agent in enumerate(self.agents)], axis=1)
+
+        if len(values) != 1:
+            raise ValueError("Agents without bid_batch are played one tick at a time")
+        bids = np.zeros(values.shape)
+        for column, agent in enumerate(self.agents):
+            state = MultiItemAuctionState(
+                agent_id=agent.agent_id,
+                round_number=first_tick,
+                items=self.agent_markets[column],
+                private_values=ItemValues(self.market_index, values[0, column]),
+                valuation_model=self.valuation_model
+            )
+            for bid in agent.get_item_bids(state, history):
+                k = self.market_index.get(bid.item_id)
+                if k is not None:
+                    bids[0, column, k] = bid.bid_amount
+        return bids
+
+
+# The shard owned by this worker process (see MultiMarketEnvironment._start_workers)
+_worker_shard: MarketShard | None = None
+
+
+def _init_worker(shard: MarketShard) -> None:
+    global _worker_shard
+    _worker_shard = shard
+
+
+def _play_worker_shard(num_ticks: int, first_tick: int, allowance: np.ndarray | None) -> ShardTicks:
+    return _worker_shard.play(num_ticks, first_tick, allowance)
+
+
+def _export_worker_shard() -> MarketShard:
+    return _worker_shard
+
+
+class MultiMarketEnvironment:
+    """
+    Simultaneous first-price markets with a shared pool of bidders.
+
+    Results are one `MultiItemAuctionResult` per tick, with the markets as
+    items: `all_bids` holds the bids of participating agents as settled,
+    and `private_values` every agent's values for every market.
+
+    Args:
+        auction_id: Recorded on every result.
+        markets: The markets, in settlement order.
+        agents: The bidders.
+        random_seed: Seeds the value and tie-breaking RNGs (of each shard).
+        value_distribution: Distribution of the agents' values for a market.
+        participation: (agents, markets) boolean array of which agents bid in
+            which markets (default: every agent in every market).
+        budgets: agent_id -> what the agent can spend over the whole run
+            (agents left out have no budget; None: no budgets at all).
+        budget_policy: "clip" or "reject": what happens to a bid above its
+            agent's remaining budget (see limit_bids).
+        num_shards: Worker processes to spread the markets over (1: play
+            everything in this process). Sharding needs every agent to
+            support bid_batch.
+        sync_ticks: Ticks each shard plays between budget synchronizations.
+    """
+
+    def __init__(
+        self,
+        auction_id: int,
+        markets: list[Item],
+        agents: list[BaseAgent],
+        random_seed: int | None = None,
+        value_distribution: ValueDistribution | None = None,
+        participation: np.ndarray | None = None,
+        budgets: dict[int, float] | None = None,
+        budget_policy: str = "clip",
+        num_shards: int = 1,
+        sync_ticks: int = 64,
+        instrumentation: Instrumentation | None = None
+    ):
+        self.auction_id = auction_id
+        self.markets = markets
+        self.agents = agents
+        self.value_distribution = value_distribution if value_distribution else UniformValues(0, 100)
+        self.instrumentation = _attach_instrumentation(instrumentation, self.agents)
+        self.market_ids = np.array([market.item_id for market in markets], dtype=np.int64)
+        self.market_index = {market.item_id: k for k, market in enumerate(markets)}
+        self.agent_ids = np.array([agent.agent_id for agent in agents], dtype=np.int64)
+
+        shape = (len(agents), len(markets))
+        self.participation = (
+            np.ones(shape, dtype=np.bool_) if participation is None else np.asarray(participation, dtype=np.bool_)
+        )
+        if self.participation.shape != shape:
+            raise ValueError(f"participation must have shape {shape}, got {self.participation.shape}")
+
+        self.budgets = None
+        if budgets is not None:
+            self.budgets = np.array([budgets.get(agent.agent_id, np.inf) for agent in agents], dtype=np.float64)
+        self.spent = np.zeros(len(agents))
+        if budget_policy not in BUDGET_POLICIES:
+            raise ValueError(f"Unknown budget policy {budget_policy!r}, expected one of {BUDGET_POLICIES}")
+
+        if num_shards < 1:
+            raise ValueError(f"num_shards must be at least 1, got {num_shards}")
+        num_shards = min(num_shards, max(len(markets), 1))
+        if num_shards > 1 and not all(agent.supports_bid_batch for agent in agents):
+            raise ValueError("Sharded markets need every agent to support bid_batch")
+        self.sync_ticks = sync_ticks
+
+        slices = np.array_split(np.arange(len(markets)), num_shards)
+        self._shard_columns = [(columns[0], columns[-1] + 1) if len(columns) else (0, 0) for columns in slices]
+        if num_shards == 1:
+            self.shards = [MarketShard(
+                agents, markets, self.participation, self.value_distribution,
+                random.Random(random_seed), np.random.default_rng(random_seed), self.instrumentation,
+                budget_policy
+            )]
+        else:
+            self.shards = [
+                MarketShard(
+                    [agent.fork(shard) for agent in agents],
+                    markets[start:stop],
+                    self.participation[:, start:stop],
+                    self.value_distribution,
+                    random.Random(None if random_seed is None else f"{random_seed}/{shard}"),
+                    np.random.default_rng(None if random_seed is None else [random_seed, shard]),
+                    budget_policy=budget_policy
+                )
+                for shard, (start, stop) in enumerate(self._shard_columns)
+            ]
+        # Each agent's share of its markets in each shard, for splitting budgets
+        counts = np.stack([self.participation[:, start:stop].sum(axis=1) for start, stop in self._shard_columns])
+        self._budget_shares = counts / np.maximum(counts.sum(axis=0), 1)
+
+    @property
+    def remaining_budgets(self) -> dict[int, float]:
+        """agent_id -> budget left (inf for agents without a budget)."""
+        if self.budgets is None:
+            return {int(agent_id): np.inf for agent_id in self.agent_ids}
+        return dict(zip(self.agent_ids.tolist(), (self.budgets - self.spent).tolist()))
+
+    def run_simulation(self, num_ticks: int) -> list[MultiItemAuctionResult]:
+        results = []
+        for _ in self._play(num_ticks, results):
+            pass
+        return results
+
+    def iter_simulation(self, num_ticks: int, history_window: int | None = 100) -> Iterator[MultiItemAuctionResult]:
+        """Play the simulation, yielding each tick's result once settled (see MultiItemAuctionEnvironment)."""
+        return self._play(num_ticks, HistoryWindow(history_window))
+
+    def _chunk_ticks(self) -> int:
+        if not all(agent.supports_bid_batch for agent in self.agents):
+            return 1
+        largest = max(stop - start for start, stop in self._shard_columns)
+        chunk = max(CHUNK_ELEMENTS // max(len(self.agents) * largest, 1), 1)
+        return min(chunk, self.sync_ticks) if len(self.shards) > 1 else chunk
+
+    def _play(self, num_ticks: int, history) -> Iterator[MultiItemAuctionResult]:
+        chunk_ticks = self._chunk_ticks()
+        with ExitStack() as stack:
+            workers = self._start_workers(stack) if len(self.shards) > 1 else None
+            try:
+                for first_tick in range(1, num_ticks + 1, chunk_ticks):
+                    ticks = min(chunk_ticks, num_ticks - first_tick + 1)
+                    allowances = self._allowances()
+                    if workers is None:
+                        played = [self.shards[0].play(ticks, first_tick, allowances[0], history)]
+                    else:
+                        futures = [
+                            worker.submit(_play_worker_shard, ticks, first_tick, allowance)
+                            for worker, allowance in zip(workers, allowances)
+                        ]
+                        played = [future.result() for future in futures]
+
+                    with self.instrumentation.timer(PHASE_SECONDS, phase="recording"):
+                        for part in played:
+                            self.spent += part.spend
+                        results = self._results(played, first_tick)
+                    self.instrumentation.increment(ROUNDS_TOTAL, ticks)
+                    self.instrumentation.increment(BIDS_TOTAL, ticks * int(self.participation.sum()))
+                    for result in results:
+                        history.append(result)
+                        yield result
+            finally:
+                if workers is not None:
+                    # Keep the shards' advanced RNG and agent state for the next run, also when the caller
+                    # stops iterating early (they then stand after the last chunk played, as a single shard does)
+                    self.shards = [worker.submit(_export_worker_shard).result() for worker in workers]
+
+    def _start_workers(self, stack: ExitStack) -> list[ProcessPoolExecutor]:
+        """One single-process pool per shard, so each shard stays in its own process between chunks."""
+        return [
+            stack.enter_context(ProcessPoolExecutor(max_workers=1, initializer=_init_worker, initargs=(shard,)))
+            for shard in self.shards
+        ]
+
+    def _allowances(self) -> list[np.ndarray | None]:
+        if self.budgets is None:
+            return [None] * len(self.shards)
+        remaining = np.maximum(self.budgets - self.spent, 0.0)
+        if len(self.shards) == 1:
+            return [remaining]
+        return [remaining * share for share in self._budget_shares]
+
+    def _results(self, played: list[ShardTicks], first_tick: int) -> list[MultiItemAuctionResult]:
+        """Merge the shards' ticks, in market order, into one result per tick."""
+        def merge(name: str, axis: int) -> np.ndarray:
+            parts = [getattr(part, name) for part in played]
+            return parts[0] if len(parts) == 1 else np.concatenate(parts, axis=axis)
+
+        # Shards own contiguous runs of markets, so concatenating keeps market order
+        values, bids = merge("values", 2), merge("bids", 2)
+        winners, prices = merge("winners", 1), merge("prices", 1)
+
+        # -1 indexes the trailing -1, for unsold markets
+        winner_ids = np.append(self.agent_ids, -1)[winners].tolist()
+        agent_rows, market_columns = np.nonzero(self.participation)
+        bid_agent_ids, bid_market_ids = self.agent_ids[agent_rows], self.market_ids[market_columns]
+        market_ids = self.market_ids.tolist()
+        agent_ids = self.agent_ids.tolist()
+
+        results = []
+        for tick in range(len(values)):
+            results.append(MultiItemAuctionResult(
+                auction_id=self.auction_id,
+                round_number=first_tick + tick,
+                allocations=dict(zip(market_ids, winner_ids[tick])),
+                prices=dict(zip(market_ids, prices[tick].tolist())),
+                all_bids=BidBatch(bid_agent_ids, bids[tick][agent_rows, market_columns], bid_market_ids),
+                private_values={
+                    agent_id: ItemValues(self.market_index, agent_values)
+                    for agent_id, agent_values in zip(agent_ids, values[tick])
+                }
+            ))
+        return results
@@ -0,0 +1,75 @@
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Any
+
+
+@dataclass
+class ExperimentConfig:
+    """
+    One environment setup to be run under many seeds.
+
+    `build_environment` receives the seed and returns a fully configured
+    `AuctionEnvironment` or `MultiItemAuctionEnvironment` (agents included).
+    It is called inside the worker process, so it must be picklable: a
+    module-level function or a `functools.partial` of one.
+
+    `summarize`, if given, is applied to the results inside the worker and only
+    its return value is sent back, which keeps large runs from being pickled.
+    """
+    name: str
+    build_environment: Callable[[int], Any]
+    num_rounds: int
+    summarize: Callable[[Any], Any] | None = None
+
+
+@dataclass
+class ExperimentRun:
+    config_name: str
+    seed: int
+    results: Any
+
+
+def run_experiment(config: ExperimentConfig, seed: int) -> ExperimentRun:
+    """Run a single configuration with a single seed in the current process."""
+    env = config.build_environment(seed)
+    results = env.run_simulation(num_rounds=config.num_rounds)
+    if config.summarize is not None:
+        results = config.summarize(results)
+    return ExperimentRun(config_name=config.name, seed=seed, results=results)
+
+
+def run_experiments(
+    configs: Iterable[ExperimentConfig],
+    seeds: Iterable[int],
+    max_workers: int | None = None
+) -> Iterator[ExperimentRun]:
+    """
+    Run every configuration under every seed on a process pool.
+
+    Runs are independent and each environment seeds its own RNGs, so every
+    run's results are identical to calling `run_experiment` serially. Runs are
+    yielded as soon as they finish, so their order is not deterministic.
+
+    Args:
+        configs: Configurations to run.
+        seeds: Seeds to run each configuration with.
+        max_workers: Worker process count (defaults to the CPU count).
+            With 1, runs execute in this process, in order.
+    """
+    seeds = list(seeds)
+    tasks = [(config, seed) for config in configs for seed in seeds]
+    if max_workers == 1:
+        for config, seed in tasks:
+            yield run_experiment(config, seed)
+        return
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(run_experiment, config, seed) for config, seed in tasks]
+        try:
+            for future in as_completed(futures):
+                yield future.result()
+        finally:
+            # Stop pending runs if the caller abandons the generator early
+            for future in futures:
+                future.cancel()
@@ -0,0 +1,116 @@
+import math
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+
+from simulation.data_models import BundleBid, Item
+from simulation.winner_determination import (
+    BranchAndBoundWinnerDetermination,
+    CompiledBids,
+    WDPSolution,
+    WinnerDeterminationSolver,
+)
+
+
+class PaymentRule(ABC):
+    """Determines the allocation and what each winner pays."""
+
+    @abstractmethod
+    def settle(
+        self,
+        bids: list[BundleBid],
+        items: list[Item],
+        solver: WinnerDeterminationSolver
+    ) -> tuple[WDPSolution, dict[int, float]]:
+        """
+        Returns:
+            The winning allocation and a mapping of winning agent_id -> payment.
+        """
+        pass
+
+
+class FirstPricePayment(PaymentRule):
+    """Every winner pays its bid."""
+
+    def settle(
+        self,
+        bids: list[BundleBid],
+        items: list[Item],
+        solver: WinnerDeterminationSolver
+    ) -> tuple[WDPSolution, dict[int, float]]:
+        solution = solver.solve(bids, items)
+        return solution, {bid.agent_id: bid.amount for bid in solution.accepted_bids}
+
+
+class VCGPayment(PaymentRule):
+    """
+    Vickrey-Clarke-Groves payments.
+
+    Winner i pays the welfare the other bidders lose because i takes part:
+    W(-i) - (W - b_i), where W is the optimal welfare, b_i is i's accepted bid
+    and W(-i) is the optimal welfare with i's bids removed.
+
+    With the branch-and-bound solver the counterfactual solves reuse the main
+    solve: the bids are compiled once, the search memo is shared (removing an
+    agent only marks its bit as occupied), and each counterfactual starts from
+    the main allocation minus i's bid, which is feasible and worth W - b_i.
+    Other solvers fall back to solving each counterfactual from scratch.
+
+    Args:
+        max_workers: If greater than 1, run the counterfactual solves in a
+            process pool of this size. Each worker starts from a copy of the
+            memo left by the main solve.
+    """
+
+    def __init__(self, max_workers: int | None = None):
+        self.max_workers = max_workers
+
+    def settle(
+        self,
+        bids: list[BundleBid],
+        items: list[Item],
+        solver: WinnerDeterminationSolver
+    ) -> tuple[WDPSolution, dict[int, float]]:
+        if not isinstance(solver, BranchAndBoundWinnerDetermination):
+            solution = solver.solve(bids, items)
+            counterfactuals = [
+                solver.solve(bids, items, excluded_agents=frozenset({bid.agent_id})).value
+                for bid in solution.accepted_bids
+            ]
+            return solution, _vcg_payments(solution, counterfactuals)
+
+        compiled = CompiledBids(bids, items)
+        solution = solver.solve_compiled(compiled)
+        tasks = [
+            (bid.agent_id, [j for j in solution.bid_indices if j != index])
+            for bid, index in zip(solution.accepted_bids, solution.bid_indices)
+        ]
+        if self.max_workers is not None and self.max_workers > 1 and len(tasks) > 1:
+            with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+                counterfactuals = list(executor.map(
+                    _counterfactual_value,
+                    [solver] * len(tasks),
+                    [compiled] * len(tasks),
+                    *zip(*tasks)
+                ))
+        else:
+            counterfactuals = [
+                _counterfactual_value(solver, compiled, agent_id, incumbent)
+                for agent_id, incumbent in tasks
+            ]
+        return solution, _vcg_payments(solution, counterfactuals)
+
+
+def _counterfactual_value(
+    solver: BranchAndBoundWinnerDetermination,
+    compiled: CompiledBids,
+    agent_id: int,
+    incumbent: list[int]
+) -> float:
+    return solver.solve_compiled(compiled, frozenset({agent_id}), incumbent=incumbent).value
+
+
+def _vcg_payments(solution: WDPSolution, counterfactuals: list[float]) -> dict[int, float]:
+    return {
+        bid.agent_id: math.fsum([welfare_without, bid.amount, -solution.value])
+        for bid, welfare_without in zip(solution.accepted_bids, counterfactuals)
+    }
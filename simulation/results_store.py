@@ -0,0 +1,256 @@
+from collections.abc import Iterator, Sequence
+
+import numpy as np
+
+from simulation.data_models import AuctionResult, BidBatch
+
+
+class AuctionResultStore(Sequence):
+    """
+    Columnar store for single-item auction results.
+
+    Every bid is one row across contiguous typed arrays (round, agent_id,
+    bid_amount, private_value, won, utility), and every round is one entry in
+    the per-round arrays. Indexing the store builds an `AuctionResult` view for
+    that round on demand, so it can be handed to agents wherever a
+    `list[AuctionResult]` history is expected.
+    """
+
+    def __init__(self, auction_id: int, capacity: int = 1024):
+        self.auction_id = auction_id
+        self._num_rounds = 0
+        self._num_rows = 0
+
+        round_capacity = max(capacity, 1)
+        self._round_numbers = np.zeros(round_capacity, dtype=np.int64)
+        self._winning_agent_ids = np.zeros(round_capacity, dtype=np.int64)
+        self._winning_bids = np.zeros(round_capacity, dtype=np.float64)
+        self._offsets = np.zeros(round_capacity + 1, dtype=np.int64)
+
+        row_capacity = max(capacity, 1)
+        self._rounds = np.zeros(row_capacity, dtype=np.int64)
+        self._agent_ids = np.zeros(row_capacity, dtype=np.int64)
+        self._bid_amounts = np.zeros(row_capacity, dtype=np.float64)
+        self._private_values = np.zeros(row_capacity, dtype=np.float64)
+        self._won = np.zeros(row_capacity, dtype=np.bool_)
+        self._utilities = np.zeros(row_capacity, dtype=np.float64)
+
+    # Columns (views over the filled part of each buffer)
+
+    @property
+    def round(self) -> np.ndarray:
+        return self._rounds[:self._num_rows]
+
+    @property
+    def agent_id(self) -> np.ndarray:
+        return self._agent_ids[:self._num_rows]
+
+    @property
+    def bid_amount(self) -> np.ndarray:
+        return self._bid_amounts[:self._num_rows]
+
+    @property
+    def private_value(self) -> np.ndarray:
+        return self._private_values[:self._num_rows]
+
+    @property
+    def won(self) -> np.ndarray:
+        return self._won[:self._num_rows]
+
+    @property
+    def utility(self) -> np.ndarray:
+        return self._utilities[:self._num_rows]
+
+    @property
+    def round_numbers(self) -> np.ndarray:
+        return self._round_numbers[:self._num_rounds]
+
+    @property
+    def winning_agent_ids(self) -> np.ndarray:
+        return self._winning_agent_ids[:self._num_rounds]
+
+    @property
+    def winning_bids(self) -> np.ndarray:
+        return self._winning_bids[:self._num_rounds]
+
+    def columns(self) -> dict[str, np.ndarray]:
+        """Per-bid columns keyed by their export name."""
+        return {
+            "round": self.round,
+            "agent_id": self.agent_id,
+            "bid_amount": self.bid_amount,
+            "private_value": self.private_value,
+            "won": self.won,
+            "utility": self.utility,
+        }
+
+    # Appending
+
+    def append(self, result: AuctionResult) -> None:
+        """Add one settled round."""
+        batch = BidBatch.from_bids(result.all_bids)
+        num_bids = len(batch)
+        agent_ids, bid_amounts = batch.agent_ids, batch.bid_amounts
+        private_values = np.fromiter(
+            (result.private_values.get(agent_id, 0.0) for agent_id in agent_ids.tolist()),
+            dtype=np.float64,
+            count=num_bids
+        )
+        self._append_rows(
+            round_numbers=np.array([result.round_number], dtype=np.int64),
+            winning_agent_ids=np.array([result.winning_agent_id], dtype=np.int64),
+            winning_bids=np.array([result.winning_bid], dtype=np.float64),
+            bids_per_round=np.array([num_bids], dtype=np.int64),
+            agent_ids=agent_ids,
+            bid_amounts=bid_amounts,
+            private_values=private_values
+        )
+
+    def append_rounds(
+        self,
+        round_numbers: np.ndarray,
+        agent_ids: np.ndarray,
+        bid_matrix: np.ndarray,
+        value_matrix: np.ndarray,
+        winner_indices: np.ndarray,
+        winning_bids: np.ndarray
+    ) -> None:
+        """
+        Add many rounds in which the same agents bid, without building any objects.
+
+        Args:
+            round_numbers: (rounds,) round number of each row.
+            agent_ids: (agents,) agent id of each column.
+            bid_matrix: (rounds, agents) bid amounts.
+            value_matrix: (rounds, agents) private values.
+            winner_indices: (rounds,) winning column, -1 if unallocated.
+            winning_bids: (rounds,) price paid in each round.
+        """
+        agent_ids = np.asarray(agent_ids, dtype=np.int64)
+        bid_matrix = np.asarray(bid_matrix, dtype=np.float64)
+        num_rounds, num_agents = bid_matrix.shape
+        winner_indices = np.asarray(winner_indices, dtype=np.int64)
+        winning_agent_ids = np.full(num_rounds, -1, dtype=np.int64)
+        allocated = winner_indices >= 0
+        winning_agent_ids[allocated] = agent_ids[winner_indices[allocated]]
+        self._append_rows(
+            round_numbers=np.asarray(round_numbers, dtype=np.int64),
+            winning_agent_ids=winning_agent_ids,
+            winning_bids=np.asarray(winning_bids, dtype=np.float64),
+            bids_per_round=np.full(num_rounds, num_agents, dtype=np.int64),
+            agent_ids=np.tile(agent_ids, num_rounds),
+            bid_amounts=bid_matrix.ravel(),
+            private_values=np.asarray(value_matrix, dtype=np.float64).ravel()
+        )
+
+    def _append_rows(
+        self,
+        round_numbers: np.ndarray,
+        winning_agent_ids: np.ndarray,
+        winning_bids: np.ndarray,
+        bids_per_round: np.ndarray,
+        agent_ids: np.ndarray,
+        bid_amounts: np.ndarray,
+        private_values: np.ndarray
+    ) -> None:
+        new_rounds = len(round_numbers)
+        new_rows = len(agent_ids)
+        self._reserve(self._num_rounds + new_rounds, self._num_rows + new_rows)
+
+        round_slice = slice(self._num_rounds, self._num_rounds + new_rounds)
+        self._round_numbers[round_slice] = round_numbers
+        self._winning_agent_ids[round_slice] = winning_agent_ids
+        self._winning_bids[round_slice] = winning_bids
+        self._offsets[self._num_rounds + 1:self._num_rounds + new_rounds + 1] = (
+            self._num_rows + np.cumsum(bids_per_round)
+        )
+
+        row_slice = slice(self._num_rows, self._num_rows + new_rows)
+        row_winners = np.repeat(winning_agent_ids, bids_per_round)
+        won = agent_ids == row_winners
+        self._rounds[row_slice] = np.repeat(round_numbers, bids_per_round)
+        self._agent_ids[row_slice] = agent_ids
+        self._bid_amounts[row_slice] = bid_amounts
+        self._private_values[row_slice] = private_values
+        self._won[row_slice] = won
+        # Winner's surplus: what the item was worth to them minus what they paid
+        self._utilities[row_slice] = np.where(won, private_values - bid_amounts, 0.0)
+
+        self._num_rounds += new_rounds
+        self._num_rows += new_rows
+
+    def _reserve(self, num_rounds: int, num_rows: int) -> None:
+        if num_rounds > len(self._round_numbers):
+            capacity = max(num_rounds, 2 * len(self._round_numbers))
+            self._round_numbers = _grow(self._round_numbers, capacity)
+            self._winning_agent_ids = _grow(self._winning_agent_ids, capacity)
+            self._winning_bids = _grow(self._winning_bids, capacity)
+            self._offsets = _grow(self._offsets, capacity + 1)
+        if num_rows > len(self._rounds):
+            capacity = max(num_rows, 2 * len(self._rounds))
+            self._rounds = _grow(self._rounds, capacity)
+            self._agent_ids = _grow(self._agent_ids, capacity)
+            self._bid_amounts = _grow(self._bid_amounts, capacity)
+            self._private_values = _grow(self._private_values, capacity)
+            self._won = _grow(self._won, capacity)
+            self._utilities = _grow(self._utilities, capacity)
+
+    # Sequence interface: lazy per-round AuctionResult views
+
+    def __len__(self) -> int:
+        return self._num_rounds
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._result_at(i) for i in range(*index.indices(self._num_rounds))]
+        index = int(index)
+        if index < 0:
+            index += self._num_rounds
+        if not 0 <= index < self._num_rounds:
+            raise IndexError("result index out of range")
+        return self._result_at(index)
+
+    def __iter__(self) -> Iterator[AuctionResult]:
+        for i in range(self._num_rounds):
+            yield self._result_at(i)
+
+    def _result_at(self, index: int) -> AuctionResult:
+        start, stop = self._offsets[index], self._offsets[index + 1]
+        # Copies, so a result does not keep a since-outgrown buffer alive
+        agent_ids = self._agent_ids[start:stop].copy()
+        private_values = self._private_values[start:stop].tolist()
+        return AuctionResult(
+            auction_id=self.auction_id,
+            winning_agent_id=int(self._winning_agent_ids[index]),
+            round_number=int(self._round_numbers[index]),
+            winning_bid=float(self._winning_bids[index]),
+            all_bids=BidBatch(agent_ids, self._bid_amounts[start:stop].copy()),
+            private_values=dict(zip(agent_ids.tolist(), private_values))
+        )
+
+    # Export
+
+    def to_dataframe(self):
+        """Return the per-bid columns as a pandas DataFrame."""
+        import pandas as pd
+        return pd.DataFrame(self.columns())
+
+    def to_arrow(self):
+        """Return the per-bid columns as a pyarrow Table."""
+        try:
+            import pyarrow as pa
+        except ImportError as exc:
+            raise ImportError("pyarrow is required for Arrow/Parquet export") from exc
+        return pa.table(self.columns())
+
+    def to_parquet(self, path: str) -> None:
+        """Write the per-bid columns to a Parquet file."""
+        table = self.to_arrow()
+        import pyarrow.parquet as pq
+        pq.write_table(table, path)
+
+
+def _grow(array: np.ndarray, capacity: int) -> np.ndarray:
+    grown = np.zeros(capacity, dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
@@ -0,0 +1,229 @@
+"""
+Streaming simulation output.
+
+`iter_simulation` on the environments yields each round's result as soon as
+it is settled. The sinks here consume such a stream incrementally, so a run
+of any length can be written out and summarised in constant memory.
+"""
+import csv
+from abc import ABC, abstractmethod
+from collections import defaultdict, deque
+from collections.abc import Iterable, Iterator, Sequence
+from itertools import islice
+
+from simulation.data_models import AuctionResult, MultiItemAuctionResult
+
+
+class HistoryWindow(Sequence):
+    """The most recent `maxlen` results (all of them if None), oldest first."""
+
+    def __init__(self, maxlen: int | None = None):
+        self._results = deque(maxlen=maxlen)
+
+    def append(self, result) -> None:
+        self._results.append(result)
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self._results))
+            return list(islice(self._results, start, stop, step)) if step > 0 else list(self._results)[index]
+        return self._results[index]
+
+    def __iter__(self) -> Iterator:
+        return iter(self._results)
+
+
+def result_rows(
+    result: AuctionResult | MultiItemAuctionResult,
+    agent_types: dict[int, str] | None = None
+) -> list[dict]:
+    """
+    One row per bid, with the same columns as `AuctionResultStore.columns()`
+    (plus `item_id` for multi-item results, and `agent_type` if given).
+    Utility is the winner's private value minus its bid.
+    """
+    rows = []
+    if isinstance(result, MultiItemAuctionResult):
+        for bid in result.all_bids:
+            won = result.allocations.get(bid.item_id) == bid.agent_id
+            private_value = result.private_values.get(bid.agent_id, {}).get(bid.item_id, 0.0)
+            rows.append(_row(
+                result.round_number, bid.agent_id, agent_types,
+                {"item_id": bid.item_id}, bid.bid_amount, private_value, won
+            ))
+        return rows
+
+    for bid in result.all_bids:
+        won = bid.agent_id == result.winning_agent_id
+        private_value = result.private_values.get(bid.agent_id, 0.0)
+        rows.append(_row(result.round_number, bid.agent_id, agent_types, {}, bid.bid_amount, private_value, won))
+    return rows
+
+
+def _row(round_number, agent_id, agent_types, extra, bid_amount, private_value, won) -> dict:
+    row = {"round": round_number, "agent_id": agent_id}
+    if agent_types is not None:
+        row["agent_type"] = agent_types.get(agent_id, "")
+    row.update(extra)
+    row["bid_amount"] = bid_amount
+    row["private_value"] = private_value
+    row["won"] = won
+    row["utility"] = private_value - bid_amount if won else 0.0
+    return row
+
+
+class ResultSink(ABC):
+    """Consumes settled results one at a time. Usable as a context manager."""
+
+    @abstractmethod
+    def write(self, result: AuctionResult | MultiItemAuctionResult) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class CSVSink(ResultSink):
+    """Appends each result's bid rows to a CSV file as it arrives."""
+
+    def __init__(self, path: str, agent_types: dict[int, str] | None = None):
+        self.agent_types = agent_types
+        self._file = open(path, "w", newline="")
+        self._writer: csv.DictWriter | None = None
+
+    def write(self, result) -> None:
+        rows = result_rows(result, self.agent_types)
+        if not rows:
+            return
+        if self._writer is None:
+            self._writer = csv.DictWriter(self._file, fieldnames=list(rows[0]))
+            self._writer.writeheader()
+        self._writer.writerows(rows)
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class ParquetSink(ResultSink):
+    """
+    Writes each result's bid rows to a Parquet file, one row group every
+    `row_group_size` rows, so only one row group is held in memory.
+    """
+
+    def __init__(self, path: str, agent_types: dict[int, str] | None = None, row_group_size: int = 65536):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError as exc:
+            raise ImportError("pyarrow is required for Arrow/Parquet export") from exc
+        self.path = path
+        self.agent_types = agent_types
+        self.row_group_size = row_group_size
+        self._columns: dict[str, list] = {}
+        self._num_buffered = 0
+        self._writer = None
+
+    def write(self, result) -> None:
+        for row in result_rows(result, self.agent_types):
+            for name, value in row.items():
+                self._columns.setdefault(name, []).append(value)
+            self._num_buffered += 1
+        if self._num_buffered >= self.row_group_size:
+            self._flush()
+
+    def _flush(self) -> None:
+        if not self._num_buffered:
+            return
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        table = pa.table(self._columns)
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(self.path, table.schema)
+        self._writer.write_table(table)
+        self._columns = {}
+        self._num_buffered = 0
+
+    def close(self) -> None:
+        self._flush()
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+class RollingMetrics(ResultSink):
+    """
+    Per-agent win counts and utility over the whole run and over the last
+    `window` rounds, plus the seller's revenue over the same window.
+    """
+
+    def __init__(self, window: int = 1000):
+        self.window = window
+        self.rounds = 0
+        self.total_wins: dict[int, int] = defaultdict(int)
+        self.total_utility: dict[int, float] = defaultdict(float)
+        self.recent_wins: dict[int, int] = defaultdict(int)
+        self.recent_utility: dict[int, float] = defaultdict(float)
+        self.recent_revenue = 0.0
+        # Per round in the window: (revenue, {agent_id: (wins, utility)})
+        self._recent: deque[tuple[float, dict[int, tuple[int, float]]]] = deque()
+
+    def write(self, result) -> None:
+        contributions: dict[int, tuple[int, float]] = {}
+        revenue = 0.0
+        for row in result_rows(result):
+            wins, utility = contributions.get(row["agent_id"], (0, 0.0))
+            if row["won"]:
+                wins += 1
+                utility += row["utility"]
+                revenue += row["bid_amount"]
+            contributions[row["agent_id"]] = (wins, utility)
+
+        self.rounds += 1
+        for agent_id, (wins, utility) in contributions.items():
+            self.total_wins[agent_id] += wins
+            self.total_utility[agent_id] += utility
+            self.recent_wins[agent_id] += wins
+            self.recent_utility[agent_id] += utility
+        self.recent_revenue += revenue
+        self._recent.append((revenue, contributions))
+
+        if len(self._recent) > self.window:
+            old_revenue, old_contributions = self._recent.popleft()
+            self.recent_revenue -= old_revenue
+            for agent_id, (wins, utility) in old_contributions.items():
+                self.recent_wins[agent_id] -= wins
+                self.recent_utility[agent_id] -= utility
+
+    def snapshot(self) -> dict:
+        """Current metrics; rates and averages are per round in the window."""
+        window_rounds = max(len(self._recent), 1)
+        return {
+            "rounds": self.rounds,
+            "window_rounds": len(self._recent),
+            "win_rate": {agent_id: wins / window_rounds for agent_id, wins in self.recent_wins.items()},
+            "average_utility": {
+                agent_id: utility / window_rounds for agent_id, utility in self.recent_utility.items()
+            },
+            "average_revenue": self.recent_revenue / window_rounds,
+            "total_wins": dict(self.total_wins),
+            "total_utility": dict(self.total_utility),
+        }
+
+
+def stream_results(results: Iterable, sinks: Iterable[ResultSink]) -> int:
+    """Write every result to every sink as it arrives. Returns the number of results."""
+    sinks = list(sinks)
+    count = 0
+    for result in results:
+        for sink in sinks:
+            sink.write(result)
+        count += 1
+    return count
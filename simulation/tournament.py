@@ -0,0 +1,400 @@
+"""
+Tournaments between agent strategies.
+
+A `Strategy` names an agent configuration (class plus constructor arguments).
+A `Matchup` is one population mix, one strategy name per bidder, played
+under one seed. Matchups come from `round_robin`, `sampled_matchups` or
+`Tournament.evolve`, which replaces the worst performers generation by
+generation.
+
+`Tournament` plays matchups and folds them into a `Leaderboard`:
+
+- Matchups are canonicalised (bidders sorted by configuration), so the same
+  mix generated twice, in any order or under another strategy name with
+  identical arguments, is only played once per seed.
+- Matchups of cheap strategies run on a process pool, matchups involving an
+  `api_bound` strategy on a separate thread pool, so slow API calls do not
+  tie up the CPU workers and their concurrency can be limited separately.
+- Each matchup streams its rounds through per-bidder totals, so only those
+  totals are kept, never the rounds themselves.
+"""
+import random
+from collections.abc import Iterable, Iterator, Sequence
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from itertools import combinations, combinations_with_replacement
+from typing import Any
+
+from simulation.auction_environment import AuctionEnvironment, MultiItemAuctionEnvironment
+from simulation.data_models import Item
+from simulation.streaming import RollingMetrics
+from simulation.value_distributions import ValueDistribution
+
+
+@dataclass
+class Strategy:
+    """
+    An agent configuration. Agents are built as
+    `agent_class(agent_id, **params)`, plus `random_seed` if `seeded` and the
+    matchup's bidder count under `population_param` if given (e.g.
+    "num_bidders" for BayesNashAgent).
+
+    It is instantiated inside the worker, so `agent_class` and `params` must
+    be picklable. Set `api_bound` for agents that call a remote model.
+    """
+    name: str
+    agent_class: type
+    params: dict[str, Any] = field(default_factory=dict)
+    seeded: bool = False
+    population_param: str | None = None
+    api_bound: bool = False
+
+    @property
+    def key(self) -> tuple:
+        """Identifies the configuration; strategies with equal keys build identical agents."""
+        agent_class = f"{self.agent_class.__module__}.{self.agent_class.__qualname__}"
+        params = tuple(sorted((name, repr(value)) for name, value in self.params.items()))
+        return agent_class, params, self.seeded, self.population_param
+
+    def build(self, agent_id: int, seed: int, num_bidders: int):
+        params = dict(self.params)
+        if self.seeded:
+            params["random_seed"] = seed + agent_id
+        if self.population_param is not None:
+            params[self.population_param] = num_bidders
+        return self.agent_class(agent_id, **params)
+
+
+@dataclass(frozen=True)
+class Matchup:
+    strategies: tuple[str, ...]  # one strategy name per bidder
+    seed: int
+
+
+@dataclass
+class MatchupResult:
+    """Per-bidder totals of one matchup; bidder i played strategies[i] as agent i."""
+    strategies: tuple[str, ...]
+    seed: int
+    num_rounds: int
+    utility: tuple[float, ...]
+    wins: tuple[int, ...]
+
+
+def round_robin(
+    names: Sequence[str],
+    group_size: int,
+    seeds: Iterable[int],
+    with_repeats: bool = False
+) -> list[Matchup]:
+    """
+    Every mix of `group_size` strategies, under every seed.
+
+    Args:
+        names: Strategy names to draw from.
+        group_size: Bidders per matchup.
+        seeds: Seeds to play each mix under.
+        with_repeats: Also include mixes where a strategy fills several seats.
+    """
+    mixes = (combinations_with_replacement if with_repeats else combinations)(sorted(names), group_size)
+    seeds = list(seeds)
+    return [Matchup(mix, seed) for mix in mixes for seed in seeds]
+
+
+def sampled_matchups(
+    names: Sequence[str],
+    group_size: int,
+    count: int,
+    seeds: Iterable[int],
+    rng: random.Random
+) -> list[Matchup]:
+    """
+    `count` random mixes of `group_size` strategies (a strategy may fill
+    several seats), each under every seed. For pools too large to play
+    every mix.
+    """
+    names = sorted(names)
+    seeds = list(seeds)
+    mixes = [tuple(sorted(rng.choices(names, k=group_size))) for _ in range(count)]
+    return [Matchup(mix, seed) for mix in mixes for seed in seeds]
+
+
+def play_matchup(
+    strategies: tuple[Strategy, ...],
+    seed: int,
+    num_rounds: int,
+    items: list[Item] | None = None,
+    value_distribution: ValueDistribution | None = None,
+    history_window: int | None = 100
+) -> tuple[tuple[float, ...], tuple[int, ...]]:
+    """
+    Play one matchup in the current process.
+
+    Returns:
+        Total utility and win count of each bidder, in seat order.
+    """
+    agents = [strategy.build(agent_id, seed, len(strategies)) for agent_id, strategy in enumerate(strategies)]
+    if items:
+        env = MultiItemAuctionEnvironment(
+            auction_id=1, items=items, agents=agents, random_seed=seed, value_distribution=value_distribution
+        )
+    else:
+        env = AuctionEnvironment(
+            auction_id=1, random_seed=seed, agents=agents, value_distribution=value_distribution
+        )
+
+    totals = RollingMetrics(window=1)
+    for result in env.iter_simulation(num_rounds, history_window=history_window):
+        totals.write(result)
+    seats = range(len(agents))
+    return (
+        tuple(totals.total_utility.get(agent_id, 0.0) for agent_id in seats),
+        tuple(totals.total_wins.get(agent_id, 0) for agent_id in seats),
+    )
+
+
+@dataclass
+class LeaderboardEntry:
+    strategy: str
+    matchups: int = 0
+    agent_rounds: int = 0
+    wins: int = 0
+    total_utility: float = 0.0
+    # Running mean and sum of squared deviations of each seat's utility per round
+    seats: int = 0
+    _seat_mean: float = 0.0
+    _seat_m2: float = 0.0
+
+    @property
+    def mean_utility(self) -> float:
+        """Utility per bidder per round."""
+        return self.total_utility / self.agent_rounds if self.agent_rounds else 0.0
+
+    @property
+    def win_rate(self) -> float:
+        """Wins per bidder per round (items won, in multi-item auctions)."""
+        return self.wins / self.agent_rounds if self.agent_rounds else 0.0
+
+    @property
+    def standard_error(self) -> float:
+        """Standard error of mean_utility across seats; 0.0 with fewer than two seats."""
+        if self.seats < 2:
+            return 0.0
+        return (self._seat_m2 / (self.seats - 1) / self.seats) ** 0.5
+
+    def _add_seat(self, utility: float, wins: int, num_rounds: int) -> None:
+        self.agent_rounds += num_rounds
+        self.wins += wins
+        self.total_utility += utility
+        self.seats += 1
+        per_round = utility / num_rounds if num_rounds else 0.0
+        delta = per_round - self._seat_mean
+        self._seat_mean += delta / self.seats
+        self._seat_m2 += delta * (per_round - self._seat_mean)
+
+
+class Leaderboard:
+    """Per-strategy totals over every matchup added, in constant memory per strategy."""
+
+    def __init__(self):
+        self._entries: dict[str, LeaderboardEntry] = {}
+
+    def add(self, result: MatchupResult) -> None:
+        for name in set(result.strategies):
+            self._entry(name).matchups += 1
+        for name, utility, wins in zip(result.strategies, result.utility, result.wins):
+            self._entry(name)._add_seat(utility, wins, result.num_rounds)
+
+    def _entry(self, name: str) -> LeaderboardEntry:
+        entry = self._entries.get(name)
+        if entry is None:
+            entry = self._entries[name] = LeaderboardEntry(name)
+        return entry
+
+    def __getitem__(self, name: str) -> LeaderboardEntry:
+        return self._entries[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def ranking(self) -> list[LeaderboardEntry]:
+        """Entries by mean utility, best first (ties by name)."""
+        return sorted(self._entries.values(), key=lambda entry: (-entry.mean_utility, entry.strategy))
+
+    def rows(self) -> list[dict]:
+        return [
+            {"rank": rank, "strategy": entry.strategy, "matchups": entry.matchups,
+             "agent_rounds": entry.agent_rounds, "mean_utility": entry.mean_utility,
+             "standard_error": entry.standard_error, "win_rate": entry.win_rate}
+            for rank, entry in enumerate(self.ranking(), start=1)
+        ]
+
+
+@dataclass
+class EvolutionResult:
+    populations: list[tuple[str, ...]]  # the population of each generation, plus the final one
+    leaderboard: Leaderboard
+
+
+class Tournament:
+    """
+    Plays matchups between the strategies of a pool.
+
+    Args:
+        strategies: The strategy pool; names must be unique.
+        num_rounds: Rounds per matchup.
+        items: If given, matchups are multi-item auctions over these items.
+        value_distribution: Private value distribution (uniform on [0, 100] by default).
+        max_workers: Process count for cheap matchups (defaults to the CPU
+            count). With 1, they run in this process, in order.
+        api_workers: Thread count for matchups with an api_bound strategy.
+        history_window: Rounds of history kept for the agents in each matchup.
+    """
+
+    def __init__(
+        self,
+        strategies: Iterable[Strategy],
+        num_rounds: int,
+        items: list[Item] | None = None,
+        value_distribution: ValueDistribution | None = None,
+        max_workers: int | None = None,
+        api_workers: int = 4,
+        history_window: int | None = 100
+    ):
+        self.strategies: dict[str, Strategy] = {}
+        for strategy in strategies:
+            if strategy.name in self.strategies:
+                raise ValueError(f"Duplicate strategy name {strategy.name!r}")
+            self.strategies[strategy.name] = strategy
+        self.num_rounds = num_rounds
+        self.items = items
+        self.value_distribution = value_distribution
+        self.max_workers = max_workers
+        self.api_workers = api_workers
+        self.history_window = history_window
+        # (configuration keys in seat order, seed) -> (utility, wins)
+        self._played: dict[tuple, tuple[tuple[float, ...], tuple[int, ...]]] = {}
+
+    def _canonical(self, matchup: Matchup) -> tuple[tuple[str, ...], tuple]:
+        """The matchup's names in seat order, and the key identifying its configuration."""
+        for name in matchup.strategies:
+            if name not in self.strategies:
+                raise KeyError(f"Unknown strategy {name!r}")
+        names = tuple(sorted(matchup.strategies, key=lambda name: (self.strategies[name].key, name)))
+        return names, (tuple(self.strategies[name].key for name in names), matchup.seed)
+
+    def iter_results(self, matchups: Iterable[Matchup]) -> Iterator[MatchupResult]:
+        """
+        Play every distinct matchup, yielding results as they finish (so not
+        in a deterministic order). A configuration listed under several
+        strategy names is played once and yielded once per name mix.
+        Matchups already played by this tournament are yielded from its
+        record without being replayed.
+        """
+        seen = set()
+        pending: dict[tuple, list[tuple[str, ...]]] = {}  # key -> distinct name mixes
+        for matchup in matchups:
+            names, key = self._canonical(matchup)
+            if (names, key) in seen:
+                continue
+            seen.add((names, key))
+            if key in self._played:
+                yield self._result(names, key)
+            else:
+                pending.setdefault(key, []).append(names)
+
+        cheap = [key for key, mixes in pending.items() if not self._api_bound(mixes[0])]
+        api_bound = [key for key, mixes in pending.items() if self._api_bound(mixes[0])]
+        process_pool = ProcessPoolExecutor(self.max_workers) if cheap and self.max_workers != 1 else None
+        thread_pool = ThreadPoolExecutor(self.api_workers) if api_bound else None
+        futures: dict[Future, tuple] = {}
+        try:
+            # Start the worker processes before any thread, as forking a threaded process is unsafe
+            if process_pool is not None:
+                for key in cheap:
+                    futures[process_pool.submit(play_matchup, *self._job(pending[key][0], key))] = key
+            for key in api_bound:
+                futures[thread_pool.submit(play_matchup, *self._job(pending[key][0], key))] = key
+            if process_pool is None:
+                for key in cheap:
+                    self._played[key] = play_matchup(*self._job(pending[key][0], key))
+                    yield from (self._result(names, key) for names in pending[key])
+            for future in as_completed(futures):
+                key = futures[future]
+                self._played[key] = future.result()
+                yield from (self._result(names, key) for names in pending[key])
+        finally:
+            # Stop pending matchups if the caller abandons the generator early
+            for future in futures:
+                future.cancel()
+            for pool in (process_pool, thread_pool):
+                if pool is not None:
+                    pool.shutdown()
+
+    def run(self, matchups: Iterable[Matchup], leaderboard: Leaderboard | None = None) -> Leaderboard:
+        """Play every distinct matchup and add it to `leaderboard` (a new one by default)."""
+        leaderboard = leaderboard if leaderboard is not None else Leaderboard()
+        for result in self.iter_results(matchups):
+            leaderboard.add(result)
+        return leaderboard
+
+    def evolve(
+        self,
+        population: Sequence[str],
+        generations: int,
+        seeds: Iterable[int],
+        replace_count: int = 1,
+        mutation_rate: float = 0.0,
+        rng: random.Random | None = None
+    ) -> EvolutionResult:
+        """
+        Evolutionary replacement: each generation the population plays one
+        matchup per seed, then the `replace_count` seats of the worst
+        strategies (by utility per round) are given to the best strategy, or,
+        with probability `mutation_rate`, to a random strategy from the pool.
+
+        Populations that recur are not replayed. The leaderboard covers every
+        distinct matchup played.
+        """
+        rng = rng if rng is not None else random.Random(0)
+        seeds = list(seeds)
+        population = tuple(sorted(population))
+        if not 0 < replace_count < len(population):
+            raise ValueError(f"replace_count must be between 1 and {len(population) - 1}, got {replace_count}")
+        populations = [population]
+        leaderboard = Leaderboard()
+        counted = set()
+        for _ in range(generations):
+            generation = Leaderboard()
+            for result in self.iter_results(Matchup(population, seed) for seed in seeds):
+                generation.add(result)
+                key = self._canonical(Matchup(result.strategies, result.seed))[1]
+                if key not in counted:
+                    counted.add(key)
+                    leaderboard.add(result)
+
+            ranking = generation.ranking()
+            seats = sorted(population, key=lambda name: (generation[name].mean_utility, name))
+            survivors = seats[replace_count:]
+            newcomers = [
+                rng.choice(sorted(self.strategies)) if rng.random() < mutation_rate else ranking[0].strategy
+                for _ in range(replace_count)
+            ]
+            population = tuple(sorted(survivors + newcomers))
+            populations.append(population)
+        return EvolutionResult(populations=populations, leaderboard=leaderboard)
+
+    def _api_bound(self, names: tuple[str, ...]) -> bool:
+        return any(self.strategies[name].api_bound for name in names)
+
+    def _job(self, names: tuple[str, ...], key: tuple) -> tuple:
+        """play_matchup's arguments; only these are sent to a worker process."""
+        strategies = tuple(self.strategies[name] for name in names)
+        return strategies, key[1], self.num_rounds, self.items, self.value_distribution, self.history_window
+
+    def _result(self, names: tuple[str, ...], key: tuple) -> MatchupResult:
+        utility, wins = self._played[key]
+        return MatchupResult(strategies=names, seed=key[1], num_rounds=self.num_rounds, utility=utility, wins=wins)
@@ -1,6 +1,44 @@
 from abc import ABC, abstractmethod
 from itertools import combinations
 
+import numpy as np
+
+# Largest item count compile() accepts: a 2^20 float64 table is 8 MB
+MAX_COMPILED_ITEMS = 20
+
+
+class CompiledValuation:
+    """
+    Dense table of bundle values for a fixed list of items.
+
+    Bundles are integer bitmasks where bit k stands for `item_ids[k]`, and
+    `table[..., mask]` is the value of that bundle. Leading dimensions of the
+    table, if any, come from batched base values (e.g. rounds x agents).
+    """
+
+    def __init__(self, item_ids: list[int], table: np.ndarray):
+        self.item_ids = list(item_ids)
+        self.table = table
+        self._bits = {item_id: 1 << k for k, item_id in enumerate(self.item_ids)}
+
+    def mask_of(self, bundle: frozenset[int]) -> int:
+        mask = 0
+        for item_id in bundle:
+            mask |= self._bits[item_id]
+        return mask
+
+    def bundle_of(self, mask: int) -> frozenset[int]:
+        return frozenset(item_id for k, item_id in enumerate(self.item_ids) if mask >> k & 1)
+
+    def value(self, bundle: frozenset[int] | int):
+        """Value of one bundle, given as item ids or as a mask."""
+        mask = bundle if isinstance(bundle, (int, np.integer)) else self.mask_of(bundle)
+        return self.table[..., mask]
+
+    def values(self, masks: np.ndarray) -> np.ndarray:
+        """Values of an array of bundle masks."""
+        return np.take(self.table, np.asarray(masks, dtype=np.int64), axis=-1)
+
 
 class ValuationModel(ABC):
     """Abstract base class for computing bundle valuations."""
@@ -21,6 +59,66 @@ class ValuationModel(ABC):
         """
         pass
 
+    def compile(self, item_ids: list[int], base_values) -> CompiledValuation:
+        """
+        Precompute the value of every bundle of `item_ids`.
+
+        Args:
+            item_ids: Items to enumerate bundles over (at most MAX_COMPILED_ITEMS).
+            base_values: Either a mapping of item_id -> base value, or an array
+                of shape (..., len(item_ids)) of base values in `item_ids` order,
+                which compiles one table per leading index.
+
+        Returns:
+            A CompiledValuation whose table has shape (..., 2 ** len(item_ids)).
+        """
+        if len(item_ids) > MAX_COMPILED_ITEMS:
+            raise ValueError(
+                f"Cannot compile {len(item_ids)} items, the limit is {MAX_COMPILED_ITEMS}"
+            )
+        if isinstance(base_values, dict):
+            base_values = [base_values.get(item_id, 0.0) for item_id in item_ids]
+        values = np.asarray(base_values, dtype=np.float64)
+        if values.shape[-1:] != (len(item_ids),):
+            raise ValueError(
+                f"Expected base values with last dimension {len(item_ids)}, got shape {values.shape}"
+            )
+        return CompiledValuation(item_ids, self._bundle_value_table(list(item_ids), values))
+
+    def _bundle_value_table(self, item_ids: list[int], values: np.ndarray) -> np.ndarray:
+        """Table of shape (..., 2^n). Generic version: one get_bundle_value call per bundle."""
+        num_bundles = 1 << len(item_ids)
+        flat_values = values.reshape(-1, len(item_ids))
+        table = np.empty((len(flat_values), num_bundles), dtype=np.float64)
+        bundles = [
+            frozenset(item_id for k, item_id in enumerate(item_ids) if mask >> k & 1)
+            for mask in range(num_bundles)
+        ]
+        for row, row_values in enumerate(flat_values.tolist()):
+            base_values = dict(zip(item_ids, row_values))
+            for mask, bundle in enumerate(bundles):
+                table[row, mask] = self.get_bundle_value(bundle, base_values)
+        return table.reshape(values.shape[:-1] + (num_bundles,))
+
+
+def _additive_table(values: np.ndarray) -> np.ndarray:
+    """Sum of base values over each bundle, built by doubling: O(2^n) per table."""
+    num_items = values.shape[-1]
+    table = np.zeros(values.shape[:-1] + (1 << num_items,), dtype=np.float64)
+    for k in range(num_items):
+        size = 1 << k
+        table[..., size:2 * size] = table[..., :size] + values[..., k:k + 1]
+    return table
+
+
+def _pair_view(table: np.ndarray, num_items: int, i: int, j: int) -> np.ndarray:
+    """Strided view of every entry of `table` whose bundle contains items bits i and j."""
+    low, high = min(i, j), max(i, j)
+    shaped = table.reshape(
+        table.shape[:-1] + (1 << (num_items - high - 1), 2, 1 << (high - low - 1), 2, 1 << low)
+    )
+    return shaped[..., 1, :, 1, :]
+
 
 class AdditiveValuation(ValuationModel):
     def get_bundle_value(
@@ -28,6 +126,9 @@ class AdditiveValuation(ValuationModel):
     ) -> float:
         return sum(base_values.get(item_id, 0.0) for item_id in bundle)
 
+    def _bundle_value_table(self, item_ids: list[int], values: np.ndarray) -> np.ndarray:
+        return _additive_table(values)
+
 
 class SynergyValuation(ValuationModel):
     """
@@ -65,6 +166,16 @@ class SynergyValuation(ValuationModel):
 
         return total
 
+    def _bundle_value_table(self, item_ids: list[int], values: np.ndarray) -> np.ndarray:
+        table = _additive_table(values)
+        position = {item_id: k for k, item_id in enumerate(item_ids)}
+        for pair, bonus in self.synergies.items():
+            # Pairs involving items outside item_ids can never be in a bundle
+            if all(item_id in position for item_id in pair):
+                i, j = (position[item_id] for item_id in pair)
+                _pair_view(table, len(item_ids), i, j)[...] += bonus
+        return table
+
 
 class SubstitutesValuation(ValuationModel):
     """
@@ -105,3 +216,23 @@ class SubstitutesValuation(ValuationModel):
                 total += base_values.get(item_id, 0.0)
 
         return total
+
+    def _bundle_value_table(self, item_ids: list[int], values: np.ndarray) -> np.ndarray:
+        grouped = set().union(*self.substitute_groups) if self.substitute_groups else set()
+        ungrouped = [k for k, item_id in enumerate(item_ids) if item_id not in grouped]
+        ungrouped_values = np.zeros_like(values)
+        ungrouped_values[..., ungrouped] = values[..., ungrouped]
+        table = _additive_table(ungrouped_values)
+
+        for group in self.substitute_groups:
+            # Max base value over the group's items in each bundle, by doubling;
+            # bundles without any of them contribute nothing
+            best = np.full(table.shape, -np.inf)
+            for k, item_id in enumerate(item_ids):
+                size = 1 << k
+                if item_id in group:
+                    best[..., size:2 * size] = np.maximum(best[..., :size], values[..., k:k + 1])
+                else:
+                    best[..., size:2 * size] = best[..., :size]
+            table += np.where(np.isneginf(best), 0.0, best)
+        return table
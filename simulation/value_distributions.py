@@ -0,0 +1,219 @@
+import random
+from abc import ABC, abstractmethod
+from collections.abc import Iterator, Mapping
+from contextlib import contextmanager
+
+import numpy as np
+
+from simulation.checkpoint import pack_rng_state, unpack_rng_state
+
+
+@contextmanager
+def numpy_generator(rng: random.Random) -> Iterator[np.random.Generator]:
+    """
+    Draw from a `random.Random` through a NumPy Generator.
+
+    Both use MT19937, so the Generator is started from `rng`'s exact state and
+    the advanced state is written back on exit. `rng.uniform(a, b)` called n
+    times and `a + (b - a) * generator.random(n)` give identical values and
+    leave `rng` in the same state.
+    """
+    version, internal_state, gauss_next = rng.getstate()
+    bit_generator = np.random.MT19937()
+    bit_generator.state = {
+        "bit_generator": "MT19937",
+        "state": {"key": np.array(internal_state[:-1], dtype=np.uint32), "pos": internal_state[-1]},
+    }
+    yield np.random.Generator(bit_generator)
+    state = bit_generator.state["state"]
+    rng.setstate((version, tuple(state["key"].tolist()) + (int(state["pos"]),), gauss_next))
+
+
+class ValueDistribution(ABC):
+    """Distribution of agents' private values."""
+
+    @abstractmethod
+    def sample(
+        self, generator: np.random.Generator, num_rounds: int, num_agents: int, num_items: int
+    ) -> np.ndarray:
+        """
+        Returns:
+            Array of shape (num_rounds, num_agents, num_items) of private values.
+        """
+        pass
+
+
+class UniformValues(ValueDistribution):
+    """
+    Independent U(low, high) values.
+
+    Draws in (round, agent, item) order, so with the default bounds it
+    reproduces the values of one `value_rng.uniform(0, 100)` call per agent
+    (per item) per round.
+    """
+
+    def __init__(self, low: float = 0.0, high: float = 100.0):
+        self.low = low
+        self.high = high
+
+    def sample(self, generator, num_rounds, num_agents, num_items):
+        # low + (high - low) * u, computed in place
+        values = generator.random((num_rounds, num_agents, num_items))
+        values *= self.high - self.low
+        values += self.low
+        return values
+
+
+class LogNormalValues(ValueDistribution):
+    """Independent log-normal values: exp of N(mean, sigma^2)."""
+
+    def __init__(self, mean: float = 3.5, sigma: float = 0.5):
+        self.mean = mean
+        self.sigma = sigma
+
+    def sample(self, generator, num_rounds, num_agents, num_items):
+        return generator.lognormal(self.mean, self.sigma, (num_rounds, num_agents, num_items))
+
+
+class AffiliatedValues(ValueDistribution):
+    """
+    Affiliated values on [low, high]: each value mixes a component common to
+    all agents for that item and round with a private one,
+    v = low + (high - low) * (weight * common + (1 - weight) * private),
+    both uniform on [0, 1]. weight=0 gives independent values, weight=1
+    identical ones.
+    """
+
+    def __init__(self, low: float = 0.0, high: float = 100.0, weight: float = 0.5):
+        if not 0.0 <= weight <= 1.0:
+            raise ValueError(f"weight must be in [0, 1], got {weight}")
+        self.low = low
+        self.high = high
+        self.weight = weight
+
+    def sample(self, generator, num_rounds, num_agents, num_items):
+        common = generator.random((num_rounds, 1, num_items))
+        private = generator.random((num_rounds, num_agents, num_items))
+        mixed = self.weight * common + (1.0 - self.weight) * private
+        return self.low + (self.high - self.low) * mixed
+
+
+class CommonValuePlusNoise(ValueDistribution):
+    """
+    Common-value model: each item has one true value per round, U(low, high),
+    and every agent observes it plus independent N(0, noise_std^2) noise,
+    floored at zero.
+    """
+
+    def __init__(self, low: float = 0.0, high: float = 100.0, noise_std: float = 10.0):
+        self.low = low
+        self.high = high
+        self.noise_std = noise_std
+
+    def sample(self, generator, num_rounds, num_agents, num_items):
+        common = generator.uniform(self.low, self.high, (num_rounds, 1, num_items))
+        noise = generator.normal(0.0, self.noise_std, (num_rounds, num_agents, num_items))
+        return np.maximum(common + noise, 0.0)
+
+
+class ValueSampler:
+    """
+    Hands out per-round value matrices, drawing them from `rng` in blocks.
+
+    Each block is a single `distribution.sample` call covering up to
+    `block_rounds` rounds. `reserve` lets a caller that knows how many rounds
+    remain size the next block exactly, so nothing is drawn beyond the run.
+    """
+
+    def __init__(self, distribution: ValueDistribution, rng: random.Random, block_rounds: int = 1024):
+        self.distribution = distribution
+        self.rng = rng
+        self.block_rounds = block_rounds
+        self._block = np.empty((0, 0, 0))
+        self._block_rng_state = None  # rng state the current block was drawn from
+        self._cursor = 0
+        self._expected_rounds = 0
+
+    def reserve(self, num_rounds: int) -> None:
+        """Announce that `num_rounds` more rounds are about to be requested."""
+        self._expected_rounds = num_rounds
+
+    def next_rounds(self, num_rounds: int, num_agents: int, num_items: int) -> np.ndarray:
+        """Values for the next `num_rounds` rounds, shape (num_rounds, num_agents, num_items)."""
+        if self._block.shape[1:] != (num_agents, num_items):
+            # The population changed; values drawn for the old one are dropped
+            self._block = np.empty((0, num_agents, num_items))
+            self._cursor = 0
+
+        parts = []
+        while num_rounds > 0:
+            if self._cursor == len(self._block):
+                block_rounds = min(max(self._expected_rounds, num_rounds), self.block_rounds)
+                self._draw_block(block_rounds, num_agents, num_items)
+            taken = min(num_rounds, len(self._block) - self._cursor)
+            parts.append(self._block[self._cursor:self._cursor + taken])
+            self._cursor += taken
+            self._expected_rounds = max(self._expected_rounds - taken, 0)
+            num_rounds -= taken
+        return parts[0] if len(parts) == 1 else np.concatenate(parts)
+
+    def next_round(self, num_agents: int, num_items: int) -> np.ndarray:
+        """Values for the next round, shape (num_agents, num_items)."""
+        return self.next_rounds(1, num_agents, num_items)[0]
+
+    def _draw_block(self, block_rounds: int, num_agents: int, num_items: int) -> None:
+        self._block_rng_state = self.rng.getstate()
+        with numpy_generator(self.rng) as generator:
+            self._block = self.distribution.sample(generator, block_rounds, num_agents, num_items)
+        self._cursor = 0
+
+    def get_state(self) -> dict:
+        """
+        Compact snapshot of the sampler and its rng. The buffered block is not
+        stored; set_state redraws it from the rng state it was drawn from.
+        """
+        drawn = len(self._block) > 0
+        return {
+            "rng": pack_rng_state(self._block_rng_state if drawn else self.rng.getstate()),
+            "block_shape": self._block.shape,
+            "cursor": self._cursor,
+            "expected_rounds": self._expected_rounds,
+        }
+
+    def set_state(self, state: dict) -> None:
+        self.rng.setstate(unpack_rng_state(state["rng"]))
+        block_rounds, num_agents, num_items = state["block_shape"]
+        if block_rounds:
+            self._draw_block(block_rounds, num_agents, num_items)
+        else:
+            self._block = np.empty(state["block_shape"])
+            self._block_rng_state = None
+        self._cursor = state["cursor"]
+        self._expected_rounds = state["expected_rounds"]
+
+
+class ItemValues(Mapping):
+    """
+    Read-only item_id -> value mapping over one agent's row of a value array.
+
+    Used in place of a per-agent dict; `item_index` is shared by all views of
+    an environment.
+    """
+
+    __slots__ = ("_item_index", "_values")
+
+    def __init__(self, item_index: dict[int, int], values: np.ndarray):
+        self._item_index = item_index
+        self._values = values
+
+    def __getitem__(self, item_id: int) -> float:
+        return float(self._values[self._item_index[item_id]])
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._item_index)
+
+    def __len__(self) -> int:
+        return len(self._item_index)
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
@@ -0,0 +1,306 @@
+"""
+Winner determination for combinatorial auctions with XOR bundle bids.
+
+Bids are compiled to integer bitmasks: bit k stands for the k-th item and
+bit (num_items + j) for the j-th bidding agent. Adding the agent bit to every
+bid of that agent turns the XOR constraint (win at most one bundle) into an
+ordinary item conflict, so two bids are compatible iff their masks are disjoint.
+It also means "solve without agent i" is just a search that starts with
+agent i's bit occupied, so searches over the same compiled bids can share
+their cached sub-results.
+"""
+import math
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+
+from simulation.data_models import BundleBid, Item
+
+
+@dataclass
+class WDPSolution:
+    accepted_bids: list[BundleBid]
+    value: float  # total amount of the accepted bids
+    optimal: bool  # proven optimal (False if the time budget ran out)
+    bid_indices: list[int] = field(default_factory=list)  # positions in CompiledBids.bids
+
+
+class CompiledBids:
+    """
+    Bitmask form of one round's bids.
+
+    `memo` caches search results per occupied mask, as (completion value,
+    completion bid indices) when exact or (upper bound, None) otherwise. It is
+    filled by BranchAndBoundWinnerDetermination and reused by later solves over
+    the same compiled bids, up to `max_memo_entries` entries.
+    """
+
+    def __init__(self, bids: list[BundleBid], items: list[Item], max_memo_entries: int = 200_000):
+        item_index = {item.item_id: k for k, item in enumerate(items)}
+        self.agent_bits: dict[int, int] = {}
+        self.num_items = len(items)
+        self.item_mask = (1 << self.num_items) - 1
+        self.bids: list[BundleBid] = []
+        self.masks: list[int] = []
+        self.amounts: list[float] = []
+        self.sizes: list[int] = []
+
+        for bid in bids:
+            if not bid.bundle:
+                raise ValueError(f"Bundle bid from agent {bid.agent_id} has an empty bundle")
+            unknown = [item_id for item_id in bid.bundle if item_id not in item_index]
+            if unknown:
+                raise ValueError(f"Bundle bid from agent {bid.agent_id} contains unknown items {unknown}")
+            if bid.amount <= 0:
+                continue
+            if bid.agent_id not in self.agent_bits:
+                self.agent_bits[bid.agent_id] = 1 << (self.num_items + len(self.agent_bits))
+            mask = self.agent_bits[bid.agent_id]
+            for item_id in bid.bundle:
+                mask |= 1 << item_index[item_id]
+            self.bids.append(bid)
+            self.masks.append(mask)
+            self.amounts.append(bid.amount)
+            self.sizes.append(len(bid.bundle))
+
+        # Per item: bids containing it, best amount first (branching order) and
+        # best amount-per-item first (upper bound)
+        self.bids_by_amount: list[list[tuple[float, int, int]]] = [[] for _ in range(self.num_items)]
+        self.bids_by_share: list[list[tuple[float, int]]] = [[] for _ in range(self.num_items)]
+        for index, (mask, amount, size) in enumerate(zip(self.masks, self.amounts, self.sizes)):
+            for k in range(self.num_items):
+                if mask >> k & 1:
+                    self.bids_by_amount[k].append((amount, mask, index))
+                    self.bids_by_share[k].append((amount / size, mask))
+        for k in range(self.num_items):
+            self.bids_by_amount[k].sort(key=lambda entry: (-entry[0], entry[2]))
+            self.bids_by_share[k].sort(key=lambda entry: -entry[0])
+
+        self.memo: dict[int, tuple[float, tuple[int, ...] | None]] = {}
+        self.max_memo_entries = max_memo_entries
+
+    def value_of(self, indices) -> float:
+        # fsum is exactly rounded, so equal allocations always get equal values
+        return math.fsum(self.amounts[i] for i in indices)
+
+    def solution(self, indices, optimal: bool) -> WDPSolution:
+        indices = sorted(indices)
+        return WDPSolution(
+            accepted_bids=[self.bids[i] for i in indices],
+            value=self.value_of(indices),
+            optimal=optimal,
+            bid_indices=indices
+        )
+
+    def agents_mask(self, agent_ids) -> int:
+        """Mask that blocks every bid of the given agents."""
+        mask = 0
+        for agent_id in agent_ids:
+            mask |= self.agent_bits.get(agent_id, 0)
+        return mask
+
+    def greedy(self, occupied: int = 0) -> tuple[list[int], float]:
+        """Accept bids by amount / sqrt(size) while they stay compatible."""
+        order = sorted(
+            range(len(self.bids)),
+            key=lambda i: (-self.amounts[i] / math.sqrt(self.sizes[i]), i)
+        )
+        accepted = []
+        value = 0.0
+        for i in order:
+            if not self.masks[i] & occupied:
+                occupied |= self.masks[i]
+                accepted.append(i)
+                value += self.amounts[i]
+        return accepted, value
+
+    def upper_bound(self, occupied: int) -> float:
+        """
+        Sum over free items of the best amount-per-item among bids still
+        compatible with `occupied`. Every completion spreads each accepted bid's
+        amount over its items, so none can exceed this.
+        """
+        total = 0.0
+        free = ~occupied & self.item_mask
+        while free:
+            low = free & -free
+            for share, mask in self.bids_by_share[low.bit_length() - 1]:
+                if not mask & occupied:
+                    total += share
+                    break
+            free ^= low
+        return total
+
+
+class WinnerDeterminationSolver(ABC):
+    """Chooses the value-maximizing set of compatible bundle bids."""
+
+    @abstractmethod
+    def solve(
+        self,
+        bids: list[BundleBid],
+        items: list[Item],
+        excluded_agents: frozenset[int] = frozenset()
+    ) -> WDPSolution:
+        """
+        Args:
+            bids: XOR bundle bids; each agent wins at most one of its bids.
+            items: Items on sale. Every bundle must be a subset of their ids.
+            excluded_agents: Agents whose bids are ignored.
+
+        Returns:
+            The accepted bids and their total amount.
+        """
+        pass
+
+
+class GreedyWinnerDetermination(WinnerDeterminationSolver):
+    """Fast approximate solver: accept bids in order of amount / sqrt(bundle size)."""
+
+    def solve(
+        self,
+        bids: list[BundleBid],
+        items: list[Item],
+        excluded_agents: frozenset[int] = frozenset()
+    ) -> WDPSolution:
+        compiled = CompiledBids(bids, items)
+        accepted, _ = compiled.greedy(compiled.agents_mask(excluded_agents))
+        return compiled.solution(accepted, optimal=False)
+
+
+class _OutOfTime(Exception):
+    pass
+
+
+class BranchAndBoundWinnerDetermination(WinnerDeterminationSolver):
+    """
+    Exact solver: depth-first branch-and-bound over items.
+
+    Each node branches on the lowest free item, trying every compatible bid
+    containing it (highest amount first) and finally leaving it unallocated.
+    Nodes whose value plus `CompiledBids.upper_bound` cannot beat the incumbent
+    are pruned. The greedy solution seeds the incumbent, and if `time_budget`
+    seconds pass first the best allocation found so far is returned with
+    `optimal=False`.
+    """
+
+    def __init__(self, time_budget: float | None = None):
+        self.time_budget = time_budget
+        self.nodes_explored = 0
+
+    def solve(
+        self,
+        bids: list[BundleBid],
+        items: list[Item],
+        excluded_agents: frozenset[int] = frozenset()
+    ) -> WDPSolution:
+        return self.solve_compiled(CompiledBids(bids, items), excluded_agents)
+
+    def solve_compiled(
+        self,
+        compiled: CompiledBids,
+        excluded_agents: frozenset[int] = frozenset(),
+        incumbent: list[int] | None = None
+    ) -> WDPSolution:
+        """
+        Solve over already compiled bids, reusing and extending `compiled.memo`.
+
+        Args:
+            compiled: Bids compiled by CompiledBids.
+            excluded_agents: Agents whose bids are ignored.
+            incumbent: Indices of a known feasible allocation (not using any
+                excluded agent) to start from if it beats the greedy one.
+        """
+        occupied = compiled.agents_mask(excluded_agents)
+        start, _ = compiled.greedy(occupied)
+        if incumbent is not None and compiled.value_of(incumbent) > compiled.value_of(start):
+            start = list(incumbent)
+        indices, optimal = self._search(compiled, occupied, start)
+        return compiled.solution(indices, optimal)
+
+    def _search(self, compiled: CompiledBids, occupied: int, incumbent: list[int]) -> tuple[list[int], bool]:
+        best_indices = incumbent
+        best_value = compiled.value_of(incumbent)
+        deadline = None if self.time_budget is None else time.perf_counter() + self.time_budget
+        bids_by_amount = compiled.bids_by_amount
+        upper_bound = compiled.upper_bound
+        item_mask = compiled.item_mask
+        memo = compiled.memo
+        max_memo_entries = compiled.max_memo_entries
+        path: list[int] = []
+        nodes = 0
+
+        def search(occupied: int, alpha: float, path_value: float) -> tuple[float, tuple[int, ...] | None]:
+            """
+            Best completion from `occupied`. Returns (value, bid indices) if it
+            beats `alpha`, otherwise (upper bound <= alpha, None); exact memo
+            hits may also be returned below `alpha`.
+            """
+            nonlocal best_indices, best_value, nodes
+            nodes += 1
+            if deadline is not None and nodes & 1023 == 0 and time.perf_counter() > deadline:
+                raise _OutOfTime
+
+            entry = memo.get(occupied)
+            if entry is not None and (entry[1] is not None or entry[0] <= alpha):
+                result = entry
+            else:
+                bound = upper_bound(occupied)
+                if bound <= alpha:
+                    return bound, None
+                result = expand(occupied, alpha, path_value)
+                if len(memo) < max_memo_entries:
+                    memo[occupied] = result
+
+            value, completion = result
+            if completion is not None and path_value + value > best_value:
+                best_value = path_value + value
+                best_indices = path + list(completion)
+            return result
+
+        def expand(occupied: int, alpha: float, path_value: float) -> tuple[float, tuple[int, ...] | None]:
+            # Branch on the lowest free item that some compatible bid still covers
+            free = ~occupied & item_mask
+            while free:
+                low = free & -free
+                k = low.bit_length() - 1
+                candidates = [entry for entry in bids_by_amount[k] if not entry[1] & occupied]
+                if candidates:
+                    break
+                occupied |= low
+                free ^= low
+            else:
+                return 0.0, ()
+
+            best_here = alpha
+            completion_here = None
+            fail_bound = 0.0
+            for amount, mask, index in candidates:
+                path.append(index)
+                child_value, child_completion = search(occupied | mask, best_here - amount, path_value + amount)
+                path.pop()
+                if child_completion is not None and child_value + amount > best_here:
+                    best_here = child_value + amount
+                    completion_here = (index,) + child_completion
+                else:
+                    fail_bound = max(fail_bound, child_value + amount)
+
+            # Leave the item unallocated
+            child_value, child_completion = search(occupied | low, best_here, path_value)
+            if child_completion is not None and child_value > best_here:
+                best_here = child_value
+                completion_here = child_completion
+            else:
+                fail_bound = max(fail_bound, child_value)
+
+            if completion_here is not None:
+                return best_here, completion_here
+            return fail_bound, None
+
+        optimal = True
+        try:
+            search(occupied, best_value, 0.0)
+        except _OutOfTime:
+            optimal = False
+        self.nodes_explored = nodes
+        return best_indices, optimal
@@ -0,0 +1,179 @@
+"""Minimal local stand-in for the Anthropic Messages API, used by tests."""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def message_response(text: str, input_tokens: int = 10, output_tokens: int = 5) -> dict:
+    return {
+        "id": "msg_test",
+        "type": "message",
+        "role": "assistant",
+        "model": "test-model",
+        "content": [{"type": "text", "text": text}],
+        "stop_reason": "end_turn",
+        "stop_sequence": None,
+        "usage": {"input_tokens": input_tokens, "output_tokens": output_tokens},
+    }
+
+
+class FakeModelServer:
+    """
+    Serves POST /v1/messages from a background thread.
+
+    `reply` maps the decoded request body to the text of the assistant
+    message; `delay` seconds are slept before every response.
+    """
+
+    def __init__(self, reply=lambda request: "BID: 10", delay: float = 0.0):
+        self.reply = reply
+        self.delay = delay
+        self.requests: list[dict] = []
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._make_handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def handle(self, handler: BaseHTTPRequestHandler) -> tuple[int, dict, dict]:
+        """Return (status, headers, body) for a request. Override for other endpoints."""
+        length = int(handler.headers.get("Content-Length", 0))
+        request = json.loads(handler.rfile.read(length) or b"{}")
+        with self._lock:
+            self.requests.append(request)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(self.delay)
+            return 200, {}, message_response(self.reply(request))
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _respond(self):
+                status, headers, body = server.handle(self)
+                payload = body if isinstance(body, bytes) else json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", headers.pop("Content-Type", "application/json"))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            do_POST = _respond
+            do_GET = _respond
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+class FakeBatchServer(FakeModelServer):
+    """
+    Adds the Message Batches endpoints. A batch reports "in_progress" for
+    `polls_before_ended` status checks, then "ended" with every request succeeded.
+    """
+
+    def __init__(self, reply=lambda request: "BID: 10", polls_before_ended: int = 1):
+        super().__init__(reply=reply)
+        self.polls_before_ended = polls_before_ended
+        self.batches: dict[str, dict] = {}
+
+    def handle(self, handler: BaseHTTPRequestHandler) -> tuple[int, dict, dict]:
+        path = handler.path.split("?")[0].rstrip("/")
+        if not path.startswith("/v1/messages/batches"):
+            return super().handle(handler)
+
+        if handler.command == "POST":
+            length = int(handler.headers.get("Content-Length", 0))
+            body = json.loads(handler.rfile.read(length))
+            with self._lock:
+                batch_id = f"msgbatch_{len(self.batches)}"
+                self.batches[batch_id] = {"requests": body["requests"], "polls": 0}
+            return 200, {}, self._batch_json(batch_id)
+
+        parts = path.split("/")
+        batch_id = parts[4]
+        if parts[-1] == "results":
+            lines = []
+            for request in self.batches[batch_id]["requests"]:
+                self.requests.append(request["params"])
+                message = message_response(self.reply(request["params"]))
+                lines.append(json.dumps({
+                    "custom_id": request["custom_id"],
+                    "result": {"type": "succeeded", "message": message},
+                }))
+            return 200, {"Content-Type": "application/binary"}, "\n".join(lines).encode()
+
+        self.batches[batch_id]["polls"] += 1
+        return 200, {}, self._batch_json(batch_id)
+
+    def _batch_json(self, batch_id: str) -> dict:
+        batch = self.batches[batch_id]
+        ended = batch["polls"] >= self.polls_before_ended
+        num_requests = len(batch["requests"])
+        return {
+            "id": batch_id,
+            "type": "message_batch",
+            "processing_status": "ended" if ended else "in_progress",
+            "request_counts": {
+                "processing": 0 if ended else num_requests,
+                "succeeded": num_requests if ended else 0,
+                "errored": 0,
+                "canceled": 0,
+                "expired": 0,
+            },
+            "created_at": "2026-01-01T00:00:00Z",
+            "expires_at": "2026-01-02T00:00:00Z",
+            "ended_at": "2026-01-01T00:01:00Z" if ended else None,
+            "archived_at": None,
+            "cancel_initiated_at": None,
+            "results_url": f"{self.base_url}/v1/messages/batches/{batch_id}/results" if ended else None,
+        }
+
+
+class FakeThrottlingServer(FakeModelServer):
+    """
+    Answers the first `throttled_requests` messages with `status` (429 by
+    default) and a `retry_after` header, then serves normally.
+    """
+
+    def __init__(self, reply=lambda request: "BID: 10", throttled_requests: int = 1,
+                 status: int = 429, retry_after: float | None = 0.01):
+        super().__init__(reply=reply)
+        self.throttled_requests = throttled_requests
+        self.status = status
+        self.retry_after = retry_after
+        self.throttled = 0
+
+    def handle(self, handler: BaseHTTPRequestHandler) -> tuple[int, dict, dict]:
+        with self._lock:
+            throttle = self.throttled < self.throttled_requests
+            if throttle:
+                self.throttled += 1
+        if not throttle:
+            return super().handle(handler)
+        handler.rfile.read(int(handler.headers.get("Content-Length", 0)))
+        headers = {} if self.retry_after is None else {"retry-after": str(self.retry_after)}
+        error_type = "rate_limit_error" if self.status == 429 else "api_error"
+        return self.status, headers, {"type": "error", "error": {"type": error_type, "message": "Slow down"}}
@@ -1,6 +1,12 @@
+import copy
+
 from simulation.data_models import Bid, AuctionResult, AuctionState
 
+from simulation.data_models import Item, MultiItemAuctionState
 from agents.random_agent import RandomAgent
+from agents.shading_agent import ShadingAgent, BayesNashAgent
+from agents.pacing_agent import PacingAgent, MultiplicativePacingAgent, ThrottlingAgent
+import numpy as np
 import unittest
 
 class TestRandomAgent(unittest.TestCase):
@@ -23,4 +29,150 @@ class TestRandomAgent(unittest.TestCase):
     def test_bid_contains_correct_metadata(self):
         bid = self.agent.get_bid(self.auction_state, [])
         self.assertEqual(bid.agent_id, self.agent.agent_id)
-        
\ No newline at end of file
+
+    def test_bid_batch_matches_per_round_bids(self):
+        values = np.array([[10.0], [55.5], [0.0], [99.0]])
+        batch = RandomAgent(agent_id=1, random_seed=7).bid_batch(values)
+        agent = RandomAgent(agent_id=1, random_seed=7)
+        per_round = [
+            agent.get_bid(AuctionState(agent_id=1, private_value=value, round_number=1), []).bid_amount
+            for value in values[:, 0]
+        ]
+        self.assertEqual(batch[:, 0].tolist(), per_round)
+
+    def test_forks_draw_independent_streams(self):
+        agent = RandomAgent(agent_id=1, random_seed=7)
+        state = agent.rng.getstate()
+        values = np.full((5, 1), 100.0)
+        first, second = agent.fork(0).bid_batch(values), agent.fork(1).bid_batch(values)
+        self.assertFalse(np.array_equal(first, second))
+        np.testing.assert_array_equal(agent.fork(0).bid_batch(values), first)
+        self.assertEqual(agent.rng.getstate(), state)
+
+
+class TestShadingAgents(unittest.TestCase):
+    def test_fixed_shading(self):
+        agent = ShadingAgent(agent_id=2, shading_factor=0.75)
+        state = AuctionState(agent_id=2, private_value=80.0, round_number=1)
+        self.assertEqual(agent.get_bid(state, []).bid_amount, 60.0)
+        np.testing.assert_array_equal(agent.bid_batch(np.array([[80.0, 40.0]])), [[60.0, 30.0]])
+        with self.assertRaises(ValueError):
+            ShadingAgent(agent_id=2, shading_factor=1.5)
+
+    def test_bayes_nash_bids(self):
+        agent = BayesNashAgent(agent_id=0, num_bidders=4, low=20.0)
+        items = [Item(item_id=0), Item(item_id=1)]
+        state = MultiItemAuctionState(agent_id=0, round_number=1, items=items, private_values={0: 60.0, 1: 20.0})
+        bids = agent.get_item_bids(state, [])
+        self.assertEqual([bid.bid_amount for bid in bids], [50.0, 20.0])
+        np.testing.assert_array_equal(agent.bid_batch(np.array([[60.0, 20.0]])), [[50.0, 20.0]])
+
+    def test_supports_bid_batch(self):
+        class HistoryAware(ShadingAgent):
+            def get_bid(self, auction_state, history):
+                return super().get_bid(auction_state, history)
+
+        self.assertTrue(RandomAgent(agent_id=0).supports_bid_batch)
+        self.assertTrue(BayesNashAgent(agent_id=0, num_bidders=2).supports_bid_batch)
+        self.assertFalse(HistoryAware(agent_id=0).supports_bid_batch)
+
+
+class TestPacingAgents(unittest.TestCase):
+    def state(self, private_value: float, remaining_budget: float | None) -> AuctionState:
+        return AuctionState(agent_id=0, private_value=private_value, round_number=1, remaining_budget=remaining_budget)
+
+    def test_strategy_without_bids_cannot_be_built(self):
+        with self.assertRaises(TypeError):
+            PacingAgent(0, num_rounds=100)
+
+    def test_control_follows_spend(self):
+        # 1000 over 100 rounds: the even share of a 10-round interval is 100
+        agent = MultiplicativePacingAgent(0, num_rounds=100, pacing_interval=10, learning_rate=0.5)
+        for _ in range(10):
+            agent.get_bid(self.state(50.0, 1000.0), [])
+        agent.get_bid(self.state(50.0, 800.0), [])  # spent 200: twice the target
+        self.assertAlmostEqual(agent.control, np.exp(-0.5))
+        self.assertAlmostEqual(agent.get_bid(self.state(50.0, 800.0), []).bid_amount, 0.8 * np.exp(-0.5) * 50.0)
+        for _ in range(8):
+            agent.get_bid(self.state(50.0, 800.0), [])
+        agent.get_bid(self.state(50.0, 800.0), [])  # spent nothing: the control goes back up, capped at 1
+        self.assertEqual(agent.control, 1.0)
+
+    def test_no_budget_means_no_pacing(self):
+        agent = MultiplicativePacingAgent(0, num_rounds=20, pacing_interval=2)
+        bids = [agent.get_bid(self.state(10.0, None), []).bid_amount for _ in range(20)]
+        self.assertEqual(bids, [8.0] * 20)
+
+    def test_bid_block_matches_per_round_bids(self):
+        values = np.random.default_rng(2).random((30, 1)) * 100
+        for make_agent in (
+            lambda: MultiplicativePacingAgent(0, num_rounds=30, pacing_interval=10),
+            lambda: ThrottlingAgent(0, num_rounds=30, pacing_interval=10, random_seed=4),
+        ):
+            block_agent, agent = make_agent(), make_agent()
+            for start, remaining in zip(range(0, 30, 10), (300.0, 120.0, 90.0)):
+                block = block_agent.bid_block(values[start:start + 10], remaining)
+                per_round = [
+                    agent.get_bid(self.state(value, remaining), []).bid_amount for value in values[start:start + 10, 0]
+                ]
+                self.assertEqual(block[:, 0].tolist(), per_round)
+            self.assertEqual(block_agent.get_state(), agent.get_state())
+
+    def test_blocks_cannot_cross_an_update(self):
+        agent = ThrottlingAgent(0, num_rounds=30, pacing_interval=10)
+        agent.bid_block(np.ones((4, 1)), 100.0)
+        with self.assertRaises(ValueError):
+            agent.bid_block(np.ones((7, 1)), 100.0)
+
+    def test_throttling_abstains_instead_of_shading(self):
+        agent = ThrottlingAgent(0, num_rounds=100, pacing_interval=100, shading_factor=0.5, random_seed=0)
+        agent.control = 0.3
+        bids = agent.bid_block(np.full((99, 1), 10.0), 100.0)[:, 0]
+        self.assertEqual(set(bids.tolist()), {0.0, 5.0})
+        self.assertEqual(agent.control, 0.3)  # no update before round 101
+
+    def test_supports_bid_block(self):
+        class PerRound(MultiplicativePacingAgent):
+            def get_bid(self, auction_state, history):
+                return super().get_bid(auction_state, history)
+
+        self.assertTrue(MultiplicativePacingAgent(0, 10).supports_bid_block)
+        self.assertFalse(MultiplicativePacingAgent(0, 10).supports_bid_batch)
+        self.assertFalse(PerRound(0, 10).supports_bid_block)
+        self.assertTrue(RandomAgent(agent_id=0).supports_bid_block)
+
+    def test_bid_blocks_matches_bid_block(self):
+        values = np.random.default_rng(3).random((20, 4)) * 100
+        remaining = np.array([50.0, np.inf, 10.0, 200.0])
+
+        def make_agents():
+            return [ThrottlingAgent(i, num_rounds=20, pacing_interval=10, random_seed=i) for i in range(4)]
+
+        grouped, alone = make_agents(), make_agents()
+        for start in (0, 10):
+            block = ThrottlingAgent.bid_blocks(grouped, values[start:start + 10], remaining)
+            for column, agent in enumerate(alone):
+                expected = agent.bid_block(values[start:start + 10, column:column + 1], remaining[column])
+                np.testing.assert_array_equal(block[:, [column]], expected)
+            remaining = remaining * 0.5
+        self.assertEqual([agent.get_state() for agent in grouped], [agent.get_state() for agent in alone])
+
+    def test_copies_take_only_their_own_state(self):
+        agents = [MultiplicativePacingAgent(i, num_rounds=20, pacing_interval=5) for i in range(3)]
+        MultiplicativePacingAgent.bid_blocks(agents, np.ones((5, 3)), np.array([10.0, 20.0, 30.0]))
+        clone = copy.deepcopy(agents[1])
+        self.assertEqual(clone.get_state(), agents[1].get_state())
+        self.assertEqual(clone.interval_budget, 20.0)
+        clone.control = 0.5
+        self.assertEqual(agents[1].control, 1.0)
+        # An agent bidding on its own again leaves the others' shared state alone
+        agents[0].bid_block(np.ones((5, 1)), 5.0)
+        self.assertEqual([agent.rounds_played for agent in agents], [10, 5, 5])
+
+    def test_throttling_forks_draw_independent_streams(self):
+        agent = ThrottlingAgent(0, num_rounds=10, pacing_interval=10, random_seed=3)
+        agent.control = 0.5
+        values = np.ones((10, 1))
+        first, second = agent.fork(0).bid_block(values, 5.0), agent.fork(1).bid_block(values, 5.0)
+        self.assertFalse(np.array_equal(first, second))
+        np.testing.assert_array_equal(agent.fork(0).bid_block(values, 5.0), first)
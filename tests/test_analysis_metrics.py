@@ -0,0 +1,137 @@
+import itertools
+import random
+import tempfile
+import unittest
+
+import numpy as np
+
+from agents.random_agent import RandomAgent
+from agents.shading_agent import BayesNashAgent, ShadingAgent
+from analysis.metrics import AuctionAnalyzer, analyze, bayes_nash_bids, round_data, welfare
+from simulation.auction_environment import AuctionEnvironment, MultiItemAuctionEnvironment
+from simulation.data_models import Item
+from simulation.valuation_models import AdditiveValuation, SubstitutesValuation, SynergyValuation
+from simulation.value_distributions import LogNormalValues, UniformValues
+
+
+def brute_force_optimum(values: np.ndarray, valuation_model) -> float:
+    """Best welfare over every assignment of items to agents (or to nobody)."""
+    num_agents, num_items = values.shape
+    base_values = [dict(enumerate(agent_values.tolist())) for agent_values in values]
+    best = 0.0
+    for owners in itertools.product(range(-1, num_agents), repeat=num_items):
+        total = sum(
+            valuation_model.get_bundle_value(
+                frozenset(item for item, owner in enumerate(owners) if owner == agent), base_values[agent]
+            )
+            for agent in range(num_agents)
+        )
+        best = max(best, total)
+    return best
+
+
+def multi_item_run(valuation_model, num_rounds=20, num_agents=3, num_items=3):
+    items = [Item(item_id=i) for i in range(num_items)]
+    agents = [RandomAgent(agent_id=i, random_seed=i) for i in range(num_agents)]
+    env = MultiItemAuctionEnvironment(1, items, agents, random_seed=5, valuation_model=valuation_model)
+    return env.run_simulation(num_rounds)
+
+
+class TestWelfare(unittest.TestCase):
+    def test_optimum_matches_brute_force(self):
+        models = [
+            SynergyValuation({frozenset({0, 1}): 40.0, frozenset({1, 2}): 25.0}),
+            SubstitutesValuation([frozenset({0, 1})]),
+        ]
+        for model in models:
+            results = multi_item_run(model)
+            data = round_data(results)
+            optimal, realized = welfare(data, model)
+            for r in range(len(results)):
+                self.assertAlmostEqual(optimal[r], brute_force_optimum(data.values[r], model))
+            self.assertTrue((realized <= optimal + 1e-9).all())
+
+    def test_additive_fast_path_matches_table_path(self):
+        results = multi_item_run(AdditiveValuation())
+        data = round_data(results)
+        fast = welfare(data, AdditiveValuation())
+        tables = welfare(data, SynergyValuation({}))
+        np.testing.assert_allclose(fast[0], tables[0])
+        np.testing.assert_allclose(fast[1], tables[1])
+
+    def test_realized_welfare_uses_won_bundles(self):
+        model = SynergyValuation({frozenset({0, 1}): 40.0})
+        results = multi_item_run(model)
+        _, realized = welfare(round_data(results), model)
+        for r, result in enumerate(results):
+            expected = 0.0
+            for agent_id, values in result.private_values.items():
+                bundle = frozenset(item for item, owner in result.allocations.items() if owner == agent_id)
+                expected += model.get_bundle_value(bundle, dict(values))
+            self.assertAlmostEqual(realized[r], expected)
+
+    def test_single_item_store_matches_result_list(self):
+        agents = [RandomAgent(agent_id=i, random_seed=i) for i in range(4)]
+        store = AuctionEnvironment(1, 3, agents).run_simulation(50)
+        from_store = round_data(store)
+        from_list = round_data(list(store))
+        for name in ("agent_ids", "values", "bids", "won", "prices"):
+            np.testing.assert_array_equal(getattr(from_store, name), getattr(from_list, name))
+
+        optimal, realized = welfare(from_store)
+        np.testing.assert_allclose(optimal, store.private_value.reshape(50, 4).max(axis=1))
+        self.assertTrue((realized <= optimal).all())
+
+
+class TestShading(unittest.TestCase):
+    def test_uniform_closed_form(self):
+        values = np.array([[[0.0], [50.0], [100.0]]])
+        bids = bayes_nash_bids(values, 4, UniformValues(0, 100))
+        np.testing.assert_allclose(bids[0, :, 0], [0.0, 37.5, 75.0])
+
+    def test_empirical_matches_uniform_closed_form(self):
+        values = np.random.default_rng(0).uniform(0, 100, size=(20_000, 3, 1))
+        empirical = bayes_nash_bids(values, 3)
+        np.testing.assert_allclose(empirical, bayes_nash_bids(values, 3, UniformValues(0, 100)), atol=1.0)
+
+    def test_bayes_nash_agents_have_no_excess(self):
+        agents = [BayesNashAgent(i, num_bidders=3) for i in range(2)] + [ShadingAgent(2, shading_factor=0.9)]
+        store = AuctionEnvironment(1, 7, agents).run_simulation(200)
+        summary = analyze(store, value_distribution=UniformValues(0, 100)).agent_summary()
+        self.assertAlmostEqual(summary[0]["excess_bid"], 0.0)
+        self.assertAlmostEqual(summary[0]["shading"], 1 / 3)
+        self.assertGreater(summary[2]["excess_bid"], 0.0)
+        self.assertAlmostEqual(sum(entry["win_rate"] for entry in summary.values()), 1.0)
+
+    def test_utility_and_efficiency(self):
+        agents = [RandomAgent(agent_id=i, random_seed=i) for i in range(3)]
+        store = AuctionEnvironment(1, 2, agents, value_distribution=LogNormalValues()).run_simulation(100)
+        analysis = analyze(store)
+        np.testing.assert_allclose(analysis.utility, store.utility.reshape(100, 3))
+        self.assertTrue(((analysis.efficiency > 0) & (analysis.efficiency <= 1)).all())
+        self.assertLessEqual(analysis.mean_efficiency, 1.0)
+
+
+class TestAuctionAnalyzer(unittest.TestCase):
+    def test_results_cached_by_run_id(self):
+        agents = [RandomAgent(agent_id=i, random_seed=i) for i in range(3)]
+        store = AuctionEnvironment(1, 2, agents).run_simulation(30)
+        with tempfile.TemporaryDirectory() as directory:
+            analyzer = AuctionAnalyzer(cache_dir=directory)
+            first = analyzer.analyze("run-1", store)
+            self.assertIs(analyzer.analyze("run-1", None), first)
+
+            def not_loaded():
+                raise AssertionError("results loaded on a cache hit")
+
+            reloaded = AuctionAnalyzer(cache_dir=directory).analyze("run-1", not_loaded)
+            np.testing.assert_array_equal(reloaded.realized_welfare, first.realized_welfare)
+            self.assertIsNone(AuctionAnalyzer(value_distribution=UniformValues(), cache_dir=directory).cached("run-1"))
+            self.assertIsNone(AuctionAnalyzer(SynergyValuation({}), cache_dir=directory).cached("run-1"))
+
+            analyzer.invalidate("run-1")
+            self.assertIsNone(analyzer.cached("run-1"))
+
+
+if __name__ == "__main__":
+    unittest.main()
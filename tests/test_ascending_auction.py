@@ -0,0 +1,199 @@
+import random
+import unittest
+
+from simulation.ascending_auction import AscendingAuction
+from simulation.auction_environment import MultiItemAuctionEnvironment
+from simulation.data_models import Item, ItemBid
+from agents.base_agent import BaseAgent
+from agents.shading_agent import ShadingAgent
+
+
+def reference_replay(bids, items, increment, reserve_price, pricing):
+    """
+    Replay `bids` recomputing every item's price from all live limits after
+    each bid: the standing bids as a full re-settlement would give them.
+    Returns (accepted flags, item_id -> (leader, price, tied)).
+    """
+    live = {item.item_id: {} for item in items}  # agent_id -> (limit, order)
+    state = {}
+    accepted = []
+    for order, bid in enumerate(bids):
+        limits = live.get(bid.item_id)
+        asking = reserve_price if bid.item_id not in state else state[bid.item_id][1] + increment
+        ok = (
+            limits is not None and bid.bid_amount > 0 and bid.bid_amount >= asking
+            and (bid.agent_id not in limits or bid.bid_amount >= limits[bid.agent_id][0] + increment)
+        )
+        accepted.append(ok)
+        if not ok:
+            continue
+        limits[bid.agent_id] = (bid.bid_amount, order)
+        ranked = sorted(limits.items(), key=lambda entry: (-entry[1][0], entry[1][1]))
+        leader, (first, _) = ranked[0]
+        tied = False
+        if len(ranked) == 1:
+            price = reserve_price
+        elif pricing == "english":
+            price = min(first, ranked[1][1][0] + increment)
+        else:
+            # Walk the clock up until at most one bidder is left
+            tick = 0
+            while sum(limit >= reserve_price + tick * increment for limit, _ in limits.values()) > 1:
+                tick += 1
+            price = reserve_price + tick * increment
+            if first < price:
+                price -= increment
+                tied = True
+        state[bid.item_id] = (leader, price, tied)
+    return accepted, state
+
+
+class TestAscendingAuction(unittest.TestCase):
+    def test_matches_full_resettlement_after_every_bid(self):
+        items = [Item(item_id=i) for i in range(3)]
+        rng = random.Random(4)
+        for pricing in ("english", "clock"):
+            # Integer limits on an increment of 2 and a reserve of 1 make ties and equal ticks common
+            bids = [
+                ItemBid(agent_id=rng.randrange(6), item_id=rng.randrange(4), bid_amount=float(rng.randrange(0, 40)))
+                for _ in range(400)
+            ]
+            auction = AscendingAuction(items, increment=2.0, reserve_price=1.0, pricing=pricing)
+            accepted = [auction.submit(bid) for bid in bids]
+
+            expected_accepted, expected = reference_replay(bids, items, 2.0, 1.0, pricing)
+            self.assertEqual(accepted, expected_accepted)
+            self.assertEqual(auction.num_accepted, sum(expected_accepted))
+            standing = auction.standing_bids()
+            for item_id, (leader, price, _) in expected.items():
+                self.assertEqual(standing[item_id].agent_id, leader)
+                self.assertEqual(standing[item_id].bid_amount, price)
+                self.assertEqual(auction.asking_prices()[item_id], price + 2.0)
+
+    def test_english_price_is_second_limit_plus_increment(self):
+        auction = AscendingAuction([Item(item_id=0)], increment=1.0)
+        auction.submit(ItemBid(agent_id=0, item_id=0, bid_amount=40.0))
+        self.assertEqual(auction.standing_bids()[0].bid_amount, 0.0)
+        auction.submit(ItemBid(agent_id=1, item_id=0, bid_amount=70.0))
+        auction.submit(ItemBid(agent_id=2, item_id=0, bid_amount=55.0))
+        self.assertEqual(auction.settle(random.Random(0)), ({0: 1}, {0: 56.0}))
+
+    def test_english_tie_goes_to_earlier_bid_at_its_limit(self):
+        auction = AscendingAuction([Item(item_id=0)], increment=1.0)
+        auction.submit(ItemBid(agent_id=3, item_id=0, bid_amount=50.0))
+        auction.submit(ItemBid(agent_id=1, item_id=0, bid_amount=50.0))
+        self.assertEqual(auction.settle(random.Random(0)), ({0: 3}, {0: 50.0}))
+
+    def test_clock_price_and_simultaneous_dropout(self):
+        auction = AscendingAuction([Item(item_id=0), Item(item_id=1)], increment=5.0, pricing="clock")
+        auction.submit_many([
+            ItemBid(agent_id=0, item_id=0, bid_amount=42.0),
+            ItemBid(agent_id=1, item_id=0, bid_amount=61.0),
+            # Both leave the clock between 40 and 45
+            ItemBid(agent_id=0, item_id=1, bid_amount=43.0),
+            ItemBid(agent_id=1, item_id=1, bid_amount=44.0),
+            ItemBid(agent_id=2, item_id=1, bid_amount=12.0),
+        ])
+        winners = set()
+        for seed in range(20):
+            allocations, prices = _copy(auction).settle(random.Random(seed))
+            self.assertEqual((allocations[0], prices[0]), (1, 45.0))
+            self.assertEqual(prices[1], 40.0)
+            winners.add(allocations[1])
+        self.assertEqual(winners, {0, 1})
+
+    def test_raised_limits_supersede_old_ones(self):
+        auction = AscendingAuction([Item(item_id=0)], increment=1.0)
+        auction.submit(ItemBid(agent_id=0, item_id=0, bid_amount=30.0))
+        auction.submit(ItemBid(agent_id=1, item_id=0, bid_amount=20.0))
+        self.assertFalse(auction.submit(ItemBid(agent_id=0, item_id=0, bid_amount=30.5)))
+        for limit in (25.0, 35.0, 45.0):
+            self.assertTrue(auction.submit(ItemBid(agent_id=1, item_id=0, bid_amount=limit)))
+        # The heap still holds the superseded limits of agent 1
+        self.assertEqual(auction.standing_bids()[0], ItemBid(agent_id=1, item_id=0, bid_amount=31.0))
+        self.assertTrue(auction.submit(ItemBid(agent_id=0, item_id=0, bid_amount=50.0)))
+        self.assertEqual(auction.standing_bids()[0], ItemBid(agent_id=0, item_id=0, bid_amount=46.0))
+
+    def test_rejects_bids_below_asking_price_and_unknown_items(self):
+        auction = AscendingAuction([Item(item_id=0)], increment=1.0, reserve_price=10.0)
+        self.assertFalse(auction.submit(ItemBid(agent_id=0, item_id=0, bid_amount=9.0)))
+        self.assertFalse(auction.submit(ItemBid(agent_id=0, item_id=5, bid_amount=90.0)))
+        self.assertEqual(auction.settle(random.Random(0)), ({0: -1}, {0: 0.0}))
+        self.assertEqual(len(auction.bids), 2)
+        with self.assertRaises(ValueError):
+            auction.submit(ItemBid(agent_id=0, item_id=0, bid_amount=20.0))
+
+    def test_invalid_parameters(self):
+        with self.assertRaises(ValueError):
+            AscendingAuction([Item(item_id=0)], pricing="dutch")
+        with self.assertRaises(ValueError):
+            AscendingAuction([Item(item_id=0)], increment=0.0)
+
+
+def _copy(auction: AscendingAuction) -> AscendingAuction:
+    clone = AscendingAuction([Item(item_id=i) for i in auction.item_ids], auction.increment,
+                             auction.reserve_price, auction.pricing)
+    clone.submit_many(auction.bids)
+    return clone
+
+
+class StraightforwardBidder(BaseAgent):
+    """Bids the asking price on every item it does not lead whose asking price is below its value."""
+
+    def __init__(self, agent_id: int):
+        super().__init__(agent_id)
+        self.sub_rounds = 0
+
+    def get_bid(self, auction_state, history):
+        raise NotImplementedError
+
+    def get_ascending_bids(self, auction_state, history):
+        self.sub_rounds = auction_state.sub_round
+        bids = []
+        for item in auction_state.items:
+            standing = auction_state.standing_bids.get(item.item_id)
+            asking = auction_state.asking_prices[item.item_id]
+            if (standing is None or standing.agent_id != self.agent_id) and asking <= auction_state.private_values[item.item_id]:
+                bids.append(ItemBid(agent_id=self.agent_id, item_id=item.item_id, bid_amount=asking))
+        return bids
+
+
+class TestAscendingEnvironment(unittest.TestCase):
+    def test_default_agents_bid_their_limits_once(self):
+        items = [Item(item_id=i) for i in range(3)]
+        env = MultiItemAuctionEnvironment(1, items, [ShadingAgent(i) for i in range(4)], random_seed=2,
+                                          auction_format="english", increment=0.5)
+        for result in env.run_simulation(10):
+            self.assertEqual(len(result.all_bids), 12)
+            for item_id, winner in result.allocations.items():
+                limits = sorted((bid.bid_amount, -k) for k, bid in enumerate(result.all_bids) if bid.item_id == item_id)
+                self.assertEqual(winner, result.all_bids[-limits[-1][1]].agent_id)
+                self.assertEqual(result.prices[item_id], min(limits[-1][0], limits[-2][0] + 0.5))
+
+    def test_straightforward_bidding_ends_near_second_value(self):
+        items = [Item(item_id=i) for i in range(2)]
+        agents = [StraightforwardBidder(i) for i in range(3)]
+        env = MultiItemAuctionEnvironment(1, items, agents, random_seed=8, auction_format="clock", increment=1.0,
+                                          reserve_price=1.0)
+        for result in env.run_simulation(5):
+            for item_id, winner in result.allocations.items():
+                values = sorted((values[item_id], agent_id) for agent_id, values in result.private_values.items())
+                self.assertEqual(winner, values[-1][1])
+                self.assertLessEqual(result.prices[item_id], values[-2][0] + 1.0)
+                self.assertGreaterEqual(result.prices[item_id], values[-2][0] - 1.0)
+        self.assertGreater(agents[0].sub_rounds, 2)
+
+    def test_max_sub_rounds(self):
+        agents = [StraightforwardBidder(i) for i in range(2)]
+        env = MultiItemAuctionEnvironment(1, [Item(item_id=0)], agents, random_seed=8, auction_format="english",
+                                          increment=1.0, reserve_price=1.0, max_sub_rounds=3)
+        env.run_simulation(1)
+        self.assertEqual(agents[0].sub_rounds, 3)
+
+    def test_unknown_format(self):
+        with self.assertRaises(ValueError):
+            MultiItemAuctionEnvironment(1, [Item(item_id=0)], [], auction_format="dutch")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import asyncio
+import os
+import time
+import unittest
+from unittest.mock import patch
+
+from agents.llm_agent import LLMAgent
+from agents.random_agent import RandomAgent
+from simulation.auction_environment import AuctionEnvironment
+from simulation.data_models import AuctionState, Bid
+from tests.fake_model_server import FakeModelServer
+
+
+class SlowAgent(RandomAgent):
+    async def get_bid_async(self, auction_state: AuctionState, history) -> Bid:
+        await asyncio.sleep(5)
+        return await super().get_bid_async(auction_state, history)
+
+
+class SlowFirstRoundAgent(RandomAgent):
+    """Bids through the default thread-backed get_bid_async, slowly in round 1."""
+
+    def get_bid(self, auction_state: AuctionState, history) -> Bid:
+        if auction_state.round_number == 1:
+            time.sleep(0.3)
+        return super().get_bid(auction_state, history)
+
+
+class TestAsyncBidding(unittest.TestCase):
+    def test_async_matches_sync_for_random_agents(self):
+        def make_env():
+            agents = [RandomAgent(agent_id=i, random_seed=10 + i) for i in range(4)]
+            return AuctionEnvironment(auction_id=1, random_seed=3, agents=agents)
+
+        sync_results = make_env().run_simulation(num_rounds=10)
+        async_results = asyncio.run(make_env().run_simulation_async(num_rounds=10))
+        self.assertEqual(list(async_results), list(sync_results))
+
+    def test_timed_out_agent_abstains(self):
+        agents = [RandomAgent(agent_id=0, random_seed=1), SlowAgent(agent_id=1, random_seed=2)]
+        env = AuctionEnvironment(auction_id=1, random_seed=3, agents=agents)
+        results = asyncio.run(env.run_simulation_async(num_rounds=2, bid_timeout=0.05))
+        for result in results:
+            self.assertEqual(result.all_bids[1], Bid(agent_id=1, bid_amount=0.0))
+            self.assertEqual(result.winning_agent_id, 0)
+
+    def test_timed_out_thread_finishes_before_next_round(self):
+        def run(bid_timeout):
+            agents = [RandomAgent(agent_id=0, random_seed=1), SlowFirstRoundAgent(agent_id=1, random_seed=2)]
+            env = AuctionEnvironment(auction_id=1, random_seed=3, agents=agents)
+            return list(asyncio.run(env.run_simulation_async(num_rounds=5, bid_timeout=bid_timeout)))
+
+        timed_out, reference = run(0.05), run(None)
+        self.assertFalse(SlowFirstRoundAgent(agent_id=1).supports_async_cancellation)
+        self.assertEqual(timed_out[0].all_bids[1], Bid(agent_id=1, bid_amount=0.0))
+        self.assertNotEqual(reference[0].all_bids[1].bid_amount, 0.0)
+        # The abandoned round-1 call used up its draw exactly once, before round 2
+        self.assertEqual(timed_out[1:], reference[1:])
+
+
+@patch.dict(os.environ, {"ANTHROPIC_API_KEY": "test-key"})
+class TestAsyncLLMBidding(unittest.TestCase):
+    def test_round_bids_are_gathered_concurrently(self):
+        delay = 0.3
+        with FakeModelServer(reply=lambda request: "BID: 12.5", delay=delay) as server:
+            agents = [LLMAgent(agent_id=i, model="test-model", base_url=server.base_url) for i in range(6)]
+            env = AuctionEnvironment(auction_id=1, random_seed=1, agents=agents)
+            start = time.perf_counter()
+            results = asyncio.run(env.run_simulation_async(num_rounds=2))
+            elapsed = time.perf_counter() - start
+
+        self.assertEqual(server.max_in_flight, 6)
+        self.assertLess(elapsed, 2 * 6 * delay / 2)
+        self.assertEqual(len(server.requests), 12)
+        for result in results:
+            self.assertEqual([bid.bid_amount for bid in result.all_bids], [12.5] * 6)
+
+    def test_concurrency_limit(self):
+        with FakeModelServer(delay=0.05) as server:
+            agents = [LLMAgent(agent_id=i, model="test-model", base_url=server.base_url) for i in range(6)]
+            env = AuctionEnvironment(auction_id=1, random_seed=1, agents=agents)
+            asyncio.run(env.run_simulation_async(num_rounds=1, max_concurrency=2))
+
+        self.assertLessEqual(server.max_in_flight, 2)
+        self.assertEqual(len(server.requests), 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
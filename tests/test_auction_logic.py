@@ -0,0 +1,183 @@
+import random
+import unittest
+
+import numpy as np
+
+from simulation.auction_logic import (
+    run_auction, run_auction_batch, run_budgeted_auction_batch, run_budgeted_rounds, run_multi_item_auction,
+    limit_bids, ItemBidIndex, BUDGET_POLICIES, MIN_BULK_DRAWS, _randbelow_many
+)
+from simulation.data_models import Bid, Item, ItemBid
+
+
+class TestRunAuctionBatch(unittest.TestCase):
+    def test_matches_run_auction_for_same_seed(self):
+        value_rng = np.random.default_rng(7)
+        # Coarse bids so that ties are common, plus some zero rows
+        bid_matrix = value_rng.integers(0, 4, size=(500, 5)).astype(float)
+        bid_matrix[::50] = 0.0
+
+        batch = run_auction_batch(bid_matrix, random.Random(11))
+
+        rng = random.Random(11)
+        for r, row in enumerate(bid_matrix):
+            bids = [Bid(agent_id=i, bid_amount=amount) for i, amount in enumerate(row)]
+            result = run_auction(bids, auction_id=1, rng=rng, round_number=r)
+            self.assertEqual(batch.winner_indices[r], result.winning_agent_id)
+            self.assertEqual(batch.winning_bids[r], result.winning_bid)
+
+    def test_bulk_draws_match_randrange(self):
+        # Long runs of equal limits, as in settlement, and enough draws to go through NumPy
+        limits = np.repeat([1, 2, 3, 1, 7, 64, 1000], MIN_BULK_DRAWS // 2)
+        rng, reference = random.Random(5), random.Random(5)
+        picks = _randbelow_many(rng, limits)
+        self.assertEqual(picks.tolist(), [reference.randrange(n) for n in limits.tolist()])
+        self.assertEqual(rng.getstate(), reference.getstate())
+
+    def test_unallocated_rounds(self):
+        bid_matrix = np.array([[0.0, -1.0], [np.nan, 0.0], [0.0, 3.0]])
+        batch = run_auction_batch(bid_matrix, random.Random(0))
+        self.assertEqual(batch.winner_indices.tolist(), [-1, -1, 1])
+        self.assertEqual(batch.winning_bids.tolist(), [0.0, 0.0, 3.0])
+        self.assertEqual(batch.num_tied.tolist(), [0, 0, 1])
+
+    def test_no_agents(self):
+        batch = run_auction_batch(np.empty((3, 0)), random.Random(0))
+        self.assertEqual(batch.winner_indices.tolist(), [-1, -1, -1])
+
+    def test_generator_tie_breaks_are_seeded(self):
+        bid_matrix = np.full((200, 4), 10.0)
+        first = run_auction_batch(bid_matrix, np.random.default_rng(3))
+        second = run_auction_batch(bid_matrix, np.random.default_rng(3))
+        np.testing.assert_array_equal(first.winner_indices, second.winner_indices)
+        self.assertTrue(set(first.winner_indices.tolist()) <= {0, 1, 2, 3})
+        self.assertTrue((first.num_tied == 4).all())
+
+    def test_rejects_non_matrix_input(self):
+        with self.assertRaises(ValueError):
+            run_auction_batch(np.zeros(3))
+
+
+def settle_by_grouping(bids, items, rng):
+    """Reference settlement: group by item, filter, max, then rng.choice over the ties."""
+    allocations, prices = {}, {}
+    for item in items:
+        tied_pool = [b for b in bids if b.item_id == item.item_id and b.bid_amount > 0]
+        if not tied_pool:
+            allocations[item.item_id], prices[item.item_id] = -1, 0.0
+            continue
+        highest = max(b.bid_amount for b in tied_pool)
+        winner = rng.choice([b for b in tied_pool if b.bid_amount == highest])
+        allocations[item.item_id], prices[item.item_id] = winner.agent_id, winner.bid_amount
+    return allocations, prices
+
+
+class TestRunMultiItemAuction(unittest.TestCase):
+    def test_reused_index_matches_grouping(self):
+        items = [Item(item_id=i) for i in (3, 1, 7)]
+        bid_index = ItemBidIndex(items)
+        bid_rng = random.Random(5)
+        rng, reference_rng = random.Random(2), random.Random(2)
+        for round_number in range(300):
+            # Coarse amounts so that ties are common; item 9 is not auctioned
+            bids = [
+                ItemBid(agent_id=a, item_id=i, bid_amount=float(bid_rng.randint(-1, 3)))
+                for a in range(6) for i in (3, 1, 7, 9) if bid_rng.random() < 0.8
+            ]
+            bid_rng.shuffle(bids)
+            result = run_multi_item_auction(bids, items, 1, rng, round_number, bid_index=bid_index)
+            allocations, prices = settle_by_grouping(bids, items, reference_rng)
+            self.assertEqual(result.allocations, allocations)
+            self.assertEqual(result.prices, prices)
+        self.assertEqual(rng.getstate(), reference_rng.getstate())
+
+    def test_unallocated_items(self):
+        items = [Item(item_id=0), Item(item_id=1)]
+        bids = [ItemBid(0, 0, 0.0), ItemBid(1, 0, float("nan")), ItemBid(2, 1, -2.0)]
+        result = run_multi_item_auction(bids, items, 1, random.Random(0))
+        self.assertEqual(result.allocations, {0: -1, 1: -1})
+        self.assertEqual(result.prices, {0: 0.0, 1: 0.0})
+
+
+class TestRunBudgetedAuctionBatch(unittest.TestCase):
+    def test_wins_beyond_the_budget_go_to_the_next_bidder(self):
+        bids = np.array([[5.0, 3.0], [5.0, 3.0], [5.0, 3.0], [0.0, 0.0]])
+        outcome, settled = run_budgeted_auction_batch(bids, np.array([10.0, 100.0]), random.Random(0))
+        self.assertEqual(outcome.winner_indices.tolist(), [0, 0, 1, -1])
+        self.assertEqual(outcome.winning_bids.tolist(), [5.0, 5.0, 3.0, 0.0])
+        self.assertEqual(settled[2].tolist(), [0.0, 3.0])
+
+    def test_bids_are_clipped_to_the_budget(self):
+        bids = np.array([[8.0, 3.0], [8.0, 1.0]])
+        outcome, settled = run_budgeted_auction_batch(bids, np.array([4.0, 100.0]), random.Random(0))
+        self.assertEqual(outcome.winner_indices.tolist(), [0, 1])
+        self.assertEqual(outcome.winning_bids.tolist(), [4.0, 1.0])
+        self.assertEqual(settled[:, 0].tolist(), [4.0, 0.0])
+
+    def test_unlimited_budgets_match_run_auction_batch(self):
+        bids = np.random.default_rng(3).integers(0, 4, size=(200, 5)).astype(float)
+        outcome, settled = run_budgeted_auction_batch(bids, np.full(5, np.inf), random.Random(1))
+        expected = run_auction_batch(bids, random.Random(1))
+        np.testing.assert_array_equal(outcome.winner_indices, expected.winner_indices)
+        np.testing.assert_array_equal(settled, bids)
+
+    def test_rejected_wins_go_to_the_next_bidder(self):
+        bids = np.array([[5.0, 3.0], [5.0, 3.0], [5.0, 3.0]])
+        outcome, settled = run_budgeted_auction_batch(bids, np.array([12.0, 100.0]), random.Random(0), "reject")
+        self.assertEqual(outcome.winner_indices.tolist(), [0, 0, 1])
+        self.assertEqual(settled[:, 0].tolist(), [5.0, 5.0, 0.0])
+
+    def test_rejects_unknown_policy(self):
+        with self.assertRaises(ValueError):
+            run_budgeted_auction_batch(np.ones((1, 2)), np.ones(2), random.Random(0), "spread")
+
+
+def settle_rounds_one_by_one(bids, budgets, spent, rng, policy):
+    """Reference: run_auction row by row, each bid limited to the budget left before its row."""
+    spent = spent.copy()
+    winners, prices, settled = [], [], []
+    for row in bids:
+        row = limit_bids(row, budgets - spent, policy)
+        result = run_auction([Bid(agent, float(amount)) for agent, amount in enumerate(row)], 1, rng)
+        if result.winning_agent_id >= 0:
+            spent[result.winning_agent_id] += result.winning_bid
+        winners.append(result.winning_agent_id)
+        prices.append(result.winning_bid)
+        settled.append(row)
+    return winners, prices, np.array(settled), spent
+
+
+class TestRunBudgetedRounds(unittest.TestCase):
+    def test_matches_settling_one_round_at_a_time(self):
+        generator = np.random.default_rng(0)
+        for trial in range(200):
+            num_rounds, num_agents = generator.integers(1, 60), generator.integers(1, 6)
+            # Coarse amounts in odd trials, so that ties are common
+            if trial % 2:
+                bids = generator.integers(0, 5, (num_rounds, num_agents)).astype(float)
+            else:
+                bids = generator.random((num_rounds, num_agents)) * 10
+            budgets = generator.random(num_agents) * 30
+            budgets[generator.random(num_agents) < 0.2] = np.inf
+            spent = np.where(np.isfinite(budgets), generator.random(num_agents) * 5, 0.0)
+            for policy in BUDGET_POLICIES:
+                rng, reference_rng = random.Random(trial), random.Random(trial)
+                outcome, settled, spent_after = run_budgeted_rounds(bids, budgets, rng, policy, spent=spent)
+                winners, prices, expected_settled, expected_spent = settle_rounds_one_by_one(
+                    bids, budgets, spent, reference_rng, policy
+                )
+                self.assertEqual(outcome.winner_indices.tolist(), winners)
+                self.assertEqual(outcome.winning_bids.tolist(), prices)
+                np.testing.assert_array_equal(settled, expected_settled)
+                np.testing.assert_array_equal(spent_after, expected_spent)
+                self.assertEqual(rng.getstate(), reference_rng.getstate())
+
+    def test_budgets_are_never_exceeded(self):
+        bids = np.random.default_rng(1).random((5000, 20)) * 10
+        budgets = np.linspace(10.0, 500.0, 20)
+        _, _, spent = run_budgeted_rounds(bids, budgets, random.Random(0))
+        self.assertTrue((spent <= budgets).all())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+import os
+import unittest
+from unittest.mock import patch
+
+from agents.llm_agent import LLMAgent
+from agents.random_agent import RandomAgent
+from simulation.auction_environment import AuctionEnvironment
+from simulation.batch_runner import run_batched_simulations
+from tests.fake_model_server import FakeBatchServer, FakeModelServer
+
+
+def reply_from_prompt(request: dict) -> str:
+    # Deterministic in the prompt, so batched and direct runs see the same answers
+    return f"BID: {len(request['messages'][0]['content']) % 50}"
+
+
+@patch.dict(os.environ, {"ANTHROPIC_API_KEY": "test-key"})
+class TestBatchRunner(unittest.TestCase):
+    def make_environments(self, base_url: str) -> list[AuctionEnvironment]:
+        environments = []
+        for env_index in range(3):
+            agents = [LLMAgent(agent_id=i, model="test-model", base_url=base_url) for i in range(2)]
+            agents.append(RandomAgent(agent_id=2, random_seed=env_index))
+            environments.append(AuctionEnvironment(auction_id=env_index, random_seed=100 + env_index, agents=agents))
+        return environments
+
+    def test_rounds_advance_in_lockstep_with_one_batch_per_round(self):
+        num_rounds = 3
+        with FakeBatchServer(reply=reply_from_prompt) as server:
+            batched = run_batched_simulations(self.make_environments(server.base_url), num_rounds, poll_interval=0.01)
+
+        self.assertEqual(len(server.batches), num_rounds)
+        for batch in server.batches.values():
+            self.assertEqual(len(batch["requests"]), 6)
+            self.assertGreaterEqual(batch["polls"], 1)
+
+        with FakeModelServer(reply=reply_from_prompt) as server:
+            direct = [env.run_simulation(num_rounds) for env in self.make_environments(server.base_url)]
+        for batched_results, direct_results in zip(batched, direct):
+            self.assertEqual(list(batched_results), list(direct_results))
+
+    def test_environment_batched_mode(self):
+        with FakeBatchServer(reply=lambda request: "BID: 7") as server:
+            env = self.make_environments(server.base_url)[0]
+            results = env.run_simulation_batched(num_rounds=2, poll_interval=0.01)
+        self.assertEqual(len(results), 2)
+        self.assertEqual([bid.bid_amount for bid in results[0].all_bids[:2]], [7.0, 7.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import io
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from dataclasses import replace
+
+from benchmarks.__main__ import main
+from benchmarks.cases import all_cases, prepare_run_auction
+from benchmarks.harness import BenchmarkCase, compare, load_results, run_case, save_results
+
+
+class TestHarness(unittest.TestCase):
+    def test_run_case_reports_throughput_and_memory(self):
+        case = BenchmarkCase("run_auction", prepare_run_auction, {"agents": 3, "rounds": 20}, units=20)
+        result = run_case(case, repeats=2, min_time=0.01)
+        self.assertEqual(result.key, "run_auction[agents=3,rounds=20]")
+        self.assertGreater(result.throughput, 0)
+        self.assertGreater(result.peak_memory_bytes, 0)
+        self.assertAlmostEqual(result.throughput, 20 / result.seconds_per_call)
+
+    def test_compare_flags_regressions_beyond_threshold(self):
+        case = BenchmarkCase("run_auction", prepare_run_auction, {"agents": 3, "rounds": 20}, units=20)
+        baseline = run_case(case, repeats=1, min_time=0.01)
+        slower = replace(baseline, throughput=baseline.throughput * 0.8)
+        bigger = replace(baseline, peak_memory_bytes=baseline.peak_memory_bytes * 2)
+
+        self.assertEqual(compare([baseline], [replace(baseline, throughput=baseline.throughput * 0.95)]), [])
+        [regression] = compare([baseline], [slower], threshold=0.1)
+        self.assertEqual(regression.metric, "throughput")
+        self.assertAlmostEqual(regression.change, -0.2)
+        self.assertEqual([r.metric for r in compare([baseline], [bigger])], ["peak_memory_bytes"])
+
+    def test_results_round_trip_through_json(self):
+        case = BenchmarkCase("run_auction", prepare_run_auction, {"agents": 3, "rounds": 20}, units=20)
+        results = [run_case(case, repeats=1, min_time=0.01)]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "results.json")
+            save_results(path, results)
+            self.assertEqual(load_results(path), results)
+
+    def test_case_keys_are_unique(self):
+        keys = [case.key for case in all_cases()]
+        self.assertEqual(len(keys), len(set(keys)))
+
+
+class TestCommandLine(unittest.TestCase):
+    def test_baseline_comparison_sets_exit_status(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "results.json")
+            arguments = ["--quick", "--filter", "llm_parse_bid", "--repeats", "1", "--min-time", "0.01"]
+            with redirect_stdout(io.StringIO()):
+                self.assertEqual(main(arguments + ["--output", path]), 0)
+                results = load_results(path)
+                save_results(path, [replace(result, throughput=result.throughput * 100) for result in results])
+                self.assertEqual(main(arguments + ["--baseline", path]), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
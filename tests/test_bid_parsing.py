@@ -0,0 +1,150 @@
+import asyncio
+import io
+import os
+import unittest
+from contextlib import redirect_stdout
+from unittest.mock import MagicMock, patch
+
+from anthropic.types import Message
+
+from agents.bid_parsing import BID_TOOL_NAME, BidParseError, BidPolicy, extract_bid
+from agents.llm_agent import LLMAgent
+from simulation.data_models import AuctionState
+from tests.fake_model_server import FakeModelServer, message_response
+
+
+def tool_response(tool_input: dict) -> dict:
+    response = message_response("")
+    response["content"] = [
+        {"type": "text", "text": "Let me think."},
+        {"type": "tool_use", "id": "toolu_1", "name": BID_TOOL_NAME, "input": tool_input},
+    ]
+    response["stop_reason"] = "tool_use"
+    return response
+
+
+class TestExtractBid(unittest.TestCase):
+    def test_text_formats(self):
+        cases = {
+            "BID: 42.5\nBecause.": 42.5,
+            "Reasoning first.\nbid - 17": 17.0,
+            "**BID:** $1,250.75": 1250.75,
+            "BID: 30, since the others bid low": 30.0,
+        }
+        for text, expected in cases.items():
+            self.assertEqual(extract_bid(message_response(text)), expected, text)
+
+    def test_reads_sdk_message_blocks(self):
+        message = Message.model_validate(message_response("I bid carefully.\nBID: 12.5"))
+        self.assertEqual(extract_bid(message), 12.5)
+        self.assertEqual(extract_bid(Message.model_validate(tool_response({"bid_amount": 33}))), 33.0)
+
+    def test_tool_call_wins_over_text(self):
+        response = tool_response({"bid_amount": 8.25, "reasoning": "low"})
+        response["content"][0]["text"] = "BID: 99"
+        self.assertEqual(extract_bid(response), 8.25)
+
+    def test_failures(self):
+        for response in (
+            message_response("I would rather not say."),
+            {"content": []},
+            tool_response({"reasoning": "no amount"}),
+            tool_response({"bid_amount": "a lot"}),
+            tool_response({"bid_amount": float("nan")}),
+            tool_response({"bid_amount": True}),
+        ):
+            with self.assertRaises(BidParseError):
+                extract_bid(response)
+        self.assertTrue(issubclass(BidParseError, ValueError))
+
+
+class TestBidPolicy(unittest.TestCase):
+    def test_clamp(self):
+        self.assertEqual(BidPolicy().clamp(-3.0, 50.0), 0.0)
+        self.assertEqual(BidPolicy().clamp(80.0, 50.0), 80.0)
+        self.assertEqual(BidPolicy(max_bid_ratio=1.0).clamp(80.0, 50.0), 50.0)
+
+    def test_retries_and_budget(self):
+        policy = BidPolicy(max_retries=2, retry_budget=3)
+        self.assertTrue(policy.may_retry(attempt=1, retries_used=2))
+        self.assertFalse(policy.may_retry(attempt=2, retries_used=0))
+        self.assertFalse(policy.may_retry(attempt=0, retries_used=3))
+
+    def test_fallback(self):
+        error = BidParseError("no bid")
+        self.assertEqual(BidPolicy(fallback_fraction=0.5).fallback(40.0, error), 20.0)
+        # Abstains by default; raising is opt-in
+        self.assertEqual(BidPolicy().fallback(40.0, error), 0.0)
+        with self.assertRaises(BidParseError):
+            BidPolicy(fallback_fraction=None).fallback(40.0, error)
+
+
+@patch.dict(os.environ, {"ANTHROPIC_API_KEY": "test-key"})
+class TestLLMAgentBidding(unittest.TestCase):
+    state = AuctionState(agent_id=0, private_value=60.0, round_number=1)
+
+    def test_retries_after_malformed_answer(self):
+        replies = iter(["I would rather not say.", "BID: 21"])
+        with FakeModelServer(reply=lambda request: next(replies)) as server:
+            agent = LLMAgent(agent_id=0, base_url=server.base_url)
+            with redirect_stdout(io.StringIO()):
+                bid = agent.get_bid(self.state, [])
+        self.assertEqual(bid.bid_amount, 21.0)
+        self.assertEqual(agent.retries_used, 1)
+        retry = server.requests[1]["messages"]
+        self.assertEqual([message["role"] for message in retry], ["user", "assistant", "user"])
+        self.assertEqual(retry[1]["content"][0]["text"], "I would rather not say.")
+        self.assertIn("BID: <amount>", retry[2]["content"])
+
+    def test_async_retries(self):
+        replies = iter(["No.", "BID: 5"])
+        with FakeModelServer(reply=lambda request: next(replies)) as server:
+            agent = LLMAgent(agent_id=0, base_url=server.base_url)
+            with redirect_stdout(io.StringIO()):
+                bid = asyncio.run(agent.get_bid_async(self.state, []))
+        self.assertEqual(bid.bid_amount, 5.0)
+        self.assertEqual(len(server.requests), 2)
+
+    def test_fallback_after_retries(self):
+        with FakeModelServer(reply=lambda request: "No bid from me.") as server:
+            agent = LLMAgent(
+                agent_id=0, base_url=server.base_url,
+                bid_policy=BidPolicy(max_retries=2, retry_budget=3, fallback_fraction=0.25)
+            )
+            with redirect_stdout(io.StringIO()):
+                self.assertEqual(agent.get_bid(self.state, []).bid_amount, 15.0)
+                self.assertEqual(len(server.requests), 3)
+                # Only one retry left in the budget
+                agent.get_bid(self.state, [])
+        self.assertEqual(len(server.requests), 5)
+        self.assertEqual(agent.retries_used, 3)
+
+    def test_tool_bids(self):
+        agent = LLMAgent(agent_id=0, use_bid_tool=True, bid_policy=BidPolicy(max_bid_ratio=1.0))
+        agent.client.messages.create = MagicMock(side_effect=[
+            tool_response({"reasoning": "forgot the amount"}),
+            tool_response({"bid_amount": 75.0}),
+        ])
+        with redirect_stdout(io.StringIO()):
+            bid = agent.get_bid(self.state, [])
+        self.assertEqual(bid.bid_amount, 60.0)  # clamped to the private value
+
+        first, retry = (call.kwargs for call in agent.client.messages.create.call_args_list)
+        self.assertEqual(first["tool_choice"], {"type": "tool", "name": BID_TOOL_NAME})
+        self.assertIn(BID_TOOL_NAME, first["messages"][0]["content"])
+        tool_result = retry["messages"][2]["content"][0]
+        self.assertEqual((tool_result["type"], tool_result["tool_use_id"]), ("tool_result", "toolu_1"))
+        self.assertTrue(tool_result["is_error"])
+
+    def test_batch_response_retries_directly(self):
+        agent = LLMAgent(agent_id=0)
+        agent.client.messages.create = MagicMock(return_value=message_response("BID: 30"))
+        with redirect_stdout(io.StringIO()):
+            params = agent.prepare_batch_request(self.state, [])
+            bid = agent.bid_from_batch_response(message_response("Hmm."))
+        self.assertEqual(bid.bid_amount, 30.0)
+        self.assertEqual(agent.client.messages.create.call_args.kwargs["messages"][0], params["messages"][0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+import os
+import tempfile
+import unittest
+
+from agents.pacing_agent import MultiplicativePacingAgent, ThrottlingAgent
+from agents.random_agent import RandomAgent
+from simulation.auction_environment import AuctionEnvironment, MultiItemAuctionEnvironment
+from simulation.checkpoint import CheckpointError, Checkpointer
+from simulation.data_models import Item
+from simulation.value_distributions import AffiliatedValues
+
+
+class Crash(Exception):
+    pass
+
+
+class CrashingAgent(RandomAgent):
+    """Per-round RandomAgent that raises once when it reaches `crash_round`."""
+
+    def __init__(self, agent_id: int, crash_round: int | None = None):
+        super().__init__(agent_id, random_seed=agent_id)
+        self.crash_round = crash_round
+
+    def get_bid(self, auction_state, history):
+        if auction_state.round_number == self.crash_round:
+            raise Crash
+        return super().get_bid(auction_state, history)
+
+
+def single_item_environment(crash_round=None) -> AuctionEnvironment:
+    agents = [CrashingAgent(0, crash_round)] + [CrashingAgent(i) for i in range(1, 4)]
+    return AuctionEnvironment(1, 21, agents, value_distribution=AffiliatedValues(weight=0.7))
+
+
+def multi_item_environment() -> MultiItemAuctionEnvironment:
+    items = [Item(item_id=i) for i in range(3)]
+    return MultiItemAuctionEnvironment(1, items, [RandomAgent(i, random_seed=i) for i in range(3)], random_seed=21)
+
+
+def budgeted_environment() -> AuctionEnvironment:
+    agents = [MultiplicativePacingAgent(0, 400, pacing_interval=30), ThrottlingAgent(1, 400, random_seed=1)]
+    agents += [RandomAgent(2, random_seed=2)]
+    return AuctionEnvironment(1, 21, agents, budgets={0: 1500.0, 1: 1500.0, 2: 2000.0})
+
+
+class TestCheckpoint(unittest.TestCase):
+    def setUp(self):
+        temporary = tempfile.TemporaryDirectory()
+        self.addCleanup(temporary.cleanup)
+        self.directory = temporary.name
+
+    def test_resume_after_crash_is_bit_identical(self):
+        expected = list(single_item_environment().run_simulation(50))
+
+        for every in (1, 7):
+            directory = os.path.join(self.directory, str(every))
+            with Checkpointer(directory, every=every) as checkpoint:
+                with self.assertRaises(Crash):
+                    single_item_environment(crash_round=31).run_simulation(50, checkpoint=checkpoint)
+            with Checkpointer(directory, every=every) as checkpoint:
+                resumed = single_item_environment().run_simulation(50, checkpoint=checkpoint)
+            self.assertEqual(list(resumed), expected)
+
+    def test_resume_keeps_budgets_and_pacing(self):
+        reference = budgeted_environment()
+        expected = list(reference.run_simulation(400))
+
+        with Checkpointer(self.directory) as checkpoint:
+            budgeted_environment().run_simulation(250, checkpoint=checkpoint)
+        with Checkpointer(self.directory) as checkpoint:
+            env = budgeted_environment()
+            resumed = env.run_simulation(400, checkpoint=checkpoint)
+        self.assertEqual(list(resumed), expected)
+        self.assertEqual(env.remaining_budgets, reference.remaining_budgets)
+
+    def test_streaming_resume_yields_only_new_rounds(self):
+        env = single_item_environment()
+        with Checkpointer(self.directory) as checkpoint:
+            stream = env.iter_simulation(20, history_window=5, checkpoint=checkpoint)
+            first = [next(stream) for _ in range(8)]
+        with Checkpointer(self.directory) as checkpoint:
+            rest = list(single_item_environment().iter_simulation(20, history_window=5, checkpoint=checkpoint))
+        self.assertEqual(first + rest, list(single_item_environment().run_simulation(20)))
+
+    def test_bulk_multi_item_resume(self):
+        expected = multi_item_environment().run_simulation(3000)
+        with Checkpointer(self.directory) as checkpoint:
+            stream = multi_item_environment().iter_simulation(3000, checkpoint=checkpoint)
+            for _ in range(1500):
+                next(stream)
+        with Checkpointer(self.directory) as checkpoint:
+            resumed = multi_item_environment().run_simulation(3000, checkpoint=checkpoint)
+        self.assertEqual(resumed, expected)
+
+    def test_mismatched_environment_is_rejected(self):
+        with Checkpointer(self.directory) as checkpoint:
+            single_item_environment().run_simulation(3, checkpoint=checkpoint)
+        other = AuctionEnvironment(2, 21, [RandomAgent(0)])
+        with Checkpointer(self.directory) as checkpoint:
+            with self.assertRaises(CheckpointError):
+                other.run_simulation(3, checkpoint=checkpoint)
+
+
+if __name__ == "__main__":
+    unittest.main()
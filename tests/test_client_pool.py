@@ -0,0 +1,144 @@
+import asyncio
+import io
+import os
+import unittest
+from contextlib import redirect_stdout
+from unittest.mock import patch
+
+import anthropic
+
+from agents.client_pool import ClientManager, RateLimiter, estimate_input_tokens
+from agents.llm_agent import LLMAgent
+from simulation.data_models import AuctionState
+from tests.fake_model_server import FakeModelServer, FakeThrottlingServer
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestRateLimiter(unittest.TestCase):
+    def test_request_bucket_paces_requests(self):
+        clock = FakeClock()
+        limiter = RateLimiter(requests_per_minute=60, clock=clock)
+        self.assertEqual(limiter._reserve(0), 0.0)
+        self.assertAlmostEqual(limiter._reserve(0), 1.0)
+        clock.now = 1.0
+        self.assertEqual(limiter._reserve(0), 0.0)
+
+    def test_token_bucket_settles_actual_usage(self):
+        clock = FakeClock()
+        limiter = RateLimiter(tokens_per_minute=6000, clock=clock)  # 100 tokens per second
+        self.assertEqual(limiter._reserve(50), 0.0)
+        limiter.record_success(estimated_tokens=50, used_tokens=250)  # 50 - 200 = 150 in debt
+        self.assertAlmostEqual(limiter._reserve(50), 2.0)
+        clock.now = 2.0
+        self.assertEqual(limiter._reserve(50), 0.0)
+
+    def test_throttle_pauses_and_halves_rate(self):
+        clock = FakeClock()
+        limiter = RateLimiter(requests_per_minute=600, clock=clock)
+        limiter.record_throttle(retry_after=3.0)
+        self.assertEqual(limiter.scale, 0.5)
+        self.assertAlmostEqual(limiter._reserve(0), 3.0)
+        clock.now = 3.0
+        self.assertEqual(limiter._reserve(0), 0.0)
+        limiter.record_success(0, None)
+        self.assertAlmostEqual(limiter.scale, 0.55)
+
+    def test_estimate_input_tokens(self):
+        params = {"system": "x" * 40, "messages": [{"role": "user", "content": "y" * 400}]}
+        self.assertEqual(estimate_input_tokens(params), 111)
+
+
+@patch.dict(os.environ, {"ANTHROPIC_API_KEY": "test-key"})
+class TestClientManager(unittest.TestCase):
+    state = AuctionState(agent_id=0, private_value=50.0, round_number=1)
+
+    def test_agents_share_connection_pool_and_limiter(self):
+        manager = ClientManager()
+        agents = [LLMAgent(agent_id=i, client_manager=manager) for i in range(3)]
+        self.assertIsNot(agents[0].client, agents[1].client)
+        self.assertIs(agents[0].client._client, agents[1].client._client)
+        self.assertIs(agents[0].rate_limiter, agents[2].rate_limiter)
+        self.assertEqual(agents[0].client.max_retries, 0)
+        other = LLMAgent(agent_id=3, client_manager=manager, base_url="http://127.0.0.1:1")
+        self.assertIsNot(other.client._client, agents[0].client._client)
+        self.assertIsNot(other.rate_limiter, agents[0].rate_limiter)
+        manager.close()
+
+    def test_dotenv_loaded_once_on_first_agent(self):
+        with patch("agents.client_pool.load_dotenv") as load_dotenv:
+            manager = ClientManager()
+            self.assertEqual(load_dotenv.call_count, 0)
+            LLMAgent(agent_id=0, client_manager=manager)
+            LLMAgent(agent_id=1, client_manager=manager)
+        self.assertEqual(load_dotenv.call_count, 1)
+
+    def test_missing_api_key(self):
+        with patch.dict(os.environ, {"ANTHROPIC_API_KEY": ""}), patch("agents.client_pool.load_dotenv"):
+            with self.assertRaises(ValueError):
+                LLMAgent(agent_id=0, client_manager=ClientManager())
+
+    def test_retries_throttled_requests(self):
+        with FakeThrottlingServer(reply=lambda request: "BID: 7", throttled_requests=2) as server:
+            agent = LLMAgent(agent_id=0, base_url=server.base_url, client_manager=ClientManager())
+            with redirect_stdout(io.StringIO()):
+                bid = agent.get_bid(self.state, [])
+        self.assertEqual(bid.bid_amount, 7.0)
+        self.assertEqual(server.throttled, 2)
+        self.assertEqual(len(server.requests), 1)
+        self.assertEqual(agent.rate_limiter.throttled, 2)
+        self.assertAlmostEqual(agent.rate_limiter.scale, 0.3)
+
+    def test_async_retries_throttled_requests(self):
+        with FakeThrottlingServer(reply=lambda request: "BID: 9", status=529) as server:
+            agent = LLMAgent(agent_id=0, base_url=server.base_url, client_manager=ClientManager())
+
+            async def bid_twice():
+                first = await agent.get_bid_async(self.state, [])
+                second = await agent.get_bid_async(self.state, [])
+                self.assertIs(agent.async_client, agent.async_client)
+                return first, second
+
+            with redirect_stdout(io.StringIO()):
+                bids = asyncio.run(bid_twice())
+        self.assertEqual([bid.bid_amount for bid in bids], [9.0, 9.0])
+        self.assertEqual(agent.rate_limiter.throttled, 1)
+
+    def test_gives_up_after_max_attempts(self):
+        manager = ClientManager(max_attempts=2)
+        with FakeThrottlingServer(throttled_requests=5) as server:
+            agent = LLMAgent(agent_id=0, base_url=server.base_url, client_manager=manager)
+            with redirect_stdout(io.StringIO()), self.assertRaises(anthropic.RateLimitError):
+                agent.get_bid(self.state, [])
+        self.assertEqual(server.throttled, 2)
+
+    def test_client_errors_are_not_retried(self):
+        with FakeThrottlingServer(status=400) as server:
+            agent = LLMAgent(agent_id=0, base_url=server.base_url, client_manager=ClientManager())
+            with redirect_stdout(io.StringIO()), self.assertRaises(anthropic.BadRequestError):
+                agent.get_bid(self.state, [])
+        self.assertEqual(server.throttled, 1)
+
+    def test_concurrent_agents_share_quota(self):
+        manager = ClientManager(requests_per_minute=6000)
+        with FakeModelServer(reply=lambda request: "BID: 3") as server:
+            agents = [LLMAgent(agent_id=i, base_url=server.base_url, client_manager=manager) for i in range(4)]
+            states = [AuctionState(agent_id=i, private_value=50.0, round_number=1) for i in range(4)]
+
+            async def all_bids():
+                return await asyncio.gather(*(agent.get_bid_async(state, []) for agent, state in zip(agents, states)))
+
+            with redirect_stdout(io.StringIO()):
+                bids = asyncio.run(all_bids())
+        self.assertEqual([bid.bid_amount for bid in bids], [3.0] * 4)
+        self.assertEqual(len(server.requests), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
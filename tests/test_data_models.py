@@ -0,0 +1,42 @@
+import dataclasses
+import pickle
+import unittest
+
+import numpy as np
+
+from simulation.data_models import AuctionResult, Bid, BidBatch, ItemBid
+
+
+class TestRecords(unittest.TestCase):
+    def test_records_are_slotted_and_frozen(self):
+        bid = Bid(agent_id=1, bid_amount=2.0)
+        self.assertFalse(hasattr(bid, "__dict__"))
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            bid.bid_amount = 3.0
+        result = AuctionResult(auction_id=1, winning_agent_id=1, round_number=1, winning_bid=2.0, all_bids=[bid])
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            result.private_values = {1: 5.0}
+        self.assertEqual(pickle.loads(pickle.dumps(result)), result)
+
+
+class TestBidBatch(unittest.TestCase):
+    def test_behaves_like_a_list_of_bids(self):
+        bids = [ItemBid(agent_id=a, item_id=i, bid_amount=a + i / 10) for a in range(3) for i in range(2)]
+        batch = BidBatch.from_bids(bids)
+        self.assertEqual(len(batch), 6)
+        self.assertEqual(list(batch), bids)
+        self.assertEqual(batch[-1], bids[-1])
+        self.assertEqual(batch[1:4], bids[1:4])
+        self.assertTrue(bids == batch)
+        self.assertNotEqual(batch, bids[:-1])
+        self.assertEqual(pickle.loads(pickle.dumps(batch)), bids)
+
+    def test_single_item_bids(self):
+        batch = BidBatch(np.array([4, 2]), np.array([1.5, 0.0]))
+        self.assertEqual(list(batch), [Bid(4, 1.5), Bid(2, 0.0)])
+        self.assertIsInstance(batch[0].agent_id, int)
+        self.assertEqual(BidBatch.from_bids([]), [])
+
+    def test_rejects_ragged_columns(self):
+        with self.assertRaises(ValueError):
+            BidBatch(np.arange(3), np.zeros(2))
@@ -1,8 +1,32 @@
-from simulation.auction_environment import AuctionEnvironment
-from simulation.data_models import Bid, AuctionResult, AuctionState
+from simulation.auction_environment import AuctionEnvironment, MultiItemAuctionEnvironment
+from simulation.data_models import Bid, AuctionResult, AuctionState, Item
 from agents.random_agent import RandomAgent
+from agents.shading_agent import BayesNashAgent, ShadingAgent
+from agents.pacing_agent import MultiplicativePacingAgent, ThrottlingAgent
+import numpy as np
 import unittest
 
+
+class PerRoundRandomAgent(RandomAgent):
+    """RandomAgent forced onto the per-round path."""
+
+    def get_bid(self, auction_state, history):
+        return super().get_bid(auction_state, history)
+
+    def get_item_bids(self, auction_state, history):
+        return super().get_item_bids(auction_state, history)
+
+
+class PerRoundMultiplicativePacingAgent(MultiplicativePacingAgent):
+    def get_bid(self, auction_state, history):
+        return super().get_bid(auction_state, history)
+
+
+class PerRoundThrottlingAgent(ThrottlingAgent):
+    def get_bid(self, auction_state, history):
+        return super().get_bid(auction_state, history)
+
+
 class TestAuctionEnvironment(unittest.TestCase):
     def test_simulation_completes_with_correct_rounds(self):
         agents = [RandomAgent(agent_id=i) for i in range(3)]
@@ -54,4 +78,152 @@ class TestAuctionEnvironment(unittest.TestCase):
             for agent in agents:
                 received_history = agent.received_history_in_round.get(round_number, [])
                 self.assertEqual(received_history, round_number - 1)
-        
+
+
+    def test_each_agent_gets_its_own_state(self):
+        class StateSpy(PerRoundRandomAgent):
+            def get_bid(self, auction_state, history):
+                self.seen = auction_state
+                return Bid(agent_id=self.agent_id, bid_amount=auction_state.private_value)
+
+        class ItemStateSpy(PerRoundRandomAgent):
+            def get_item_bids(self, auction_state, history):
+                self.seen = auction_state
+                return super().get_item_bids(auction_state, history)
+
+        agents = [StateSpy(agent_id=i) for i in (7, 2, 5)]
+        env = AuctionEnvironment(auction_id=1, random_seed=3, agents=agents)
+        result = env.run_simulation(num_rounds=2)[-1]
+        for agent in agents:
+            self.assertEqual(agent.seen.agent_id, agent.agent_id)
+            self.assertEqual(agent.seen.round_number, 2)
+            self.assertEqual(agent.seen.private_value, result.private_values[agent.agent_id])
+
+        agents = [ItemStateSpy(agent_id=i) for i in (7, 2, 5)]
+        env = MultiItemAuctionEnvironment(1, [Item(item_id=0), Item(item_id=1)], agents, random_seed=3)
+        result = env.run_simulation(num_rounds=2)[-1]
+        for agent in agents:
+            self.assertEqual(agent.seen.agent_id, agent.agent_id)
+            self.assertIs(agent.seen.private_values, result.private_values[agent.agent_id])
+
+
+class TestBulkBidding(unittest.TestCase):
+    def test_bulk_path_matches_per_round_path(self):
+        bulk = AuctionEnvironment(1, 11, [RandomAgent(i, random_seed=i) for i in range(4)]).run_simulation(200)
+        per_round = AuctionEnvironment(1, 11, [PerRoundRandomAgent(i, random_seed=i) for i in range(4)]).run_simulation(200)
+        self.assertEqual(list(bulk), list(per_round))
+
+    def test_multi_item_bulk_path_matches_per_round_path(self):
+        def run(agent_class):
+            items = [Item(item_id=i) for i in range(3)]
+            agents = [agent_class(i, random_seed=i) for i in range(4)]
+            return MultiItemAuctionEnvironment(1, items, agents, random_seed=11).run_simulation(50)
+
+        self.assertEqual(run(RandomAgent), run(PerRoundRandomAgent))
+
+    def test_ties_are_broken_like_per_round_path(self):
+        # Equal Bayes-Nash bidders on a common value tie every round
+        agents = [BayesNashAgent(i, num_bidders=3) for i in range(3)]
+        env = AuctionEnvironment(1, 5, agents)
+        env.value_sampler.next_rounds = lambda num_rounds, num_agents, num_items: np.full(
+            (num_rounds, num_agents, num_items), 30.0
+        )
+        winners = env.run_simulation(20).winning_agent_ids.tolist()
+
+        class PerRoundBayesNash(BayesNashAgent):
+            def get_bid(self, auction_state, history):
+                return super().get_bid(auction_state, history)
+
+        reference = AuctionEnvironment(1, 5, [PerRoundBayesNash(i, num_bidders=3) for i in range(3)])
+        reference.value_sampler.next_rounds = env.value_sampler.next_rounds
+        self.assertEqual(reference.run_simulation(20).winning_agent_ids.tolist(), winners)
+        self.assertGreater(len(set(winners)), 1)
+
+
+class TestBudgets(unittest.TestCase):
+    def paced_environment(self, per_round: bool, budget_policy: str = "clip") -> AuctionEnvironment:
+        multiplicative = PerRoundMultiplicativePacingAgent if per_round else MultiplicativePacingAgent
+        throttling = PerRoundThrottlingAgent if per_round else ThrottlingAgent
+        agents = [
+            multiplicative(0, 600, pacing_interval=40),
+            throttling(1, 600, pacing_interval=60, random_seed=1),
+            multiplicative(2, 600, pacing_interval=60, learning_rate=1.0),
+            ShadingAgent(3, shading_factor=0.5),
+        ]
+        return AuctionEnvironment(
+            1, 7, agents, budgets={0: 1500.0, 1: 2000.0, 2: 2500.0, 3: 800.0}, budget_policy=budget_policy
+        )
+
+    def test_bulk_path_matches_per_round_path(self):
+        for budget_policy in ("clip", "reject"):
+            bulk = self.paced_environment(per_round=False, budget_policy=budget_policy)
+            per_round = self.paced_environment(per_round=True, budget_policy=budget_policy)
+            self.assertTrue(bulk._bids_in_bulk())
+            self.assertFalse(per_round._bids_in_bulk())
+            self.assertEqual(list(bulk.run_simulation(600)), list(per_round.run_simulation(600)))
+            self.assertEqual(bulk.remaining_budgets, per_round.remaining_budgets)
+
+    def test_budgets_are_never_exceeded(self):
+        env = self.paced_environment(per_round=False)
+        results = env.run_simulation(600)
+        for agent_id, budget in {0: 1500.0, 1: 2000.0, 2: 2500.0, 3: 800.0}.items():
+            spent = results.winning_bids[results.winning_agent_ids == agent_id].sum()
+            self.assertGreaterEqual(env.remaining_budgets[agent_id], 0.0)
+            self.assertAlmostEqual(env.remaining_budgets[agent_id], budget - spent)
+
+    def test_bids_above_the_budget_are_clipped_or_rejected(self):
+        for budget_policy, expected in (("clip", [50.0, 50.0, 20.0, 0.0]), ("reject", [50.0, 50.0, 0.0, 0.0])):
+            env = AuctionEnvironment(
+                1, 0, [ShadingAgent(0, shading_factor=0.5)], budgets={0: 120.0}, budget_policy=budget_policy
+            )
+            env.value_sampler.next_rounds = lambda num_rounds, num_agents, num_items: np.full(
+                (num_rounds, num_agents, num_items), 100.0
+            )
+            self.assertEqual(env.run_simulation(4).bid_amount.tolist(), expected)
+
+    def test_agents_see_their_remaining_budget(self):
+        agent = PerRoundMultiplicativePacingAgent(0, 10)
+        env = AuctionEnvironment(1, 3, [agent, PerRoundRandomAgent(1, random_seed=1)], budgets={0: 100.0})
+        results = env.run_simulation(5)
+        paid = sum(result.winning_bid for result in results if result.winning_agent_id == 0)
+        state = env._setup_round(6)
+        self.assertEqual(state[0].remaining_budget, 100.0 - paid)
+        self.assertEqual(state[1].remaining_budget, float("inf"))
+        self.assertIsNone(AuctionEnvironment(1, 3, [agent])._setup_round(1)[0].remaining_budget)
+
+    def test_pacing_simulation_matches_full_run(self):
+        run = self.paced_environment(per_round=False).run_pacing_simulation(600)
+        env = self.paced_environment(per_round=False)
+        results = env.run_simulation(600)
+        for column, agent_id in enumerate(run.agent_ids.tolist()):
+            mine = results.agent_id == agent_id
+            paid = results.winning_bids[results.winning_agent_ids == agent_id]
+            self.assertAlmostEqual(run.spend[column], paid.sum())
+            self.assertEqual(run.wins[column], results.won[mine].sum())
+            self.assertAlmostEqual(run.utility[column], results.utility[mine].sum())
+        np.testing.assert_array_equal(run.remaining[-1], list(env.remaining_budgets.values()))
+        self.assertEqual(run.round_ends[-1], 600)
+        self.assertTrue((np.diff(run.round_ends) <= 20).all())
+
+    def test_pacing_spreads_the_budget_over_the_run(self):
+        def spend(make_agent):
+            env = AuctionEnvironment(1, 3, [make_agent(i) for i in range(4)], budgets={i: 3000.0 for i in range(4)})
+            run = env.run_pacing_simulation(2000)
+            middle = np.searchsorted(run.round_ends, 1000)
+            return run.budgets - run.remaining[middle], run.spend
+
+        # Unpaced bidders run out of budget in the first half of the run
+        first_half, total = spend(lambda agent_id: ShadingAgent(agent_id))
+        np.testing.assert_array_equal(first_half, total)
+        # Paced ones still spend a good part of it in the second half
+        for make_agent in (
+            lambda agent_id: MultiplicativePacingAgent(agent_id, 2000, pacing_interval=50),
+            lambda agent_id: ThrottlingAgent(agent_id, 2000, pacing_interval=50, random_seed=agent_id),
+        ):
+            first_half, total = spend(make_agent)
+            self.assertTrue((first_half < 0.7 * total).all())
+            self.assertTrue((total > 0.9 * 3000.0).all())
+
+    def test_rejects_unknown_policy(self):
+        with self.assertRaises(ValueError):
+            AuctionEnvironment(1, 0, [], budget_policy="spread")
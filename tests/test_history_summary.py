@@ -0,0 +1,78 @@
+import unittest
+from collections import deque
+
+from agents.history_summary import HistorySummary
+from simulation.data_models import AuctionResult, Bid
+
+
+def make_result(round_number: int, own_bid: float, other_bid: float) -> AuctionResult:
+    winner = 0 if own_bid > other_bid else 1
+    return AuctionResult(
+        auction_id=1,
+        winning_agent_id=winner,
+        round_number=round_number,
+        winning_bid=max(own_bid, other_bid),
+        all_bids=[Bid(agent_id=0, bid_amount=own_bid), Bid(agent_id=1, bid_amount=other_bid)],
+        private_values={0: 2 * own_bid, 1: 100.0}
+    )
+
+
+class TestHistorySummary(unittest.TestCase):
+    def setUp(self):
+        self.history = [
+            make_result(1, own_bid=30.0, other_bid=20.0),
+            make_result(2, own_bid=10.0, other_bid=40.0),
+            make_result(3, own_bid=50.0, other_bid=45.0),
+        ]
+
+    def test_running_statistics(self):
+        summary = HistorySummary(agent_id=0, window=2)
+        summary.sync(self.history)
+
+        self.assertEqual(summary.rounds_seen, 3)
+        self.assertEqual(summary.wins, 2)
+        self.assertAlmostEqual(summary.win_rate, 2 / 3)
+        self.assertAlmostEqual(summary.average_winning_bid, 40.0)
+        self.assertAlmostEqual(summary.average_shading, 0.5)
+        self.assertEqual([outcome.round_number for outcome in summary.recent], [2, 3])
+        self.assertEqual(summary.recent[-1].own_bid, 50.0)
+        self.assertTrue(summary.recent[-1].won)
+
+    def test_sync_only_reads_new_rounds(self):
+        summary = HistorySummary(agent_id=0)
+        history = []
+        for result in self.history:
+            summary.sync(history)
+            history.append(result)
+        summary.sync(history)
+        summary.sync(history)
+        self.assertEqual(summary.rounds_seen, 3)
+        self.assertEqual(summary.last_round, 3)
+
+    def test_sync_with_bounded_window(self):
+        summary = HistorySummary(agent_id=0)
+        window = deque(maxlen=2)
+        for result in self.history:
+            window.append(result)
+            summary.sync(window)
+        self.assertEqual(summary.rounds_seen, 3)
+        self.assertEqual(summary.wins, 2)
+
+    def test_new_simulation_resets(self):
+        summary = HistorySummary(agent_id=0)
+        summary.sync(self.history)
+        summary.sync([])
+        self.assertEqual(summary.rounds_seen, 0)
+        summary.sync(self.history[:1])
+        self.assertEqual(summary.rounds_seen, 1)
+
+    def test_absent_agent(self):
+        summary = HistorySummary(agent_id=7)
+        summary.sync(self.history)
+        self.assertEqual(summary.wins, 0)
+        self.assertIsNone(summary.average_shading)
+        self.assertIsNone(summary.recent[0].own_bid)
+
+
+if __name__ == "__main__":
+    unittest.main()
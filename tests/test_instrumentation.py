@@ -0,0 +1,131 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+import urllib.request
+from contextlib import redirect_stdout
+from unittest.mock import patch
+
+from agents.bid_parsing import BidPolicy
+from agents.llm_agent import LLMAgent
+from agents.random_agent import RandomAgent
+from simulation.auction_environment import AuctionEnvironment, MultiItemAuctionEnvironment
+from simulation.data_models import Item
+from simulation.instrumentation import NULL_INSTRUMENTATION, Instrumentation
+from tests.fake_model_server import FakeModelServer
+
+
+class PerRoundRandomAgent(RandomAgent):
+    def get_bid(self, auction_state, history):
+        return super().get_bid(auction_state, history)
+
+
+def counters(instrumentation: Instrumentation) -> dict:
+    return {
+        (counter["name"], tuple(sorted(counter["labels"].items()))): counter["value"]
+        for counter in instrumentation.snapshot()["counters"]
+    }
+
+
+def summaries(instrumentation: Instrumentation) -> dict:
+    return {
+        (summary["name"], tuple(sorted(summary["labels"].items()))): summary
+        for summary in instrumentation.snapshot()["summaries"]
+    }
+
+
+class TestInstrumentation(unittest.TestCase):
+    def test_counters_and_summaries(self):
+        instrumentation = Instrumentation()
+        instrumentation.increment("bids_total", 3)
+        instrumentation.increment("bids_total", 2)
+        for value in range(1, 101):
+            instrumentation.observe("latency_seconds", value / 100, agent_id=1)
+        with instrumentation.timer("phase_seconds", phase="setup"):
+            pass
+
+        self.assertEqual(counters(instrumentation), {("bids_total", ()): 5})
+        latency = summaries(instrumentation)[("latency_seconds", (("agent_id", "1"),))]
+        self.assertEqual(latency["count"], 100)
+        self.assertAlmostEqual(latency["sum"], 50.5)
+        self.assertEqual(latency["quantiles"], {"0.5": 0.51, "0.9": 0.91, "0.99": 1.0})
+        self.assertEqual(summaries(instrumentation)[("phase_seconds", (("phase", "setup"),))]["count"], 1)
+
+    def test_prometheus_export(self):
+        instrumentation = Instrumentation()
+        instrumentation.increment("auction_bids_total", 4)
+        instrumentation.observe("llm_phase_seconds", 0.25, agent_id=0, phase="api")
+        text = instrumentation.to_prometheus()
+        self.assertIn("# TYPE auction_bids_total counter\nauction_bids_total 4\n", text)
+        self.assertIn('llm_phase_seconds{agent_id="0",phase="api",quantile="0.5"} 0.25\n', text)
+        self.assertIn('llm_phase_seconds_count{agent_id="0",phase="api"} 1\n', text)
+
+        with instrumentation.serve() as server:
+            with urllib.request.urlopen(server.url) as response:
+                self.assertEqual(response.read().decode(), instrumentation.to_prometheus())
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "metrics.json")
+            instrumentation.write_json(path)
+            with open(path) as f:
+                self.assertEqual(json.load(f)["counters"][0]["value"], 4)
+
+    def test_null_instrumentation_records_nothing(self):
+        with NULL_INSTRUMENTATION.timer("phase_seconds", phase="setup"):
+            NULL_INSTRUMENTATION.increment("bids_total")
+        self.assertEqual(NULL_INSTRUMENTATION.snapshot()["counters"], [])
+        self.assertEqual(NULL_INSTRUMENTATION.snapshot()["summaries"], [])
+
+
+class TestEnvironmentInstrumentation(unittest.TestCase):
+    def test_per_round_phases(self):
+        instrumentation = Instrumentation()
+        agents = [PerRoundRandomAgent(i, random_seed=i) for i in range(3)]
+        AuctionEnvironment(1, 0, agents, instrumentation=instrumentation).run_simulation(10)
+
+        phases = summaries(instrumentation)
+        for phase in ("setup", "bidding", "settlement", "recording"):
+            self.assertEqual(phases[("auction_phase_seconds", (("phase", phase),))]["count"], 10)
+        self.assertEqual(counters(instrumentation), {("auction_bids_total", ()): 30, ("auction_rounds_total", ()): 10})
+
+    def test_bulk_counters(self):
+        instrumentation = Instrumentation()
+        items = [Item(item_id=i) for i in range(2)]
+        env = MultiItemAuctionEnvironment(1, items, [RandomAgent(i) for i in range(3)], instrumentation=instrumentation)
+        env.run_simulation(50)
+        self.assertEqual(counters(instrumentation), {("auction_bids_total", ()): 300, ("auction_rounds_total", ()): 50})
+
+    def test_disabled_by_default(self):
+        env = AuctionEnvironment(1, 0, [RandomAgent(0)])
+        self.assertIs(env.instrumentation, NULL_INSTRUMENTATION)
+        self.assertIs(env.agents[0].instrumentation, NULL_INSTRUMENTATION)
+
+
+@patch.dict(os.environ, {"ANTHROPIC_API_KEY": "test-key"})
+class TestLLMAgentInstrumentation(unittest.TestCase):
+    def test_api_latency_tokens_and_parse_failures(self):
+        replies = iter(["BID: 12", "I would rather not say."])
+        instrumentation = Instrumentation()
+        with FakeModelServer(reply=lambda request: next(replies)) as server:
+            agent = LLMAgent(
+                agent_id=0, base_url=server.base_url, bid_policy=BidPolicy(max_retries=0, fallback_fraction=None)
+            )
+            env = AuctionEnvironment(1, 0, [agent], instrumentation=instrumentation)
+            with redirect_stdout(io.StringIO()):
+                env.run_simulation(1)
+                with self.assertRaises(ValueError):
+                    env.run_simulation(1)
+
+        labels = (("agent_id", "0"),)
+        self.assertEqual(counters(instrumentation)[("llm_calls_total", labels)], 2)
+        self.assertEqual(counters(instrumentation)[("llm_input_tokens_total", labels)], 20)
+        self.assertEqual(counters(instrumentation)[("llm_output_tokens_total", labels)], 10)
+        self.assertEqual(counters(instrumentation)[("llm_parse_failures_total", labels)], 1)
+        phases = summaries(instrumentation)
+        self.assertEqual(phases[("llm_phase_seconds", (("agent_id", "0"), ("phase", "api")))]["count"], 2)
+        self.assertEqual(phases[("llm_phase_seconds", (("agent_id", "0"), ("phase", "prompt")))]["count"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -28,4 +28,26 @@ class TestLLMAgent(unittest.TestCase):
         bid = self.agent.get_bid(auction_state, history)
         self.assertIsInstance(bid, Bid)
         self.assertEqual(bid.agent_id, 0)
-        self.assertAlmostEqual(bid.bid_amount, 50.6)
\ No newline at end of file
+        self.assertAlmostEqual(bid.bid_amount, 50.6)
+
+    def test_prompt_size_is_bounded_by_window(self):
+        def history_of(num_rounds):
+            return [
+                AuctionResult(
+                    auction_id=1,
+                    winning_agent_id=1,
+                    round_number=r,
+                    winning_bid=60.0,
+                    all_bids=[Bid(agent_id=0, bid_amount=40.0), Bid(agent_id=1, bid_amount=60.0)],
+                    private_values={0: 80.0, 1: 90.0}
+                )
+                for r in range(1, num_rounds + 1)
+            ]
+
+        short_prompt = self.agent._format_prompt(AuctionState(agent_id=0, round_number=11, private_value=70.0), history_of(10))
+        self.agent.history_summary.reset()
+        long_prompt = self.agent._format_prompt(AuctionState(agent_id=0, round_number=501, private_value=70.0), history_of(500))
+        self.assertLessEqual(len(long_prompt), len(short_prompt) + 50)
+        self.assertIn("Summary of the 500 previous auctions", long_prompt)
+        self.assertIn("In round 500, the winning bid was 60.0.", long_prompt)
+        self.assertNotIn("In round 495,", long_prompt)
@@ -0,0 +1,113 @@
+import random
+import unittest
+
+import numpy as np
+
+from agents.random_agent import RandomAgent
+from simulation.auction_logic import run_multi_item_auction
+from simulation.data_models import Item
+from simulation.multi_market import MultiMarketEnvironment
+from tests.test_environment import PerRoundRandomAgent
+
+
+def make_agents(agent_class=RandomAgent, count=4):
+    return [agent_class(agent_id=10 + i, random_seed=i) for i in range(count)]
+
+
+def spend_by_agent(results):
+    spend = {}
+    for result in results:
+        for market_id, agent_id in result.allocations.items():
+            if agent_id >= 0:
+                spend[agent_id] = spend.get(agent_id, 0.0) + result.prices[market_id]
+    return spend
+
+
+class TestMultiMarketEnvironment(unittest.TestCase):
+    def setUp(self):
+        self.markets = [Item(item_id=100 + k) for k in range(30)]
+
+    def test_ticks_settle_like_run_multi_item_auction(self):
+        env = MultiMarketEnvironment(1, self.markets, make_agents(), random_seed=3)
+        for result in env.run_simulation(20):
+            expected = run_multi_item_auction(list(result.all_bids), self.markets, 1, random.Random(0))
+            self.assertEqual(result.allocations, expected.allocations)
+            self.assertEqual(result.prices, expected.prices)
+            self.assertEqual(len(result.all_bids), 4 * 30)
+
+    def test_per_round_agents_match_bulk_agents(self):
+        bulk = MultiMarketEnvironment(1, self.markets, make_agents(), random_seed=5).run_simulation(10)
+        per_round = MultiMarketEnvironment(1, self.markets, make_agents(PerRoundRandomAgent), random_seed=5)
+        for expected, result in zip(bulk, per_round.run_simulation(10)):
+            self.assertEqual(result.allocations, expected.allocations)
+            self.assertEqual(result.all_bids, expected.all_bids)
+
+    def test_only_participants_bid(self):
+        participation = np.random.default_rng(0).random((4, 30)) < 0.3
+        env = MultiMarketEnvironment(1, self.markets, make_agents(), random_seed=1, participation=participation)
+        allowed = {(10 + a, 100 + m) for a, m in zip(*np.nonzero(participation))}
+        for result in env.run_simulation(10):
+            self.assertEqual({(bid.agent_id, bid.item_id) for bid in result.all_bids}, allowed)
+            for market_id, agent_id in result.allocations.items():
+                self.assertTrue(agent_id == -1 or (agent_id, market_id) in allowed)
+
+    def test_budgets_are_never_exceeded(self):
+        budgets = {10: 50.0, 11: 500.0, 12: 5000.0}  # agent 13 has no budget
+        for budget_policy in ("clip", "reject"):
+            env = MultiMarketEnvironment(
+                1, self.markets, make_agents(), random_seed=2, budgets=budgets, budget_policy=budget_policy
+            )
+            results = env.run_simulation(40)
+            spend = spend_by_agent(results)
+            for agent_id, budget in budgets.items():
+                self.assertLessEqual(spend.get(agent_id, 0.0), budget * (1 + 1e-9))
+                self.assertAlmostEqual(env.remaining_budgets[agent_id], budget - spend.get(agent_id, 0.0))
+            if budget_policy == "clip":
+                self.assertAlmostEqual(env.remaining_budgets[10], 0.0)
+            self.assertEqual(env.remaining_budgets[13], np.inf)
+            for result in results:
+                for bid in result.all_bids:
+                    if result.allocations[bid.item_id] == bid.agent_id:
+                        self.assertEqual(result.prices[bid.item_id], bid.bid_amount)
+
+    def test_sharded_run(self):
+        budgets = {10: 300.0, 11: 300.0}
+
+        def run():
+            env = MultiMarketEnvironment(
+                1, self.markets, make_agents(), random_seed=4, budgets=budgets, num_shards=3, sync_ticks=5
+            )
+            return env, env.run_simulation(12) + env.run_simulation(3)
+
+        env, results = run()
+        self.assertEqual([result.round_number for result in results], list(range(1, 13)) + [1, 2, 3])
+        self.assertEqual(list(results[0].allocations), [market.item_id for market in self.markets])
+        spend = spend_by_agent(results)
+        for agent_id, budget in budgets.items():
+            self.assertLessEqual(spend[agent_id], budget * (1 + 1e-9))
+        _, repeated = run()
+        self.assertEqual([r.allocations for r in repeated], [r.allocations for r in results])
+
+    def test_sharded_run_stopped_early_keeps_shard_state(self):
+        def make_env():
+            return MultiMarketEnvironment(1, self.markets, make_agents(), random_seed=6, num_shards=2, sync_ticks=5)
+
+        env = make_env()
+        ticks = env.iter_simulation(12)
+        for _ in range(3):
+            next(ticks)
+        ticks.close()
+        # The first chunk of 5 ticks was played in full
+        expected_env = make_env()
+        expected_env.run_simulation(5)
+        self.assertEqual(
+            [r.all_bids for r in env.run_simulation(3)], [r.all_bids for r in expected_env.run_simulation(3)]
+        )
+
+    def test_sharding_needs_bid_batch(self):
+        with self.assertRaises(ValueError):
+            MultiMarketEnvironment(1, self.markets, make_agents(PerRoundRandomAgent), num_shards=2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+from functools import partial
+
+from agents.random_agent import RandomAgent
+from simulation.auction_environment import AuctionEnvironment, MultiItemAuctionEnvironment
+from simulation.data_models import Item
+from simulation.parallel_runner import ExperimentConfig, run_experiment, run_experiments
+
+
+def build_single_item(seed: int, num_agents: int) -> AuctionEnvironment:
+    agents = [RandomAgent(agent_id=i, random_seed=seed + i) for i in range(num_agents)]
+    return AuctionEnvironment(auction_id=1, random_seed=seed, agents=agents)
+
+
+def build_multi_item(seed: int) -> MultiItemAuctionEnvironment:
+    agents = [RandomAgent(agent_id=i, random_seed=seed + i) for i in range(3)]
+    items = [Item(item_id=i) for i in range(3)]
+    return MultiItemAuctionEnvironment(auction_id=2, items=items, agents=agents, random_seed=seed)
+
+
+def total_winning_bids(results) -> float:
+    return sum(result.winning_bid for result in results)
+
+
+class TestParallelRunner(unittest.TestCase):
+    def setUp(self):
+        self.configs = [
+            ExperimentConfig(name="three", build_environment=partial(build_single_item, num_agents=3), num_rounds=20),
+            ExperimentConfig(name="five", build_environment=partial(build_single_item, num_agents=5), num_rounds=20),
+            ExperimentConfig(name="multi", build_environment=build_multi_item, num_rounds=10),
+        ]
+        self.seeds = [1, 2, 3]
+
+    def test_parallel_results_match_serial(self):
+        serial = {
+            (config.name, seed): list(run_experiment(config, seed).results)
+            for config in self.configs
+            for seed in self.seeds
+        }
+        parallel = {
+            (run.config_name, run.seed): list(run.results)
+            for run in run_experiments(self.configs, self.seeds, max_workers=2)
+        }
+        self.assertEqual(parallel, serial)
+
+    def test_summarize_runs_in_worker(self):
+        config = ExperimentConfig(
+            name="summary",
+            build_environment=partial(build_single_item, num_agents=3),
+            num_rounds=5,
+            summarize=total_winning_bids
+        )
+        runs = list(run_experiments([config], [7], max_workers=2))
+        expected = total_winning_bids(build_single_item(7, 3).run_simulation(num_rounds=5))
+        self.assertEqual(len(runs), 1)
+        self.assertEqual(runs[0].results, expected)
+
+    def test_single_worker_runs_in_order(self):
+        runs = list(run_experiments(self.configs[:2], self.seeds, max_workers=1))
+        self.assertEqual(
+            [(run.config_name, run.seed) for run in runs],
+            [(config.name, seed) for config in self.configs[:2] for seed in self.seeds]
+        )
+
+    def test_seeds_from_a_generator_run_for_every_config(self):
+        runs = list(run_experiments(self.configs[:2], (seed for seed in self.seeds), max_workers=1))
+        self.assertEqual(
+            [(run.config_name, run.seed) for run in runs],
+            [(config.name, seed) for config in self.configs[:2] for seed in self.seeds]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+import unittest
+
+from simulation.auction_logic import run_combinatorial_auction
+from simulation.data_models import BundleBid, Item
+from simulation.payment_rules import FirstPricePayment, VCGPayment
+from simulation.winner_determination import (
+    BranchAndBoundWinnerDetermination,
+    GreedyWinnerDetermination,
+)
+from tests.test_winner_determination import random_instance
+
+
+def naive_vcg(bids, items):
+    solver = BranchAndBoundWinnerDetermination()
+    solution = solver.solve(bids, items)
+    payments = {}
+    for bid in solution.accepted_bids:
+        without = solver.solve(bids, items, excluded_agents=frozenset({bid.agent_id})).value
+        payments[bid.agent_id] = without - (solution.value - bid.amount)
+    return solution, payments
+
+
+class TestVCGPayment(unittest.TestCase):
+    def test_textbook_example(self):
+        items = [Item(item_id=0), Item(item_id=1)]
+        bids = [
+            BundleBid(agent_id=0, bundle=frozenset({0, 1}), amount=10.0),
+            BundleBid(agent_id=1, bundle=frozenset({0}), amount=6.0),
+            BundleBid(agent_id=2, bundle=frozenset({1}), amount=7.0),
+        ]
+        result = run_combinatorial_auction(bids, items, auction_id=1, payment_rule=VCGPayment())
+        self.assertEqual(result.allocations, {0: 1, 1: 2})
+        # Without agent 1 the best is agent 0's bundle (10): 10 - 7 = 3
+        self.assertEqual(result.payments, {1: 3.0, 2: 4.0})
+
+    def test_matches_naive_counterfactual_solves(self):
+        for seed in range(5):
+            items, bids = random_instance(seed, num_items=12, num_agents=15, bids_per_agent=6, max_size=4)
+            solution, payments = VCGPayment().settle(bids, items, BranchAndBoundWinnerDetermination())
+            naive_solution, naive_payments = naive_vcg(bids, items)
+            self.assertEqual(solution.value, naive_solution.value)
+            self.assertEqual(payments.keys(), naive_payments.keys())
+            for agent_id, payment in naive_payments.items():
+                self.assertAlmostEqual(payments[agent_id], payment, places=9)
+                self.assertGreaterEqual(payments[agent_id], -1e-9)
+
+    def test_parallel_matches_serial(self):
+        items, bids = random_instance(3, num_items=12, num_agents=15, bids_per_agent=6, max_size=4)
+        solver = BranchAndBoundWinnerDetermination()
+        _, serial = VCGPayment().settle(bids, items, solver)
+        _, parallel = VCGPayment(max_workers=2).settle(bids, items, solver)
+        self.assertEqual(parallel, serial)
+
+    def test_other_solvers_solve_counterfactuals_directly(self):
+        items, bids = random_instance(1, num_items=8, num_agents=6, bids_per_agent=4, max_size=3)
+        solution, payments = VCGPayment().settle(bids, items, GreedyWinnerDetermination())
+        self.assertEqual(set(payments), {bid.agent_id for bid in solution.accepted_bids})
+
+    def test_first_price(self):
+        items, bids = random_instance(4, num_items=6, num_agents=5, bids_per_agent=3, max_size=3)
+        solution, payments = FirstPricePayment().settle(bids, items, BranchAndBoundWinnerDetermination())
+        self.assertEqual(payments, {bid.agent_id: bid.amount for bid in solution.accepted_bids})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+import os
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+from agents.llm_agent import LLMAgent
+from agents.random_agent import RandomAgent
+from agents.response_cache import CacheMissError, ResponseCache
+from simulation.auction_environment import AuctionEnvironment
+from simulation.data_models import AuctionState
+from tests.fake_model_server import FakeModelServer
+
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.directory = self._tmp.name
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_key_depends_on_request_params(self):
+        params = {"model": "m", "system": "s", "messages": [{"role": "user", "content": "p"}]}
+        self.assertEqual(ResponseCache.key(params), ResponseCache.key(dict(reversed(params.items()))))
+        self.assertNotEqual(ResponseCache.key(params), ResponseCache.key({**params, "model": "other"}))
+
+    def test_put_get_and_persistence(self):
+        cache = ResponseCache(self.directory)
+        self.assertIsNone(cache.get("abc"))
+        cache.put("abc", {"content": [{"type": "text", "text": "BID: 3"}]})
+        reopened = ResponseCache(self.directory, replay=True)
+        self.assertEqual(reopened.get("abc"), {"content": [{"type": "text", "text": "BID: 3"}]})
+
+    def test_replay_miss_raises(self):
+        cache = ResponseCache(self.directory, replay=True)
+        with self.assertRaises(CacheMissError):
+            cache.get("missing")
+
+    def test_lru_eviction(self):
+        cache = ResponseCache(self.directory, max_bytes=100)
+        cache.put("a", {"text": "x" * 30})
+        cache.put("b", {"text": "x" * 30})
+        cache.get("a")
+        cache.put("c", {"text": "x" * 30})
+        self.assertIsNotNone(cache.get("a"))
+        self.assertIsNone(cache.get("b"))
+        self.assertLessEqual(cache.total_bytes, 100)
+        self.assertEqual(len(os.listdir(self.directory)), 2)
+
+    def test_shared_across_threads(self):
+        cache = ResponseCache(self.directory, max_bytes=400)
+
+        def work(thread: int):
+            for i in range(200):
+                key = str((thread + i) % 7)
+                cache.put(key, {"text": key * 20})
+                response = cache.get(key)
+                self.assertIn(response, (None, {"text": key * 20}))
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(work, range(8)))
+        files = os.listdir(self.directory)
+        self.assertTrue(all(name.endswith(".json") for name in files))
+        self.assertEqual(len(cache), len(files))
+        self.assertEqual(cache.total_bytes, sum(os.path.getsize(os.path.join(self.directory, f)) for f in files))
+
+
+@patch.dict(os.environ, {"ANTHROPIC_API_KEY": "test-key"})
+class TestLLMAgentReplay(unittest.TestCase):
+    def run_experiment(self, base_url: str, cache: ResponseCache):
+        agents = [LLMAgent(agent_id=i, model="test-model", base_url=base_url, cache=cache) for i in range(2)]
+        agents.append(RandomAgent(agent_id=2, random_seed=5))
+        for agent in agents[:2]:
+            agent.client = agent.client.with_options(max_retries=0)
+        env = AuctionEnvironment(auction_id=1, random_seed=9, agents=agents)
+        return env.run_simulation(num_rounds=5).to_dataframe()
+
+    def test_replay_reproduces_recorded_run_without_api_calls(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with FakeModelServer(reply=lambda request: f"BID: {len(request['messages'][0]['content']) % 40}") as server:
+                recorded = self.run_experiment(server.base_url, ResponseCache(directory))
+                base_url = server.base_url
+            self.assertEqual(len(server.requests), 10)
+
+            # The server is gone: every response has to come from the cache
+            replayed = self.run_experiment(base_url, ResponseCache(directory, replay=True))
+            self.assertTrue(recorded.equals(replayed))
+
+            agent = LLMAgent(agent_id=0, model="other-model", base_url=base_url, cache=ResponseCache(directory, replay=True))
+            with self.assertRaises(CacheMissError):
+                agent.get_bid(AuctionState(agent_id=0, private_value=1.0, round_number=1), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from simulation.auction_environment import AuctionEnvironment
+from simulation.data_models import AuctionResult, Bid
+from simulation.results_store import AuctionResultStore
+from agents.random_agent import RandomAgent
+
+
+def make_result(round_number: int, winner: int) -> AuctionResult:
+    bids = [Bid(agent_id=0, bid_amount=10.0 + round_number), Bid(agent_id=1, bid_amount=5.0)]
+    return AuctionResult(
+        auction_id=1,
+        winning_agent_id=winner,
+        round_number=round_number,
+        winning_bid=bids[winner].bid_amount if winner >= 0 else 0.0,
+        all_bids=bids,
+        private_values={0: 50.0, 1: 20.0}
+    )
+
+
+class TestAuctionResultStore(unittest.TestCase):
+    def test_round_trip_through_lazy_view(self):
+        store = AuctionResultStore(auction_id=1, capacity=1)
+        originals = [make_result(r, 0) for r in range(1, 6)]
+        for result in originals:
+            store.append(result)
+
+        self.assertEqual(len(store), 5)
+        self.assertEqual(list(store), originals)
+        self.assertEqual(store[-1], originals[-1])
+        self.assertEqual(store[1:3], originals[1:3])
+        with self.assertRaises(IndexError):
+            store[5]
+
+    def test_columns(self):
+        store = AuctionResultStore(auction_id=1)
+        store.append(make_result(1, 0))
+        store.append(make_result(2, -1))
+
+        np.testing.assert_array_equal(store.round, [1, 1, 2, 2])
+        np.testing.assert_array_equal(store.agent_id, [0, 1, 0, 1])
+        np.testing.assert_array_equal(store.won, [True, False, False, False])
+        np.testing.assert_array_equal(store.utility, [39.0, 0.0, 0.0, 0.0])
+        np.testing.assert_array_equal(store.winning_agent_ids, [0, -1])
+
+    def test_append_rounds_matches_append(self):
+        bid_matrix = np.array([[11.0, 5.0], [12.0, 5.0]])
+        value_matrix = np.array([[50.0, 20.0], [50.0, 20.0]])
+        bulk = AuctionResultStore(auction_id=1)
+        bulk.append_rounds(
+            round_numbers=[1, 2],
+            agent_ids=[0, 1],
+            bid_matrix=bid_matrix,
+            value_matrix=value_matrix,
+            winner_indices=[0, -1],
+            winning_bids=[11.0, 0.0]
+        )
+        single = AuctionResultStore(auction_id=1)
+        single.append(make_result(1, 0))
+        single.append(make_result(2, -1))
+
+        self.assertEqual(list(bulk), list(single))
+        for name, column in single.columns().items():
+            np.testing.assert_array_equal(bulk.columns()[name], column)
+
+    def test_dataframe_export(self):
+        agents = [RandomAgent(agent_id=i, random_seed=i) for i in range(3)]
+        results = AuctionEnvironment(auction_id=1, random_seed=5, agents=agents).run_simulation(num_rounds=4)
+        df = results.to_dataframe()
+        self.assertEqual(list(df.columns), ["round", "agent_id", "bid_amount", "private_value", "won", "utility"])
+        self.assertEqual(len(df), 12)
+        self.assertEqual(int(df["won"].sum()), 4)
+
+    def test_parquet_export(self):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            self.skipTest("pyarrow not installed")
+        store = AuctionResultStore(auction_id=1)
+        store.append(make_result(1, 1))
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "results.parquet")
+            store.to_parquet(path)
+            table = pq.read_table(path)
+        self.assertEqual(table.column("bid_amount").to_pylist(), [11.0, 5.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
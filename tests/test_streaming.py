@@ -0,0 +1,145 @@
+import csv
+import os
+import tempfile
+import unittest
+
+from agents.random_agent import RandomAgent
+from simulation.auction_environment import AuctionEnvironment, MultiItemAuctionEnvironment
+from simulation.data_models import AuctionResult, Bid, Item
+from simulation.streaming import (
+    CSVSink,
+    HistoryWindow,
+    ParquetSink,
+    ResultSink,
+    RollingMetrics,
+    result_rows,
+    stream_results,
+)
+
+
+class HistoryLengthAgent(RandomAgent):
+    def __init__(self, agent_id: int):
+        super().__init__(agent_id, random_seed=agent_id)
+        self.history_lengths = []
+
+    def get_bid(self, auction_state, history):
+        self.history_lengths.append(len(history))
+        return super().get_bid(auction_state, history)
+
+    def get_item_bids(self, auction_state, history):
+        self.history_lengths.append(len(history))
+        return super().get_item_bids(auction_state, history)
+
+
+def make_result(round_number: int, winner: int, bids: dict[int, float], values: dict[int, float]) -> AuctionResult:
+    return AuctionResult(
+        auction_id=1,
+        winning_agent_id=winner,
+        round_number=round_number,
+        winning_bid=bids.get(winner, 0.0),
+        all_bids=[Bid(agent_id, amount) for agent_id, amount in bids.items()],
+        private_values=values
+    )
+
+
+class TestHistoryWindow(unittest.TestCase):
+    def test_keeps_most_recent(self):
+        window = HistoryWindow(3)
+        for i in range(5):
+            window.append(i)
+        self.assertEqual(list(window), [2, 3, 4])
+        self.assertEqual(window[-1], 4)
+        self.assertEqual(window[1:], [3, 4])
+        self.assertEqual(len(window), 3)
+
+
+class TestIterSimulation(unittest.TestCase):
+    def test_matches_run_simulation(self):
+        streamed = list(AuctionEnvironment(1, 3, [RandomAgent(i, random_seed=i) for i in range(3)]).iter_simulation(2500))
+        stored = AuctionEnvironment(1, 3, [RandomAgent(i, random_seed=i) for i in range(3)]).run_simulation(2500)
+        self.assertEqual(streamed, list(stored))
+
+    def test_per_round_agents_see_bounded_history(self):
+        agents = [HistoryLengthAgent(i) for i in range(2)]
+        env = AuctionEnvironment(1, 3, agents)
+        results = env.iter_simulation(10, history_window=4)
+        self.assertEqual(next(results).round_number, 1)
+        self.assertEqual([result.round_number for result in results], list(range(2, 11)))
+        self.assertEqual(agents[0].history_lengths, [0, 1, 2, 3, 4, 4, 4, 4, 4, 4])
+
+    def test_multi_item_matches_run_simulation(self):
+        def environment(agent_class):
+            items = [Item(item_id=i) for i in range(2)]
+            return MultiItemAuctionEnvironment(1, items, [agent_class(i) for i in range(3)], random_seed=9)
+
+        self.assertEqual(
+            list(environment(HistoryLengthAgent).iter_simulation(20, history_window=2)),
+            environment(HistoryLengthAgent).run_simulation(20)
+        )
+
+
+class TestSinks(unittest.TestCase):
+    def setUp(self):
+        self.results = [
+            make_result(1, 0, {0: 10.0, 1: 5.0}, {0: 30.0, 1: 20.0}),
+            make_result(2, 1, {0: 4.0, 1: 8.0}, {0: 6.0, 1: 9.0}),
+            make_result(3, -1, {0: 0.0, 1: 0.0}, {0: 1.0, 1: 2.0}),
+        ]
+
+    def test_result_rows(self):
+        rows = result_rows(self.results[0], agent_types={0: "LLM"})
+        self.assertEqual(rows[0], {
+            "round": 1, "agent_id": 0, "agent_type": "LLM", "bid_amount": 10.0,
+            "private_value": 30.0, "won": True, "utility": 20.0
+        })
+        self.assertEqual(rows[1]["utility"], 0.0)
+        self.assertEqual(rows[1]["agent_type"], "")
+
+    def test_csv_sink_writes_incrementally(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "results.csv")
+            with CSVSink(path) as sink:
+                sink.write(self.results[0])
+                sink._file.flush()
+                with open(path) as f:
+                    self.assertEqual(len(f.readlines()), 3)
+                stream_results(self.results[1:], [sink])
+            with open(path) as f:
+                rows = list(csv.DictReader(f))
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(rows[3]["round"], "2")
+        self.assertEqual(float(rows[3]["utility"]), 1.0)
+
+    def test_sinks_must_implement_write(self):
+        class NoWrite(ResultSink):
+            pass
+
+        with self.assertRaises(TypeError):
+            NoWrite()
+
+    def test_parquet_sink_writes_row_groups(self):
+        import pyarrow.parquet as pq
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "results.parquet")
+            with ParquetSink(path, row_group_size=2) as sink:
+                stream_results(self.results, [sink])
+            parquet_file = pq.ParquetFile(path)
+            self.assertEqual(parquet_file.num_row_groups, 3)
+            table = parquet_file.read()
+        self.assertEqual(table.column("round").to_pylist(), [1, 1, 2, 2, 3, 3])
+        self.assertEqual(table.column("utility").to_pylist(), [20.0, 0.0, 0.0, 1.0, 0.0, 0.0])
+
+    def test_rolling_metrics_window(self):
+        metrics = RollingMetrics(window=2)
+        stream_results(self.results, [metrics])
+        snapshot = metrics.snapshot()
+        self.assertEqual(snapshot["rounds"], 3)
+        self.assertEqual(snapshot["window_rounds"], 2)
+        self.assertEqual(snapshot["win_rate"], {0: 0.0, 1: 0.5})
+        self.assertEqual(snapshot["average_revenue"], 4.0)
+        self.assertEqual(snapshot["total_wins"], {0: 1, 1: 1})
+        self.assertEqual(snapshot["total_utility"], {0: 20.0, 1: 1.0})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,141 @@
+import random
+import threading
+import unittest
+
+from agents.random_agent import RandomAgent
+from agents.shading_agent import BayesNashAgent, ShadingAgent
+from simulation.auction_environment import AuctionEnvironment
+from simulation.data_models import Item
+from simulation.tournament import (
+    Leaderboard, Matchup, MatchupResult, Strategy, Tournament, play_matchup, round_robin, sampled_matchups
+)
+
+
+class ThreadRecordingAgent(ShadingAgent):
+    """ShadingAgent that records the thread it was built on."""
+
+    threads: set[str] = set()
+
+    def __init__(self, agent_id: int, shading_factor: float = 0.8):
+        super().__init__(agent_id, shading_factor)
+        ThreadRecordingAgent.threads.add(threading.current_thread().name)
+
+
+def pool() -> list[Strategy]:
+    return [
+        Strategy("random", RandomAgent, seeded=True),
+        Strategy("shade-0.5", ShadingAgent, {"shading_factor": 0.5}),
+        Strategy("shade-0.9", ShadingAgent, {"shading_factor": 0.9}),
+        Strategy("bayes-nash", BayesNashAgent, population_param="num_bidders"),
+    ]
+
+
+class TestMatchupGeneration(unittest.TestCase):
+    def test_round_robin(self):
+        matchups = round_robin(["c", "a", "b"], 2, seeds=[1, 2])
+        self.assertEqual(len(matchups), 6)
+        self.assertIn(Matchup(("a", "b"), 2), matchups)
+        with_repeats = round_robin(["a", "b"], 2, seeds=[1], with_repeats=True)
+        self.assertEqual([m.strategies for m in with_repeats], [("a", "a"), ("a", "b"), ("b", "b")])
+
+    def test_sampled_matchups_are_reproducible(self):
+        first = sampled_matchups(["a", "b", "c"], 4, count=5, seeds=[1], rng=random.Random(3))
+        second = sampled_matchups(["a", "b", "c"], 4, count=5, seeds=[1], rng=random.Random(3))
+        self.assertEqual(first, second)
+        self.assertTrue(all(len(m.strategies) == 4 for m in first))
+
+
+class TestTournament(unittest.TestCase):
+    def test_play_matchup_matches_environment(self):
+        strategies = tuple(pool()[:2])
+        utility, wins = play_matchup(strategies, seed=5, num_rounds=50)
+
+        agents = [RandomAgent(0, random_seed=5), ShadingAgent(1, shading_factor=0.5)]
+        results = AuctionEnvironment(auction_id=1, random_seed=5, agents=agents).run_simulation(50)
+        expected_wins = tuple(sum(r.winning_agent_id == i for r in results) for i in range(2))
+        expected_utility = tuple(
+            sum(r.private_values[i] - r.winning_bid for r in results if r.winning_agent_id == i) for i in range(2)
+        )
+        self.assertEqual(wins, expected_wins)
+        for actual, expected in zip(utility, expected_utility):
+            self.assertAlmostEqual(actual, expected)
+
+    def test_population_param(self):
+        agent = Strategy("bayes-nash", BayesNashAgent, population_param="num_bidders").build(0, 1, num_bidders=4)
+        self.assertEqual(agent.num_bidders, 4)
+
+    def test_parallel_matches_serial(self):
+        matchups = round_robin([s.name for s in pool()], 3, seeds=[1, 2])
+        serial = list(Tournament(pool(), num_rounds=30, max_workers=1).iter_results(matchups))
+        parallel = list(Tournament(pool(), num_rounds=30, max_workers=2).iter_results(matchups))
+        key = lambda result: (result.strategies, result.seed)
+        self.assertEqual(sorted(serial, key=key), sorted(parallel, key=key))
+
+        leaderboard = Tournament(pool(), num_rounds=30, max_workers=2).run(matchups)
+        self.assertEqual(len(leaderboard), 4)
+        self.assertEqual(leaderboard["random"].matchups, 6)
+
+    def test_duplicates_are_played_once(self):
+        strategies = pool() + [Strategy("half", ShadingAgent, {"shading_factor": 0.5})]
+        tournament = Tournament(strategies, num_rounds=10, max_workers=1)
+        matchups = [
+            Matchup(("random", "shade-0.5"), 1),
+            Matchup(("shade-0.5", "random"), 1),
+            Matchup(("random", "half"), 1),
+            Matchup(("random", "shade-0.5"), 2),
+        ]
+        results = list(tournament.iter_results(matchups))
+        self.assertEqual(len(results), 3)
+        self.assertEqual(len(tournament._played), 2)
+
+        by_names = {(r.strategies, r.seed): r for r in results}
+        original = by_names[(("random", "shade-0.5"), 1)]
+        alias = by_names[(("random", "half"), 1)]
+        self.assertEqual((original.utility, original.wins), (alias.utility, alias.wins))
+
+    def test_api_bound_matchups_use_thread_pool(self):
+        ThreadRecordingAgent.threads = set()
+        strategies = pool() + [Strategy("remote", ThreadRecordingAgent, api_bound=True)]
+        leaderboard = Tournament(strategies, num_rounds=10, max_workers=1, api_workers=2).run(
+            round_robin(["random", "remote"], 2, seeds=[1, 2])
+        )
+        self.assertEqual(leaderboard["remote"].matchups, 2)
+        self.assertTrue(ThreadRecordingAgent.threads)
+        self.assertNotIn(threading.main_thread().name, ThreadRecordingAgent.threads)
+
+    def test_multi_item_matchups(self):
+        items = [Item(item_id=i) for i in range(3)]
+        leaderboard = Tournament(pool(), num_rounds=10, items=items, max_workers=1).run(
+            [Matchup(("random", "shade-0.9"), 1)]
+        )
+        self.assertEqual(leaderboard["random"].wins + leaderboard["shade-0.9"].wins, 30)
+
+    def test_unknown_strategy(self):
+        with self.assertRaises(KeyError):
+            list(Tournament(pool(), num_rounds=5, max_workers=1).iter_results([Matchup(("nobody",), 1)]))
+
+    def test_evolution_replaces_worst(self):
+        tournament = Tournament(pool(), num_rounds=50, max_workers=1)
+        evolution = tournament.evolve(["random", "shade-0.5", "shade-0.9"], generations=3, seeds=[1])
+        self.assertEqual(len(evolution.populations), 4)
+        self.assertTrue(all(len(population) == 3 for population in evolution.populations))
+        first, second = evolution.populations[:2]
+        self.assertNotEqual(first, second)
+        with self.assertRaises(ValueError):
+            tournament.evolve(["random", "shade-0.5"], generations=1, seeds=[1], replace_count=2)
+
+
+class TestLeaderboard(unittest.TestCase):
+    def test_aggregates_seats(self):
+        leaderboard = Leaderboard()
+        leaderboard.add(MatchupResult(("a", "a", "b"), 1, 10, utility=(10.0, 30.0, 5.0), wins=(1, 3, 1)))
+        leaderboard.add(MatchupResult(("a", "b"), 2, 10, utility=(20.0, 0.0), wins=(2, 0)))
+        a = leaderboard["a"]
+        self.assertEqual((a.matchups, a.seats, a.agent_rounds, a.wins), (2, 3, 30, 6))
+        self.assertAlmostEqual(a.mean_utility, 2.0)
+        self.assertAlmostEqual(a.standard_error, (1.0 / 3) ** 0.5)
+        self.assertEqual([row["strategy"] for row in leaderboard.rows()], ["a", "b"])
+
+
+if __name__ == "__main__":
+    unittest.main()
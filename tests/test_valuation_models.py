@@ -1,8 +1,13 @@
+import random
 import unittest
+
+import numpy as np
+
 from simulation.valuation_models import (
     AdditiveValuation,
     SynergyValuation,
     SubstitutesValuation,
+    ValuationModel,
 )
 
 
@@ -125,5 +130,56 @@ class TestSubstitutesValuation(unittest.TestCase):
         self.assertEqual(value, 30.0)  # Same as additive
 
 
+class MaxItemValuation(ValuationModel):
+    """Model without a vectorized table, to exercise the generic compile path."""
+
+    def get_bundle_value(self, bundle, base_values):
+        return max((base_values.get(item_id, 0.0) for item_id in bundle), default=0.0)
+
+
+class TestCompiledValuation(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(0)
+        self.item_ids = [3, 5, 8, 13, 21, 34]
+        self.base_values = {item_id: rng.uniform(0, 100) for item_id in self.item_ids}
+        self.models = [
+            AdditiveValuation(),
+            SynergyValuation({frozenset({3, 5}): 10.0, frozenset({8, 34}): 4.0, frozenset({5, 99}): 7.0}),
+            SubstitutesValuation([frozenset({3, 8}), frozenset({13, 21, 34, 99})]),
+            MaxItemValuation(),
+        ]
+
+    def test_table_matches_get_bundle_value(self):
+        for model in self.models:
+            compiled = model.compile(self.item_ids, self.base_values)
+            self.assertEqual(compiled.table.shape, (64,))
+            for mask in range(64):
+                bundle = compiled.bundle_of(mask)
+                self.assertEqual(compiled.mask_of(bundle), mask)
+                self.assertAlmostEqual(
+                    compiled.value(bundle),
+                    model.get_bundle_value(bundle, self.base_values),
+                    msg=f"{type(model).__name__} {sorted(bundle)}"
+                )
+
+    def test_batched_base_values(self):
+        values = np.random.default_rng(1).uniform(0, 100, size=(4, 3, len(self.item_ids)))
+        for model in self.models:
+            compiled = model.compile(self.item_ids, values)
+            self.assertEqual(compiled.table.shape, (4, 3, 64))
+            single = model.compile(self.item_ids, dict(zip(self.item_ids, values[2, 1])))
+            np.testing.assert_allclose(compiled.table[2, 1], single.table)
+
+    def test_batch_lookup(self):
+        compiled = SynergyValuation({frozenset({3, 5}): 10.0}).compile(self.item_ids, self.base_values)
+        masks = np.array([0, 1, 3, 63])
+        np.testing.assert_allclose(compiled.values(masks), compiled.table[masks])
+        self.assertAlmostEqual(compiled.value(3), self.base_values[3] + self.base_values[5] + 10.0)
+
+    def test_too_many_items(self):
+        with self.assertRaises(ValueError):
+            AdditiveValuation().compile(list(range(21)), {})
+
+
 if __name__ == "__main__":
     unittest.main()
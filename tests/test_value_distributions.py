@@ -0,0 +1,98 @@
+import pickle
+import random
+import unittest
+
+import numpy as np
+
+from agents.random_agent import RandomAgent
+from simulation.auction_environment import AuctionEnvironment, MultiItemAuctionEnvironment
+from simulation.data_models import Item
+from simulation.value_distributions import (
+    AffiliatedValues,
+    CommonValuePlusNoise,
+    ItemValues,
+    LogNormalValues,
+    UniformValues,
+    ValueSampler,
+    numpy_generator,
+)
+
+
+class TestNumpyGenerator(unittest.TestCase):
+    def test_matches_random_uniform_and_advances_state(self):
+        rng = random.Random(100)
+        reference = random.Random(100)
+        with numpy_generator(rng) as generator:
+            drawn = 100.0 * generator.random(500)
+        expected = [reference.uniform(0, 100) for _ in range(500)]
+        np.testing.assert_array_equal(drawn, expected)
+        self.assertEqual(rng.random(), reference.random())
+
+
+class TestValueSampler(unittest.TestCase):
+    def test_block_size_does_not_change_uniform_values(self):
+        per_round = ValueSampler(UniformValues(), random.Random(3), block_rounds=1)
+        blocked = ValueSampler(UniformValues(), random.Random(3), block_rounds=64)
+        blocked.reserve(100)
+        for _ in range(100):
+            np.testing.assert_array_equal(per_round.next_round(4, 2), blocked.next_round(4, 2))
+
+    def test_reserve_draws_exactly_the_remaining_rounds(self):
+        rng = random.Random(3)
+        sampler = ValueSampler(UniformValues(), rng)
+        sampler.reserve(10)
+        values = sampler.next_rounds(10, 2, 3)
+        reference = random.Random(3)
+        for _ in range(60):
+            reference.random()
+        self.assertEqual(values.shape, (10, 2, 3))
+        self.assertEqual(rng.getstate(), reference.getstate())
+
+    def test_distributions(self):
+        generator = np.random.default_rng(0)
+        for distribution in [UniformValues(10, 20), LogNormalValues(), AffiliatedValues(), CommonValuePlusNoise()]:
+            values = distribution.sample(generator, 50, 4, 3)
+            self.assertEqual(values.shape, (50, 4, 3))
+            self.assertTrue((values >= 0).all())
+        identical = AffiliatedValues(weight=1.0).sample(generator, 20, 4, 2)
+        np.testing.assert_allclose(identical, np.broadcast_to(identical[:, :1], identical.shape))
+        with self.assertRaises(ValueError):
+            AffiliatedValues(weight=2.0)
+
+
+class TestItemValues(unittest.TestCase):
+    def test_mapping_interface(self):
+        values = ItemValues({7: 0, 9: 1}, np.array([1.5, 2.5]))
+        self.assertEqual(values[9], 2.5)
+        self.assertEqual(values.get(8, 0), 0)
+        self.assertEqual(dict(values), {7: 1.5, 9: 2.5})
+        self.assertEqual(values, {7: 1.5, 9: 2.5})
+        self.assertEqual(pickle.loads(pickle.dumps(values)), values)
+
+
+class TestEnvironmentValues(unittest.TestCase):
+    def test_default_values_match_scalar_draws(self):
+        env = AuctionEnvironment(auction_id=1, random_seed=8, agents=[RandomAgent(i) for i in range(3)])
+        results = env.run_simulation(num_rounds=5)
+        reference = random.Random(8)
+        for result in results:
+            expected = {agent_id: reference.uniform(0, 100) for agent_id in range(3)}
+            self.assertEqual(result.private_values, expected)
+
+    def test_custom_distribution_is_reproducible(self):
+        def run():
+            agents = [RandomAgent(i, random_seed=i) for i in range(3)]
+            items = [Item(item_id=i) for i in range(2)]
+            env = MultiItemAuctionEnvironment(
+                auction_id=1, items=items, agents=agents, random_seed=4,
+                value_distribution=CommonValuePlusNoise(noise_std=5.0)
+            )
+            return env.run_simulation(num_rounds=6)
+
+        first, second = run(), run()
+        self.assertEqual(first, second)
+        self.assertIsInstance(first[0].private_values[0], ItemValues)
+
+
+if __name__ == "__main__":
+    unittest.main()
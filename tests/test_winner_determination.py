@@ -0,0 +1,123 @@
+import itertools
+import random
+import time
+import unittest
+
+from simulation.auction_logic import run_combinatorial_auction
+from simulation.data_models import BundleBid, Item
+from simulation.winner_determination import (
+    BranchAndBoundWinnerDetermination,
+    GreedyWinnerDetermination,
+)
+
+
+def random_instance(seed: int, num_items: int, num_agents: int, bids_per_agent: int, max_size: int):
+    rng = random.Random(seed)
+    items = [Item(item_id=i) for i in range(num_items)]
+    bids = []
+    for agent_id in range(num_agents):
+        for _ in range(bids_per_agent):
+            bundle = frozenset(rng.sample(range(num_items), rng.randint(1, max_size)))
+            amount = sum(rng.uniform(0, 20) for _ in bundle) * rng.uniform(1.0, 1.5)
+            bids.append(BundleBid(agent_id=agent_id, bundle=bundle, amount=amount))
+    return items, bids
+
+
+def brute_force_value(bids: list[BundleBid]) -> float:
+    best = 0.0
+    for r in range(len(bids) + 1):
+        for combo in itertools.combinations(bids, r):
+            agents = [bid.agent_id for bid in combo]
+            items = [item_id for bid in combo for item_id in bid.bundle]
+            if len(set(agents)) == len(agents) and len(set(items)) == len(items):
+                best = max(best, sum(bid.amount for bid in combo))
+    return best
+
+
+def assert_feasible(test: unittest.TestCase, accepted: list[BundleBid]) -> None:
+    agents = [bid.agent_id for bid in accepted]
+    items = [item_id for bid in accepted for item_id in bid.bundle]
+    test.assertEqual(len(set(agents)), len(agents))
+    test.assertEqual(len(set(items)), len(items))
+
+
+class TestBranchAndBound(unittest.TestCase):
+    def test_matches_brute_force(self):
+        for seed in range(25):
+            items, bids = random_instance(seed, num_items=5, num_agents=4, bids_per_agent=3, max_size=3)
+            solution = BranchAndBoundWinnerDetermination().solve(bids, items)
+            self.assertTrue(solution.optimal)
+            self.assertAlmostEqual(solution.value, brute_force_value(bids))
+            assert_feasible(self, solution.accepted_bids)
+
+    def test_xor_constraint(self):
+        items = [Item(item_id=0), Item(item_id=1)]
+        bids = [
+            BundleBid(agent_id=0, bundle=frozenset({0}), amount=10.0),
+            BundleBid(agent_id=0, bundle=frozenset({1}), amount=10.0),
+            BundleBid(agent_id=1, bundle=frozenset({0, 1}), amount=15.0),
+        ]
+        solution = BranchAndBoundWinnerDetermination().solve(bids, items)
+        self.assertEqual(solution.accepted_bids, [bids[2]])
+        self.assertEqual(solution.value, 15.0)
+
+    def test_excluded_agents(self):
+        items = [Item(item_id=0)]
+        bids = [
+            BundleBid(agent_id=0, bundle=frozenset({0}), amount=10.0),
+            BundleBid(agent_id=1, bundle=frozenset({0}), amount=8.0),
+        ]
+        solution = BranchAndBoundWinnerDetermination().solve(bids, items, excluded_agents=frozenset({0}))
+        self.assertEqual(solution.accepted_bids, [bids[1]])
+
+    def test_invalid_bundles(self):
+        items = [Item(item_id=0)]
+        with self.assertRaises(ValueError):
+            BranchAndBoundWinnerDetermination().solve([BundleBid(0, frozenset({5}), 1.0)], items)
+        with self.assertRaises(ValueError):
+            BranchAndBoundWinnerDetermination().solve([BundleBid(0, frozenset(), 1.0)], items)
+
+    def test_twenty_items_hundreds_of_bids(self):
+        items, bids = random_instance(0, num_items=20, num_agents=30, bids_per_agent=10, max_size=4)
+        start = time.perf_counter()
+        solution = BranchAndBoundWinnerDetermination().solve(bids, items)
+        elapsed = time.perf_counter() - start
+
+        self.assertTrue(solution.optimal)
+        self.assertLess(elapsed, 10.0)
+        self.assertGreaterEqual(solution.value, GreedyWinnerDetermination().solve(bids, items).value)
+        assert_feasible(self, solution.accepted_bids)
+
+    def test_time_budget_falls_back_to_best_found(self):
+        items, bids = random_instance(2, num_items=25, num_agents=60, bids_per_agent=10, max_size=6)
+        solution = BranchAndBoundWinnerDetermination(time_budget=0.0).solve(bids, items)
+        self.assertFalse(solution.optimal)
+        self.assertGreaterEqual(solution.value, GreedyWinnerDetermination().solve(bids, items).value)
+        assert_feasible(self, solution.accepted_bids)
+
+
+class TestRunCombinatorialAuction(unittest.TestCase):
+    def test_first_price_allocation(self):
+        items = [Item(item_id=i) for i in range(3)]
+        bids = [
+            BundleBid(agent_id=0, bundle=frozenset({0, 1}), amount=30.0),
+            BundleBid(agent_id=1, bundle=frozenset({0}), amount=20.0),
+            BundleBid(agent_id=1, bundle=frozenset({2}), amount=5.0),
+            BundleBid(agent_id=2, bundle=frozenset({1, 2}), amount=12.0),
+        ]
+        result = run_combinatorial_auction(bids, items, auction_id=1, round_number=3)
+        self.assertEqual(result.allocations, {0: 0, 1: 0, 2: 1})
+        self.assertEqual(result.payments, {0: 30.0, 1: 5.0})
+        self.assertEqual(result.welfare, 35.0)
+        self.assertTrue(result.optimal)
+        self.assertEqual(result.round_number, 3)
+
+    def test_no_bids(self):
+        items = [Item(item_id=0)]
+        result = run_combinatorial_auction([], items, auction_id=1)
+        self.assertEqual(result.allocations, {0: -1})
+        self.assertEqual(result.payments, {})
+
+
+if __name__ == "__main__":
+    unittest.main()